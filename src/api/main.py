@@ -180,6 +180,22 @@ async def lifespan(app: FastAPI):
             logger.warning(f"Could not initialize RegexEngine: {e}")
             app.state.regex_engine = None
 
+        # Relationship extractor pool: /extract/relationships reuses warm extractors
+        # instead of compiling patterns (and loading models) on every call
+        logger.info("Initializing RelationshipExtractorPool for /extract/relationships...")
+        try:
+            from src.core.relationships.extractor_pool import RelationshipExtractorPool
+            from src.api.routes.relationships import relationship_extraction_config
+            app.state.relationship_extractor_pool = RelationshipExtractorPool()
+            # Warm in the background so startup does not wait for it
+            app.state.relationship_pool_warmup = asyncio.create_task(
+                app.state.relationship_extractor_pool.warm(relationship_extraction_config())
+            )
+            logger.info("✅ RelationshipExtractorPool created (warming in background)")
+        except Exception as e:
+            logger.warning(f"Could not initialize RelationshipExtractorPool: {e}")
+            app.state.relationship_extractor_pool = None
+
         # AIEnhancer disabled - legacy component that imports deleted vllm_http_client
         # Wave System v2 uses ExtractionOrchestrator directly
         app.state.ai_enhancer = None
@@ -285,6 +301,14 @@ async def lifespan(app: FastAPI):
         # ExtractionService cleanup removed - ExtractionService disabled
         # CALES cleanup removed - CALES disabled
 
+        # Release warm relationship extractors (and any ML worker processes)
+        if getattr(app.state, 'relationship_extractor_pool', None):
+            app.state.relationship_extractor_pool.close()
+        
+        # Close process-wide extraction clients (replica pools)
+        from src.vllm_client.factory import close_shared_clients
+        await close_shared_clients()
+
         # Cleanup vLLM client
         if hasattr(app.state, 'vllm_client') and app.state.vllm_client:
             logger.info("Shutting down vLLM client...")
@@ -5,16 +5,25 @@ This module provides v2 API endpoints that leverage intelligent document routing
 direct vLLM integration, and consolidated prompting strategies.
 """
 
-from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, Depends, status
+from typing import Dict, Any, List, Optional, AsyncIterator
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+import asyncio
+import json
 import logging
+import time
 
 # CLAUDE.md Compliant: Absolute imports
 from src.routing.document_router import DocumentRouter, RoutingDecision, ProcessingStrategy
 from src.routing.size_detector import SizeDetector, DocumentSizeInfo, SizeCategory
 from src.core.config import get_settings
 from src.core.extraction_orchestrator import ExtractionOrchestrator, ExtractionResult, create_extraction_orchestrator
+from src.core.streaming_ingestion import decode_text_stream
+from src.core.token_counter import get_token_counter
+from src.vllm_client.models import BatchPriority
+from src.vllm_client.exceptions import DeadlineExceededError
+from src.vllm_client.scheduler import RequestContext, set_request_context, reset_request_context
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +73,21 @@ class ExtractRequest(BaseModel):
         }
 
 
+class IncrementalExtractRequest(BaseModel):
+    """Request for re-extraction of a new version of a known document."""
+    document_text: str = Field(..., description="Full text of the new document version")
+    document_id: str = Field(..., description="Document identifier (stable across versions)")
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "document_text": "Contract between Party A and Party C...",
+                "document_id": "contract_001"
+            }
+        }
+
+
 class ChunkRequest(BaseModel):
     """Request for chunking only (no extraction)."""
     document_text: str = Field(..., description="Full document text")
@@ -146,6 +170,14 @@ class ExtractResponse(BaseModel):
     processing_stats: Dict[str, Any]
 
 
+class IncrementalExtractResponse(BaseModel):
+    """Response from incremental extraction."""
+    document_id: str
+    entities: List[Dict[str, Any]]
+    delta: Dict[str, Any]
+    processing_stats: Dict[str, Any]
+
+
 class ChunkResponse(BaseModel):
     """Response from chunking-only."""
     document_id: str
@@ -172,14 +204,14 @@ async def get_document_router() -> DocumentRouter:
     """Get DocumentRouter instance."""
     settings = get_settings()
     # TODO: Initialize with actual configuration
-    return DocumentRouter()
+    return DocumentRouter(token_counter=get_token_counter())
 
 
 async def get_size_detector() -> SizeDetector:
     """Get SizeDetector instance."""
     settings = get_settings()
     # TODO: Initialize with actual configuration
-    return SizeDetector()
+    return SizeDetector(token_counter=get_token_counter())
 
 
 async def get_extraction_orchestrator() -> ExtractionOrchestrator:
@@ -208,18 +240,69 @@ async def get_extraction_orchestrator() -> ExtractionOrchestrator:
     # Determine preferred client type
     preferred = VLLMClientType.DIRECT_API if settings.vllm_direct.enable_vllm_direct else VLLMClientType.HTTP_API
 
-    # Create vLLM client asynchronously with CORRECTED parameter name
-    vllm_client = await VLLMClientFactory.create_client(
-        preferred_type=preferred,  # ✅ Fixed: 'preferred_type' not 'use_direct'
-        config=config,
-        enable_fallback=True
-    )
-
-    # Return orchestrator with initialized client
+    # Balance (and optionally hedge) across Instruct replicas when more than one is configured
+    replica_config = VLLMConfig.from_settings(settings)
+    if len(replica_config.get_instruct_urls()) > 1:
+        # One pool per process: routing load, stickiness and hedge state span requests
+        from src.vllm_client.factory import get_replica_pool_client
+        from src.vllm_client.models import VLLMServiceType
+        vllm_client = await get_replica_pool_client(VLLMServiceType.INSTRUCT, replica_config)
+    else:
+        from src.vllm_client.factory import get_shared_client
+
+        async def create_extraction_client():
+            # Create vLLM client asynchronously with CORRECTED parameter name
+            client = await VLLMClientFactory.create_client(
+                preferred_type=preferred,  # ✅ Fixed: 'preferred_type' not 'use_direct'
+                config=config,
+                enable_fallback=True
+            )
+
+            # Share one KV token budget per vLLM endpoint across requests
+            if settings.vllm_direct.vllm_enable_admission_control:
+                from src.core.throttled_vllm_client import ThrottledVLLMClient
+                client = ThrottledVLLMClient(client)
+            return client
+
+        # One client per process, so concurrent requests' calls can be micro-batched together
+        vllm_client = await get_shared_client("extraction:instruct", create_extraction_client)
+
+    # Return orchestrator with initialized client; chunk budgets are
+    # counted with the same token counter as routing
+    from src.core.smart_chunker import SmartChunker
     return ExtractionOrchestrator(
         prompt_manager=None,  # Will create default PromptManager
-        vllm_client=vllm_client
+        vllm_client=vllm_client,
+        smart_chunker=SmartChunker(settings.chunking, token_counter=get_token_counter())
+    )
+
+
+def build_request_context(
+    http_request: Request,
+    document_id: str,
+    strategy: ProcessingStrategy
+) -> RequestContext:
+    """
+    Build the vLLM scheduling context for an API request.
+
+    Without an explicit X-Request-Priority header, chunked extractions of large
+    documents run as LOW priority so interactive requests are not queued
+    behind dozens of chunk calls.
+    """
+    default_priority = (
+        BatchPriority.LOW if strategy == ProcessingStrategy.THREE_WAVE_CHUNKED else BatchPriority.NORMAL
     )
+    context = RequestContext.from_headers(
+        http_request.headers,
+        document_id=document_id,
+        default_priority=default_priority
+    )
+
+    default_timeout_ms = get_settings().vllm_direct.vllm_default_request_timeout_ms
+    if context.deadline is None and default_timeout_ms > 0:
+        context.deadline = time.time() + default_timeout_ms / 1000.0
+
+    return context
 
 
 # ============================================================================
@@ -229,6 +312,7 @@ async def get_extraction_orchestrator() -> ExtractionOrchestrator:
 @router.post("/process/extract", response_model=ExtractResponse, status_code=status.HTTP_200_OK)
 async def extract_entities(
     request: ExtractRequest,
+    http_request: Request,
     router: DocumentRouter = Depends(get_document_router),
     orchestrator: ExtractionOrchestrator = Depends(get_extraction_orchestrator)
 ) -> ExtractResponse:
@@ -243,6 +327,12 @@ async def extract_entities(
     - When chunking is not desired
     - When you only need entity extraction
 
+    **Scheduling Headers (optional):**
+    - `X-Request-Priority`: urgent | high | normal | low (or 0-3)
+    - `X-Request-Timeout-Ms` / `X-Request-Deadline`: relative budget or absolute unix time;
+      LLM calls still queued when it passes are cancelled and the request fails with 504
+    - `X-Tenant-Id`: fair-share key (defaults to the document id)
+
     **Returns:**
     - Extracted entities
     - Routing decision
@@ -259,13 +349,18 @@ async def extract_entities(
             strategy_override=request.force_strategy
         )
 
-        # Step 2: Extract entities using orchestrator
-        extraction_result = await orchestrator.extract(
-            document_text=request.document_text,
-            routing_decision=routing_decision,
-            size_info=routing_decision.size_info,
-            metadata=request.metadata
-        )
+        # Step 2: Extract entities using orchestrator, scheduled by priority/deadline
+        context = build_request_context(http_request, document_id, routing_decision.strategy)
+        context_token = set_request_context(context)
+        try:
+            extraction_result = await orchestrator.extract(
+                document_text=request.document_text,
+                routing_decision=routing_decision,
+                size_info=routing_decision.size_info,
+                metadata=request.metadata
+            )
+        finally:
+            reset_request_context(context_token)
 
         # Step 3: Build response
         return ExtractResponse(
@@ -286,6 +381,16 @@ async def extract_entities(
             }
         )
 
+    except DeadlineExceededError as e:
+        logger.warning(f"Entity extraction deadline exceeded for {document_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "message": f"Request deadline exceeded: {str(e)}",
+                "document_id": document_id
+            }
+        )
+
     except Exception as e:
         logger.error(f"Entity extraction failed: {e}", exc_info=True)
         raise HTTPException(
@@ -297,6 +402,256 @@ async def extract_entities(
         )
 
 
+@router.post(
+    "/process/extract/incremental",
+    response_model=IncrementalExtractResponse,
+    status_code=status.HTTP_200_OK
+)
+async def extract_entities_incremental(
+    request: IncrementalExtractRequest,
+    http_request: Request,
+    orchestrator: ExtractionOrchestrator = Depends(get_extraction_orchestrator)
+) -> IncrementalExtractResponse:
+    """
+    **Incremental Entity Extraction (v2)**
+
+    Re-extracts a new version of a document by diffing it against the
+    previous version stored for the same `document_id`. Entities in unchanged
+    text are rebased onto the new offsets; only changed regions (plus a
+    context margin) go back through 3-wave extraction. The first version of
+    a document is extracted in full.
+
+    **Returns:**
+    - Full entity set for the new version
+    - Delta against the previous version: added, removed and moved entities
+    - Reuse statistics (chunks reused, characters re-extracted)
+    """
+    logger.info(f"Incremental extraction (v2): {request.document_id}")
+
+    try:
+        context = build_request_context(http_request, request.document_id, ProcessingStrategy.THREE_WAVE)
+        context_token = set_request_context(context)
+        try:
+            result = await orchestrator.extract_incremental(
+                document_id=request.document_id,
+                document_text=request.document_text,
+                metadata=request.metadata
+            )
+        finally:
+            reset_request_context(context_token)
+
+        return IncrementalExtractResponse(
+            document_id=request.document_id,
+            entities=result.entities,
+            delta=result.delta.to_dict(),
+            processing_stats={
+                **result.stats,
+                "full_extraction": result.full_extraction,
+                "entities_extracted": len(result.entities)
+            }
+        )
+
+    except DeadlineExceededError as e:
+        logger.warning(f"Incremental extraction deadline exceeded for {request.document_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "message": f"Request deadline exceeded: {str(e)}",
+                "document_id": request.document_id
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Incremental extraction failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": f"Incremental extraction failed: {str(e)}",
+                "document_id": request.document_id
+            }
+        )
+
+
+# Multipart uploads are spooled to disk by the form parser and read back in pieces
+UPLOAD_READ_SIZE = 64 * 1024
+
+
+async def _read_upload(upload) -> AsyncIterator[bytes]:
+    """Read an uploaded file in UPLOAD_READ_SIZE pieces."""
+    while True:
+        data = await upload.read(UPLOAD_READ_SIZE)
+        if not data:
+            return
+        yield data
+
+
+# Body pieces read ahead of extraction for a streamed request body
+STREAM_BODY_QUEUE_SIZE = 8
+
+
+class _RequestBodyReader:
+    """
+    Reads a streamed request body from its own task into a bounded queue.
+
+    StreamingResponse calls receive() to listen for a client disconnect while
+    it sends the response, so a body read from inside the response generator
+    competes with it for messages and loses pieces. The reader is the only
+    consumer of receive() until the body has ended.
+    """
+
+    def __init__(self, request: Request):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BODY_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._read(request.stream()))
+
+    async def _read(self, stream: AsyncIterator[bytes]):
+        try:
+            async for data in stream:
+                if data:
+                    await self._queue.put(data)
+            await self._queue.put(None)
+        except Exception as e:
+            await self._queue.put(e)
+
+    async def pieces(self) -> AsyncIterator[bytes]:
+        """Body pieces in order; raises what reading the body raised."""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def wait_read(self):
+        """Wait until the whole body has been received (or reading failed)."""
+        await asyncio.wait({self._task})
+
+    def close(self):
+        """Stop reading (the response is done with the body)."""
+        self._task.cancel()
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves receive() to a _RequestBodyReader until the body is read."""
+
+    def __init__(self, content, body_reader: Optional[_RequestBodyReader] = None, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_reader = body_reader
+
+    async def listen_for_disconnect(self, receive) -> None:
+        if self.body_reader is not None:
+            await self.body_reader.wait_read()
+        await super().listen_for_disconnect(receive)
+
+
+@router.post("/process/extract/stream", status_code=status.HTTP_200_OK)
+async def extract_entities_stream(
+    http_request: Request,
+    document_id: Optional[str] = None,
+    orchestrator: ExtractionOrchestrator = Depends(get_extraction_orchestrator)
+) -> StreamingResponse:
+    """
+    **Streaming Entity Extraction (v2)**
+
+    Extracts entities from a document sent as a plain-text body (typically
+    with `Transfer-Encoding: chunked`) or as the `file` field of a
+    multipart/form-data upload, without holding the whole document in
+    memory. Chunks are cut with SmartChunker's boundary logic as text arrives
+    and dispatched to 3-wave extraction while the rest is still being read.
+
+    **Query Parameters:**
+    - `document_id`: Document identifier (generated if omitted)
+
+    **Scheduling Headers (optional):** as for `/process/extract`
+
+    **Returns:** `application/x-ndjson`, one line per chunk in document order
+    (`chunk_index`, `start_pos`, `end_pos`, `entities` with document
+    positions, `tokens_used`, `error` if the chunk failed), then a summary
+    line with `done: true`. A failure after streaming has started is
+    reported as a final line with `error` and `done: true`.
+    """
+    document_id = document_id or f"stream_{int(time.time() * 1000)}"
+    logger.info(f"Streaming extraction (v2): {document_id}")
+
+    content_type = http_request.headers.get("content-type", "")
+    encoding = "utf-8"
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "charset" and value:
+            encoding = value.strip('"')
+
+    context = build_request_context(http_request, document_id, ProcessingStrategy.THREE_WAVE_CHUNKED)
+
+    if content_type.startswith("multipart/form-data"):
+        form = await http_request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"message": "Multipart upload needs a 'file' field", "document_id": document_id}
+            )
+        body_reader = None
+        byte_stream = _read_upload(upload)
+    else:
+        body_reader = _RequestBodyReader(http_request)
+        byte_stream = body_reader.pieces()
+
+    async def ndjson_lines() -> AsyncIterator[str]:
+        start_time = time.time()
+        chunks = entities = tokens_used = chars = 0
+
+        async def counted(pieces: AsyncIterator[str]) -> AsyncIterator[str]:
+            # Chunks end before trailing whitespace, so count the decoded text itself
+            nonlocal chars
+            async for piece in pieces:
+                chars += len(piece)
+                yield piece
+
+        context_token = set_request_context(context)
+        try:
+            async for result in orchestrator.extract_stream(
+                counted(decode_text_stream(byte_stream, encoding)),
+                metadata={"document_id": document_id}
+            ):
+                chunks += 1
+                entities += len(result["entities"])
+                tokens_used += result["tokens_used"]
+                yield json.dumps(result, default=str) + "\n"
+
+            yield json.dumps({
+                "document_id": document_id,
+                "done": True,
+                "chunks": chunks,
+                "entities_extracted": entities,
+                "tokens_used": tokens_used,
+                "chars_processed": chars,
+                "duration_seconds": time.time() - start_time
+            }) + "\n"
+
+        except DeadlineExceededError as e:
+            logger.warning(f"Streaming extraction deadline exceeded for {document_id}: {e}")
+            yield json.dumps({
+                "document_id": document_id,
+                "done": True,
+                "error": f"Request deadline exceeded: {str(e)}"
+            }) + "\n"
+
+        except Exception as e:
+            logger.error(f"Streaming extraction failed: {e}", exc_info=True)
+            yield json.dumps({
+                "document_id": document_id,
+                "done": True,
+                "error": f"Streaming extraction failed: {str(e)}"
+            }) + "\n"
+
+        finally:
+            if body_reader is not None:
+                body_reader.close()
+            reset_request_context(context_token)
+
+    return _BodyStreamingResponse(ndjson_lines(), body_reader=body_reader, media_type="application/x-ndjson")
+
+
 # ============================================================================
 # Health & Info Endpoints
 # ============================================================================
@@ -327,7 +682,9 @@ async def v2_info() -> Dict[str, Any]:
             "chunked": "Large documents (>150K chars)"
         },
         "endpoints": {
-            "extract": "POST /api/v2/process/extract - Entity extraction with intelligent routing (ACTIVE)"
+            "extract": "POST /api/v2/process/extract - Entity extraction with intelligent routing (ACTIVE)",
+            "extract_incremental": "POST /api/v2/process/extract/incremental - Diff-aware re-extraction of a new document version",
+            "extract_stream": "POST /api/v2/process/extract/stream - Streaming extraction of a chunked or multipart text body (NDJSON)"
         },
         "status": {
             "phase_3_1": "complete",
@@ -613,6 +613,48 @@ async def get_relationship_statistics(
         )
 
 
+def relationship_extraction_config(confidence_threshold: float = 0.75, context_window: int = 250):
+    """
+    ExtractionConfig for /extract/relationships (pattern-based only, no spaCy or ML).
+
+    Args:
+        confidence_threshold: Minimum confidence for patterns and results
+        context_window: Character window for proximity relationships
+    """
+    from src.core.relationships.relationship_extractor import ExtractionConfig
+
+    return ExtractionConfig(
+        use_patterns=True,
+        use_dependency_parsing=False,  # No spaCy
+        use_coreference=False,  # Keep simple for now
+        use_proximity=True,
+        use_ml_model=False,
+        pattern_confidence_threshold=confidence_threshold,
+        proximity_window=context_window,
+        max_entity_distance=context_window * 2,
+        overall_confidence_threshold=confidence_threshold,
+        include_context=True,
+        context_window=50,
+        merge_duplicates=True
+    )
+
+
+def get_relationship_extractor_pool(app):
+    """
+    Process-level RelationshipExtractorPool of the app.
+
+    The lifespan creates (and warms) it at startup; apps started without
+    the lifespan get one on first use.
+    """
+    extractor_pool = getattr(app.state, "relationship_extractor_pool", None)
+    if extractor_pool is None:
+        from src.core.relationships.extractor_pool import RelationshipExtractorPool
+
+        extractor_pool = RelationshipExtractorPool()
+        app.state.relationship_extractor_pool = extractor_pool
+    return extractor_pool
+
+
 @router.post("/extract/relationships", response_model=RelationshipExtractionResponse)
 async def extract_relationships(
     request_body: RelationshipExtractionRequest,
@@ -652,11 +694,7 @@ async def extract_relationships(
     try:
         import time
         import uuid
-        from src.core.relationships.relationship_extractor import (
-            RelationshipExtractor,
-            ExtractionConfig,
-            EntityMention
-        )
+        from src.core.relationships.relationship_extractor import EntityMention
 
         start_time = time.time()
         extraction_id = str(uuid.uuid4())
@@ -670,24 +708,13 @@ async def extract_relationships(
             )
 
         # Configure extraction (pattern-based only, no spaCy or ML)
-        config = ExtractionConfig(
-            use_patterns=True,
-            use_dependency_parsing=False,  # No spaCy
-            use_coreference=False,  # Keep simple for now
-            use_proximity=True,
-            use_ml_model=False,
-            pattern_confidence_threshold=request_body.confidence_threshold,
-            proximity_window=request_body.context_window,
-            max_entity_distance=request_body.context_window * 2,
-            overall_confidence_threshold=request_body.confidence_threshold,
-            include_context=True,
-            context_window=50,
-            merge_duplicates=True
+        config = relationship_extraction_config(
+            confidence_threshold=request_body.confidence_threshold,
+            context_window=request_body.context_window
         )
 
-        # Create extractor - Note: extractor will create LegalRelationshipPatterns by default
-        # but we'll use proximity-based extraction which doesn't require patterns
-        extractor = RelationshipExtractor(config)
+        # Warm extractor from the app's pool; this request's config is applied as an overlay
+        extractor_pool = get_relationship_extractor_pool(request.app)
 
         # Convert request entities to EntityMention objects
         entity_mentions = []
@@ -748,10 +775,11 @@ async def extract_relationships(
 
         logger.info(f"Processing {len(entity_mentions)} entities for relationship extraction")
 
-        # Extract relationships using the extractor
-        result = extractor.extract_relationships(
+        # Extract relationships on the warm extractor (in a worker thread)
+        result = await extractor_pool.extract(
             text=request_body.content,
             entities=entity_mentions,
+            config=config,
             document_id=request_body.document_id
         )
 
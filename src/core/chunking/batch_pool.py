@@ -0,0 +1,110 @@
+"""
+Per-batch worker process pool for batch chunking.
+
+ChunkingEngine starts one BatchWorkerPool per running batch so that
+cancelling a batch can stop the documents it is chunking without touching
+other batches. Workers are spawned (never forked: they must not inherit the
+event loop, locks or model handles of the service process), and the pool
+records every worker it starts, since ProcessPoolExecutor offers no public
+way to stop a call that is already running.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class _TrackingContext:
+    """Multiprocessing context that records the processes created through it."""
+
+    def __init__(self, base):
+        self._base = base
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+
+    def Process(self, *args, **kwargs):
+        process = self._base.Process(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+    def __getattr__(self, name):
+        return getattr(self._base, name)
+
+
+class BatchWorkerPool:
+    """
+    Process pool owned by a single batch.
+
+    Usage:
+        pool = BatchWorkerPool(workers=4, initializer=init, initargs=(settings,))
+        result = await pool.run(fn, *args)
+        pool.terminate()  # on cancel: drop queued calls, kill running ones
+        pool.close()      # on completion
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        initializer: Optional[Callable] = None,
+        initargs: Sequence[Any] = ()
+    ):
+        """
+        Initialize BatchWorkerPool.
+
+        Args:
+            workers: Maximum worker processes
+            initializer: Called once in every worker before its first call
+            initargs: Arguments for initializer (must be picklable)
+        """
+        self.workers = max(1, workers)
+        self._context = _TrackingContext(multiprocessing.get_context("spawn"))
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=initializer,
+            initargs=tuple(initargs)
+        )
+        self.terminated = False
+
+    @property
+    def processes(self) -> List[multiprocessing.process.BaseProcess]:
+        """Worker processes started so far (alive or not)."""
+        return list(self._context.processes)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) in a worker and wait for its result.
+
+        Raises:
+            concurrent.futures.process.BrokenProcessPool: If the pool was terminated
+                while the call was running
+            concurrent.futures.CancelledError: If the pool was terminated before
+                the call started
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def terminate(self) -> int:
+        """
+        Drop queued calls and kill running workers.
+
+        Returns:
+            Number of workers that were still alive
+        """
+        self.terminated = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        killed = 0
+        for process in self._context.processes:
+            if process.is_alive():
+                process.terminate()
+                killed += 1
+        for process in self._context.processes:
+            process.join(timeout=5)
+        return killed
+
+    def close(self):
+        """Release the workers once every submitted call has finished."""
+        self._executor.shutdown(wait=False)
@@ -2,12 +2,16 @@
 Core chunking engine for the Chunking Service.
 
 Provides intelligent document chunking with multiple strategies.
+
+Batch jobs chunk their documents in a per-batch process pool (BatchWorkerPool):
+every worker builds its own chunker instances, so CPU-heavy strategies
+(semantic, legal, hybrid) run in parallel without blocking the event loop.
 """
 
 import asyncio
+import os
 import uuid
-import re
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime
 import logging
 
@@ -24,10 +28,67 @@ from .chunking_strategies import (
     ExtractionChunker
 )
 from .anthropic_contextual_enhancer import AnthropicContextualEnhancer
+from .batch_pool import BatchWorkerPool
+from .quality_scoring import ChunkScores, ChunkScoringIndex
 
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# Batch chunking workers
+# ============================================================================
+
+_CHUNKER_CLASSES = {
+    ChunkingStrategy.SIMPLE: SimpleChunker,
+    ChunkingStrategy.MARKDOWN: MarkdownChunker,
+    ChunkingStrategy.EXTRACTION: ExtractionChunker,
+    ChunkingStrategy.SEMANTIC: SemanticChunker,
+    ChunkingStrategy.HYBRID: HybridChunker,
+    ChunkingStrategy.LEGAL: LegalChunker,
+    ChunkingStrategy.LEGAL_DENSITY_ADAPTIVE: LegalDensityAdaptiveChunker
+}
+
+# Per-process worker state: chunkers are created inside each worker on first
+# use and never shared with the parent or other workers
+_worker_settings = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_chunkers: Dict[ChunkingStrategy, Any] = {}
+
+
+def _init_chunking_worker(settings):
+    """Process pool initializer: keep settings and an event loop for the chunkers' async API."""
+    global _worker_settings, _worker_loop
+    _worker_settings = settings
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+def _chunk_in_worker(
+    strategy_value: str,
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    metadata: Optional[Dict[str, Any]]
+) -> List[DocumentChunk]:
+    """Chunk one document inside a pool worker."""
+    strategy = ChunkingStrategy(strategy_value)
+    chunker = _worker_chunkers.get(strategy)
+    if chunker is None:
+        chunker = _CHUNKER_CLASSES[strategy](_worker_settings)
+        _worker_loop.run_until_complete(chunker.initialize())
+        _worker_chunkers[strategy] = chunker
+
+    return _worker_loop.run_until_complete(chunker.chunk_text(
+        text=text,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        metadata=metadata
+    ))
+
+
+_TERMINAL_STATUSES = (ChunkingStatus.COMPLETED, ChunkingStatus.FAILED, ChunkingStatus.CANCELLED)
+
+
 class ChunkingEngine:
     """Main chunking engine that coordinates different chunking strategies."""
     
@@ -37,12 +98,24 @@ class ChunkingEngine:
         self.chunkers = {}
         self.batch_operations: Dict[str, Dict[str, Any]] = {}
         self._batch_lock = asyncio.Lock()
+        # Notified on every per-document update, for stream_batch_results()
+        self._batch_updated = asyncio.Condition(self._batch_lock)
+
+        # Batch chunking: one process pool per running batch, so cancelling
+        # a batch can terminate its workers without touching other batches
+        self.batch_workers = getattr(settings, 'batch_chunking_workers', None) or os.cpu_count() or 1
+        self.use_process_pool = getattr(settings, 'batch_chunking_use_processes', True)
+        self._batch_pools: Dict[str, BatchWorkerPool] = {}
+        self._batch_tasks: Dict[str, asyncio.Task] = {}
 
         # Phase 3: Contextual Enhancement
         self.contextual_enhancer = None
         self.prompt_client = prompt_client
         self.enable_contextual_enhancement = getattr(settings, 'enable_contextual_enhancement', True)
 
+        # Quality scoring and counts in _enhance_chunks (per request: metadata['skip_chunk_scoring'])
+        self.enable_chunk_scoring = getattr(settings, 'enable_chunk_scoring', True)
+
         # GraphRAG Integration: Database storage for chunks
         self.supabase_client = supabase_client
         self.enable_graph_storage = getattr(settings, 'enable_graph_storage', True)
@@ -172,25 +245,9 @@ class ChunkingEngine:
             List of DocumentChunk objects
         """
         try:
-            # Validate inputs
-            if not text or not text.strip():
-                raise ValueError("Text cannot be empty")
-                
-            if len(text) > self.settings.max_document_size_mb * 1024 * 1024:
-                raise ValueError(f"Document exceeds maximum size of {self.settings.max_document_size_mb}MB")
-            
-            # Use defaults if not specified
-            chunk_size = chunk_size or self.settings.default_chunk_size
-            chunk_overlap = chunk_overlap or self.settings.default_chunk_overlap
-            
-            # Validate chunk parameters
-            if chunk_size > self.settings.max_chunk_size:
-                chunk_size = self.settings.max_chunk_size
-            elif chunk_size < self.settings.min_chunk_size:
-                chunk_size = self.settings.min_chunk_size
-                
-            if chunk_overlap >= chunk_size:
-                chunk_overlap = min(chunk_overlap, chunk_size // 2)
+            chunker_strategy, chunk_size, chunk_overlap = self._resolve_chunking_params(
+                text, strategy, chunk_size, chunk_overlap
+            )
             
             # Check cache if enabled
             cache_key = None
@@ -201,19 +258,8 @@ class ChunkingEngine:
                     logger.debug(f"Cache hit for chunking request")
                     return cached_result
             
-            # Get the appropriate chunker
-            chunker_strategy = ChunkingStrategy(strategy)
-            chunker = self.chunkers.get(chunker_strategy)
-            if not chunker:
-                # Fallback to simple chunker if requested strategy unavailable
-                logger.warning(f"Chunking strategy '{strategy}' not available, falling back to 'simple'")
-                chunker_strategy = ChunkingStrategy.SIMPLE
-                chunker = self.chunkers.get(chunker_strategy)
-                if not chunker:
-                    raise ValueError(f"Critical error: Simple chunker not available")
-            
             # Perform chunking
-            chunks = await chunker.chunk_text(
+            chunks = await self.chunkers[chunker_strategy].chunk_text(
                 text=text,
                 chunk_size=chunk_size,
                 chunk_overlap=chunk_overlap,
@@ -234,6 +280,83 @@ class ChunkingEngine:
             logger.error(f"Error chunking text: {e}")
             raise
     
+    def _resolve_chunking_params(
+        self,
+        text: str,
+        strategy: str,
+        chunk_size: Optional[int],
+        chunk_overlap: Optional[int]
+    ) -> Tuple[ChunkingStrategy, int, int]:
+        """
+        Validate a chunking request and resolve defaults.
+        
+        Returns:
+            Tuple of (available strategy, chunk_size, chunk_overlap)
+        """
+        # Validate inputs
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+            
+        if len(text) > self.settings.max_document_size_mb * 1024 * 1024:
+            raise ValueError(f"Document exceeds maximum size of {self.settings.max_document_size_mb}MB")
+        
+        # Use defaults if not specified
+        chunk_size = chunk_size or self.settings.default_chunk_size
+        chunk_overlap = chunk_overlap or self.settings.default_chunk_overlap
+        
+        # Validate chunk parameters
+        if chunk_size > self.settings.max_chunk_size:
+            chunk_size = self.settings.max_chunk_size
+        elif chunk_size < self.settings.min_chunk_size:
+            chunk_size = self.settings.min_chunk_size
+            
+        if chunk_overlap >= chunk_size:
+            chunk_overlap = min(chunk_overlap, chunk_size // 2)
+        
+        # Get the appropriate chunker
+        chunker_strategy = ChunkingStrategy(strategy)
+        if chunker_strategy not in self.chunkers:
+            # Fallback to simple chunker if requested strategy unavailable
+            logger.warning(f"Chunking strategy '{strategy}' not available, falling back to 'simple'")
+            chunker_strategy = ChunkingStrategy.SIMPLE
+            if chunker_strategy not in self.chunkers:
+                raise ValueError(f"Critical error: Simple chunker not available")
+        
+        return chunker_strategy, chunk_size, chunk_overlap
+    
+    async def _chunk_text_in_pool(
+        self,
+        pool: BatchWorkerPool,
+        text: str,
+        strategy: str,
+        chunk_size: Optional[int],
+        chunk_overlap: Optional[int],
+        metadata: Optional[Dict[str, Any]]
+    ) -> List[DocumentChunk]:
+        """Like chunk_text(), with the chunker itself running in a pool worker."""
+        chunker_strategy, chunk_size, chunk_overlap = self._resolve_chunking_params(
+            text, strategy, chunk_size, chunk_overlap
+        )
+        
+        cache_key = None
+        if self.cache_manager:
+            cache_key = self._generate_cache_key(text, strategy, chunk_size, chunk_overlap)
+            cached_result = await self.cache_manager.get(cache_key)
+            if cached_result:
+                logger.debug(f"Cache hit for chunking request")
+                return cached_result
+        
+        chunks = await pool.run(
+            _chunk_in_worker, chunker_strategy.value, text, chunk_size, chunk_overlap, metadata
+        )
+        
+        enhanced_chunks = await self._enhance_chunks(chunks, text, metadata)
+        
+        if self.cache_manager and cache_key:
+            await self.cache_manager.set(cache_key, enhanced_chunks)
+        
+        return enhanced_chunks
+    
     async def start_batch_chunking(
         self,
         documents: List[DocumentToChunk],
@@ -259,11 +382,24 @@ class ChunkingEngine:
                 "created_at": datetime.utcnow(),
                 "started_at": None,
                 "completed_at": None,
-                "error_message": None
+                "error_message": None,
+                # Per-document progress, and document ids in completion order
+                "documents": {
+                    document.document_id: {
+                        "status": ChunkingStatus.PENDING,
+                        "text_length": len(document.text or ""),
+                        "chunk_count": None,
+                        "started_at": None,
+                        "completed_at": None,
+                        "error_message": None
+                    }
+                    for document in documents
+                },
+                "completion_order": []
             }
         
         # Start background processing
-        asyncio.create_task(self._process_batch(
+        self._batch_tasks[batch_id] = asyncio.create_task(self._process_batch(
             batch_id, documents, default_strategy, default_chunk_size, default_chunk_overlap
         ))
         
@@ -294,6 +430,23 @@ class ChunkingEngine:
                 error_message=batch_info.get("error_message")
             )
     
+    async def get_batch_progress(self, batch_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get per-document progress of a batch chunking operation.
+        
+        Returns:
+            Mapping of document_id to status, text_length, chunk_count,
+            started_at, completed_at and error_message (None if unknown batch)
+        """
+        async with self._batch_lock:
+            batch_info = self.batch_operations.get(batch_id)
+            if not batch_info:
+                return None
+            return {
+                document_id: dict(progress)
+                for document_id, progress in batch_info["documents"].items()
+            }
+    
     async def get_batch_results(self, batch_id: str) -> Optional[Dict[str, Any]]:
         """Get results of completed batch operation."""
         async with self._batch_lock:
@@ -315,20 +468,60 @@ class ChunkingEngine:
                 "completed_at": batch_info["completed_at"]
             }
     
+    async def stream_batch_results(self, batch_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield per-document results of a batch as documents complete.
+        
+        Documents that finished before the call are yielded first; the
+        iterator ends when the batch completes, fails or is cancelled.
+        
+        Args:
+            batch_id: Batch to follow
+            
+        Yields:
+            Tuples of (document_id, result) in completion order
+        """
+        seen = 0
+        while True:
+            async with self._batch_updated:
+                batch_info = self.batch_operations.get(batch_id)
+                if not batch_info:
+                    return
+                await self._batch_updated.wait_for(
+                    lambda: len(batch_info["completion_order"]) > seen
+                    or batch_info["status"] in _TERMINAL_STATUSES
+                )
+                order = batch_info["completion_order"]
+                ready = [(document_id, batch_info["results"][document_id]) for document_id in order[seen:]]
+                seen = len(order)
+                finished = batch_info["status"] in _TERMINAL_STATUSES
+            
+            for item in ready:
+                yield item
+            if finished and not ready:
+                return
+    
     async def cancel_batch_chunking(self, batch_id: str) -> bool:
-        """Cancel a batch chunking operation."""
+        """Cancel a batch chunking operation and terminate its workers."""
         async with self._batch_lock:
             batch_info = self.batch_operations.get(batch_id)
             if not batch_info:
                 return False
                 
-            if batch_info["status"] in [ChunkingStatus.COMPLETED, ChunkingStatus.FAILED, ChunkingStatus.CANCELLED]:
+            if batch_info["status"] in _TERMINAL_STATUSES:
                 return False
                 
             batch_info["status"] = ChunkingStatus.CANCELLED
             batch_info["completed_at"] = datetime.utcnow()
-            logger.info(f"Cancelled batch chunking operation: {batch_id}")
-            return True
+            for progress in batch_info["documents"].values():
+                if progress["status"] not in _TERMINAL_STATUSES:
+                    progress["status"] = ChunkingStatus.CANCELLED
+            self._batch_updated.notify_all()
+        
+        # Documents still running in the pool are stopped by killing their workers
+        self._terminate_batch_pool(batch_id)
+        logger.info(f"Cancelled batch chunking operation: {batch_id}")
+        return True
     
     async def shutdown(self):
         """Shutdown the chunking engine."""
@@ -340,6 +533,10 @@ class ChunkingEngine:
                 if batch_info["status"] in [ChunkingStatus.PENDING, ChunkingStatus.PROCESSING]:
                     batch_info["status"] = ChunkingStatus.CANCELLED
                     batch_info["completed_at"] = datetime.utcnow()
+            self._batch_updated.notify_all()
+        
+        for batch_id in list(self._batch_pools):
+            self._terminate_batch_pool(batch_id)
         
         # Shutdown chunkers
         for chunker in self.chunkers.values():
@@ -356,19 +553,27 @@ class ChunkingEngine:
         default_chunk_size: int,
         default_chunk_overlap: int
     ):
-        """Process documents in batch."""
+        """Process documents in batch, in a process pool when available."""
         try:
             async with self._batch_lock:
+                if self.batch_operations[batch_id]["status"] == ChunkingStatus.CANCELLED:
+                    return
                 self.batch_operations[batch_id]["status"] = ChunkingStatus.PROCESSING
                 self.batch_operations[batch_id]["started_at"] = datetime.utcnow()
             
-            # Process documents with concurrency limit
-            semaphore = asyncio.Semaphore(self.settings.max_concurrent_chunks)
+            pool = self._create_batch_pool(batch_id, len(documents)) if self.use_process_pool else None
+            
+            # Process documents with concurrency limit. With a pool, documents
+            # are submitted one per worker so a submitted document is a running one.
+            semaphore = asyncio.Semaphore(
+                min(self.batch_workers, len(documents)) if pool else self.settings.max_concurrent_chunks
+            )
             tasks = []
             
             for document in documents:
                 task = asyncio.create_task(self._process_single_document(
-                    semaphore, batch_id, document, default_strategy, default_chunk_size, default_chunk_overlap
+                    semaphore, batch_id, document, default_strategy, default_chunk_size, default_chunk_overlap,
+                    pool=pool
                 ))
                 tasks.append(task)
             
@@ -381,13 +586,47 @@ class ChunkingEngine:
                 if batch_info["status"] != ChunkingStatus.CANCELLED:
                     batch_info["status"] = ChunkingStatus.COMPLETED
                 batch_info["completed_at"] = datetime.utcnow()
+                self._batch_updated.notify_all()
                 
         except Exception as e:
             async with self._batch_lock:
                 self.batch_operations[batch_id]["status"] = ChunkingStatus.FAILED
                 self.batch_operations[batch_id]["error_message"] = str(e)
                 self.batch_operations[batch_id]["completed_at"] = datetime.utcnow()
+                self._batch_updated.notify_all()
             logger.error(f"Batch processing failed for {batch_id}: {e}")
+        
+        finally:
+            self._batch_tasks.pop(batch_id, None)
+            pool = self._batch_pools.pop(batch_id, None)
+            if pool:
+                pool.close()
+    
+    def _create_batch_pool(self, batch_id: str, document_count: int) -> Optional[BatchWorkerPool]:
+        """Start a process pool for one batch (None to chunk in the event loop)."""
+        workers = max(1, min(self.batch_workers, document_count))
+        try:
+            pool = BatchWorkerPool(
+                workers,
+                initializer=_init_chunking_worker,
+                initargs=(self.settings,)
+            )
+        except Exception as e:
+            logger.warning(f"Process pool unavailable for batch {batch_id}, chunking in-process: {e}")
+            return None
+        
+        self._batch_pools[batch_id] = pool
+        logger.info(f"Batch {batch_id}: chunking {document_count} documents on {workers} worker processes")
+        return pool
+    
+    def _terminate_batch_pool(self, batch_id: str):
+        """Stop a batch's pool: drop queued documents and kill running workers."""
+        pool = self._batch_pools.pop(batch_id, None)
+        if pool is None:
+            return
+        
+        killed = pool.terminate()
+        logger.info(f"Terminated {killed} chunking workers for batch {batch_id}")
     
     async def _process_single_document(
         self,
@@ -396,10 +635,19 @@ class ChunkingEngine:
         document: DocumentToChunk,
         default_strategy: str,
         default_chunk_size: int,
-        default_chunk_overlap: int
+        default_chunk_overlap: int,
+        pool: Optional[BatchWorkerPool] = None
     ):
         """Process a single document in the batch."""
         async with semaphore:
+            async with self._batch_lock:
+                batch_info = self.batch_operations[batch_id]
+                if batch_info["status"] == ChunkingStatus.CANCELLED:
+                    return
+                progress = batch_info["documents"][document.document_id]
+                progress["status"] = ChunkingStatus.PROCESSING
+                progress["started_at"] = datetime.utcnow()
+            
             try:
                 # Use document-specific settings or defaults
                 strategy = document.strategy or default_strategy
@@ -407,31 +655,55 @@ class ChunkingEngine:
                 chunk_overlap = document.chunk_overlap or default_chunk_overlap
                 
                 # Chunk the document
-                chunks = await self.chunk_text(
-                    text=document.text,
-                    strategy=strategy,
-                    chunk_size=chunk_size,
-                    chunk_overlap=chunk_overlap,
-                    metadata=document.metadata
-                )
+                if pool is not None:
+                    chunks = await self._chunk_text_in_pool(
+                        pool, document.text, strategy, chunk_size, chunk_overlap, document.metadata
+                    )
+                else:
+                    chunks = await self.chunk_text(
+                        text=document.text,
+                        strategy=strategy,
+                        chunk_size=chunk_size,
+                        chunk_overlap=chunk_overlap,
+                        metadata=document.metadata
+                    )
                 
                 # Store result
                 async with self._batch_lock:
-                    self.batch_operations[batch_id]["results"][document.document_id] = {
+                    if batch_info["status"] == ChunkingStatus.CANCELLED:
+                        return
+                    batch_info["results"][document.document_id] = {
                         "status": ChunkingStatus.COMPLETED,
                         "chunks": chunks,
                         "chunk_count": len(chunks)
                     }
-                    self.batch_operations[batch_id]["processed_documents"] += 1
+                    batch_info["processed_documents"] += 1
+                    progress.update(
+                        status=ChunkingStatus.COMPLETED,
+                        chunk_count=len(chunks),
+                        completed_at=datetime.utcnow()
+                    )
+                    batch_info["completion_order"].append(document.document_id)
+                    self._batch_updated.notify_all()
                 
             except Exception as e:
-                # Store error
                 async with self._batch_lock:
-                    self.batch_operations[batch_id]["results"][document.document_id] = {
+                    if batch_info["status"] == ChunkingStatus.CANCELLED:
+                        # Terminated workers surface as BrokenProcessPool; not a document failure
+                        return
+                    # Store error
+                    batch_info["results"][document.document_id] = {
                         "status": ChunkingStatus.FAILED,
                         "error_message": str(e)
                     }
-                    self.batch_operations[batch_id]["failed_documents"] += 1
+                    batch_info["failed_documents"] += 1
+                    progress.update(
+                        status=ChunkingStatus.FAILED,
+                        error_message=str(e),
+                        completed_at=datetime.utcnow()
+                    )
+                    batch_info["completion_order"].append(document.document_id)
+                    self._batch_updated.notify_all()
                 
                 logger.error(f"Failed to process document {document.document_id}: {e}")
     
@@ -456,28 +728,30 @@ class ChunkingEngine:
             # - document_context: DocumentContext object with metadata
             # This should be called from the API layer, not from _enhance_chunks
         
+        # Score all chunks of the document in one batch (skippable on the hot path)
+        skip_scoring = not self.enable_chunk_scoring or (metadata or {}).get('skip_chunk_scoring', False)
+        scores = None if skip_scoring else self._score_chunks(chunks, original_text)
+
         for i, chunk in enumerate(chunks):
-            # Add quality scoring if enabled
-            if self.settings.enable_quality_validation:
-                quality_score = await self._calculate_chunk_quality(chunk.content, original_text)
-                # Ensure quality_score is not None
-                if quality_score is None:
-                    quality_score = 0.5  # Default quality score
-                if quality_score < self.settings.min_chunk_quality_score:
-                    logger.warning(f"Chunk {i} has low quality score: {quality_score}")
-                chunk.quality_score = quality_score
-            
-            # Add word and sentence counts
-            chunk.word_count = len(chunk.content.split())
-            chunk.sentence_count = len(re.split(r'[.!?]+', chunk.content))
-            
-            # Add boundary information
-            chunk.boundary_info = {
-                "starts_with_sentence": chunk.content.strip()[0].isupper() if chunk.content.strip() else False,
-                "ends_with_sentence": chunk.content.rstrip().endswith(('.', '!', '?')),
-                "has_complete_sentences": chunk.sentence_count > 0
-            }
-            
+            if scores is not None:
+                # Add quality scoring if enabled
+                if self.settings.enable_quality_validation:
+                    quality_score = float(scores.basic_quality[i])
+                    if quality_score < self.settings.min_chunk_quality_score:
+                        logger.warning(f"Chunk {i} has low quality score: {quality_score}")
+                    chunk.quality_score = quality_score
+
+                # Add word and sentence counts
+                chunk.word_count = int(scores.word_count[i])
+                chunk.sentence_count = int(scores.sentence_count[i])
+
+                # Add boundary information
+                chunk.boundary_info = {
+                    "starts_with_sentence": bool(scores.starts_with_capital[i]),
+                    "ends_with_sentence": bool(scores.ends_with_sentence[i]),
+                    "has_complete_sentences": chunk.sentence_count > 0
+                }
+
             # Phase 3: Add contextual enhancement data
             if contextual_results and i < len(contextual_results):
                 enhancement_result = contextual_results[i]
@@ -522,27 +796,22 @@ class ChunkingEngine:
         
         return enhanced_chunks
     
-    async def _calculate_chunk_quality(self, chunk_content: str, original_text: str) -> float:
-        """Calculate quality score for a chunk."""
-        # Simple quality scoring based on various factors
-        score = 1.0
-        
-        # Penalize very short chunks
-        if len(chunk_content) < self.settings.min_chunk_size:
-            score *= 0.5
-        
-        # Penalize chunks that don't end with proper punctuation
-        if not chunk_content.rstrip().endswith(('.', '!', '?', ':')):
-            score *= 0.8
-        
-        # Bonus for complete sentences
-        sentences = re.split(r'[.!?]+', chunk_content)
-        complete_sentences = [s for s in sentences if len(s.strip()) > 10]
-        if len(complete_sentences) > 0:
-            score *= 1.1
-        
-        return min(score, 1.0)
-    
+    def _score_chunks(self, chunks: List[DocumentChunk], original_text: str) -> ChunkScores:
+        """
+        Counts and quality scores of all chunks as arrays.
+
+        Chunks are scored by their offsets into original_text when every
+        chunk's content sits at its start_position; otherwise (chunkers that
+        rewrite content) by their own text.
+        """
+        if all(original_text.startswith(chunk.content, chunk.start_position) for chunk in chunks):
+            index = ChunkScoringIndex(original_text)
+            starts = [chunk.start_position for chunk in chunks]
+            ends = [chunk.start_position + len(chunk.content) for chunk in chunks]
+        else:
+            index, starts, ends = ChunkScoringIndex.for_texts([chunk.content for chunk in chunks])
+        return index.score_chunks(starts, ends, min_chunk_size=self.settings.min_chunk_size, detailed=False)
+
     async def _deduplicate_chunks(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
         """Remove duplicate chunks based on content similarity."""
         # Simple deduplication based on exact content match
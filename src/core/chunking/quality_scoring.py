@@ -0,0 +1,533 @@
+"""
+Batch quality scoring for document chunks.
+
+Scoring chunks one at a time (ChunkingEngine's quality score and counts,
+ChunkQualityScorer's metrics) re-splits each chunk's content into words and
+sentences, counts brackets and quotes with str.count, and builds a word set
+per sentence for coherence. A document cut into thousands of overlapping
+chunks is walked in Python several times per chunk.
+
+ChunkScoringIndex builds offset arrays for the whole document once with
+numpy:
+
+- sorted offsets of word starts, [.!?]+ runs, parentheses and double
+  quotes, so the counts for any [start, end) span are two binary searches
+- word start and end offsets, so stripped span edges need no slicing
+- the document's sentence pieces (the text between [.!?]+ runs, as
+  re.split(r'[.!?]+') cuts it) with their stripped lengths, and the word-set
+  overlap (Jaccard) of each adjacent pair of pieces
+
+score_chunks() then computes the metrics of every chunk (completeness,
+coherence, entity density, boundary quality, size optimality, the engine's
+basic quality score, word and sentence counts) as array operations over
+the chunks' start and end offsets. With detailed=False only the counts and
+the basic score are computed, and the word sets are never built.
+
+Scores match the per-chunk implementations, except that coherence only uses
+sentence pairs whose pieces are whole inside the chunk: a piece cut by the
+chunk's start or end is left out of its pairs.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Character classes, looked up by code point (all str.isspace() characters are below U+3001)
+_SPACE, _TERMINATOR, _END, _OPEN_PAREN, _CLOSE_PAREN, _QUOTE = 1, 2, 4, 8, 16, 32
+_CHAR_CLASSES = np.zeros(0x3002, dtype=np.uint8)
+_CHAR_CLASSES[[c for c in range(0x3001) if chr(c).isspace()]] = _SPACE
+_CHAR_CLASSES[[ord(c) for c in ".!?"]] = _TERMINATOR | _END
+_CHAR_CLASSES[ord(':')] = _END
+_CHAR_CLASSES[ord('(')] = _OPEN_PAREN
+_CHAR_CLASSES[ord(')')] = _CLOSE_PAREN
+_CHAR_CLASSES[ord('"')] = _QUOTE
+
+# Openings that mark a sentence fragment (ChunkQualityScorer completeness)
+_FRAGMENT_STARTS = ('and', 'or', 'but', 'however')
+
+# Pieces with more stripped characters than this count as complete sentences
+_COMPLETE_SENTENCE_CHARS = 10
+
+# Metric weights in the overall score
+_WEIGHTS = {
+    "completeness": 0.25,
+    "coherence": 0.25,
+    "entity_density": 0.2,
+    "boundary_quality": 0.2,
+    "size_optimality": 0.1,
+}
+
+
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    """Prefix sums with a leading zero: sum(values[a:b]) == out[b] - out[a]."""
+    out = np.zeros(len(values) + 1, dtype=np.float64 if values.dtype.kind == 'f' else np.int64)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _piece_words(text: str) -> List[str]:
+    """Words of text with [.!?] as separators (content.split() within each re.split(r'[.!?]+') piece)."""
+    return text.replace('.', ' ').replace('!', ' ').replace('?', ' ').split()
+
+
+def _count_within(offsets: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Number of sorted offsets in each [start, end)."""
+    return np.searchsorted(offsets, ends) - np.searchsorted(offsets, starts)
+
+
+def _run_starts(mask: np.ndarray) -> np.ndarray:
+    """Positions where a run of True values in mask begins."""
+    starts = mask.copy()
+    starts[1:] &= ~mask[:-1]
+    return starts
+
+
+@dataclass
+class ChunkScores:
+    """Metrics of a batch of chunks, one array entry per chunk."""
+    word_count: np.ndarray
+    sentence_count: np.ndarray       # len(re.split(r'[.!?]+', content))
+    starts_with_capital: np.ndarray
+    ends_with_sentence: np.ndarray
+    basic_quality: np.ndarray        # ChunkingEngine quality score
+    # ChunkQualityScorer metrics (None unless scored with detailed=True)
+    completeness: Optional[np.ndarray] = None
+    coherence: Optional[np.ndarray] = None
+    entity_density: Optional[np.ndarray] = None
+    boundary_quality: Optional[np.ndarray] = None
+    size_optimality: Optional[np.ndarray] = None
+    overall_score: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.word_count)
+
+
+class ChunkScoringIndex:
+    """
+    Offset arrays of one document for scoring any number of its spans.
+
+    Attributes:
+        text: The indexed text
+        piece_starts: Start of each sentence piece
+        piece_ends: End of each sentence piece (start of the following [.!?]+ run)
+    """
+
+    def __init__(self, text: str):
+        """
+        Index a document.
+
+        Args:
+            text: Document text the chunk offsets refer to
+        """
+        self.text = text
+        n = self.length = len(text)
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        classes = _CHAR_CLASSES[np.minimum(codes, len(_CHAR_CLASSES) - 1)]
+        nonspace = (classes & _SPACE) == 0
+        terminator = (classes & _TERMINATOR) != 0
+        self._codes = codes
+        self._classes = classes
+        self._nonspace = nonspace
+        self._terminator = terminator
+
+        # Sorted offsets of word starts, [.!?]+ run starts, parentheses and quotes
+        self._word_start = _run_starts(nonspace)
+        self._terminator_run_start = _run_starts(terminator)
+        self._words = np.flatnonzero(self._word_start)
+        self._terminator_runs = np.flatnonzero(self._terminator_run_start)
+        self._open_parens = np.flatnonzero(classes & _OPEN_PAREN)
+        self._close_parens = np.flatnonzero(classes & _CLOSE_PAREN)
+        self._quotes = np.flatnonzero(classes & _QUOTE)
+
+        # Last character of each word (run of non-space characters)
+        self._word_ends = np.flatnonzero(_run_starts(nonspace[::-1])[::-1])
+
+        # Sentence pieces between [.!?]+ runs
+        run_ends = np.flatnonzero(_run_starts(terminator[::-1])[::-1]) + 1
+        self.piece_starts = np.concatenate(([0], run_ends)).astype(np.int64)
+        self.piece_ends = np.concatenate((self._terminator_runs, [n])).astype(np.int64)
+        self._long_pieces = _cumulative(
+            self._stripped_lengths(self.piece_starts, self.piece_ends) > _COMPLETE_SENTENCE_CHARS
+        )
+
+        # Built on first use; only coherence needs the word sets
+        self._pair_overlap: Optional[np.ndarray] = None
+        self._pair_valid: Optional[np.ndarray] = None
+
+    @classmethod
+    def for_texts(cls, texts: Sequence[str]) -> Tuple["ChunkScoringIndex", np.ndarray, np.ndarray]:
+        """
+        Index separate texts (chunks without document offsets) as one document.
+
+        Texts are joined with newlines, which end words but not sentence
+        pieces; pieces crossing a join are cut by both chunks' edges and so
+        never paired.
+
+        Returns:
+            (index, starts, ends) with each text at index.text[start:end]
+        """
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        starts = np.cumsum(lengths + 1) - (lengths + 1)
+        return cls("\n".join(texts)), starts, starts + lengths
+
+    # ------------------------------------------------------------------
+    # Document arrays
+    # ------------------------------------------------------------------
+
+    def _next_nonspace(self, offsets: np.ndarray) -> np.ndarray:
+        """First non-space offset at or after each offset (len(text) if none)."""
+        following = np.append(self._words, self.length)[np.searchsorted(self._words, offsets)]
+        return np.where(self._nonspace[offsets], offsets, following)
+
+    def _prev_nonspace(self, offsets: np.ndarray) -> np.ndarray:
+        """Last non-space offset at or before each offset (-1 if none)."""
+        preceding = np.insert(self._word_ends, 0, -1)[np.searchsorted(self._word_ends, offsets, side='right')]
+        return np.where(self._nonspace[offsets], offsets, preceding)
+
+    def _stripped_lengths(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """len(text[start:end].strip()) for each span."""
+        lengths = np.zeros(len(starts), dtype=np.int64)
+        spans = ends > starts
+        if spans.any():
+            first = self._next_nonspace(starts[spans])
+            last = self._prev_nonspace(ends[spans] - 1)
+            lengths[spans] = np.maximum(last - first + 1, 0)
+        return lengths
+
+    def _adjacent_piece_overlaps(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Jaccard overlap of the word sets of each piece and the next.
+
+        Returns:
+            (overlap, valid) per pair (k, k + 1); valid where both word sets are non-empty
+        """
+        pair_count = max(len(self.piece_starts) - 1, 0)
+        word_positions = np.flatnonzero(_run_starts(self._nonspace & ~self._terminator))
+        words = _piece_words(self.text.lower())
+        if len(words) != len(word_positions):
+            # Lowercasing changed a character's class; split the original text instead
+            words = [word.lower() for word in _piece_words(self.text)]
+
+        vocabulary = {word: i for i, word in enumerate(set(words))}
+        word_ids = np.fromiter(map(vocabulary.__getitem__, words), dtype=np.int64, count=len(words))
+        vocabulary_size = max(len(vocabulary), 1)
+
+        # Distinct (piece, word) pairs; a word also in the next piece has key + V there
+        keys = np.searchsorted(self._terminator_runs, word_positions) * vocabulary_size + word_ids
+        keys.sort()
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        key_pieces = keys // vocabulary_size
+        next_keys = keys + vocabulary_size
+        found = np.minimum(np.searchsorted(keys, next_keys), max(len(keys) - 1, 0))
+        in_next = keys[found] == next_keys if len(keys) else np.zeros(0, dtype=bool)
+        sizes = np.bincount(key_pieces, minlength=pair_count + 1)
+        shared = np.bincount(key_pieces[in_next], minlength=pair_count + 1)[:pair_count]
+
+        union = sizes[:-1] + sizes[1:] - shared
+        valid = (sizes[:-1] > 0) & (sizes[1:] > 0)
+        overlap = np.where(valid, shared / np.maximum(union, 1), 0.0)
+        return overlap, valid
+
+    # ------------------------------------------------------------------
+    # Span metrics
+    # ------------------------------------------------------------------
+
+    def _inside(self, mask: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """mask[start] for non-empty spans, False otherwise."""
+        result = np.zeros(len(starts), dtype=bool)
+        spans = ends > starts
+        result[spans] = mask[starts[spans]]
+        return result
+
+    def word_counts(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """len(text[start:end].split()) for each span."""
+        # A word already running at the span's start is counted too
+        continued = self._inside(self._nonspace & ~self._word_start, starts, ends)
+        return _count_within(self._words, starts, ends) + continued
+
+    def terminator_runs(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """len(re.findall(r'[.!?]+', text[start:end])) for each span."""
+        continued = self._inside(self._terminator & ~self._terminator_run_start, starts, ends)
+        return _count_within(self._terminator_runs, starts, ends) + continued
+
+    def stripped_bounds(self, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """First and last non-space offsets of each span.
+
+        Returns:
+            (first, last, non_blank); first and last are only meaningful where non_blank
+        """
+        first = np.full(len(starts), self.length, dtype=np.int64)
+        last = np.full(len(starts), -1, dtype=np.int64)
+        spans = ends > starts
+        first[spans] = self._next_nonspace(starts[spans])
+        last[spans] = self._prev_nonspace(ends[spans] - 1)
+        non_blank = spans & (first <= last)
+        return first, last, non_blank
+
+    def _char_in(self, offsets: np.ndarray, where: np.ndarray, char_class: int) -> np.ndarray:
+        """Whether the character at each offset is in char_class (False where not where)."""
+        result = np.zeros(len(offsets), dtype=bool)
+        result[where] = (self._classes[offsets[where]] & char_class) != 0
+        return result
+
+    def _piece_ranges(self, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indexes of the first and last sentence pieces overlapping each span."""
+        first_piece = np.searchsorted(self.piece_ends, starts, side='right')
+        last_piece = np.searchsorted(self.piece_starts, ends, side='left') - 1
+        return first_piece, last_piece
+
+    def has_complete_sentence(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Whether any re.split(r'[.!?]+') piece of the span has more than 10 stripped chars."""
+        first_piece, last_piece = self._piece_ranges(starts, ends)
+        pieces = first_piece <= last_piece
+        piece_count = len(self.piece_starts)
+
+        # Pieces strictly between the edge pieces are whole
+        inner_from = np.minimum(first_piece + 1, piece_count)
+        inner_to = np.clip(last_piece, 0, piece_count)
+        complete = pieces & (inner_to > inner_from) & (
+            self._long_pieces[inner_to] - self._long_pieces[np.minimum(inner_from, inner_to)] > 0
+        )
+
+        # Edge pieces are cut to the span
+        for edge in (first_piece, last_piece):
+            edge = np.clip(edge, 0, piece_count - 1)
+            clipped = self._stripped_lengths(
+                np.maximum(self.piece_starts[edge], starts),
+                np.minimum(self.piece_ends[edge], ends)
+            )
+            complete |= pieces & (clipped > _COMPLETE_SENTENCE_CHARS)
+        return complete
+
+    def basic_quality(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        min_chunk_size: int,
+        last: Optional[np.ndarray] = None,
+        non_blank: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """ChunkingEngine's quality score (size, closing punctuation, complete sentences)."""
+        if last is None or non_blank is None:
+            _, last, non_blank = self.stripped_bounds(starts, ends)
+        score = np.where(ends - starts < min_chunk_size, 0.5, 1.0)
+        score *= np.where(self._char_in(last, non_blank, _END), 1.0, 0.8)
+        score *= np.where(self.has_complete_sentence(starts, ends), 1.1, 1.0)
+        return np.minimum(score, 1.0)
+
+    def completeness(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        first: Optional[np.ndarray] = None,
+        last: Optional[np.ndarray] = None,
+        non_blank: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """ChunkQualityScorer completeness: closing punctuation, fragment openings, balanced ( and "."""
+        if first is None or last is None or non_blank is None:
+            first, last, non_blank = self.stripped_bounds(starts, ends)
+        score = np.ones(len(starts))
+        score -= np.where(self._char_in(last, non_blank, _TERMINATOR), 0.0, 0.3)
+
+        # Fragment openings, compared against the codes at the stripped start
+        longest = max(len(word) for word in _FRAGMENT_STARTS)
+        window = self._codes[np.minimum(
+            first[:, None] + np.arange(longest), max(self.length - 1, 0)
+        )] if self.length else np.zeros((len(starts), longest), dtype=np.uint32)
+        fragment = np.zeros(len(starts), dtype=bool)
+        for word in _FRAGMENT_STARTS:
+            word_codes = np.array([ord(c) for c in word], dtype=np.uint32)
+            fragment |= (
+                non_blank
+                & (first + len(word) <= last + 1)
+                & (window[:, :len(word)] == word_codes).all(axis=1)
+            )
+        score -= np.where(fragment, 0.2, 0.0)
+
+        open_parens = (
+            _count_within(self._open_parens, starts, ends) - _count_within(self._close_parens, starts, ends)
+        )
+        open_quotes = _count_within(self._quotes, starts, ends) % 2
+        score -= np.where((open_parens != 0) | (open_quotes != 0), 0.2, 0.0)
+        return np.maximum(score, 0.0)
+
+    def coherence(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        word_count: Optional[np.ndarray] = None,
+        sentence_count: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Mean word-set overlap of adjacent sentences (0.3 under 5 words, 0.8 for one sentence)."""
+        if word_count is None:
+            word_count = self.word_counts(starts, ends)
+        if sentence_count is None:
+            sentence_count = self.terminator_runs(starts, ends) + 1
+
+        if self._pair_overlap is None:
+            overlap, valid = self._adjacent_piece_overlaps()
+            self._pair_overlap = _cumulative(overlap)
+            self._pair_valid = _cumulative(valid)
+
+        # Pairs (k, k + 1) of pieces that lie whole inside the span
+        first_piece, last_piece = self._piece_ranges(starts, ends)
+        piece_count = len(self.piece_starts)
+        first_piece = np.clip(first_piece, 0, piece_count - 1)
+        last_piece = np.clip(last_piece, 0, piece_count - 1)
+        pairs_from = np.minimum(first_piece + (self.piece_starts[first_piece] < starts), piece_count - 1)
+        pairs_to = np.maximum(last_piece - (self.piece_ends[last_piece] > ends), pairs_from)
+
+        pair_count = self._pair_valid[pairs_to] - self._pair_valid[pairs_from]
+        overlap = self._pair_overlap[pairs_to] - self._pair_overlap[pairs_from]
+        score = np.where(pair_count > 0, overlap / np.maximum(pair_count, 1), 0.5)
+        score = np.where(sentence_count < 2, 0.8, np.clip(score, 0.0, 1.0))
+        return np.where(word_count < 5, 0.3, score)
+
+    def entity_density(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        entity_spans: Sequence[Tuple[int, int]] = (),
+        entity_chars: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """Entity characters per chunk character, scored for a 10-20% optimum.
+
+        Args:
+            entity_spans: Document (start, end) of each entity; an entity is
+                counted in every span containing its start
+            entity_chars: Entity characters of each span, when entities were
+                mapped per chunk (overrides entity_spans)
+        """
+        lengths = ends - starts
+        if entity_chars is not None:
+            chars = np.asarray(entity_chars, dtype=np.int64)
+        elif len(entity_spans):
+            spans = np.asarray(sorted(entity_spans), dtype=np.int64).reshape(-1, 2)
+            cumulative_chars = _cumulative(spans[:, 1] - spans[:, 0])
+            chars = (
+                cumulative_chars[np.searchsorted(spans[:, 0], ends)]
+                - cumulative_chars[np.searchsorted(spans[:, 0], starts)]
+            )
+        else:
+            chars = np.zeros(len(starts), dtype=np.int64)
+        density = chars / np.maximum(lengths, 1)
+
+        score = np.select(
+            [density < 0.05, density > 0.3],
+            [density * 4, 1.0 - (density - 0.3) * 2],
+            np.minimum(1.0, density * 5)
+        )
+        return np.where(lengths > 0, score, 0.0)
+
+    @staticmethod
+    def boundary_quality(
+        lows: np.ndarray,
+        highs: np.ndarray,
+        positions: Sequence[int],
+        strengths: Sequence[float]
+    ) -> np.ndarray:
+        """Mean strength of the boundaries at positions in [low, high] (0.5 if none)."""
+        if not len(positions):
+            return np.full(len(lows), 0.5)
+        order = np.argsort(positions, kind='stable')
+        sorted_positions = np.asarray(positions, dtype=np.int64)[order]
+        total = _cumulative(np.asarray(strengths, dtype=np.float64)[order])
+        first = np.searchsorted(sorted_positions, lows, side='left')
+        last = np.searchsorted(sorted_positions, highs, side='right')
+        count = last - first
+        return np.where(count > 0, (total[last] - total[first]) / np.maximum(count, 1), 0.5)
+
+    @staticmethod
+    def size_optimality(lengths: np.ndarray, target_size: int) -> np.ndarray:
+        """1.0 within 80-120% of target_size, falling off in steps outside it."""
+        if target_size == 0:
+            return np.ones(len(lengths))
+        ratio = lengths / target_size
+        return np.select(
+            [
+                (ratio >= 0.8) & (ratio <= 1.2),
+                ((ratio >= 0.6) & (ratio < 0.8)) | ((ratio > 1.2) & (ratio <= 1.5)),
+                ((ratio >= 0.4) & (ratio < 0.6)) | ((ratio > 1.5) & (ratio <= 2.0)),
+            ],
+            [1.0, 0.7, 0.4],
+            0.1
+        )
+
+    def score_chunks(
+        self,
+        starts: Sequence[int],
+        ends: Sequence[int],
+        target_size: int = 0,
+        min_chunk_size: int = 0,
+        detailed: bool = True,
+        entity_spans: Sequence[Tuple[int, int]] = (),
+        entity_chars: Optional[Sequence[int]] = None,
+        boundary_positions: Sequence[int] = (),
+        boundary_strengths: Sequence[float] = (),
+        boundary_ranges: Optional[Tuple[Sequence[int], Sequence[int]]] = None
+    ) -> ChunkScores:
+        """
+        Score every chunk of the document in one pass of array operations.
+
+        Args:
+            starts: Chunk start offsets in the indexed text
+            ends: Chunk end offsets
+            target_size: Target chunk size for size optimality
+            min_chunk_size: Chunks shorter than this get half the basic quality
+            detailed: Also compute the ChunkQualityScorer metrics (counts and
+                the basic quality score are always computed)
+            entity_spans: Document spans of known entities
+            entity_chars: Entity characters per chunk (instead of entity_spans)
+            boundary_positions: Document offsets of detected boundaries
+            boundary_strengths: Strength of each boundary
+            boundary_ranges: (lows, highs) of the boundaries belonging to each
+                chunk (inclusive); defaults to the chunk spans
+
+        Returns:
+            ChunkScores with one entry per chunk; metrics that score 0.0 are
+            reported as 0.5, as ChunkQualityScorer.score_chunk does
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        first, last, non_blank = self.stripped_bounds(starts, ends)
+        word_count = self.word_counts(starts, ends)
+        sentence_count = self.terminator_runs(starts, ends) + 1
+
+        starts_with_capital = np.zeros(len(starts), dtype=bool)
+        if non_blank.any():
+            starts_with_capital[non_blank] = np.fromiter(
+                (self.text[offset].isupper() for offset in first[non_blank]),
+                dtype=bool, count=int(non_blank.sum())
+            )
+
+        scores = ChunkScores(
+            word_count=word_count,
+            sentence_count=sentence_count,
+            starts_with_capital=starts_with_capital,
+            ends_with_sentence=self._char_in(last, non_blank, _TERMINATOR),
+            basic_quality=self.basic_quality(starts, ends, min_chunk_size, last, non_blank)
+        )
+        if not detailed:
+            return scores
+
+        lows, highs = boundary_ranges if boundary_ranges is not None else (starts, ends)
+        metrics = {
+            "completeness": self.completeness(starts, ends, first, last, non_blank),
+            "coherence": self.coherence(starts, ends, word_count, sentence_count),
+            "entity_density": self.entity_density(starts, ends, entity_spans, entity_chars),
+            "boundary_quality": self.boundary_quality(
+                np.asarray(lows, dtype=np.int64), np.asarray(highs, dtype=np.int64),
+                boundary_positions, boundary_strengths
+            ),
+            "size_optimality": self.size_optimality(ends - starts, target_size),
+        }
+        for name, values in metrics.items():
+            setattr(scores, name, np.where(values == 0, 0.5, values))
+        scores.overall_score = sum(getattr(scores, name) * weight for name, weight in _WEIGHTS.items())
+        return scores
+
+
+def score_texts(texts: Sequence[str], target_size: int = 0, min_chunk_size: int = 0, **kwargs) -> ChunkScores:
+    """Score chunks given only by their text (see ChunkScoringIndex.for_texts)."""
+    index, starts, ends = ChunkScoringIndex.for_texts(texts)
+    return index.score_chunks(starts, ends, target_size, min_chunk_size, **kwargs)
@@ -0,0 +1,199 @@
+"""
+Sectioned sentence parsing for semantic boundary detection.
+
+BoundaryDetector finds topic shifts from the similarity of adjacent sentence
+vectors. Parsing a whole document in one spaCy call takes seconds and times
+out on long filings, so the text is cut into sections at section headers and
+each section into paragraph slices; a section goes through nlp.pipe in one
+worker thread, and its sentence vectors are compared in one vectorized pass.
+
+At most max_parallel_sections parsing threads run at a time. A section that
+times out is told to stop after its current slice, and its slot is only
+handed to the next section once the thread has actually returned.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+from typing import List, Optional, Pattern, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pipeline components semantic boundary detection never reads
+UNUSED_PIPES = ("ner", "lemmatizer", "textcat", "textcat_multilabel", "entity_ruler", "entity_linker", "merge_entities")
+
+# Cosine similarity below which adjacent sentences mark a topic shift
+TOPIC_SHIFT_SIMILARITY = 0.3
+
+Span = Tuple[int, int]
+
+
+class _SectionStopped(Exception):
+    """Raised inside a parsing thread whose section timed out."""
+
+
+class SectionSentenceParser:
+    """
+    Parse a document section by section with nlp.pipe in bounded worker threads.
+
+    Usage:
+        parser = SectionSentenceParser(section_pattern, paragraph_pattern)
+        shifts = await parser.topic_shifts(nlp, text)  # [(position, similarity), ...]
+    """
+
+    def __init__(
+        self,
+        section_pattern: Pattern,
+        paragraph_pattern: Optional[Pattern] = None,
+        max_slice_chars: int = 10000,
+        pipe_batch_size: int = 32,
+        max_parallel_sections: int = 4,
+        section_timeout: float = 12.0
+    ):
+        """
+        Initialize SectionSentenceParser.
+
+        Args:
+            section_pattern: Matches section headers; sections start at each match
+            paragraph_pattern: Matches paragraph breaks (defaults to blank lines)
+            max_slice_chars: Largest paragraph slice sent through nlp.pipe
+            pipe_batch_size: Slices per nlp.pipe batch
+            max_parallel_sections: Parsing threads running at a time
+            section_timeout: Per-section parse timeout before the section is skipped
+        """
+        self.section_pattern = section_pattern
+        self.paragraph_pattern = paragraph_pattern or re.compile(r'\n\s*\n')
+        self.max_slice_chars = max_slice_chars
+        self.pipe_batch_size = pipe_batch_size
+        self.max_parallel_sections = max_parallel_sections
+        self.section_timeout = section_timeout
+
+    async def topic_shifts(
+        self, nlp, text: str, threshold: float = TOPIC_SHIFT_SIMILARITY
+    ) -> List[Tuple[int, float]]:
+        """
+        Sentence starts whose similarity to the previous sentence is below threshold.
+
+        Sections that fail or time out contribute nothing.
+
+        Returns:
+            List of (position, similarity) in document order
+        """
+        shifts = []
+        for starts, vectors in await self.parse_sections(nlp, text):
+            if vectors is None or len(starts) < 2:
+                continue
+            similarities = self.adjacent_similarities(vectors)
+            for i in np.flatnonzero(similarities < threshold):
+                shifts.append((starts[i + 1], float(similarities[i])))
+        return shifts
+
+    async def parse_sections(self, nlp, text: str) -> List[Tuple[List[int], Optional[np.ndarray]]]:
+        """
+        Sentence starts and stacked sentence vectors, one entry per section.
+
+        A section that fails or times out yields ([], None).
+        """
+        sections = self.section_spans(text)
+        semaphore = asyncio.Semaphore(self.max_parallel_sections)
+
+        async def run_section(start: int, end: int) -> Tuple[List[int], Optional[np.ndarray]]:
+            await semaphore.acquire()
+            stop = threading.Event()
+            work = asyncio.ensure_future(asyncio.to_thread(
+                self.sentence_vectors, nlp, text, self.slice_spans(text, start, end), stop
+            ))
+            try:
+                return await asyncio.wait_for(asyncio.shield(work), timeout=self.section_timeout)
+            except asyncio.TimeoutError:
+                logger.debug(f"Section {start}-{end} timed out after {self.section_timeout}s, using heuristics")
+            except Exception as e:
+                logger.debug(f"Section {start}-{end} failed: {e}, using heuristics")
+            finally:
+                # The slot is free only once the thread has returned
+                if work.done():
+                    semaphore.release()
+                else:
+                    stop.set()
+                    work.add_done_callback(release_abandoned)
+            return [], None
+
+        def release_abandoned(work: asyncio.Future):
+            if not work.cancelled():
+                work.exception()  # Nobody awaits an abandoned section's outcome
+            semaphore.release()
+
+        return list(await asyncio.gather(*(run_section(start, end) for start, end in sections)))
+
+    def section_spans(self, text: str) -> List[Span]:
+        """Split text at section headers."""
+        starts = [0] + [m.start() for m in self.section_pattern.finditer(text) if m.start() > 0]
+        ends = starts[1:] + [len(text)]
+        return [(start, end) for start, end in zip(starts, ends) if text[start:end].strip()]
+
+    def slice_spans(self, text: str, start: int, end: int) -> List[Span]:
+        """Pack paragraphs of text[start:end] into slices of at most max_slice_chars."""
+        slices = []
+        slice_start = start
+        last_break = start
+        for match in self.paragraph_pattern.finditer(text, start, end):
+            if match.end() - slice_start > self.max_slice_chars and last_break > slice_start:
+                slices.append((slice_start, last_break))
+                slice_start = last_break
+            last_break = match.end()
+        slices.append((slice_start, end))
+
+        # A single paragraph over the limit is cut at the last sentence end that fits
+        bounded = []
+        for slice_start, slice_end in slices:
+            while slice_end - slice_start > self.max_slice_chars:
+                limit = slice_start + self.max_slice_chars
+                cut = text.rfind('. ', slice_start + self.max_slice_chars // 2, limit)
+                if cut < 0:
+                    cut = text.rfind(' ', slice_start, limit)
+                cut = cut + 1 if cut > slice_start else limit
+                bounded.append((slice_start, cut))
+                slice_start = cut
+            bounded.append((slice_start, slice_end))
+        return [(s, e) for s, e in bounded if text[s:e].strip()]
+
+    def sentence_vectors(
+        self, nlp, text: str, spans: List[Span], stop: Optional[threading.Event] = None
+    ) -> Tuple[List[int], Optional[np.ndarray]]:
+        """
+        Parse slices with nlp.pipe and stack one vector per sentence (runs in a worker thread).
+
+        Raises:
+            _SectionStopped: If stop is set; checked after every slice
+        """
+        disabled = [name for name in nlp.pipe_names if name in UNUSED_PIPES]
+        starts: List[int] = []
+        vectors = []
+        docs = nlp.pipe((text[s:e] for s, e in spans), batch_size=self.pipe_batch_size, disable=disabled)
+        for (span_start, _), doc in zip(spans, docs):
+            if stop is not None and stop.is_set():
+                raise _SectionStopped()
+            for sent in doc.sents:
+                starts.append(span_start + sent.start_char)
+                vectors.append(sent.vector)
+        if not vectors:
+            return starts, None
+        return starts, np.vstack(vectors)
+
+    @staticmethod
+    def adjacent_similarities(vectors: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of each row with the next one.
+
+        Rows without a vector (zero norm) get a neutral 0.5, matching the
+        default of the per-pair path.
+        """
+        norms = np.linalg.norm(vectors, axis=1)
+        dots = np.einsum('ij,ij->i', vectors[:-1], vectors[1:])
+        denominators = norms[:-1] * norms[1:]
+        similarities = np.full(len(dots), 0.5, dtype=np.float64)
+        np.divide(dots, denominators, out=similarities, where=denominators > 0)
+        return similarities
@@ -9,6 +9,7 @@ import logging
 
 # CLAUDE.md Compliant: Absolute import
 from src.models.responses import DocumentChunk
+from src.core.smart_chunker import strip_span
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,19 @@ class BaseChunker(ABC):
             metadata=metadata or {}
         )
     
+    def _content_span(self, text: str, start: int, end: int) -> tuple:
+        """
+        Stripped chunk content with matching positions.
+        
+        Slices the document once (``text[start:end].strip()`` copies twice)
+        and keeps start/end aligned with the returned content.
+        
+        Returns:
+            (content, start, end) with content == text[start:end]
+        """
+        start, end = strip_span(text, start, end)
+        return text[start:end], start, end
+    
     def _validate_parameters(self, text: str, chunk_size: int, chunk_overlap: int):
         """Validate chunking parameters."""
         if not text:
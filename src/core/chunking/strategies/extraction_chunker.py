@@ -12,6 +12,7 @@ import logging
 
 # CLAUDE.md Compliant: Absolute imports
 from src.core.chunking.strategies.base_chunker import BaseChunker
+from src.core.document_index import DocumentIndex
 from src.models.responses import DocumentChunk
 
 logger = logging.getLogger(__name__)
@@ -45,12 +46,16 @@ class ExtractionChunker(BaseChunker):
     # Paragraph boundary pattern (double newline or indentation)
     PARAGRAPH_PATTERN = re.compile(r'\n\s*\n|\n\t+|\n {4,}')
     
+    # Numbered section headers
+    SECTION_PATTERN = re.compile(r'\n\s*(?:\d+\.|\([a-z]\)|\([0-9]+\))\s+')
+    
     async def chunk_text(
         self,
         text: str,
         chunk_size: Optional[int] = None,
         chunk_overlap: Optional[int] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        index: Optional[DocumentIndex] = None
     ) -> List[DocumentChunk]:
         """
         Chunk text optimized for AI entity extraction.
@@ -60,6 +65,7 @@ class ExtractionChunker(BaseChunker):
             chunk_size: Target chunk size (defaults to 8000 for extraction)
             chunk_overlap: Overlap between chunks (defaults to 500)
             metadata: Additional metadata
+            index: Structure index of text shared with other pipeline stages
             
         Returns:
             List of DocumentChunk objects optimized for entity extraction
@@ -72,7 +78,7 @@ class ExtractionChunker(BaseChunker):
         self._validate_parameters(text, chunk_size, chunk_overlap)
         
         # Pre-process text to identify important boundaries
-        boundaries = self._identify_legal_boundaries(text)
+        boundaries = self._identify_legal_boundaries(text, index)
         
         chunks = []
         current_pos = 0
@@ -89,7 +95,7 @@ class ExtractionChunker(BaseChunker):
             )
             
             # Extract chunk content
-            content = text[current_pos:chunk_end].strip()
+            content, content_start, content_end = self._content_span(text, current_pos, chunk_end)
             
             if content:
                 # Calculate chunk statistics
@@ -101,8 +107,8 @@ class ExtractionChunker(BaseChunker):
                 
                 chunk = self._create_chunk(
                     content=content,
-                    start_position=current_pos,
-                    end_position=chunk_end,
+                    start_position=content_start,
+                    end_position=content_end,
                     chunk_index=chunk_index,
                     metadata={
                         **(metadata or {}),
@@ -143,38 +149,36 @@ class ExtractionChunker(BaseChunker):
         
         return chunks
     
-    def _identify_legal_boundaries(self, text: str) -> Dict[str, List[int]]:
+    def _identify_legal_boundaries(
+        self,
+        text: str,
+        index: Optional[DocumentIndex] = None
+    ) -> Dict[str, List[int]]:
         """
         Identify important boundaries in legal text.
         
+        Args:
+            text: Text to analyze
+            index: Optional structure index of text (pattern scans are shared through it)
+        
         Returns:
             Dictionary mapping boundary types to positions
         """
-        boundaries = {
-            'paragraphs': [],
-            'sentences': [],
-            'citations': [],
-            'sections': []
+        if index is not None and index.covers(text):
+            def spans(pattern):
+                return index.spans(pattern)
+        else:
+            def spans(pattern):
+                return [match.span() for match in pattern.finditer(text)]
+        
+        return {
+            # Paragraph, sentence and citation boundaries end their matches
+            'paragraphs': [end for _, end in spans(self.PARAGRAPH_PATTERN)],
+            'sentences': [end for _, end in spans(self.SENTENCE_END_PATTERN)],
+            'citations': [end for _, end in spans(self.CITATION_PATTERN)],
+            # Section headers (numbered sections) start theirs
+            'sections': [start for start, _ in spans(self.SECTION_PATTERN)]
         }
-        
-        # Find paragraph boundaries
-        for match in self.PARAGRAPH_PATTERN.finditer(text):
-            boundaries['paragraphs'].append(match.end())
-        
-        # Find sentence boundaries
-        for match in self.SENTENCE_END_PATTERN.finditer(text):
-            boundaries['sentences'].append(match.end())
-        
-        # Find citation boundaries (end of citations)
-        for match in self.CITATION_PATTERN.finditer(text):
-            boundaries['citations'].append(match.end())
-        
-        # Find section headers (numbered sections)
-        section_pattern = re.compile(r'\n\s*(?:\d+\.|\([a-z]\)|\([0-9]+\))\s+')
-        for match in section_pattern.finditer(text):
-            boundaries['sections'].append(match.start())
-        
-        return boundaries
     
     def _find_optimal_boundary(
         self,
@@ -167,7 +167,7 @@ class LegalChunker(SemanticChunker):
             )
             
             # Extract chunk content
-            chunk_content = text[chunk_start:chunk_end].strip()
+            chunk_content, content_start, content_end = self._content_span(text, chunk_start, chunk_end)
             
             if chunk_content:
                 # Analyze chunk for legal content
@@ -184,8 +184,8 @@ class LegalChunker(SemanticChunker):
                 
                 chunk = self._create_chunk(
                     content=chunk_content,
-                    start_position=chunk_start,
-                    end_position=chunk_end,
+                    start_position=content_start,
+                    end_position=content_end,
                     chunk_index=chunk_index,
                     metadata=legal_metadata
                 )
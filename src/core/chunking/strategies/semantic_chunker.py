@@ -3,16 +3,19 @@ Advanced semantic chunking strategy with intelligent boundary detection.
 
 Implements Phase 2 features:
 - BoundaryDetector for semantic, paragraph, and sentence boundaries
+  (batched nlp.pipe over paragraph slices, vectorized sentence similarity)
 - EntityPositionMapper for precise entity location tracking
 - ChunkQualityScorer for multi-dimensional quality assessment
+  (all chunks of a document scored in one batch over shared offset arrays)
 - Configurable boundary types and intelligent size optimization
 """
 
 import asyncio
 import re
+import numpy as np
 import spacy
 import time
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Union, Tuple
 import logging
 from dataclasses import dataclass
 from enum import Enum
@@ -22,6 +25,8 @@ import uuid
 from src.core.chunking.strategies.base_chunker import BaseChunker
 from src.models.responses import DocumentChunk
 from src.core.chunking.async_spacy_wrapper import AsyncSpacyWrapper, CircuitConfig
+from src.core.chunking.quality_scoring import ChunkScores, ChunkScoringIndex
+from src.core.chunking.section_parsing import SectionSentenceParser
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +73,22 @@ class QualityMetrics:
 class BoundaryDetector:
     """Detects various types of text boundaries with confidence scores."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_slice_chars: int = 10000,
+        pipe_batch_size: int = 32,
+        max_parallel_sections: int = 4,
+        section_timeout: float = 12.0
+    ):
+        """
+        Initialize BoundaryDetector.
+        
+        Args:
+            max_slice_chars: Largest paragraph slice sent through nlp.pipe
+            pipe_batch_size: Slices per nlp.pipe batch
+            max_parallel_sections: Sections parsed concurrently (worker threads)
+            section_timeout: Per-section parse timeout before falling back to heuristics
+        """
         # Initialize AsyncSpacyWrapper with optimized performance configuration
         config = CircuitConfig(
             failure_threshold=3,          # Optimized for faster detection
@@ -99,6 +119,14 @@ class BoundaryDetector:
             'paragraph_break': re.compile(r'\n\s*\n'),
             'topic_shift': re.compile(r'\b(?:however|moreover|furthermore|nevertheless|therefore)\b', re.IGNORECASE)
         }
+        self.section_parser = SectionSentenceParser(
+            self._legal_patterns['section_header'],
+            self._legal_patterns['paragraph_break'],
+            max_slice_chars=max_slice_chars,
+            pipe_batch_size=pipe_batch_size,
+            max_parallel_sections=max_parallel_sections,
+            section_timeout=section_timeout
+        )
         
     async def initialize(self):
         """Initialize spaCy wrapper with comprehensive hanging prevention."""
@@ -130,6 +158,13 @@ class BoundaryDetector:
         heuristic_boundaries = self._detect_heuristic_semantic_boundaries(text)
         boundaries.extend(heuristic_boundaries)
         
+        # Batched path when the wrapper exposes its loaded pipeline
+        nlp = getattr(self.spacy_wrapper, 'nlp', None)
+        if nlp is not None:
+            boundaries.extend(await self._detect_batched_semantic_boundaries(nlp, text))
+            return boundaries
+        logger.debug("spaCy wrapper exposes no loaded pipeline (.nlp), using per-pair similarity")
+        
         # Try spaCy analysis using AsyncSpacyWrapper with optimized timeout
         try:
             # Use hierarchical timeout aligned with system architecture
@@ -194,6 +229,28 @@ class BoundaryDetector:
         
         return boundaries
     
+    async def _detect_batched_semantic_boundaries(self, nlp, text: str) -> List[Boundary]:
+        """
+        Topic-shift boundaries from one nlp.pipe pass per section.
+        
+        See SectionSentenceParser: sections are parsed in bounded worker
+        threads and adjacent-sentence similarities computed per section in one
+        vectorized pass. A section that fails or times out contributes no
+        boundaries; the heuristic ones still apply.
+        """
+        boundaries = [
+            Boundary(
+                position=position,
+                boundary_type=BoundaryType.SEMANTIC,
+                strength=max(0.1, min(1.0, 1.0 - similarity)),
+                metadata={'similarity': similarity, 'method': 'spacy_batched'}
+            )
+            for position, similarity in await self.section_parser.topic_shifts(nlp, text)
+        ]
+        
+        logger.debug(f"✅ Batched spaCy semantic analysis found {len(boundaries)} semantic boundaries")
+        return boundaries
+    
     def _detect_heuristic_semantic_boundaries(self, text: str) -> List[Boundary]:
         """Detect semantic boundaries using enhanced heuristic patterns."""
         boundaries = []
@@ -451,133 +508,60 @@ class ChunkQualityScorer:
         if entities is None:
             entities = await self.entity_mapper.map_entities(content, 0)
         
-        completeness = self._score_completeness(content) or 0.5
-        coherence = self._score_coherence(content) or 0.5
-        entity_density = self._score_entity_density(content, entities) or 0.5
-        boundary_quality = self._score_boundary_quality(content, boundaries) or 0.5
-        size_optimality = self._score_size_optimality(len(content), target_size) or 0.5
-        
-        # Ensure all scores are valid numbers
-        scores = [completeness, coherence, entity_density, boundary_quality, size_optimality]
-        valid_scores = [max(0.0, min(1.0, float(s))) for s in scores if s is not None]
-        
-        if len(valid_scores) != len(scores):
-            # Some scores were invalid, use defaults
-            valid_scores = [0.5, 0.5, 0.5, 0.5, 0.5]
-            completeness, coherence, entity_density, boundary_quality, size_optimality = valid_scores
-        
-        # Weighted overall score
-        overall_score = (
-            completeness * 0.25 +
-            coherence * 0.25 +
-            entity_density * 0.2 +
-            boundary_quality * 0.2 +
-            size_optimality * 0.1
+        positions = [b.position for b in boundaries]
+        index, starts, ends = ChunkScoringIndex.for_texts([content])
+        scores = self.score_chunks(
+            index, starts, ends, boundaries, target_size,
+            entity_chars=[sum(len(entity.text) for entity in entities)],
+            windows=([min(positions, default=0)], [max(positions, default=0)])
         )
-        
-        return QualityMetrics(
-            completeness=completeness,
-            coherence=coherence,
-            entity_density=entity_density,
-            boundary_quality=boundary_quality,
-            size_optimality=size_optimality,
-            overall_score=overall_score
-        )
-    
-    def _score_completeness(self, content: str) -> float:
-        """Score how complete/self-contained the chunk is."""
-        score = 1.0
-        
-        # Check for complete sentences
-        if not content.strip().endswith(('.', '!', '?')):
-            score -= 0.3
-        
-        # Check for sentence fragments at the beginning
-        if content.strip().startswith(('and', 'or', 'but', 'however')):
-            score -= 0.2
-        
-        # Check for incomplete parentheses/quotes
-        open_parens = content.count('(') - content.count(')')
-        open_quotes = content.count('"') % 2
-        if open_parens != 0 or open_quotes != 0:
-            score -= 0.2
-        
-        return max(0.0, score)
-    
-    def _score_coherence(self, content: str) -> float:
-        """Score the internal coherence of the chunk."""
-        try:
-            # Simple heuristics for coherence
-            words = content.split()
-            if len(words) < 5:
-                return 0.3
-            
-            # Check for topic consistency (basic keyword overlap)
-            sentences = re.split(r'[.!?]+', content)
-            if len(sentences) < 2:
-                return 0.8
-            
-            # Calculate word overlap between sentences (simple coherence measure)
-            overlaps = []
-            for i in range(len(sentences) - 1):
-                words1 = set(sentences[i].lower().split())
-                words2 = set(sentences[i + 1].lower().split())
-                if words1 and words2:
-                    overlap = len(words1.intersection(words2)) / len(words1.union(words2))
-                    overlaps.append(overlap)
-            
-            if overlaps:
-                avg_overlap = sum(overlaps) / len(overlaps)
-                # Ensure valid range [0, 1]
-                return max(0.0, min(1.0, avg_overlap))
-            else:
-                return 0.5
-                
-        except Exception as e:
-            logger.debug(f"Coherence scoring failed: {e}, using default")
-            return 0.5
-    
-    def _score_entity_density(self, content: str, entities: List[EntityPosition]) -> float:
-        """Score based on entity density (legal documents should have entities)."""
-        if not content:
-            return 0.0
-        
-        entity_chars = sum(len(entity.text) for entity in entities)
-        density = entity_chars / len(content)
-        
-        # Optimal density is around 10-20% for legal documents
-        if density < 0.05:
-            return density * 4  # Scale up low densities
-        elif density > 0.3:
-            return 1.0 - (density - 0.3) * 2  # Penalize very high densities
-        else:
-            return min(1.0, density * 5)  # Reward moderate densities
+        return self.quality_metrics(scores, 0)
     
-    def _score_boundary_quality(self, content: str, boundaries: List[Boundary]) -> float:
-        """Score the quality of chunk boundaries."""
-        if not boundaries:
-            return 0.5
-        
-        # Average boundary strength
-        avg_strength = sum(b.strength for b in boundaries) / len(boundaries)
-        return avg_strength
+    def score_chunks(
+        self,
+        index: ChunkScoringIndex,
+        starts: Sequence[int],
+        ends: Sequence[int],
+        boundaries: List[Boundary],
+        target_size: int,
+        entity_chars: Sequence[int],
+        windows: Optional[Tuple[Sequence[int], Sequence[int]]] = None
+    ) -> ChunkScores:
+        """
+        Score all chunks of a document in one batch.
+        
+        Args:
+            index: Scoring index of the document
+            starts: Chunk content start offsets
+            ends: Chunk content end offsets
+            boundaries: All boundaries of the document
+            target_size: Target chunk size
+            entity_chars: Characters of the entities mapped in each chunk
+            windows: (starts, ends) of the ranges whose boundaries belong to
+                each chunk (inclusive); defaults to the content spans
+        
+        Returns:
+            ChunkScores; use quality_metrics() for one chunk's QualityMetrics
+        """
+        return index.score_chunks(
+            starts, ends, target_size,
+            entity_chars=entity_chars,
+            boundary_positions=[b.position for b in boundaries],
+            boundary_strengths=[b.strength for b in boundaries],
+            boundary_ranges=windows
+        )
     
-    def _score_size_optimality(self, actual_size: int, target_size: int) -> float:
-        """Score how close the chunk size is to the target."""
-        if target_size == 0:
-            return 1.0
-        
-        ratio = actual_size / target_size
-        
-        # Optimal range is 80% to 120% of target
-        if 0.8 <= ratio <= 1.2:
-            return 1.0
-        elif 0.6 <= ratio < 0.8 or 1.2 < ratio <= 1.5:
-            return 0.7
-        elif 0.4 <= ratio < 0.6 or 1.5 < ratio <= 2.0:
-            return 0.4
-        else:
-            return 0.1
+    @staticmethod
+    def quality_metrics(scores: ChunkScores, i: int) -> QualityMetrics:
+        """QualityMetrics of chunk i of a batch."""
+        return QualityMetrics(
+            completeness=float(scores.completeness[i]),
+            coherence=float(scores.coherence[i]),
+            entity_density=float(scores.entity_density[i]),
+            boundary_quality=float(scores.boundary_quality[i]),
+            size_optimality=float(scores.size_optimality[i]),
+            overall_score=float(scores.overall_score[i])
+        )
 
 
 class SemanticChunker(BaseChunker):
@@ -691,7 +675,9 @@ class SemanticChunker(BaseChunker):
         )
         
         # Apply quality scoring and optimization
-        chunks = await self._optimize_chunks_by_quality(chunks, chunk_size, config)
+        quality_optimized = not config.get('skip_chunk_scoring', False)
+        if quality_optimized:
+            chunks = await self._optimize_chunks_by_quality(chunks, chunk_size, config)
         
         # Add comprehensive metadata
         for i, chunk in enumerate(chunks):
@@ -699,7 +685,7 @@ class SemanticChunker(BaseChunker):
                 'chunking_strategy': 'semantic_v2',
                 'phase': 2,
                 'boundary_types_used': [bt.value for bt in boundary_types],
-                'quality_optimized': True
+                'quality_optimized': quality_optimized
             })
         
         logger.info(f"SemanticChunker Phase 2 created {len(chunks)} high-quality chunks")
@@ -726,6 +712,7 @@ class SemanticChunker(BaseChunker):
         config['min_quality_score'] = metadata.get('min_quality_score', 0.6)
         config['optimize_for_entities'] = metadata.get('optimize_for_entities', True)
         config['preserve_legal_structure'] = metadata.get('preserve_legal_structure', True)
+        config['skip_chunk_scoring'] = metadata.get('skip_chunk_scoring', False)
         
         return config
     
@@ -742,8 +729,8 @@ class SemanticChunker(BaseChunker):
             # Fallback to fixed-size chunking
             return await self._create_fixed_chunks(text, chunk_size, chunk_overlap)
         
-        chunks = []
-        chunk_index = 0
+        # Chunk spans first: (content, start, end, window start, window end, entities)
+        spans = []
         current_start = 0
         
         # Sort boundaries by position
@@ -763,25 +750,12 @@ class SemanticChunker(BaseChunker):
                 break
             
             # Extract chunk content
-            chunk_content = text[current_start:chunk_end].strip()
+            chunk_content, content_start, content_end = self._content_span(text, current_start, chunk_end)
             
             if chunk_content:
                 # Map entities within this chunk
-                entities = await self.entity_mapper.map_entities(chunk_content, current_start)
-                
-                # Create chunk with enhanced metadata
-                chunk = await self._create_enhanced_chunk(
-                    content=chunk_content,
-                    start_position=current_start,
-                    end_position=chunk_end,
-                    chunk_index=chunk_index,
-                    entities=entities,
-                    boundaries=self._get_chunk_boundaries(boundaries, current_start, chunk_end),
-                    target_size=chunk_size
-                )
-                
-                chunks.append(chunk)
-                chunk_index += 1
+                entities = await self.entity_mapper.map_entities(chunk_content, content_start)
+                spans.append((chunk_content, content_start, content_end, current_start, chunk_end, entities))
             
             # Move to next chunk with overlap
             if chunk_overlap > 0:
@@ -794,6 +768,35 @@ class SemanticChunker(BaseChunker):
             if current_start >= chunk_end:
                 current_start = chunk_end
         
+        if not spans:
+            return []
+        
+        # Then score all chunks of the document in one batch
+        scores = None
+        if not config.get('skip_chunk_scoring', False):
+            _, starts, ends, window_starts, window_ends, _ = zip(*spans)
+            scores = self.quality_scorer.score_chunks(
+                ChunkScoringIndex(text), starts, ends, boundaries, chunk_size,
+                entity_chars=[sum(len(entity.text) for entity in span[-1]) for span in spans],
+                windows=(window_starts, window_ends)
+            )
+        
+        chunks = []
+        for chunk_index, (content, start, end, window_start, window_end, entities) in enumerate(spans):
+            # Create chunk with enhanced metadata
+            chunk = await self._create_enhanced_chunk(
+                content=content,
+                start_position=start,
+                end_position=end,
+                chunk_index=chunk_index,
+                entities=entities,
+                boundaries=self._get_chunk_boundaries(boundaries, window_start, window_end),
+                quality_metrics=self.quality_scorer.quality_metrics(scores, chunk_index) if scores else None,
+                word_count=int(scores.word_count[chunk_index]) if scores else None,
+                sentence_count=int(scores.sentence_count[chunk_index]) - 1 if scores else None
+            )
+            chunks.append(chunk)
+        
         return chunks
     
     async def _find_optimal_chunk_end(
@@ -880,17 +883,17 @@ class SemanticChunker(BaseChunker):
         chunk_index: int,
         entities: List[EntityPosition],
         boundaries: List[Boundary],
-        target_size: int
+        quality_metrics: Optional[QualityMetrics] = None,
+        word_count: Optional[int] = None,
+        sentence_count: Optional[int] = None
     ) -> DocumentChunk:
-        """Create a chunk with enhanced metadata and quality scoring."""
+        """
+        Create a chunk with enhanced metadata and quality scoring.
         
-        # Calculate quality metrics
-        quality_metrics = await self.quality_scorer.score_chunk(
-            content=content,
-            boundaries=boundaries,
-            target_size=target_size,
-            entities=entities
-        )
+        quality_metrics, word_count and sentence_count come from the batch
+        scoring in _create_intelligent_chunks; without them (scoring skipped)
+        the chunk carries no quality data.
+        """
         
         # Prepare enhanced metadata
         enhanced_metadata = {
@@ -907,8 +910,10 @@ class SemanticChunker(BaseChunker):
                 'type': b.boundary_type.value,
                 'strength': b.strength,
                 'metadata': b.metadata
-            } for b in boundaries],
-            'quality': {
+            } for b in boundaries]
+        }
+        if quality_metrics is not None:
+            enhanced_metadata['quality'] = {
                 'completeness': quality_metrics.completeness,
                 'coherence': quality_metrics.coherence,
                 'entity_density': quality_metrics.entity_density,
@@ -916,7 +921,6 @@ class SemanticChunker(BaseChunker):
                 'size_optimality': quality_metrics.size_optimality,
                 'overall_score': quality_metrics.overall_score
             }
-        }
         
         # Create chunk with all enhancements
         chunk = self._create_chunk(
@@ -928,9 +932,10 @@ class SemanticChunker(BaseChunker):
         )
         
         # Set additional fields
-        chunk.quality_score = quality_metrics.overall_score
-        chunk.sentence_count = len(re.findall(r'[.!?]+', content))
-        chunk.word_count = len(content.split())
+        if quality_metrics is not None:
+            chunk.quality_score = quality_metrics.overall_score
+            chunk.sentence_count = sentence_count
+            chunk.word_count = word_count
         chunk.boundary_info = {
             'boundary_count': len(boundaries),
             'strongest_boundary': max(boundaries, key=lambda b: b.strength).boundary_type.value if boundaries else None,
@@ -1053,7 +1058,7 @@ class SemanticChunker(BaseChunker):
         positions = self._calculate_positions(text, chunk_size, chunk_overlap)
         
         for i, (start, end) in enumerate(positions):
-            content = text[start:end].strip()
+            content, start, end = self._content_span(text, start, end)
             if content:
                 chunk = self._create_chunk(
                     content=content,
@@ -1074,7 +1079,7 @@ class SemanticChunker(BaseChunker):
         positions = self._calculate_positions(text, chunk_size, chunk_overlap)
         
         for i, (start, end) in enumerate(positions):
-            content = text[start:end].strip()
+            content, start, end = self._content_span(text, start, end)
             if content:
                 chunk = DocumentChunk(
                     chunk_id=str(uuid.uuid4()),
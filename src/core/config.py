@@ -1179,6 +1179,175 @@ class VLLMDirectSettings(BaseSettings):
         description="Connection pool size for vLLM client"
     )
 
+    # Admission Control (ThrottledVLLMClient)
+    vllm_enable_admission_control: bool = Field(
+        default=True,
+        env="VLLM_ENABLE_ADMISSION_CONTROL",
+        description="Admit vLLM calls against an estimated KV-cache token budget"
+    )
+    vllm_kv_token_budget: int = Field(
+        default=262144,
+        env="VLLM_KV_TOKEN_BUDGET",
+        gt=0,
+        description="Maximum estimated in-flight prompt+completion tokens across all calls"
+    )
+    vllm_admission_min_token_budget: int = Field(
+        default=16384,
+        env="VLLM_ADMISSION_MIN_TOKEN_BUDGET",
+        gt=0,
+        description="Floor for the AIMD-adjusted token budget"
+    )
+    vllm_admission_additive_increase: int = Field(
+        default=8192,
+        env="VLLM_ADMISSION_ADDITIVE_INCREASE",
+        gt=0,
+        description="Tokens added to the budget after a healthy completion while calls are queued"
+    )
+    vllm_admission_decrease_factor: float = Field(
+        default=0.7,
+        env="VLLM_ADMISSION_DECREASE_FACTOR",
+        gt=0.0,
+        lt=1.0,
+        description="Multiplicative budget decrease on slow or failed completions"
+    )
+    vllm_admission_slowdown_threshold: float = Field(
+        default=3.0,
+        env="VLLM_ADMISSION_SLOWDOWN_THRESHOLD",
+        gt=1.0,
+        description="Observed/expected latency ratio above which the budget is decreased"
+    )
+    vllm_admission_max_in_flight: int = Field(
+        default=64,
+        env="VLLM_ADMISSION_MAX_IN_FLIGHT",
+        gt=0,
+        description="Hard cap on concurrently admitted vLLM calls"
+    )
+    vllm_requests_per_minute: int = Field(
+        default=0,
+        env="VLLM_REQUESTS_PER_MINUTE",
+        ge=0,
+        description="Sliding-window request rate limit (0 disables)"
+    )
+    vllm_enable_circuit_breaker: bool = Field(
+        default=True,
+        env="VLLM_ENABLE_CIRCUIT_BREAKER",
+        description="Reject calls while the vLLM service is failing repeatedly"
+    )
+    vllm_circuit_failure_threshold: int = Field(
+        default=3,
+        env="VLLM_CIRCUIT_FAILURE_THRESHOLD",
+        gt=0,
+        description="Consecutive failures before the circuit opens"
+    )
+    vllm_circuit_recovery_timeout: int = Field(
+        default=60,
+        env="VLLM_CIRCUIT_RECOVERY_TIMEOUT",
+        gt=0,
+        description="Seconds before an open circuit allows a probe call"
+    )
+    vllm_circuit_half_open_requests: int = Field(
+        default=1,
+        env="VLLM_CIRCUIT_HALF_OPEN_REQUESTS",
+        gt=0,
+        description="Successful probe calls required to close the circuit"
+    )
+
+    # Request Scheduling (priority / deadline / fair share)
+    vllm_scheduler_aging_seconds: float = Field(
+        default=30.0,
+        env="VLLM_SCHEDULER_AGING_SECONDS",
+        ge=0.0,
+        description="Queue time after which a waiting call is promoted one priority class (0 = no aging)"
+    )
+    vllm_default_request_timeout_ms: int = Field(
+        default=0,
+        env="VLLM_DEFAULT_REQUEST_TIMEOUT_MS",
+        ge=0,
+        description="Deadline applied to API requests without deadline headers (0 = none)"
+    )
+
+    # Micro-batching (ExtractionOrchestrator._call_vllm -> VLLMMicroBatcher)
+    vllm_enable_micro_batching: bool = Field(
+        default=True,
+        env="VLLM_ENABLE_MICRO_BATCHING",
+        description="Collect extraction calls for a few milliseconds and submit them together"
+    )
+    vllm_micro_batch_max_size: int = Field(
+        default=16,
+        env="VLLM_MICRO_BATCH_MAX_SIZE",
+        gt=0,
+        description="Maximum calls per micro-batch for small prompts (reduced for larger size tiers)"
+    )
+    vllm_micro_batch_max_wait_ms: float = Field(
+        default=5.0,
+        env="VLLM_MICRO_BATCH_MAX_WAIT_MS",
+        ge=0.0,
+        description="Initial time a micro-batch waits for more calls before it is submitted"
+    )
+    vllm_micro_batch_tune_interval: int = Field(
+        default=50,
+        env="VLLM_MICRO_BATCH_TUNE_INTERVAL",
+        gt=0,
+        description="Completed calls between online batch size / wait time tuning passes"
+    )
+
+    # Request Hedging (HedgedVLLMClient over VLLM_INSTRUCT_REPLICA_URLS)
+    vllm_enable_hedging: bool = Field(
+        default=False,
+        env="VLLM_ENABLE_HEDGING",
+        description="Send a duplicate to another instruct replica when a call exceeds its tier's p95"
+    )
+    vllm_hedge_budget_ratio: float = Field(
+        default=0.1,
+        env="VLLM_HEDGE_BUDGET_RATIO",
+        ge=0.0,
+        le=1.0,
+        description="Maximum hedged calls as a fraction of primary calls"
+    )
+    vllm_hedge_min_delay_ms: float = Field(
+        default=500.0,
+        env="VLLM_HEDGE_MIN_DELAY_MS",
+        ge=0.0,
+        description="Lower bound on the wait before a hedge is sent"
+    )
+    vllm_hedge_default_delay_ms: float = Field(
+        default=30000.0,
+        env="VLLM_HEDGE_DEFAULT_DELAY_MS",
+        gt=0.0,
+        description="Hedge delay used until a size tier has enough latency samples"
+    )
+    vllm_hedge_min_samples: int = Field(
+        default=20,
+        env="VLLM_HEDGE_MIN_SAMPLES",
+        gt=0,
+        description="Successful calls per size tier before its observed p95 is used"
+    )
+
+    # Replica Pool (PooledVLLMClient over VLLM_*_REPLICA_URLS)
+    vllm_enable_sticky_routing: bool = Field(
+        default=True,
+        env="VLLM_ENABLE_STICKY_ROUTING",
+        description="Route all calls for one document to the replica holding its prefix in KV cache"
+    )
+    vllm_sticky_max_imbalance_tokens: int = Field(
+        default=65536,
+        env="VLLM_STICKY_MAX_IMBALANCE_TOKENS",
+        ge=0,
+        description="Outstanding-token lead over the least-loaded replica before a document spills over"
+    )
+    vllm_replica_failure_threshold: int = Field(
+        default=3,
+        env="VLLM_REPLICA_FAILURE_THRESHOLD",
+        gt=0,
+        description="Consecutive failures before a replica is taken out of rotation"
+    )
+    vllm_replica_cooldown_seconds: float = Field(
+        default=30.0,
+        env="VLLM_REPLICA_COOLDOWN_SECONDS",
+        gt=0.0,
+        description="Time an unhealthy replica stays out of rotation"
+    )
+
     # Token Estimation
     vllm_chars_per_token: float = Field(
         default=4.0,
@@ -1186,6 +1355,17 @@ class VLLMDirectSettings(BaseSettings):
         gt=0.0,
         description="Average characters per token"
     )
+    vllm_tokenizer_path: Optional[str] = Field(
+        default=None,
+        env="VLLM_TOKENIZER_PATH",
+        description="Served model's HuggingFace tokenizer.json (or model directory) for exact token counts"
+    )
+    vllm_token_count_cache_size: int = Field(
+        default=65536,
+        env="VLLM_TOKEN_COUNT_CACHE_SIZE",
+        gt=0,
+        description="Token counts cached per text (LRU)"
+    )
     vllm_token_overlap_percent: float = Field(
         default=0.1,
         env="VLLM_TOKEN_OVERLAP_PERCENT",
@@ -1311,6 +1491,12 @@ class ChunkingIntegrationSettings(BaseSettings):
         gt=0,
         description="Maximum chunks per document"
     )
+    chunking_max_tokens: int = Field(
+        default=0,
+        env="CHUNKING_MAX_TOKENS",
+        ge=0,
+        description="Token budget per chunk using the served model's tokenizer (0 = size chunks in characters)"
+    )
     smart_chunk_threshold: int = Field(
         default=50000,
         env="SMART_CHUNK_THRESHOLD",
@@ -1357,6 +1543,77 @@ class ChunkingIntegrationSettings(BaseSettings):
         gt=0,
         description="Maximum document size for unified processing (bytes)"
     )
+    incremental_context_margin: int = Field(
+        default=1000,
+        env="INCREMENTAL_CONTEXT_MARGIN",
+        ge=0,
+        description="Characters re-extracted on each side of an edit when re-processing a document version"
+    )
+    incremental_max_region_size: int = Field(
+        default=10000,
+        env="INCREMENTAL_MAX_REGION_SIZE",
+        gt=0,
+        description="Largest re-extracted piece (characters, or tokens when CHUNKING_MAX_TOKENS is set)"
+    )
+    incremental_version_store: str = Field(
+        default="local",
+        env="INCREMENTAL_VERSION_STORE",
+        description="Where previous document versions are kept for diffing (local|graph)"
+    )
+    incremental_max_documents: int = Field(
+        default=256,
+        env="INCREMENTAL_MAX_DOCUMENTS",
+        gt=0,
+        description="Document versions kept by the local version store (LRU)"
+    )
+    streaming_lookahead_chars: int = Field(
+        default=2000,
+        env="STREAMING_LOOKAHEAD_CHARS",
+        gt=0,
+        description="Text read past a streamed chunk's cut so boundaries (citations, quotes, headers) are seen whole"
+    )
+    streaming_max_buffer_chars: int = Field(
+        default=100000,
+        env="STREAMING_MAX_BUFFER_CHARS",
+        gt=0,
+        description="Most characters of a streamed document held at once; a chunk is cut when the buffer fills"
+    )
+    streaming_max_inflight_chunks: int = Field(
+        default=4,
+        env="STREAMING_MAX_INFLIGHT_CHUNKS",
+        gt=0,
+        description="Streamed chunks being extracted at once before reading of the body pauses"
+    )
+    adaptive_density_enabled: bool = Field(
+        default=False,
+        env="ADAPTIVE_DENSITY_ENABLED",
+        description="Size adaptive and smart chunks by regex entity density instead of fixed sizes"
+    )
+    adaptive_density_target_completion_tokens: int = Field(
+        default=4000,
+        env="ADAPTIVE_DENSITY_TARGET_COMPLETION_TOKENS",
+        gt=0,
+        description="Completion tokens one extraction call should produce; chunks are sized to this"
+    )
+    adaptive_density_tokens_per_match: float = Field(
+        default=60.0,
+        env="ADAPTIVE_DENSITY_TOKENS_PER_MATCH",
+        gt=0.0,
+        description="Starting completion tokens per regex match (learned from recorded chunks)"
+    )
+    adaptive_density_baseline_per_kchar: float = Field(
+        default=1.0,
+        env="ADAPTIVE_DENSITY_BASELINE_PER_KCHAR",
+        ge=0.0,
+        description="Entities assumed per 1,000 characters in addition to regex matches"
+    )
+    adaptive_density_smoothing: float = Field(
+        default=0.2,
+        env="ADAPTIVE_DENSITY_SMOOTHING",
+        gt=0.0,
+        le=1.0,
+        description="Weight of each recorded chunk in the learned tokens-per-match average"
+    )
 
     @validator('default_chunking_strategy')
     def validate_chunking_strategy(cls, v, values):
@@ -1372,6 +1629,12 @@ class ChunkingIntegrationSettings(BaseSettings):
             raise ValueError("chunking_overlap must be less than chunking_max_size")
         return v
 
+    @validator('incremental_version_store')
+    def validate_incremental_version_store(cls, v):
+        if v not in ('local', 'graph'):
+            raise ValueError("incremental_version_store must be 'local' or 'graph'")
+        return v
+
     # Compatibility properties for SmartChunker (maps chunking_* to expected names)
     @property
     def max_chunk_size(self) -> int:
@@ -1511,6 +1774,26 @@ class SupabaseSettings(BaseSettings):
         description="Slow query threshold (seconds)"
     )
 
+    # Cross-document entity resolution
+    entity_resolution_dir: str = Field(
+        default="",
+        env="ENTITY_RESOLUTION_DIR",
+        description="Canonical entity index directory; resolution before storage is off when empty"
+    )
+    entity_resolution_threshold: float = Field(
+        default=0.85,
+        env="ENTITY_RESOLUTION_THRESHOLD",
+        ge=0.0,
+        le=1.0,
+        description="Least core-name similarity that joins a canonical entity"
+    )
+    entity_resolution_compact_names: int = Field(
+        default=100000,
+        env="ENTITY_RESOLUTION_COMPACT_NAMES",
+        gt=0,
+        description="Names added since the last index generation that trigger writing a new one"
+    )
+
 
 class EntityExtractionServiceSettings(BaseSettings):
     """Main configuration class for Entity Extraction Service."""
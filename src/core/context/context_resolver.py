@@ -21,6 +21,7 @@ from nltk.corpus import wordnet
 from collections import defaultdict, Counter
 
 # Import local modules
+from ..document_index import DocumentIndex
 from .context_mappings import ContextMappings, ContextType, EntityContextMapping
 from .context_window_extractor import (
     ContextWindowExtractor, 
@@ -74,7 +75,9 @@ class ContextResolver:
                  dynamic_model_loader: Optional[Any] = None,
                  use_semantic_analysis: bool = True,
                  use_dependency_parsing: bool = True,
-                 confidence_threshold: float = 0.6):
+                 confidence_threshold: float = 0.6,
+                 inference_threads: Optional[int] = None,
+                 quantize_semantic_model: bool = False):
         """
         Initialize the context resolver.
         
@@ -83,11 +86,17 @@ class ContextResolver:
             use_semantic_analysis: Whether to use Legal-BERT for semantic analysis
             use_dependency_parsing: Whether to use SpaCy for dependency parsing
             confidence_threshold: Minimum confidence for context resolution
+            inference_threads: Torch CPU threads for Legal-BERT inference
+                (process-wide; None keeps torch's default)
+            quantize_semantic_model: Apply int8 dynamic quantization to the
+                Linear layers of a CPU Legal-BERT model
         """
         self.dynamic_model_loader = dynamic_model_loader
         self.use_semantic_analysis = use_semantic_analysis
         self.use_dependency_parsing = use_dependency_parsing
         self.confidence_threshold = confidence_threshold
+        self.inference_threads = inference_threads
+        self.quantize_semantic_model = quantize_semantic_model
         
         # Initialize components
         self.context_mappings = ContextMappings()
@@ -156,6 +165,31 @@ class ContextResolver:
                     logger.info("Loaded base SpaCy as fallback")
                 except Exception as e2:
                     logger.warning(f"Could not load fallback SpaCy: {e2}")
+        
+        self._prepare_semantic_model()
+    
+    def _prepare_semantic_model(self):
+        """Set CPU inference threads and quantize Legal-BERT if configured"""
+        if self.inference_threads:
+            torch.set_num_threads(self.inference_threads)
+        
+        model = self.legal_bert_model
+        if not isinstance(model, torch.nn.Module):
+            return
+        model.eval()
+        
+        if self.quantize_semantic_model:
+            on_cpu = all(p.device.type == 'cpu' for p in model.parameters())
+            if not on_cpu:
+                logger.warning("Skipping int8 quantization: Legal-BERT is not on the CPU")
+                return
+            try:
+                self.legal_bert_model = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logger.info("Quantized Legal-BERT to int8 for CPU inference")
+            except Exception as e:
+                logger.warning(f"Could not quantize Legal-BERT: {e}")
     
     def _init_pattern_matchers(self):
         """Initialize regex patterns for context detection"""
@@ -221,7 +255,8 @@ class ContextResolver:
     def resolve_context(self,
                         text: str,
                         entity: ExtractedEntity,
-                        all_entities: Optional[List[ExtractedEntity]] = None) -> ResolvedContext:
+                        all_entities: Optional[List[ExtractedEntity]] = None,
+                        index: Optional[DocumentIndex] = None) -> ResolvedContext:
         """
         Resolve the context for an entity using multi-stage analysis.
         
@@ -229,15 +264,32 @@ class ContextResolver:
             text: Full document text
             entity: Entity to resolve context for
             all_entities: All entities in the document (for relationship analysis)
+            index: Structure index of text shared across entities
         
         Returns:
             ResolvedContext with combined analysis results
         """
         # Extract context window
         context_window = self.window_extractor.extract_window(
-            text, entity, WindowLevel.SENTENCE, window_size=3
+            text, entity, WindowLevel.SENTENCE, window_size=3, index=index
         )
         
+        return self._resolve_window(text, entity, context_window, all_entities, index)
+    
+    def _resolve_window(self,
+                        text: str,
+                        entity: ExtractedEntity,
+                        context_window: ContextWindow,
+                        all_entities: Optional[List[ExtractedEntity]] = None,
+                        index: Optional[DocumentIndex] = None,
+                        context_embedding: Optional[np.ndarray] = None,
+                        doc: Optional[Doc] = None) -> ResolvedContext:
+        """
+        Resolve an entity's context from its extracted window.
+        
+        context_embedding and doc are the window's Legal-BERT embedding and
+        SpaCy parse when a batch computed them; otherwise they are computed here.
+        """
         # Collect signals from different methods
         signals = []
         
@@ -248,18 +300,18 @@ class ContextResolver:
         
         # 2. Semantic analysis with Legal-BERT
         if self.use_semantic_analysis and self.legal_bert_model:
-            semantic_signal = self._analyze_semantic(context_window, entity)
+            semantic_signal = self._analyze_semantic(context_window, entity, context_embedding)
             if semantic_signal:
                 signals.append(semantic_signal)
         
         # 3. Dependency parsing with SpaCy
         if self.use_dependency_parsing and self.spacy_model:
-            dependency_signal = self._analyze_dependencies(context_window, entity)
+            dependency_signal = self._analyze_dependencies(context_window, entity, doc)
             if dependency_signal:
                 signals.append(dependency_signal)
         
         # 4. Section-based analysis
-        section_signal = self._analyze_section(text, entity)
+        section_signal = self._analyze_section(text, entity, index)
         if section_signal:
             signals.append(section_signal)
         
@@ -269,7 +321,7 @@ class ContextResolver:
         # Add relationship information if available
         if all_entities:
             resolved.metadata['nearby_entities'] = self._analyze_nearby_entities(
-                text, entity, all_entities
+                text, entity, all_entities, index
             )
         
         return resolved
@@ -325,7 +377,8 @@ class ContextResolver:
     
     def _analyze_semantic(self,
                          context_window: ContextWindow,
-                         entity: ExtractedEntity) -> Optional[ContextSignal]:
+                         entity: ExtractedEntity,
+                         context_embedding: Optional[np.ndarray] = None) -> Optional[ContextSignal]:
         """Semantic context analysis using Legal-BERT embeddings"""
         if not self.legal_bert_model or not self.legal_bert_tokenizer:
             return None
@@ -333,38 +386,26 @@ class ContextResolver:
         try:
             # Prepare text for BERT
             window_text = context_window.text
-            entity_text = entity.text
             
-            # Tokenize and get embeddings
-            inputs = self.legal_bert_tokenizer(
-                window_text,
-                return_tensors="pt",
-                max_length=512,
-                truncation=True,
-                padding=True
-            )
-            
-            with torch.no_grad():
-                outputs = self.legal_bert_model(**inputs)
-                # Use CLS token embedding as context representation
-                context_embedding = outputs.last_hidden_state[:, 0, :].numpy()
+            # Use CLS token embedding as context representation
+            if context_embedding is None:
+                context_embedding = self._encode_windows([window_text])[0]
             
             # Compare with known context embeddings
             # In a real implementation, you would have pre-computed embeddings
             # for different context types to compare against
             
-            # For now, use a simplified heuristic based on attention patterns
-            attention_weights = outputs.attentions[-1] if hasattr(outputs, 'attentions') else None
-            
             # Analyze semantic similarity to context keywords
             context_scores = {}
+            tokens = None
             for context_type in ContextType:
                 # Get context indicators
                 indicators = self.context_mappings.get_context_indicators_for_type(context_type)
                 if indicators and 'keywords' in indicators:
                     keywords = indicators['keywords']
                     # Simple keyword matching in tokenized text
-                    tokens = self.legal_bert_tokenizer.tokenize(window_text.lower())
+                    if tokens is None:
+                        tokens = self.legal_bert_tokenizer.tokenize(window_text.lower())
                     keyword_matches = sum(1 for kw in keywords if kw in tokens)
                     context_scores[context_type] = keyword_matches
             
@@ -395,16 +436,44 @@ class ContextResolver:
             logger.warning(f"Semantic analysis failed: {e}")
             return None
     
+    def _encode_windows(self, texts: List[str], batch_size: int = 32) -> List[np.ndarray]:
+        """
+        CLS embeddings of texts from Legal-BERT, each of shape (1, hidden).
+        
+        Texts are tokenized once, sorted by token count and encoded in
+        batches padded to their longest member, so short windows are not
+        padded to the length of long ones.
+        """
+        encodings = self.legal_bert_tokenizer(texts, max_length=512, truncation=True)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings['input_ids'][i]))
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.legal_bert_tokenizer.pad(
+                {key: [encodings[key][i] for i in batch] for key in encodings.keys()},
+                return_tensors="pt"
+            )
+            with torch.no_grad():
+                outputs = self.legal_bert_model(**inputs)
+            cls = outputs.last_hidden_state[:, 0, :].numpy()
+            for row, i in enumerate(batch):
+                embeddings[i] = cls[row:row + 1]
+        
+        return embeddings
+    
     def _analyze_dependencies(self,
                              context_window: ContextWindow,
-                             entity: ExtractedEntity) -> Optional[ContextSignal]:
-        """Dependency parsing analysis using SpaCy"""
+                             entity: ExtractedEntity,
+                             doc: Optional[Doc] = None) -> Optional[ContextSignal]:
+        """Dependency parsing analysis using SpaCy (doc: the window's parse, if already run)"""
         if not self.spacy_model:
             return None
         
         try:
             # Process text with SpaCy
-            doc = self.spacy_model(context_window.text)
+            if doc is None:
+                doc = self.spacy_model(context_window.text)
             
             # Find entity in SpaCy doc
             entity_span = None
@@ -511,11 +580,12 @@ class ContextResolver:
     
     def _analyze_section(self,
                         text: str,
-                        entity: ExtractedEntity) -> Optional[ContextSignal]:
+                        entity: ExtractedEntity,
+                        index: Optional[DocumentIndex] = None) -> Optional[ContextSignal]:
         """Section-based context analysis"""
         # Extract section context
         section_window = self.window_extractor.extract_window(
-            text, entity, WindowLevel.SECTION
+            text, entity, WindowLevel.SECTION, index=index
         )
         
         # Analyze section metadata
@@ -653,10 +723,11 @@ class ContextResolver:
     def _analyze_nearby_entities(self,
                                 text: str,
                                 entity: ExtractedEntity,
-                                all_entities: List[ExtractedEntity]) -> List[Dict[str, Any]]:
+                                all_entities: List[ExtractedEntity],
+                                index: Optional[DocumentIndex] = None) -> List[Dict[str, Any]]:
         """Analyze entities appearing near the target entity"""
         nearby = self.window_extractor.extract_surrounding_entities(
-            entity, all_entities, max_distance=200
+            entity, all_entities, max_distance=200, index=index
         )
         
         nearby_info = []
@@ -672,46 +743,99 @@ class ContextResolver:
     def batch_resolve_contexts(self,
                               text: str,
                               entities: List[ExtractedEntity],
-                              batch_size: int = 10) -> List[ResolvedContext]:
+                              batch_size: int = 32) -> List[ResolvedContext]:
         """
         Resolve contexts for multiple entities in batch.
         
+        Context windows are extracted for all entities first. Each distinct
+        window text is then encoded by Legal-BERT (in length-sorted, padded
+        batches) and parsed by SpaCy (through nlp.pipe) once, and the results
+        are shared by every entity with that window.
+        
         Args:
             text: Full document text
             entities: List of entities to resolve
-            batch_size: Number of entities to process together
+            batch_size: Number of distinct windows per Legal-BERT and SpaCy batch
         
         Returns:
             List of resolved contexts
         """
-        resolved_contexts = []
+        # Sentence, paragraph and section splits are shared by every entity
+        index = DocumentIndex.build(text)
         
-        for i in range(0, len(entities), batch_size):
-            batch = entities[i:i + batch_size]
-            
-            for entity in batch:
-                try:
-                    resolved = self.resolve_context(text, entity, entities)
-                    resolved_contexts.append(resolved)
-                except Exception as e:
-                    logger.error(f"Failed to resolve context for entity {entity.text}: {e}")
-                    # Create fallback resolution
-                    resolved_contexts.append(
-                        ResolvedContext(
-                            entity=entity,
-                            primary_context=ContextType.GENERAL_PARTIES,
-                            secondary_contexts=[],
-                            confidence=0.0,
-                            signals=[],
-                            context_window=self.window_extractor.extract_window(
-                                text, entity, WindowLevel.SENTENCE
-                            ),
-                            metadata={'error': str(e)}
-                        )
+        windows: List[Optional[ContextWindow]] = []
+        window_errors: Dict[int, Exception] = {}
+        for i, entity in enumerate(entities):
+            try:
+                windows.append(self.window_extractor.extract_window(
+                    text, entity, WindowLevel.SENTENCE, window_size=3, index=index
+                ))
+            except Exception as e:
+                windows.append(None)
+                window_errors[i] = e
+        
+        # Distinct window texts, in first-seen order
+        window_texts = list(dict.fromkeys(w.text for w in windows if w is not None))
+        embeddings = self._batch_encode_windows(window_texts, batch_size)
+        docs = self._batch_parse_windows(window_texts, batch_size)
+        
+        resolved_contexts = []
+        for i, entity in enumerate(entities):
+            context_window = windows[i]
+            try:
+                if context_window is None:
+                    raise window_errors[i]
+                resolved = self._resolve_window(
+                    text, entity, context_window, entities, index,
+                    context_embedding=embeddings.get(context_window.text),
+                    doc=docs.get(context_window.text)
+                )
+                resolved_contexts.append(resolved)
+            except Exception as e:
+                logger.error(f"Failed to resolve context for entity {entity.text}: {e}")
+                # Create fallback resolution
+                resolved_contexts.append(
+                    ResolvedContext(
+                        entity=entity,
+                        primary_context=ContextType.GENERAL_PARTIES,
+                        secondary_contexts=[],
+                        confidence=0.0,
+                        signals=[],
+                        context_window=context_window or self.window_extractor.extract_window(
+                            text, entity, WindowLevel.SENTENCE, index=index
+                        ),
+                        metadata={'error': str(e)}
                     )
+                )
         
         return resolved_contexts
     
+    def _batch_encode_windows(self, window_texts: List[str], batch_size: int) -> Dict[str, np.ndarray]:
+        """Legal-BERT embeddings of distinct window texts, by text (empty if unavailable)"""
+        if not (self.use_semantic_analysis and self.legal_bert_model and self.legal_bert_tokenizer):
+            return {}
+        if not window_texts:
+            return {}
+        try:
+            return dict(zip(window_texts, self._encode_windows(window_texts, batch_size)))
+        except Exception as e:
+            # Entities fall back to encoding their own window
+            logger.warning(f"Batched semantic encoding failed: {e}")
+            return {}
+    
+    def _batch_parse_windows(self, window_texts: List[str], batch_size: int) -> Dict[str, Doc]:
+        """SpaCy parses of distinct window texts, by text (empty if unavailable)"""
+        if not (self.use_dependency_parsing and self.spacy_model):
+            return {}
+        if not window_texts:
+            return {}
+        try:
+            return dict(zip(window_texts, self.spacy_model.pipe(window_texts, batch_size=batch_size)))
+        except Exception as e:
+            # Entities fall back to parsing their own window
+            logger.warning(f"Batched dependency parsing failed: {e}")
+            return {}
+    
     def get_context_quality_score(self, resolved_context: ResolvedContext) -> float:
         """
         Calculate a quality score for the resolved context.
@@ -7,11 +7,15 @@ handling sentence-level and paragraph-level context extraction with edge cases.
 
 import re
 import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
+
+from ..document_index import DocumentIndex
 # SpaCy import handled in ContextResolver when needed
 
 # Configure logging
@@ -147,7 +151,8 @@ class ContextWindowExtractor:
                       text: str,
                       entity: ExtractedEntity,
                       level: WindowLevel = WindowLevel.SENTENCE,
-                      window_size: Optional[int] = None) -> ContextWindow:
+                      window_size: Optional[int] = None,
+                      index: Optional[DocumentIndex] = None) -> ContextWindow:
         """
         Extract context window around an entity.
         
@@ -156,32 +161,39 @@ class ContextWindowExtractor:
             entity: Entity with position information
             level: Window extraction level
             window_size: Custom window size (overrides defaults)
+            index: Structure index of text, so sentence, paragraph and section
+                splits are computed once across entities
         
         Returns:
             ContextWindow with extracted context
         """
+        if index is not None and not index.covers(text):
+            index = None
+        
         if level == WindowLevel.TOKEN:
-            return self._extract_token_window(text, entity, window_size)
+            return self._extract_token_window(text, entity, window_size, index)
         elif level == WindowLevel.SENTENCE:
-            return self._extract_sentence_window(text, entity, window_size)
+            return self._extract_sentence_window(text, entity, window_size, index)
         elif level == WindowLevel.PARAGRAPH:
-            return self._extract_paragraph_window(text, entity, window_size)
+            return self._extract_paragraph_window(text, entity, window_size, index)
         elif level == WindowLevel.SECTION:
-            return self._extract_section_window(text, entity)
+            return self._extract_section_window(text, entity, index)
         elif level == WindowLevel.DOCUMENT:
-            return self._extract_document_window(text, entity)
+            return self._extract_document_window(text, entity, index)
         else:
             raise ValueError(f"Unknown window level: {level}")
     
     def extract_multi_level_context(self,
                                   text: str,
-                                  entity: ExtractedEntity) -> Dict[WindowLevel, ContextWindow]:
+                                  entity: ExtractedEntity,
+                                  index: Optional[DocumentIndex] = None) -> Dict[WindowLevel, ContextWindow]:
         """
         Extract context at multiple levels for comprehensive analysis.
         
         Args:
             text: Full document text
             entity: Entity with position information
+            index: Optional structure index of text
         
         Returns:
             Dictionary mapping window levels to extracted contexts
@@ -191,7 +203,7 @@ class ContextWindowExtractor:
         for level in [WindowLevel.TOKEN, WindowLevel.SENTENCE, 
                      WindowLevel.PARAGRAPH, WindowLevel.SECTION]:
             try:
-                contexts[level] = self.extract_window(text, entity, level)
+                contexts[level] = self.extract_window(text, entity, level, index=index)
             except Exception as e:
                 logger.warning(f"Failed to extract {level} context: {e}")
                 contexts[level] = None
@@ -201,21 +213,30 @@ class ContextWindowExtractor:
     def _extract_token_window(self, 
                             text: str, 
                             entity: ExtractedEntity,
-                            window_size: Optional[int] = None) -> ContextWindow:
+                            window_size: Optional[int] = None,
+                            index: Optional[DocumentIndex] = None) -> ContextWindow:
         """Extract token-based context window"""
         window_size = window_size or self.default_token_window
+        index = self._document_index(text, index)
         
-        # Tokenize the text
-        tokens = word_tokenize(text)
+        # Tokenize the text (once per document)
+        tokens = index.memo("context_window.tokens", lambda: word_tokenize(text))
         
-        # Find entity position in tokens
+        # Find entity position in tokens: first occurrence of its token sequence
         entity_tokens = word_tokenize(entity.text)
         entity_start_token = None
+        last_start = len(tokens) - len(entity_tokens)
         
-        for i in range(len(tokens) - len(entity_tokens) + 1):
-            if tokens[i:i+len(entity_tokens)] == entity_tokens:
-                entity_start_token = i
-                break
+        if not entity_tokens:
+            entity_start_token = 0 if last_start >= 0 else None
+        else:
+            token_positions = index.memo("context_window.token_positions", lambda: self._token_positions(tokens))
+            for i in token_positions.get(entity_tokens[0], ()):
+                if i > last_start:
+                    break
+                if tokens[i:i+len(entity_tokens)] == entity_tokens:
+                    entity_start_token = i
+                    break
         
         if entity_start_token is None:
             # Fallback to character position based extraction
@@ -229,17 +250,10 @@ class ContextWindowExtractor:
         window_tokens = tokens[start_token:end_token]
         window_text = ' '.join(window_tokens)
         
-        # Calculate character positions
-        char_pos = 0
-        for i, token in enumerate(tokens):
-            if i == start_token:
-                start_pos = char_pos
-            if i == end_token:
-                end_pos = char_pos
-                break
-            char_pos += len(token) + 1  # +1 for space
-        else:
-            end_pos = len(text)
+        # Calculate character positions (tokens joined by single spaces)
+        token_offsets = index.memo("context_window.token_offsets", lambda: self._token_offsets(tokens))
+        start_pos = token_offsets[start_token]
+        end_pos = token_offsets[end_token] if end_token < len(tokens) else len(text)
         
         # Entity position relative to window
         entity_start_rel = entity_start_token - start_token
@@ -264,39 +278,34 @@ class ContextWindowExtractor:
     def _extract_sentence_window(self,
                                 text: str,
                                 entity: ExtractedEntity,
-                                window_size: Optional[int] = None) -> ContextWindow:
+                                window_size: Optional[int] = None,
+                                index: Optional[DocumentIndex] = None) -> ContextWindow:
         """Extract sentence-based context window"""
         window_size = window_size or self.default_sentence_window
+        index = self._document_index(text, index)
         
-        # Split text into sentences
-        sentences = self._split_sentences(text)
+        # Sentences and their offsets, located once per document
+        sentences, sentence_positions, sentence_starts = index.memo(
+            "context_window.sentence_positions",
+            lambda: self._locate_spans(text, self._split_sentences(text, index))
+        )
         
         # Find entity's sentence
-        entity_sentence_idx = None
-        sentence_positions = []
-        current_pos = 0
-        
-        for i, sentence in enumerate(sentences):
-            sentence_start = text.find(sentence, current_pos)
-            sentence_end = sentence_start + len(sentence)
-            sentence_positions.append((sentence_start, sentence_end))
-            
-            if entity.start_pos >= sentence_start and entity.start_pos < sentence_end:
-                entity_sentence_idx = i
-            
-            current_pos = sentence_end
+        entity_sentence_idx = self._find_containing_span(entity.start_pos, sentence_positions, sentence_starts)
         
         if entity_sentence_idx is None:
             # Entity spans multiple sentences or not found
-            entity_sentence_idx = self._find_closest_sentence(entity.start_pos, sentence_positions)
+            entity_sentence_idx = self._find_closest_sentence(entity.start_pos, sentence_positions, sentence_starts)
         
         # Calculate window boundaries
         start_idx = max(0, entity_sentence_idx - window_size)
         end_idx = min(len(sentences), entity_sentence_idx + window_size + 1)
         
-        # Extract window sentences
-        window_sentences = sentences[start_idx:end_idx]
-        window_text = ' '.join(window_sentences)
+        # Extract window sentences (text and tokens shared by entities with the same window)
+        window_sentences, window_text, _, window_tokens = index.memo(
+            ("context_window.sentence_window", start_idx, end_idx),
+            lambda: self._window_text(sentences[start_idx:end_idx], ' ', sentences=sentences[start_idx:end_idx])
+        )
         
         # Calculate positions
         start_pos = sentence_positions[start_idx][0] if sentence_positions else 0
@@ -313,8 +322,8 @@ class ContextWindowExtractor:
             level=WindowLevel.SENTENCE,
             entity_start=entity_start_rel,
             entity_end=entity_end_rel,
-            sentences=window_sentences,
-            tokens=word_tokenize(window_text),
+            sentences=list(window_sentences),
+            tokens=list(window_tokens),
             metadata={
                 'window_size': window_size,
                 'total_sentences': len(window_sentences),
@@ -325,49 +334,47 @@ class ContextWindowExtractor:
     def _extract_paragraph_window(self,
                                  text: str,
                                  entity: ExtractedEntity,
-                                 window_size: Optional[int] = None) -> ContextWindow:
+                                 window_size: Optional[int] = None,
+                                 index: Optional[DocumentIndex] = None) -> ContextWindow:
         """Extract paragraph-based context window"""
         window_size = window_size or self.default_paragraph_window
+        index = self._document_index(text, index)
         
-        # Split text into paragraphs
-        paragraphs = self._split_paragraphs(text)
+        # Paragraphs and their offsets, located once per document
+        paragraphs, para_positions, para_starts = index.memo(
+            "context_window.paragraph_positions",
+            lambda: self._locate_paragraphs(text, self._split_paragraphs(text, index))
+        )
         
         # Find entity's paragraph
-        entity_para_idx = None
-        para_positions = []
-        current_pos = 0
-        
-        for i, paragraph in enumerate(paragraphs):
-            if not paragraph.strip():
-                continue
-                
-            para_start = text.find(paragraph, current_pos)
-            para_end = para_start + len(paragraph)
-            para_positions.append((para_start, para_end, i))
-            
-            if entity.start_pos >= para_start and entity.start_pos < para_end:
-                entity_para_idx = i
-            
-            current_pos = para_end
+        entity_para_idx = self._find_containing_span(entity.start_pos, para_positions, para_starts)
+        if entity_para_idx is not None:
+            entity_para_idx = para_positions[entity_para_idx][2]
         
         if entity_para_idx is None and para_positions:
             # Find closest paragraph
-            entity_para_idx = self._find_closest_paragraph(entity.start_pos, para_positions)
+            entity_para_idx = self._find_closest_paragraph(entity.start_pos, para_positions, para_starts)
         
         if entity_para_idx is None:
             # Fallback to sentence window
-            return self._extract_sentence_window(text, entity, window_size * 3)
+            return self._extract_sentence_window(text, entity, window_size * 3, index)
         
         # Calculate window boundaries
         start_idx = max(0, entity_para_idx - window_size)
         end_idx = min(len(paragraphs), entity_para_idx + window_size + 1)
         
-        # Extract window paragraphs
-        window_paragraphs = [p for p in paragraphs[start_idx:end_idx] if p.strip()]
-        window_text = '\n\n'.join(window_paragraphs)
+        # Extract window paragraphs (text and tokens shared by entities with the same window)
+        window_paragraphs, window_text, window_sentences, window_tokens = index.memo(
+            ("context_window.paragraph_window", start_idx, end_idx),
+            lambda: self._window_text([p for p in paragraphs[start_idx:end_idx] if p.strip()], '\n\n')
+        )
         
         # Calculate positions
-        if para_positions:
+        if para_starts is not None:
+            # One position per paragraph, in document order
+            start_pos = para_positions[start_idx][0]
+            end_pos = para_positions[end_idx - 1][1]
+        elif para_positions:
             start_pos = min(p[0] for p in para_positions if p[2] >= start_idx)
             end_pos = max(p[1] for p in para_positions if p[2] < end_idx)
         else:
@@ -385,8 +392,8 @@ class ContextWindowExtractor:
             level=WindowLevel.PARAGRAPH,
             entity_start=entity_start_rel,
             entity_end=entity_end_rel,
-            sentences=sent_tokenize(window_text),
-            tokens=word_tokenize(window_text),
+            sentences=list(window_sentences),
+            tokens=list(window_tokens),
             metadata={
                 'window_size': window_size,
                 'total_paragraphs': len(window_paragraphs),
@@ -396,30 +403,35 @@ class ContextWindowExtractor:
     
     def _extract_section_window(self,
                                text: str,
-                               entity: ExtractedEntity) -> ContextWindow:
+                               entity: ExtractedEntity,
+                               index: Optional[DocumentIndex] = None) -> ContextWindow:
         """Extract section-based context window"""
-        sections = self._split_sections(text)
-        
-        # Find entity's section
-        entity_section_idx = None
-        section_positions = []
+        index = self._document_index(text, index)
+        sections, section_positions, section_starts = index.memo(
+            "context_window.section_positions",
+            lambda: self._locate_sections(text, self._split_sections(text, index))
+        )
         
-        for i, section in enumerate(sections):
-            section_start = text.find(section['text'])
-            section_end = section_start + len(section['text'])
-            section_positions.append((section_start, section_end, i))
-            
-            if entity.start_pos >= section_start and entity.start_pos < section_end:
-                entity_section_idx = i
-                break
+        # Find entity's section (the first one containing it)
+        if section_starts is not None:
+            entity_section_idx = self._find_containing_span(entity.start_pos, section_positions, section_starts)
+        else:
+            entity_section_idx = next(
+                (i for i, (start, end) in enumerate(section_positions) if start <= entity.start_pos < end),
+                None
+            )
         
         if entity_section_idx is None:
             # Fallback to paragraph window
-            return self._extract_paragraph_window(text, entity, 2)
+            return self._extract_paragraph_window(text, entity, 2, index)
         
         section = sections[entity_section_idx]
         section_text = section['text']
         section_start = section_positions[entity_section_idx][0]
+        _, _, section_sentences, section_tokens = index.memo(
+            ("context_window.section_window", entity_section_idx),
+            lambda: self._window_text([section_text], '')
+        )
         
         # Entity position relative to section
         entity_start_rel = entity.start_pos - section_start
@@ -432,8 +444,8 @@ class ContextWindowExtractor:
             level=WindowLevel.SECTION,
             entity_start=entity_start_rel,
             entity_end=entity_end_rel,
-            sentences=sent_tokenize(section_text),
-            tokens=word_tokenize(section_text),
+            sentences=list(section_sentences),
+            tokens=list(section_tokens),
             metadata={
                 'section_title': section.get('title', 'Untitled'),
                 'section_number': entity_section_idx,
@@ -443,8 +455,16 @@ class ContextWindowExtractor:
     
     def _extract_document_window(self,
                                 text: str,
-                                entity: ExtractedEntity) -> ContextWindow:
+                                entity: ExtractedEntity,
+                                index: Optional[DocumentIndex] = None) -> ContextWindow:
         """Extract full document as context"""
+        if index is not None:
+            sentences = index.sentences
+            tokens = index.memo("context_window.tokens", lambda: word_tokenize(text))
+        else:
+            sentences = sent_tokenize(text)
+            tokens = word_tokenize(text)
+        
         return ContextWindow(
             text=text,
             start_pos=0,
@@ -452,12 +472,12 @@ class ContextWindowExtractor:
             level=WindowLevel.DOCUMENT,
             entity_start=entity.start_pos,
             entity_end=entity.end_pos,
-            sentences=sent_tokenize(text),
-            tokens=word_tokenize(text),
+            sentences=sentences,
+            tokens=tokens,
             metadata={
                 'document_length': len(text),
-                'total_sentences': len(sent_tokenize(text)),
-                'total_tokens': len(word_tokenize(text))
+                'total_sentences': len(sentences),
+                'total_tokens': len(tokens)
             }
         )
     
@@ -490,11 +510,19 @@ class ContextWindowExtractor:
             }
         )
     
-    def _split_sentences(self, text: str) -> List[str]:
+    def _split_sentences(self, text: str, index: Optional[DocumentIndex] = None) -> List[str]:
         """Split text into sentences with legal text handling"""
-        # Use NLTK sentence tokenizer
-        sentences = sent_tokenize(text)
+        if index is not None:
+            return index.memo(
+                "context_window.sentences",
+                lambda: self._merge_abbreviated_sentences(index.sentences)
+            )
         
+        # Use NLTK sentence tokenizer
+        return self._merge_abbreviated_sentences(sent_tokenize(text))
+    
+    def _merge_abbreviated_sentences(self, sentences: List[str]) -> List[str]:
+        """Rejoin sentences that the tokenizer ended at a legal abbreviation"""        
         # Post-process to handle legal abbreviations
         processed_sentences = []
         buffer = ""
@@ -516,8 +544,11 @@ class ContextWindowExtractor:
         
         return processed_sentences
     
-    def _split_paragraphs(self, text: str) -> List[str]:
+    def _split_paragraphs(self, text: str, index: Optional[DocumentIndex] = None) -> List[str]:
         """Split text into paragraphs"""
+        if index is not None:
+            return index.memo("context_window.paragraphs", lambda: self._split_paragraphs(text))
+        
         # Try different paragraph separators
         for pattern in self.paragraph_patterns:
             paragraphs = re.split(pattern, text)
@@ -527,8 +558,11 @@ class ContextWindowExtractor:
         # Fallback: treat entire text as one paragraph
         return [text]
     
-    def _split_sections(self, text: str) -> List[Dict[str, str]]:
+    def _split_sections(self, text: str, index: Optional[DocumentIndex] = None) -> List[Dict[str, str]]:
         """Split text into sections based on headers"""
+        if index is not None:
+            return index.memo("context_window.sections", lambda: self._split_sections(text))
+        
         sections = []
         current_section = {'title': 'Introduction', 'text': ''}
         
@@ -560,10 +594,121 @@ class ContextWindowExtractor:
         
         return sections
     
+    def _document_index(self, text: str, index: Optional[DocumentIndex]) -> DocumentIndex:
+        """The caller's index of text, or a new one for this call"""
+        if index is not None and index.covers(text):
+            return index
+        return DocumentIndex(text)
+    
+    @staticmethod
+    def _window_text(parts: List[str],
+                     separator: str,
+                     sentences: Optional[List[str]] = None) -> Tuple[List[str], str, List[str], List[str]]:
+        """Joined window text with its sentences and tokens: (parts, text, sentences, tokens)"""
+        window_text = separator.join(parts)
+        if sentences is None:
+            sentences = sent_tokenize(window_text)
+        return parts, window_text, sentences, word_tokenize(window_text)
+    
+    @staticmethod
+    def _ordered_starts(positions: List[Tuple[int, ...]]) -> Optional[List[int]]:
+        """
+        Start offsets for bisect lookups, or None when the spans are not
+        non-empty, non-overlapping and in document order (a piece text.find
+        could not locate), in which case callers scan linearly as before.
+        """
+        previous_end = 0
+        for position in positions:
+            start, end = position[0], position[1]
+            if start < previous_end or end <= start:
+                return None
+            previous_end = end
+        return [position[0] for position in positions]
+    
+    def _locate_spans(self, text: str, pieces: List[str]) -> Tuple[List[str], List[Tuple[int, int]], Optional[List[int]]]:
+        """Locate pieces in order in text: (pieces, (start, end) of each, bisect starts)"""
+        positions = []
+        current_pos = 0
+        for piece in pieces:
+            start = text.find(piece, current_pos)
+            end = start + len(piece)
+            positions.append((start, end))
+            current_pos = end
+        return pieces, positions, self._ordered_starts(positions)
+    
+    def _locate_paragraphs(self,
+                           text: str,
+                           paragraphs: List[str]) -> Tuple[List[str], List[Tuple[int, int, int]], Optional[List[int]]]:
+        """Locate non-blank paragraphs in order: (paragraphs, (start, end, paragraph index), bisect starts)"""
+        positions = []
+        current_pos = 0
+        for i, paragraph in enumerate(paragraphs):
+            if not paragraph.strip():
+                continue
+            start = text.find(paragraph, current_pos)
+            end = start + len(paragraph)
+            positions.append((start, end, i))
+            current_pos = end
+        
+        # Bisect only when position k belongs to paragraph k
+        starts = self._ordered_starts(positions)
+        if starts is not None and len(positions) != len(paragraphs):
+            starts = None
+        return paragraphs, positions, starts
+    
+    def _locate_sections(self,
+                         text: str,
+                         sections: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Tuple[int, int]], Optional[List[int]]]:
+        """Locate sections by the first occurrence of their text: (sections, (start, end), bisect starts)"""
+        positions = []
+        for section in sections:
+            start = text.find(section['text'])
+            positions.append((start, start + len(section['text'])))
+        return sections, positions, self._ordered_starts(positions)
+    
+    @staticmethod
+    def _find_containing_span(position: int,
+                              positions: List[Tuple[int, ...]],
+                              starts: Optional[List[int]] = None) -> Optional[int]:
+        """Index of the (last) span with start <= position < end, or None"""
+        if starts is not None:
+            k = bisect_right(starts, position) - 1
+            return k if k >= 0 and position < positions[k][1] else None
+        
+        found = None
+        for i, span in enumerate(positions):
+            if span[0] <= position < span[1]:
+                found = i
+        return found
+    
+    @staticmethod
+    def _closest_ordered_span(position: int,
+                              positions: List[Tuple[int, ...]],
+                              starts: List[int]) -> int:
+        """
+        Position in positions of the span a linear closest-span scan picks,
+        for ordered spans: the first span containing position (end
+        inclusive), else the nearest one, the earlier on ties.
+        """
+        k = bisect_right(starts, position) - 1
+        if k < 0:
+            return 0
+        if k > 0 and position <= positions[k - 1][1]:
+            return k - 1
+        if position <= positions[k][1] or k + 1 == len(positions):
+            return k
+        if position - positions[k][1] <= positions[k + 1][0] - position:
+            return k
+        return k + 1
+    
     def _find_closest_sentence(self, 
                               position: int, 
-                              sentence_positions: List[Tuple[int, int]]) -> int:
-        """Find closest sentence to a position"""
+                              sentence_positions: List[Tuple[int, int]],
+                              starts: Optional[List[int]] = None) -> int:
+        """Find closest sentence to a position (bisect when starts are given)"""
+        if starts is not None and sentence_positions:
+            return self._closest_ordered_span(position, sentence_positions, starts)
+        
         min_distance = float('inf')
         closest_idx = 0
         
@@ -584,8 +729,12 @@ class ContextWindowExtractor:
     
     def _find_closest_paragraph(self,
                                position: int,
-                               para_positions: List[Tuple[int, int, int]]) -> int:
-        """Find closest paragraph to a position"""
+                               para_positions: List[Tuple[int, int, int]],
+                               starts: Optional[List[int]] = None) -> int:
+        """Find closest paragraph to a position (bisect when starts are given)"""
+        if starts is not None and para_positions:
+            return para_positions[self._closest_ordered_span(position, para_positions, starts)][2]
+        
         min_distance = float('inf')
         closest_idx = 0
         
@@ -604,10 +753,30 @@ class ContextWindowExtractor:
         
         return closest_idx
     
+    @staticmethod
+    def _token_positions(tokens: List[str]) -> Dict[str, List[int]]:
+        """Indices of each distinct token, ascending"""
+        positions = defaultdict(list)
+        for i, token in enumerate(tokens):
+            positions[token].append(i)
+        return positions
+    
+    @staticmethod
+    def _token_offsets(tokens: List[str]) -> List[int]:
+        """Character offset of each token when tokens are joined by single spaces"""
+        offsets = []
+        char_pos = 0
+        for token in tokens:
+            offsets.append(char_pos)
+            char_pos += len(token) + 1  # +1 for space
+        offsets.append(char_pos)
+        return offsets
+    
     def extract_surrounding_entities(self,
                                     target_entity: ExtractedEntity,
                                     all_entities: List[ExtractedEntity],
-                                    max_distance: int = 500) -> List[ExtractedEntity]:
+                                    max_distance: int = 500,
+                                    index: Optional[DocumentIndex] = None) -> List[ExtractedEntity]:
         """
         Extract entities that appear near the target entity.
         
@@ -615,13 +784,27 @@ class ContextWindowExtractor:
             target_entity: The entity to find neighbors for
             all_entities: All entities in the document
             max_distance: Maximum character distance to consider
+            index: Structure index of the document; all_entities is then sorted
+                by position once and searched with bisect (the list must not
+                change while the index is in use)
         
         Returns:
             List of nearby entities sorted by distance
         """
+        candidates = all_entities
+        if index is not None:
+            order, starts, max_length = index.memo(
+                ("context_window.entity_order", id(all_entities), len(all_entities)),
+                lambda: self._entity_order(all_entities)
+            )
+            low = bisect_left(starts, target_entity.start_pos - max_distance - max_length)
+            high = bisect_right(starts, target_entity.end_pos + max_distance)
+            # Input order, so ties in distance keep their order
+            candidates = [all_entities[i] for i in sorted(order[low:high])]
+        
         nearby_entities = []
         
-        for entity in all_entities:
+        for entity in candidates:
             if entity == target_entity:
                 continue
             
@@ -642,6 +825,14 @@ class ContextWindowExtractor:
         
         return [entity for entity, _ in nearby_entities]
     
+    @staticmethod
+    def _entity_order(entities: List[ExtractedEntity]) -> Tuple[List[int], List[int], int]:
+        """Entity indices by start position, their starts, and the longest entity length"""
+        order = sorted(range(len(entities)), key=lambda i: entities[i].start_pos)
+        starts = [entities[i].start_pos for i in order]
+        max_length = max((max(0, e.end_pos - e.start_pos) for e in entities), default=0)
+        return order, starts, max_length
+    
     def analyze_context_quality(self, context_window: ContextWindow) -> Dict[str, Any]:
         """
         Analyze the quality and characteristics of a context window.
@@ -0,0 +1,229 @@
+"""
+Shared structural index of a document's text.
+
+Chunking, page batching, context-window extraction and the extraction
+chunker each scan the full document for its lines, paragraphs, sentences,
+sections, pages and citations, and ContextResolver repeats the sentence,
+paragraph and section splits for every entity. On a 1M-character document
+that is the same structure found about ten times per request.
+
+DocumentIndex is built once per request and passed to each stage as an
+optional ``index`` argument:
+
+- line, paragraph and page offsets are computed when the index is built
+- pattern matches (citations, quotes, section headers, page breaks) are
+  found with spans(), once per compiled pattern, and every stage that uses
+  the same pattern shares the result
+- sentences are split once with the same NLTK tokenizer the stages use
+- memo() keeps any other derived structure (a stage's own sentence or
+  section split) so it is computed once per document
+- position queries (line_of, paragraph_of, sentence_of, spans_within) bisect
+  the offset arrays instead of re-scanning
+
+Stages only use an index built over the exact text they were given
+(covers()); for any other text they fall back to scanning it themselves, so
+results are the same with or without an index.
+"""
+
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Hashable, List, Optional, Pattern, Tuple
+
+from nltk.tokenize import sent_tokenize
+
+logger = logging.getLogger(__name__)
+
+# Blank-line paragraph separator (SmartChunker.paragraph_break_pattern)
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Explicit page separator
+_FORM_FEED = '\f'
+
+Span = Tuple[int, int]
+
+
+class DocumentIndex:
+    """
+    Offsets of a document's structure, computed once and queried with bisect.
+
+    Attributes:
+        text: The indexed document text
+        line_starts: Offset of the first character of each line
+        paragraph_spans: (start, end) of each blank-line separated paragraph,
+            excluding the separators
+        page_starts: Offset of each page (form-feed separated)
+    """
+
+    def __init__(
+        self,
+        text: str,
+        sentence_splitter: Optional[Callable[[str], List[str]]] = None
+    ):
+        """
+        Index a document.
+
+        Args:
+            text: Document text
+            sentence_splitter: Function splitting text into sentence strings
+                (defaults to NLTK's sent_tokenize, as the pipeline stages use)
+        """
+        self.text = text
+        self._sentence_splitter = sentence_splitter or sent_tokenize
+        self._spans: Dict[Tuple[str, int], List[Span]] = {}
+        self._span_starts: Dict[Tuple[str, int], List[int]] = {}
+        self._memo: Dict[Hashable, Any] = {}
+        self._sentences: Optional[List[str]] = None
+        self._sentence_spans: Optional[List[Span]] = None
+        self._sentence_starts: Optional[List[int]] = None
+
+        # Lines and pages by offset scan; paragraphs from one pass of the
+        # separator pattern, shared through spans() with SmartChunker
+        self.line_starts = [0]
+        pos = text.find('\n')
+        while pos != -1:
+            self.line_starts.append(pos + 1)
+            pos = text.find('\n', pos + 1)
+
+        self.page_starts = [0]
+        pos = text.find(_FORM_FEED)
+        while pos != -1:
+            self.page_starts.append(pos + 1)
+            pos = text.find(_FORM_FEED, pos + 1)
+
+        self.paragraph_spans = self._gaps(self.spans(_PARAGRAPH_BREAK), 0, len(text))
+        self._paragraph_starts = [start for start, _ in self.paragraph_spans]
+
+    @classmethod
+    def build(cls, text: str, **kwargs) -> "DocumentIndex":
+        """Index a document (see __init__ for arguments)."""
+        index = cls(text, **kwargs)
+        logger.debug(
+            f"Indexed document of {len(text):,} chars: {len(index.line_starts):,} lines, "
+            f"{len(index.paragraph_spans):,} paragraphs, {len(index.page_starts):,} pages"
+        )
+        return index
+
+    def covers(self, text: str) -> bool:
+        """Whether this index was built over exactly this text."""
+        return text is self.text or (len(text) == len(self.text) and text == self.text)
+
+    def spans(self, pattern: Pattern) -> List[Span]:
+        """
+        (start, end) of every match of a compiled pattern, scanned once.
+
+        Results are shared by pattern source and flags, so stages compiling
+        the same pattern separately reuse one scan.
+
+        Args:
+            pattern: Compiled regular expression
+
+        Returns:
+            Match spans in document order
+        """
+        key = (pattern.pattern, pattern.flags)
+        spans = self._spans.get(key)
+        if spans is None:
+            spans = [match.span() for match in pattern.finditer(self.text)]
+            self._spans[key] = spans
+            self._span_starts[key] = [start for start, _ in spans]
+        return spans
+
+    def spans_within(self, pattern: Pattern, start: int, end: int) -> List[Span]:
+        """
+        Matches of a pattern lying entirely within text[start:end].
+
+        These are the matches pattern.finditer(text, start, end) finds when
+        no match of the full-text scan crosses start or end, which holds for
+        whitespace-only patterns (paragraph breaks) over spans that start and
+        end on non-whitespace, as strip_span produces.
+
+        Args:
+            pattern: Compiled regular expression
+            start: Span start offset
+            end: Span end offset
+
+        Returns:
+            Match spans in document order
+        """
+        spans = self.spans(pattern)
+        starts = self._span_starts[(pattern.pattern, pattern.flags)]
+        lo = bisect_left(starts, start)
+        hi = bisect_right(starts, end)
+        return [span for span in spans[lo:hi] if span[1] <= end]
+
+    def memo(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Compute a derived structure of the document once.
+
+        Args:
+            key: Cache key, namespaced by the caller (e.g. "context_window.sections")
+            factory: Zero-argument function computing the value
+
+        Returns:
+            The cached or newly computed value
+        """
+        if key not in self._memo:
+            self._memo[key] = factory()
+        return self._memo[key]
+
+    @property
+    def sentences(self) -> List[str]:
+        """Sentence strings from the sentence splitter, split once."""
+        if self._sentences is None:
+            self._sentences = self._sentence_splitter(self.text)
+        return self._sentences
+
+    @property
+    def sentence_spans(self) -> List[Span]:
+        """Offsets of each sentence, located in order in the document."""
+        if self._sentence_spans is None:
+            spans = []
+            pos = 0
+            for sentence in self.sentences:
+                start = self.text.find(sentence, pos)
+                if start == -1:
+                    continue
+                pos = start + len(sentence)
+                spans.append((start, pos))
+            self._sentence_spans = spans
+        return self._sentence_spans
+
+    def line_spans(self) -> List[Span]:
+        """Offsets of each line including its newline."""
+        ends = self.line_starts[1:] + [len(self.text)]
+        return list(zip(self.line_starts, ends))
+
+    def page_spans(self) -> List[Span]:
+        """Offsets of each form-feed separated page, excluding the form feed."""
+        ends = [start - 1 for start in self.page_starts[1:]] + [len(self.text)]
+        return list(zip(self.page_starts, ends))
+
+    def line_of(self, position: int) -> int:
+        """Index of the line containing position."""
+        return bisect_right(self.line_starts, position) - 1
+
+    def page_of(self, position: int) -> int:
+        """Index of the page containing position."""
+        return bisect_right(self.page_starts, position) - 1
+
+    def paragraph_of(self, position: int) -> int:
+        """Index of the paragraph containing position, or the one before a separator."""
+        return bisect_right(self._paragraph_starts, position) - 1
+
+    def sentence_of(self, position: int) -> int:
+        """Index of the sentence containing position, or the one before it (-1 if none)."""
+        if self._sentence_starts is None:
+            self._sentence_starts = [start for start, _ in self.sentence_spans]
+        return bisect_right(self._sentence_starts, position) - 1
+
+    @staticmethod
+    def _gaps(separators: List[Span], start: int, end: int) -> List[Span]:
+        """Spans between separators within [start, end]."""
+        gaps = []
+        pos = start
+        for sep_start, sep_end in separators:
+            gaps.append((pos, sep_start))
+            pos = sep_end
+        gaps.append((pos, end))
+        return gaps
@@ -0,0 +1,389 @@
+"""
+Candidate blocking for entity resolution.
+
+EntityRegistry used to score every new entity against every registered
+entity of its type with SequenceMatcher, which makes registering n entities
+O(n²) comparisons. CandidateBlockingIndex buckets entity names by cheap keys
+so a lookup returns the few registered entities that can plausibly match:
+
+- the normalized name itself (exact matches up to case and punctuation)
+- normalized tokens, minus titles and corporate suffixes ("Hon. Jane Doe"
+  and "Jane Doe" share "jane" and "doe")
+- single-character deletions of those tokens, so a typo in every token
+  still meets ("Smith" and "Smyth" share "smth")
+- MinHash-LSH bands over character 3-grams of the name (spelling variants
+  of longer names)
+
+Blocking is approximate: a pair whose only similarity is spread thinly over
+characters can be missed, and token keys shared by too many names are
+skipped at lookup. sequence_ratio is the exact scorer the registry
+uses on the candidates: it returns SequenceMatcher's ratio, but first
+rejects pairs whose length or bit-parallel LCS bound cannot reach the
+caller's cutoff, so most non-matches never run SequenceMatcher.
+"""
+
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from itertools import chain
+from difflib import SequenceMatcher
+from typing import Collection, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Titles, honorifics and entity suffixes common to too many names to block on
+STOP_TOKENS = frozenset({
+    "the", "of", "and", "for", "in", "a", "an", "v", "vs",
+    "mr", "mrs", "ms", "dr", "hon", "honorable", "judge", "justice", "chief", "esq", "jr", "sr",
+    "inc", "corp", "corporation", "co", "company", "llc", "llp", "ltd", "lp", "pc", "pa",
+    "court", "district", "state", "states", "united", "county",
+})
+
+_HASH_PRIME = (1 << 61) - 1
+_HASH_MASK = (1 << 32) - 1
+
+
+def name_tokens(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens of text"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def normalize_name(text: str) -> str:
+    """Lowercased tokens joined by single spaces (punctuation dropped)"""
+    return " ".join(name_tokens(text))
+
+
+def lcs_ratio(a: str, b: str) -> float:
+    """
+    2 * LCS(a, b) / (len(a) + len(b)), computed bit-parallel.
+
+    SequenceMatcher's matching blocks form a common subsequence, so this is
+    an upper bound on SequenceMatcher(None, a, b).ratio().
+    """
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if len(a) < len(b):
+        a, b = b, a
+
+    masks: Dict[str, int] = defaultdict(int)
+    for i, char in enumerate(a):
+        masks[char] |= 1 << i
+
+    full = (1 << len(a)) - 1
+    row = full
+    for char in b:
+        matches = row & masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & full
+
+    lcs = len(a) - bin(row).count("1")
+    return 2.0 * lcs / total
+
+
+def sequence_ratio(a: str, b: str, cutoff: float = 0.0) -> float:
+    """
+    SequenceMatcher(None, a, b).ratio(), or an upper bound on it below cutoff.
+
+    Args:
+        a: First string
+        b: Second string
+        cutoff: Ratios below this only need to be known to be below it
+
+    Returns:
+        The exact ratio whenever it is at least cutoff; otherwise a value
+        below cutoff that is at least the exact ratio
+    """
+    if a == b:
+        return 1.0
+    total = len(a) + len(b)
+    bound = 2.0 * min(len(a), len(b)) / total
+    if bound < cutoff:
+        return bound
+    bound = lcs_ratio(a, b)
+    if bound < cutoff:
+        return bound
+    return SequenceMatcher(None, a, b).ratio()
+
+
+class CandidateBlockingIndex:
+    """
+    Blocking keys of entity names, per group (entity type).
+
+    Keys are stable 64-bit hashes, so an index can be saved as arrays
+    (to_arrays) and loaded without re-keying every name (from_arrays): loaded
+    buckets stay in sorted arrays searched with numpy, names added later go
+    to a dict. Keys that are row numbers 0..n-1 of the caller's own tables
+    are kept as a range, so millions of them cost no Python objects.
+
+    Attributes:
+        bands: MinHash-LSH bands; names sharing any band are candidates
+        rows: MinHash values per band
+        shingle_size: Character n-gram size for MinHash
+        max_token_bucket: Token buckets larger than this are skipped at lookup
+        max_band_bucket: Band buckets larger than this are skipped at lookup
+            (None: never; names sharing 3-grams with a large share of the
+            index make band buckets grow with it)
+        edit_key_length: Tokens up to this length also get deletion keys
+        seed: Seed of the MinHash permutations and key hashing
+    """
+
+    def __init__(
+        self,
+        bands: int = 24,
+        rows: int = 2,
+        shingle_size: int = 3,
+        max_token_bucket: int = 200,
+        edit_key_length: int = 8,
+        seed: int = 7,
+        max_band_bucket: Optional[int] = None
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            bands: MinHash-LSH bands
+            rows: MinHash values per band (more rows need closer names)
+            shingle_size: Character n-gram size for MinHash
+            max_token_bucket: Largest token bucket used at lookup
+            edit_key_length: Longest token given deletion keys
+            seed: Seed of the MinHash permutations and key hashing
+            max_band_bucket: Largest band bucket used at lookup (None: all)
+        """
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.max_token_bucket = max_token_bucket
+        self.edit_key_length = edit_key_length
+        self.seed = seed
+        self.max_band_bucket = max_band_bucket
+
+        rng = np.random.default_rng(seed)
+        permutations = bands * rows
+        self._hash_a = rng.integers(1, _HASH_MASK, size=permutations, dtype=np.uint64)
+        self._hash_b = rng.integers(0, _HASH_MASK, size=permutations, dtype=np.uint64)
+        # Band signature -> key: odd multipliers per row plus a salt per band
+        self._band_mix = rng.integers(0, 1 << 63, size=rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._band_salt = rng.integers(0, 1 << 63, size=bands, dtype=np.uint64)
+
+        self._buckets: Dict[int, Set[Hashable]] = defaultdict(set)
+        # Keys indexed since loading, in insertion order (dict as ordered set)
+        self._keys: Dict[Hashable, None] = {}
+        # Loaded buckets: sorted keys, member offsets, member positions into ids
+        self._loaded: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Sequence[Hashable]]] = None
+        self._loaded_keys: Collection[Hashable] = frozenset()
+
+    def __len__(self) -> int:
+        return len(self._keys) + (len(self._loaded[3]) if self._loaded is not None else 0)
+
+    def clear(self) -> None:
+        """Remove all names, keeping the key parameters"""
+        self._buckets.clear()
+        self._keys.clear()
+        self._loaded = None
+        self._loaded_keys = frozenset()
+
+    @property
+    def key_parameters(self) -> Dict[str, int]:
+        """Parameters that determine the keys of a name (equal parameters, equal keys)"""
+        return {
+            "bands": self.bands,
+            "rows": self.rows,
+            "shingle_size": self.shingle_size,
+            "edit_key_length": self.edit_key_length,
+            "seed": self.seed,
+        }
+
+    def add(self, key: Hashable, text: str, group: Hashable = None) -> None:
+        """
+        Index one name of an entity.
+
+        Args:
+            key: Entity identifier returned by candidates()
+            text: Name or variant of the entity
+            group: Partition the name belongs to (e.g. entity type)
+        """
+        if key not in self._loaded_keys:
+            self._keys[key] = None
+        token_keys, band_keys = self._bucket_keys(text, group)
+        for bucket_key in token_keys + band_keys:
+            self._buckets[bucket_key].add(key)
+
+    def add_many(self, key: Hashable, texts: Iterable[str], group: Hashable = None) -> None:
+        """Index several names of one entity"""
+        for text in texts:
+            self.add(key, text, group)
+
+    def candidates(self, text: str, group: Hashable = None) -> Set[Hashable]:
+        """Entities in group sharing a blocking key with text"""
+        token_keys, band_keys = self._bucket_keys(text, group)
+        bucket_keys = token_keys + band_keys
+        loaded = self._loaded_buckets(bucket_keys)
+
+        found: Set[Hashable] = set()
+        for i, bucket_key in enumerate(bucket_keys):
+            bucket = self._buckets.get(bucket_key)
+            members = loaded[i] if loaded else None
+            size = (len(bucket) if bucket else 0) + (len(members) if members is not None else 0)
+            limit = self.max_token_bucket if i < len(token_keys) else self.max_band_bucket
+            if not size or (limit is not None and size > limit):
+                continue
+            if bucket:
+                found |= bucket
+            if members is not None:
+                ids = self._loaded[3]
+                found.update(ids[position] for position in members.tolist())
+        return found
+
+    def candidates_for_all(self, texts: Iterable[str], group: Hashable = None) -> Set[Hashable]:
+        """Union of candidates() over several names"""
+        found: Set[Hashable] = set()
+        for text in texts:
+            found |= self.candidates(text, group)
+        return found
+
+    def to_arrays(self) -> Tuple[Sequence[Hashable], Dict[str, np.ndarray]]:
+        """
+        All buckets as arrays.
+
+        Returns:
+            Indexed keys (loaded keys first, then keys added since, in order;
+            a range when the keys are exactly 0..n-1 that way), and arrays
+            "keys" (sorted bucket keys), "offsets" and "members" (positions
+            into the indexed keys) for from_arrays
+        """
+        loaded_ids = self._loaded[3] if self._loaded is not None else range(0)
+        added = list(self._keys)
+        if loaded_ids == range(len(loaded_ids)) and added == list(range(len(loaded_ids), len(loaded_ids) + len(added))):
+            ids: Sequence[Hashable] = range(len(loaded_ids) + len(added))
+            position = None  # keys are their own positions
+        else:
+            ids = [*loaded_ids, *added]
+            position = {key: i for i, key in enumerate(ids)}
+
+        # (bucket key, member) pairs of the dict buckets, then of the loaded ones
+        sizes = np.fromiter(map(len, self._buckets.values()), dtype=np.int64, count=len(self._buckets))
+        keys = np.repeat(np.fromiter(self._buckets, dtype=np.uint64, count=len(self._buckets)), sizes)
+        pairs = chain.from_iterable(self._buckets.values())
+        members = np.fromiter(
+            pairs if position is None else map(position.__getitem__, pairs),
+            dtype=np.int32, count=int(sizes.sum())
+        )
+
+        order = np.argsort(keys, kind="stable")
+        keys, members = keys[order], members[order]
+        if self._loaded is not None:
+            return ids, self._merge_loaded(keys, members)
+        bucket_keys, starts = np.unique(keys, return_index=True)
+        offsets = np.append(starts, len(keys)).astype(np.int64 if len(keys) >= 1 << 31 else np.int32)
+        return ids, {"keys": bucket_keys, "offsets": offsets, "members": members}
+
+    def _merge_loaded(self, keys: np.ndarray, members: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Loaded buckets plus the (key-sorted) pairs of the dict buckets.
+
+        Loaded keys keep their positions, so the pairs are inserted into the
+        loaded arrays without sorting those: one linear pass however large
+        the loaded index is.
+        """
+        loaded_keys, offsets, loaded_members, loaded_ids = self._loaded
+        if len(loaded_keys):
+            slots = np.minimum(np.searchsorted(loaded_keys, keys), len(loaded_keys) - 1)
+            present = loaded_keys[slots] == keys
+        else:
+            slots = np.zeros(len(keys), dtype=np.int64)
+            present = np.zeros(len(keys), dtype=bool)
+
+        # A name indexed again after loading repeats its loaded pairs
+        check = present & (members < len(loaded_ids))
+        if check.any():
+            hit_slots = np.unique(slots[check])
+            sizes = offsets[hit_slots + 1] - offsets[hit_slots]
+            within = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            existing = loaded_members[np.repeat(offsets[hit_slots], sizes) + within]
+            pair = lambda slot, member: (slot.astype(np.uint64) << np.uint64(32)) | member.astype(np.uint64)
+            repeated = np.zeros(len(keys), dtype=bool)
+            repeated[check] = np.isin(pair(slots[check], members[check]), pair(np.repeat(hit_slots, sizes), existing))
+            keys, members, present = keys[~repeated], members[~repeated], present[~repeated]
+
+        # Each pair goes after the loaded members of its key (or where its key goes)
+        at = np.asarray(offsets)[np.searchsorted(loaded_keys, keys, side="right")]
+        merged_members = np.insert(np.asarray(loaded_members, dtype=np.int32), at, members)
+        new_keys = np.unique(keys[~present])
+        merged_keys = np.insert(loaded_keys, np.searchsorted(loaded_keys, new_keys), new_keys)
+        sizes = np.zeros(len(merged_keys), dtype=np.int64)
+        sizes[np.arange(len(loaded_keys)) + np.searchsorted(new_keys, loaded_keys)] = np.diff(offsets)
+        np.add.at(sizes, np.searchsorted(merged_keys, keys), 1)
+        merged_offsets = np.concatenate([[0], np.cumsum(sizes)])
+        dtype = np.int64 if len(merged_members) >= 1 << 31 else np.int32
+        return {"keys": merged_keys, "offsets": merged_offsets.astype(dtype), "members": merged_members}
+
+    def from_arrays(self, ids: Sequence[Hashable], arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Replace the index contents with to_arrays() output of an index with
+        the same key_parameters (arrays may be memory-mapped; ids given as a
+        range are kept as one).
+        """
+        if not isinstance(ids, range):
+            ids = list(ids)
+        self._buckets = defaultdict(set)
+        self._keys = {}
+        self._loaded = (arrays["keys"], arrays["offsets"], arrays["members"], ids)
+        self._loaded_keys = ids if isinstance(ids, range) else set(ids)
+
+    def _loaded_buckets(self, bucket_keys: List[int]) -> Optional[List[Optional[np.ndarray]]]:
+        """Member positions of each key in the loaded buckets (None if absent)"""
+        if self._loaded is None or not len(self._loaded[0]):
+            return None
+        loaded_keys, offsets, members, _ = self._loaded
+        wanted = np.asarray(bucket_keys, dtype=np.uint64)
+        slots = np.minimum(np.searchsorted(loaded_keys, wanted), len(loaded_keys) - 1)
+        hits = loaded_keys[slots] == wanted
+        return [
+            members[offsets[slot]:offsets[slot + 1]] if hit else None
+            for slot, hit in zip(slots.tolist(), hits.tolist())
+        ]
+
+    def _bucket_keys(self, text: str, group: Hashable) -> Tuple[List[int], List[int]]:
+        """Token keys (name, tokens, token deletions) and band keys of one name"""
+        normalized = normalize_name(text) or text.lower().strip()
+        prefix = f"{getattr(group, 'value', group)}\x1f".encode("utf-8")
+        keys = [_string_key(prefix + b"v\x1f" + normalized.encode("utf-8"))]
+
+        deletions = set()
+        for token in set(normalized.split()):
+            if len(token) < 2 or token in STOP_TOKENS:
+                continue
+            keys.append(_string_key(prefix + b"t\x1f" + token.encode("utf-8")))
+            if len(token) <= self.edit_key_length:
+                # Token and deletions both ways, so one substitution meets too
+                deletions.add(token)
+                deletions.update(token[:i] + token[i + 1:] for i in range(len(token)))
+        keys.extend(_string_key(prefix + b"d\x1f" + deletion.encode("utf-8")) for deletion in deletions)
+
+        # Products wrap modulo 2^64, which is all a key needs
+        signature = self._band_signatures(normalized)
+        group_key = np.uint64(_string_key(prefix + b"b"))
+        with np.errstate(over="ignore"):
+            band_keys = (signature * self._band_mix).sum(axis=1) + self._band_salt + group_key
+        return keys, band_keys.tolist()
+
+    def _band_signatures(self, normalized: str) -> np.ndarray:
+        """MinHash signature of a normalized name, one row per band"""
+        padded = f" {normalized} "
+        size = self.shingle_size
+        shingles = {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        # Universal hashing (a * x + b) mod p; 32-bit a and x keep a * x within uint64
+        permuted = (np.outer(hashes, self._hash_a) + self._hash_b) % np.uint64(_HASH_PRIME)
+        return permuted.min(axis=0).reshape(self.bands, self.rows)
+
+
+def _string_key(data: bytes) -> int:
+    """Stable 64-bit key of a byte string"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
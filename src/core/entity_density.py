@@ -0,0 +1,249 @@
+"""
+Entity-density driven chunk sizing.
+
+SmartChunker._adaptive_chunking and PageBatchProcessor._calculate_optimal_batch_size
+size their units from static complexity heuristics (legal vocabulary, page
+word counts). Output size per LLM call follows the number of entities in the
+text instead: a string cite or a party list can hold dozens of entities in a
+few hundred characters and overflow the completion budget, while the same
+size of narrative holds a handful and wastes the per-call prompt overhead.
+
+EntityDensityModel estimates the entities in a span with a cheap regex
+pre-pass and sizes spans so the expected output per call stays constant:
+
+- match_starts() runs a set of compiled proxy patterns (citations, party
+  names, dates, amounts; or the RegexEngine's own high-confidence patterns
+  via from_pattern_loader()) over the document once; with a DocumentIndex
+  the scans are shared with the other pipeline stages
+- weight() is the number of matches in a span, by bisect over those starts,
+  plus a baseline per 1,000 characters for entities no pattern sees
+- chunk_extent() is the length at which a span's weight reaches
+  target_completion_tokens / tokens_per_match
+- record() learns tokens_per_match from the completion tokens each chunk
+  actually produced (an exponentially weighted average), so the size
+  follows what the served model emits for this kind of text
+"""
+
+import logging
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Pattern, Sequence
+
+from .document_index import DocumentIndex
+
+logger = logging.getLogger(__name__)
+
+# Proxies for the entities the extraction prompts ask for; each match is
+# roughly one extracted entity
+DEFAULT_PROXY_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r"\b\d+\s+(?:U\.S\.|S\.\s?Ct\.|L\.\s?Ed\.|F\.(?:\s?Supp\.)?(?:\s?\d?d)?|[A-Z][a-z]*\.(?:\s?\d?d)?)\s+\d+",  # Reporter citations
+        r"\b\d+\s+(?:U\.S\.C|C\.F\.R)\.?\s*§*\s*\d+",  # Code citations
+        r"§§?\s*\d+",  # Section references
+        r"\b[A-Z][\w.'&-]*(?:\s+[A-Z][\w.'&-]*)*\s+v\.\s+[A-Z]",  # Case names
+        r"\b(?:Id\.|supra|infra)",  # Short-form citations
+        r"\b[A-Z][a-z]+(?:\s+(?:[A-Z]\.\s+)?[A-Z][a-z]+)+",  # Multi-word names (parties, courts, agencies)
+        r"\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}",  # Dates
+        r"\$\s?\d[\d,]*(?:\.\d+)?",  # Monetary amounts
+    )
+]
+
+
+class EntityDensityModel:
+    """
+    Expected extraction output of a span, from regex match density.
+
+    Attributes:
+        tokens_per_match: Learned completion tokens per unit of weight
+        samples: Number of chunks recorded
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[Sequence[Pattern]] = None,
+        target_completion_tokens: int = 4000,
+        tokens_per_match: float = 60.0,
+        baseline_per_kchar: float = 1.0,
+        smoothing: float = 0.2
+    ):
+        """
+        Initialize EntityDensityModel.
+
+        Args:
+            patterns: Compiled proxy patterns (defaults to DEFAULT_PROXY_PATTERNS)
+            target_completion_tokens: Completion tokens one extraction call should produce
+            tokens_per_match: Starting completion tokens per unit of weight
+            baseline_per_kchar: Weight added per 1,000 characters regardless of matches
+            smoothing: Weight of each recorded chunk in the tokens_per_match average
+        """
+        self.patterns = list(patterns) if patterns is not None else list(DEFAULT_PROXY_PATTERNS)
+        self.target_completion_tokens = target_completion_tokens
+        self.tokens_per_match = tokens_per_match
+        self.baseline_per_kchar = baseline_per_kchar
+        self.smoothing = smoothing
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings=None, patterns: Optional[Sequence[Pattern]] = None) -> "EntityDensityModel":
+        """Create a model from ADAPTIVE_DENSITY_* settings."""
+        if settings is None:
+            from .config import get_settings
+            settings = get_settings()
+
+        chunking = settings.chunking
+        return cls(
+            patterns=patterns,
+            target_completion_tokens=chunking.adaptive_density_target_completion_tokens,
+            tokens_per_match=chunking.adaptive_density_tokens_per_match,
+            baseline_per_kchar=chunking.adaptive_density_baseline_per_kchar,
+            smoothing=chunking.adaptive_density_smoothing
+        )
+
+    @classmethod
+    def from_pattern_loader(
+        cls,
+        pattern_loader: Any,
+        min_confidence: float = 0.9,
+        settings=None
+    ) -> "EntityDensityModel":
+        """
+        Create a model whose proxies are the RegexEngine's own patterns.
+
+        Args:
+            pattern_loader: PatternLoader shared with the RegexEngine
+            min_confidence: Only patterns at or above this confidence are used,
+                which keeps the pre-pass cheap and its matches specific
+            settings: Settings for the remaining parameters
+
+        Returns:
+            EntityDensityModel using the loader's compiled patterns
+        """
+        patterns = [
+            compiled.compiled_regex
+            for compiled in pattern_loader.get_patterns_by_confidence(min_confidence)
+            if compiled.compiled_regex is not None
+        ]
+        if not patterns:
+            logger.warning("No patterns above confidence %.2f; using default density proxies", min_confidence)
+            patterns = None
+        return cls.from_settings(settings, patterns=patterns)
+
+    @property
+    def target_weight(self) -> float:
+        """Weight of a span expected to produce target_completion_tokens."""
+        return self.target_completion_tokens / max(self.tokens_per_match, 1e-6)
+
+    def match_starts(self, text: str, index: Optional[DocumentIndex] = None) -> List[int]:
+        """
+        Sorted start offsets of every proxy match in text.
+
+        Args:
+            text: Document text
+            index: Optional structure index of text (pattern scans and the
+                merged result are kept on it)
+
+        Returns:
+            Match start offsets in document order
+        """
+        if index is not None and index.covers(text):
+            return index.memo(
+                ("entity_density.match_starts", id(self)),
+                lambda: sorted(start for pattern in self.patterns for start, _ in index.spans(pattern))
+            )
+        return sorted(match.start() for pattern in self.patterns for match in pattern.finditer(text))
+
+    def weight(self, starts: List[int], start: int, end: int) -> float:
+        """Expected entities in [start, end), given the document's match_starts()."""
+        matches = bisect_left(starts, end) - bisect_left(starts, start)
+        return matches + self.baseline_per_kchar * (end - start) / 1000
+
+    def text_weight(self, text: str) -> float:
+        """Expected entities in text (scans text; use weight() within a document)."""
+        return self.weight(self.match_starts(text), 0, len(text))
+
+    def chunk_extent(
+        self,
+        starts: List[int],
+        start: int,
+        end: int,
+        min_chars: int,
+        max_chars: int
+    ) -> int:
+        """
+        Length of a chunk starting at start whose weight reaches target_weight.
+
+        Args:
+            starts: The document's match_starts()
+            start: Chunk start offset
+            end: End of the document
+            min_chars: Smallest chunk returned (unless the document ends first)
+            max_chars: Largest chunk returned
+
+        Returns:
+            Chunk length in characters, at most end - start
+        """
+        available = end - start
+        low, high = min(min_chars, available), min(max_chars, available)
+        if high <= low:
+            return high
+
+        # Weight only grows with length: find the shortest length at the target
+        target = self.target_weight
+        if self.weight(starts, start, start + high) <= target:
+            return high
+        while low < high:
+            mid = (low + high) // 2
+            if self.weight(starts, start, start + mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def record(self, weight: float, completion_tokens: int, calls: int = 1):
+        """
+        Learn from the completion tokens a chunk produced.
+
+        Args:
+            weight: The chunk's weight() (or text_weight())
+            completion_tokens: Completion tokens across the chunk's extraction calls
+            calls: Extraction calls made for the chunk (e.g. 3 waves)
+        """
+        if weight <= 0 or calls <= 0 or completion_tokens <= 0:
+            return
+        observed = completion_tokens / calls / weight
+        with self._lock:
+            self.tokens_per_match += self.smoothing * (observed - self.tokens_per_match)
+            self.samples += 1
+        logger.debug(
+            f"Density model: {observed:.1f} completion tokens per match observed, "
+            f"now {self.tokens_per_match:.1f} (target weight {self.target_weight:.1f})"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current sizing parameters."""
+        return {
+            "tokens_per_match": self.tokens_per_match,
+            "target_completion_tokens": self.target_completion_tokens,
+            "target_weight": self.target_weight,
+            "baseline_per_kchar": self.baseline_per_kchar,
+            "samples": self.samples,
+            "patterns": len(self.patterns)
+        }
+
+
+_density_model: Optional[EntityDensityModel] = None
+
+
+def get_entity_density_model() -> EntityDensityModel:
+    """
+    Get the shared density model.
+
+    Chunkers and the extraction orchestrator share one instance so completion
+    statistics recorded after each chunk size the next document's chunks.
+    """
+    global _density_model
+    if _density_model is None:
+        _density_model = EntityDensityModel.from_settings()
+    return _density_model
@@ -7,6 +7,7 @@ Supports the 7-pass extraction strategy with deduplication and normalization.
 """
 
 import asyncio
+import heapq
 import re
 from collections import defaultdict, Counter
 from typing import List, Dict, Optional, Set, Tuple, Any
@@ -15,6 +16,7 @@ from difflib import SequenceMatcher
 import logging
 from pathlib import Path
 import pickle
+import uuid
 import zlib
 
 from ..models.registry import (
@@ -30,6 +32,15 @@ from ..models.registry import (
 )
 from ..models.entities import Entity, EntityType, TextPosition, EntityAttributes
 from ..utils.pattern_loader import PatternLoader
+from .entity_blocking import CandidateBlockingIndex, sequence_ratio
+from .registry_snapshot import (
+    SNAPSHOT_SUFFIX,
+    decode_snapshot,
+    encode_snapshot,
+    read_header,
+    read_snapshot,
+    write_snapshot,
+)
 
 
 class EntityRegistry:
@@ -48,7 +59,9 @@ class EntityRegistry:
         total_chunks: int,
         similarity_threshold: float = 0.85,
         enable_caching: bool = True,
-        cache_dir: Optional[str] = None
+        cache_dir: Optional[str] = None,
+        candidate_blocking: bool = True,
+        snapshot_delta_limit: int = 16
     ):
         """
         Initialize the entity registry.
@@ -60,6 +73,11 @@ class EntityRegistry:
             similarity_threshold: Threshold for entity similarity matching (0.0-1.0)
             enable_caching: Enable registry caching for large documents
             cache_dir: Directory for cache files
+            candidate_blocking: Score only entities sharing a blocking key
+                (name token, short-name edit or MinHash band) with a new
+                entity, instead of every registered entity of its type
+            snapshot_delta_limit: Most delta snapshots chained onto a full
+                snapshot before an incremental save writes a full one
         """
         self.logger = logging.getLogger(__name__)
         
@@ -69,11 +87,22 @@ class EntityRegistry:
         self.entity_index: Dict[str, Set[str]] = defaultdict(set)  # text -> entity IDs
         self.type_index: Dict[EntityType, Set[str]] = defaultdict(set)  # type -> entity IDs
         self.chunk_index: Dict[str, Set[str]] = defaultdict(set)  # chunk -> entity IDs
+        # Variant blocking keys -> entity IDs, per type (None scores all of a type)
+        self.blocking_index: Optional[CandidateBlockingIndex] = (
+            CandidateBlockingIndex() if candidate_blocking else None
+        )
         
         # Reference resolution
         self.reference_map: Dict[str, str] = {}  # reference text -> canonical entity ID
         self.pronoun_context: Dict[str, List[str]] = defaultdict(list)  # chunk -> recent entities
         
+        # Changes since the last snapshot saved or loaded, for delta snapshots
+        self._checkpoint_id: Optional[str] = None
+        self._checkpoint_depth = 0
+        self._changed_entities: Set[str] = set()
+        self._changed_relationships: Set[str] = set()
+        self._changed_index_keys: Dict[str, Set[Any]] = defaultdict(set)  # index name -> keys
+        
         # Metadata
         self.metadata = RegistryMetadata(
             document_id=document_id,
@@ -81,13 +110,15 @@ class EntityRegistry:
             total_chunks=total_chunks,
             configuration={
                 "similarity_threshold": similarity_threshold,
-                "enable_caching": enable_caching
+                "enable_caching": enable_caching,
+                "candidate_blocking": candidate_blocking
             }
         )
         
         # Configuration
         self.similarity_threshold = similarity_threshold
         self.enable_caching = enable_caching
+        self.snapshot_delta_limit = snapshot_delta_limit
         self.cache_dir = Path(cache_dir) if cache_dir else Path("./cache/registry")
         if self.enable_caching:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -161,6 +192,12 @@ class EntityRegistry:
             self.entity_index[entity.cleaned_text.lower()].add(registered_id)
             self.type_index[entity.entity_type].add(registered_id)
             self.chunk_index[chunk_id].add(registered_id)
+            self._changed_entities.add(registered_id)
+            self._changed_index_keys["entity_index"].update(
+                (entity.text.lower(), entity.cleaned_text.lower())
+            )
+            self._changed_index_keys["type_index"].add(entity.entity_type)
+            self._changed_index_keys["chunk_index"].add(chunk_id)
             
             # Update metadata
             self.metadata.processed_chunks = max(
@@ -188,8 +225,9 @@ class EntityRegistry:
             
             # Add occurrence to existing entity
             existing.occurrences.append(occurrence)
-            existing.all_variants.add(entity.text)
-            existing.all_variants.add(entity.cleaned_text)
+            new_variants = {entity.text, entity.cleaned_text} - existing.all_variants
+            existing.all_variants.update(new_variants)
+            self._index_variants(existing, new_variants)
             existing.last_seen_chunk = chunk_id
             existing.chunk_span = (
                 existing.chunk_span[0],
@@ -231,6 +269,7 @@ class EntityRegistry:
             )
             
             self.entities[registered.id] = registered
+            self._index_variants(registered, registered.all_variants)
             self.metadata.total_entities += 1
             
             # Update type distribution
@@ -251,8 +290,13 @@ class EntityRegistry:
         for variant in [entity.text.lower(), entity.cleaned_text.lower()]:
             potential_ids.update(self.entity_index.get(variant, set()))
         
-        # Check same type entities
-        type_entities = self.type_index.get(entity.entity_type, set())
+        # Check same type entities (those sharing a blocking key, when blocking)
+        if self.blocking_index is not None:
+            type_entities = self.blocking_index.candidates_for_all(
+                {entity.text, entity.cleaned_text}, entity.entity_type
+            )
+        else:
+            type_entities = self.type_index.get(entity.entity_type, set())
         
         # Score each potential match
         for entity_id in potential_ids | type_entities:
@@ -263,7 +307,9 @@ class EntityRegistry:
                 continue
             
             # Calculate similarity
-            similarity, features = self._calculate_similarity(entity, existing)
+            similarity, features = self._calculate_similarity(
+                entity, existing, self.similarity_threshold
+            )
             
             if similarity >= self.similarity_threshold:
                 candidates.append(ResolutionCandidate(
@@ -283,40 +329,58 @@ class EntityRegistry:
     def _calculate_similarity(
         self, 
         entity: Entity, 
-        registered: RegisteredEntity
+        registered: RegisteredEntity,
+        threshold: float = 0.0
     ) -> Tuple[float, Dict[str, List[str]]]:
-        """Calculate similarity between entities."""
+        """
+        Calculate similarity between entities.
+        
+        Scores of at least threshold are exact. Below threshold a score is
+        only known to be below it, which lets most text comparisons skip
+        SequenceMatcher.
+        """
         scores = []
         features = {"matching": [], "conflicting": []}
         
-        # Text similarity
-        text_sim = max(
-            SequenceMatcher(None, entity.text.lower(), variant.lower()).ratio()
-            for variant in registered.all_variants
+        same_type = entity.entity_type == registered.entity_type
+        same_subtype = entity.entity_subtype == registered.entity_subtype
+        type_score = (0.2 if same_type else 0.0) + (0.1 if same_subtype else 0.0)
+        
+        # Cleaned text similarity (the least that can still reach threshold,
+        # less a margin so rounding never lifts a bound to threshold)
+        cleaned_sim = sequence_ratio(
+            entity.cleaned_text.lower(), 
+            registered.canonical_text.lower(),
+            (threshold - type_score - 0.4) / 0.3 - 1e-9
         )
+        
+        # Text similarity
+        text = entity.text.lower()
+        text_sim = 0.0
+        text_cutoff = (threshold - type_score - cleaned_sim * 0.3) / 0.4 - 1e-9
+        if text_cutoff <= 1.0:
+            for variant in registered.all_variants:
+                text_sim = max(text_sim, sequence_ratio(text, variant.lower(), max(text_cutoff, text_sim)))
+                if text_sim == 1.0:
+                    break
+        
         scores.append(text_sim * 0.4)  # 40% weight
         if text_sim > 0.8:
             features["matching"].append("text_similarity")
         
-        # Cleaned text similarity
-        cleaned_sim = SequenceMatcher(
-            None, 
-            entity.cleaned_text.lower(), 
-            registered.canonical_text.lower()
-        ).ratio()
         scores.append(cleaned_sim * 0.3)  # 30% weight
         if cleaned_sim > 0.8:
             features["matching"].append("canonical_match")
         
         # Type match
-        if entity.entity_type == registered.entity_type:
+        if same_type:
             scores.append(0.2)  # 20% weight
             features["matching"].append("same_type")
         else:
             features["conflicting"].append("different_type")
         
         # Subtype match
-        if entity.entity_subtype == registered.entity_subtype:
+        if same_subtype:
             scores.append(0.1)  # 10% weight
             features["matching"].append("same_subtype")
         
@@ -400,6 +464,11 @@ class EntityRegistry:
                     # Merge dictionaries
                     target_val.update(source_val)
     
+    def _index_variants(self, entity: RegisteredEntity, variants: Set[str]) -> None:
+        """Add variants of a registered entity to the blocking index."""
+        if self.blocking_index is not None and variants:
+            self.blocking_index.add_many(entity.id, variants, entity.entity_type)
+    
     def _determine_reference_type(self, text: str, entity_type: EntityType) -> ReferenceType:
         """Determine the type of reference for an entity occurrence."""
         text_lower = text.lower()
@@ -533,20 +602,25 @@ class EntityRegistry:
             
             # Group entities by type for efficient comparison
             for entity_type, entity_ids in self.type_index.items():
+                entity_ids = list(entity_ids)
                 entities = [self.entities[eid] for eid in entity_ids]
+                positions = {eid: i for i, eid in enumerate(entity_ids)}
                 
-                # Compare each pair
+                # Compare each pair (with blocking, only pairs sharing a key)
                 for i, entity1 in enumerate(entities):
                     if entity1.resolution_status == ResolutionStatus.MERGED:
                         continue
                     
-                    for entity2 in entities[i+1:]:
+                    pending = self._merge_candidates(entity1, entity_type, positions, i)
+                    while pending:
+                        j = heapq.heappop(pending)
+                        entity2 = entities[j]
                         if entity2.resolution_status == ResolutionStatus.MERGED:
                             continue
                         
                         # Calculate similarity
                         similarity, _ = self._calculate_similarity_between_registered(
-                            entity1, entity2
+                            entity1, entity2, threshold
                         )
                         
                         if similarity >= threshold:
@@ -554,39 +628,75 @@ class EntityRegistry:
                             self._perform_merge(entity1, entity2)
                             merges.append((entity2.id, entity1.id))
                             self.metadata.merge_operations += 1
+                            
+                            if self.blocking_index is not None:
+                                # entity1 now carries entity2's variants too
+                                seen = set(pending)
+                                for k in self._merge_candidates(entity2, entity_type, positions, j):
+                                    if k not in seen:
+                                        heapq.heappush(pending, k)
             
             return merges
     
+    def _merge_candidates(
+        self,
+        entity: RegisteredEntity,
+        entity_type: EntityType,
+        positions: Dict[str, int],
+        after: int
+    ) -> List[int]:
+        """Positions after `after` in a type group to compare entity with, as a heap."""
+        if self.blocking_index is None:
+            return list(range(after + 1, len(positions)))
+        
+        candidates = self.blocking_index.candidates_for_all(entity.all_variants, entity_type)
+        found = [positions[eid] for eid in candidates if positions.get(eid, -1) > after]
+        heapq.heapify(found)
+        return found
+    
     def _calculate_similarity_between_registered(
         self, 
         entity1: RegisteredEntity, 
-        entity2: RegisteredEntity
+        entity2: RegisteredEntity,
+        threshold: float = 0.0
     ) -> Tuple[float, Dict]:
-        """Calculate similarity between two registered entities."""
+        """
+        Calculate similarity between two registered entities.
+        
+        Scores of at least threshold are exact; below threshold a score is
+        only known to be below it.
+        """
         scores = []
         features = {"matching": [], "conflicting": []}
         
+        variant_overlap = len(entity1.all_variants & entity2.all_variants)
+        same_type = entity1.entity_type == entity2.entity_type
+        chunk_distance = abs(entity1.chunk_span[0] - entity2.chunk_span[0])
+        other_score = (
+            (0.3 if variant_overlap > 0 else 0.0)
+            + (0.2 if same_type else 0.0)
+            + (0.1 if chunk_distance <= 2 else 0.0)
+        )
+        
         # Canonical text similarity
-        canonical_sim = SequenceMatcher(
-            None, 
+        canonical_sim = sequence_ratio(
             entity1.canonical_text.lower(), 
-            entity2.canonical_text.lower()
-        ).ratio()
+            entity2.canonical_text.lower(),
+            (threshold - other_score) / 0.4 - 1e-9
+        )
         scores.append(canonical_sim * 0.4)
         
         # Variant overlap
-        variant_overlap = len(entity1.all_variants & entity2.all_variants)
         if variant_overlap > 0:
             scores.append(0.3)
             features["matching"].append("variant_overlap")
         
         # Type match
-        if entity1.entity_type == entity2.entity_type:
+        if same_type:
             scores.append(0.2)
             features["matching"].append("same_type")
         
         # Chunk proximity
-        chunk_distance = abs(entity1.chunk_span[0] - entity2.chunk_span[0])
         if chunk_distance <= 2:
             scores.append(0.1)
             features["matching"].append("chunk_proximity")
@@ -604,6 +714,7 @@ class EntityRegistry:
         
         # Merge variants
         target.all_variants.update(source.all_variants)
+        self._index_variants(target, source.all_variants)
         
         # Update chunk span
         target.chunk_span = (
@@ -646,6 +757,7 @@ class EntityRegistry:
         target.resolution_status = ResolutionStatus.RESOLVED
         
         target.updated_at = datetime.utcnow()
+        self._changed_entities.update((target.id, source.id))
     
     async def build_entity_graph(self) -> EntityGraph:
         """
@@ -806,6 +918,8 @@ class EntityRegistry:
             # Update entity relationship lists
             self.entities[source_entity_id].relationships.append(relationship.id)
             self.entities[target_entity_id].relationships.append(relationship.id)
+            self._changed_relationships.add(relationship.id)
+            self._changed_entities.update((source_entity_id, target_entity_id))
             
             # Update metadata
             self.metadata.total_relationships += 1
@@ -919,42 +1033,93 @@ class EntityRegistry:
             else:
                 return export_data
     
-    async def save_snapshot(self, checkpoint_chunk_id: Optional[str] = None) -> str:
+    async def save_snapshot(
+        self,
+        checkpoint_chunk_id: Optional[str] = None,
+        incremental: bool = False
+    ) -> str:
         """
         Save a snapshot of the registry for persistence.
         
+        Snapshots are columnar files that carry the registry's indexes (see
+        registry_snapshot). Encoding and writing run in a worker thread while
+        the registry lock is held, so the event loop stays responsive. An
+        incremental snapshot holds only what changed through the registry's
+        methods since the last snapshot saved or loaded; it falls back to a
+        full snapshot when there is no such snapshot, after
+        _rebuild_indices, or once snapshot_delta_limit deltas are chained.
+        
         Args:
             checkpoint_chunk_id: Last processed chunk for resumption
+            incremental: Save a delta against the last snapshot
             
         Returns:
             Snapshot ID
         """
-        snapshot = RegistrySnapshot(
-            entities=self.entities,
-            relationships=self.relationships,
-            metadata=self.metadata,
-            checkpoint_chunk_id=checkpoint_chunk_id
-        )
+        snapshot_id = str(uuid.uuid4())
+        if not self.enable_caching:
+            return snapshot_id
         
-        if self.enable_caching:
-            # Save to cache directory
-            snapshot_file = self.cache_dir / f"snapshot_{snapshot.snapshot_id}.pkl"
-            
-            # Compress snapshot
-            snapshot_data = pickle.dumps(snapshot.dict())
-            compressed_data = zlib.compress(snapshot_data)
-            
-            with open(snapshot_file, 'wb') as f:
-                f.write(compressed_data)
+        async with self._lock:
+            delta = (
+                incremental
+                and self._checkpoint_id is not None
+                and self._checkpoint_depth < self.snapshot_delta_limit
+            )
+            header = {
+                "snapshot_id": snapshot_id,
+                "kind": "delta" if delta else "full",
+                "base_id": self._checkpoint_id if delta else None,
+                "checkpoint_chunk_id": checkpoint_chunk_id,
+                "created_at": datetime.utcnow().isoformat()
+            }
+            snapshot_file = self._snapshot_path(snapshot_id)
+            size = await asyncio.to_thread(self._write_snapshot, snapshot_file, header, delta)
             
-            self.logger.info(f"Saved snapshot {snapshot.snapshot_id} to {snapshot_file}")
+            self._checkpoint_id = snapshot_id
+            self._checkpoint_depth = self._checkpoint_depth + 1 if delta else 0
+            self._changed_entities.clear()
+            self._changed_relationships.clear()
+            self._changed_index_keys.clear()
+        
+        self.logger.info(f"Saved {header['kind']} snapshot {snapshot_id} to {snapshot_file} ({size} bytes)")
+        return snapshot_id
+    
+    def _snapshot_path(self, snapshot_id: str) -> Path:
+        return self.cache_dir / f"snapshot_{snapshot_id}{SNAPSHOT_SUFFIX}"
+    
+    def _write_snapshot(self, snapshot_file: Path, header: Dict[str, Any], delta: bool) -> int:
+        """Encode the registry (or its changes, for a delta) and write it; runs off-loop."""
+        indexes = {
+            "entity_index": self.entity_index,
+            "type_index": self.type_index,
+            "chunk_index": self.chunk_index
+        }
+        if delta:
+            entities = [self.entities[eid] for eid in self._changed_entities]
+            relationships = [self.relationships[rid] for rid in self._changed_relationships]
+            indexes = {
+                name: {key: index.get(key, set()) for key in self._changed_index_keys.get(name, ())}
+                for name, index in indexes.items()
+            }
+            blocking = None
+        else:
+            entities = list(self.entities.values())
+            relationships = list(self.relationships.values())
+            blocking = self.blocking_index
         
-        return snapshot.snapshot_id
+        arrays = encode_snapshot(header, entities, relationships, self.metadata, indexes, blocking)
+        return write_snapshot(snapshot_file, arrays)
     
     async def load_snapshot(self, snapshot_id: str) -> bool:
         """
         Load a snapshot from persistence.
         
+        Reads a delta snapshot's chain back to its full snapshot. Reading and
+        decoding run in a worker thread; persisted indexes are used as saved
+        (the blocking index is rebuilt only if it was saved with other key
+        parameters). Pickled snapshots of earlier versions are still read.
+        
         Args:
             snapshot_id: Snapshot ID to load
             
@@ -964,21 +1129,92 @@ class EntityRegistry:
         if not self.enable_caching:
             return False
         
-        snapshot_file = self.cache_dir / f"snapshot_{snapshot_id}.pkl"
+        snapshot_file = self._snapshot_path(snapshot_id)
         
         if not snapshot_file.exists():
+            legacy_file = self.cache_dir / f"snapshot_{snapshot_id}.pkl"
+            if legacy_file.exists():
+                return await self._load_pickled_snapshot(legacy_file, snapshot_id)
             self.logger.error(f"Snapshot {snapshot_id} not found")
             return False
         
         try:
+            state, depth = await asyncio.to_thread(self._read_snapshot_chain, snapshot_id)
+        except Exception as e:
+            self.logger.error(f"Failed to load snapshot: {e}")
+            return False
+        
+        async with self._lock:
+            (self.entities, self.relationships, self.metadata,
+             self.entity_index, self.type_index, self.chunk_index, self.blocking_index) = state
+            self._checkpoint_id = snapshot_id
+            self._checkpoint_depth = depth
+            self._changed_entities.clear()
+            self._changed_relationships.clear()
+            self._changed_index_keys.clear()
+        
+        self.logger.info(f"Loaded snapshot {snapshot_id} ({depth} deltas)")
+        return True
+    
+    def _read_snapshot_chain(self, snapshot_id: str) -> Tuple[tuple, int]:
+        """Registry state from a snapshot and the deltas before it; runs off-loop."""
+        chain = [snapshot_id]
+        header = read_header(self._snapshot_path(snapshot_id))
+        while header["kind"] == "delta":
+            if header["base_id"] in chain:
+                raise ValueError(f"Snapshot chain of {snapshot_id} has a cycle")
+            chain.append(header["base_id"])
+            header = read_header(self._snapshot_path(header["base_id"]))
+        chain.reverse()
+        
+        full = decode_snapshot(read_snapshot(self._snapshot_path(chain[0])))
+        entities, relationships, metadata = full.entities, full.relationships, full.metadata
+        indexes = {name: defaultdict(set, index) for name, index in full.indexes.items()}
+        
+        blocking_index = None
+        if self.blocking_index is not None:
+            blocking_index = CandidateBlockingIndex(
+                max_token_bucket=self.blocking_index.max_token_bucket,
+                **self.blocking_index.key_parameters
+            )
+            if full.blocking is not None and full.header["blocking"] == blocking_index.key_parameters:
+                blocking_index.from_arrays(*full.blocking)
+            else:
+                for entity in entities.values():
+                    blocking_index.add_many(entity.id, entity.all_variants, entity.entity_type)
+        
+        for delta_id in chain[1:]:
+            delta = decode_snapshot(read_snapshot(self._snapshot_path(delta_id)))
+            entities.update(delta.entities)
+            relationships.update(delta.relationships)
+            metadata = delta.metadata
+            for name, index in delta.indexes.items():
+                indexes[name].update(index)
+            if blocking_index is not None:
+                # Indexed variants only grow, so re-adding changed entities is exact
+                for entity in delta.entities.values():
+                    blocking_index.add_many(entity.id, entity.all_variants, entity.entity_type)
+        
+        state = (
+            entities, relationships, metadata,
+            indexes["entity_index"], indexes["type_index"], indexes["chunk_index"], blocking_index
+        )
+        return state, len(chain) - 1
+    
+    async def _load_pickled_snapshot(self, snapshot_file: Path, snapshot_id: str) -> bool:
+        """Load a zlib-compressed pickle snapshot written by earlier versions."""
+        def read() -> RegistrySnapshot:
             with open(snapshot_file, 'rb') as f:
                 compressed_data = f.read()
             
             snapshot_data = zlib.decompress(compressed_data)
             snapshot_dict = pickle.loads(snapshot_data)
+            return RegistrySnapshot(**snapshot_dict)
+        
+        try:
+            snapshot = await asyncio.to_thread(read)
             
             # Restore registry state
-            snapshot = RegistrySnapshot(**snapshot_dict)
             self.entities = snapshot.entities
             self.relationships = snapshot.relationships
             self.metadata = snapshot.metadata
@@ -998,11 +1234,16 @@ class EntityRegistry:
         self.entity_index.clear()
         self.type_index.clear()
         self.chunk_index.clear()
+        if self.blocking_index is not None:
+            self.blocking_index.clear()
+        # Indices no longer follow the change log; the next snapshot is full
+        self._checkpoint_id = None
         
         for entity_id, entity in self.entities.items():
             # Text index
             for variant in entity.all_variants:
                 self.entity_index[variant.lower()].add(entity_id)
+            self._index_variants(entity, entity.all_variants)
             
             # Type index
             self.type_index[entity.entity_type].add(entity_id)
@@ -14,7 +14,7 @@ This is the core intelligence that bridges intelligent routing with actual extra
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterable, AsyncIterator
 from datetime import datetime
 from dataclasses import dataclass
 from pydantic import ValidationError
@@ -23,6 +23,8 @@ from src.core.prompt_manager import PromptManager, PromptTemplate
 from src.core.config import get_settings
 from src.vllm_client.client import DirectVLLMClient, HTTPVLLMClient
 from src.vllm_client.models import VLLMConfig
+from src.vllm_client.exceptions import DeadlineExceededError
+from src.core.vllm_micro_batcher import get_micro_batcher
 from src.vllm_client.factory import VLLMClientFactory
 from src.routing.document_router import RoutingDecision, ProcessingStrategy
 from src.routing.size_detector import DocumentSizeInfo
@@ -162,7 +164,8 @@ class ExtractionOrchestrator:
     def __init__(
         self,
         prompt_manager: Optional[PromptManager] = None,
-        vllm_client: Optional[Any] = None
+        vllm_client: Optional[Any] = None,
+        smart_chunker: Optional[Any] = None
     ):
         """
         Initialize ExtractionOrchestrator with multi-service support.
@@ -170,10 +173,15 @@ class ExtractionOrchestrator:
         Args:
             prompt_manager: PromptManager instance (creates default if None)
             vllm_client: vLLM client instance (created lazily if None)
+            smart_chunker: SmartChunker for chunked, incremental and streaming
+                extraction (created from settings if None)
         """
         self.prompt_manager = prompt_manager or PromptManager()
         self.vllm_client = vllm_client  # May be None - created lazily (Instruct service)
+        self.smart_chunker = smart_chunker  # May be None - created lazily from settings
         self.thinking_client = None  # Lazy initialization for Wave 4 relationships
+        self._incremental_extractor = None  # Lazy initialization for extract_incremental()
+        self._streaming_extractor = None  # Lazy initialization for extract_stream()
 
         # P0 Fix #3: Async locks to prevent race conditions during client initialization
         self._vllm_client_lock = asyncio.Lock()
@@ -220,6 +228,18 @@ class ExtractionOrchestrator:
 
         return self.vllm_client
 
+    def _get_smart_chunker(self) -> Any:
+        """
+        SmartChunker shared by chunked, incremental and streaming extraction.
+
+        Returns:
+            The configured chunker, or one created from chunking settings
+        """
+        if self.smart_chunker is None:
+            from src.core.smart_chunker import SmartChunker
+            self.smart_chunker = SmartChunker()
+        return self.smart_chunker
+
     async def _ensure_thinking_client(self) -> Any:
         """
         Ensure Thinking client is initialized for Wave 4 (lazy initialization with race condition protection).
@@ -485,6 +505,78 @@ class ExtractionOrchestrator:
             metadata=result.get("metadata", {})
         )
 
+    async def extract_incremental(
+        self,
+        document_id: str,
+        document_text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Extract entities from a new version of a document, re-extracting only what changed.
+
+        The text is diffed against the previous version in the version store
+        (INCREMENTAL_VERSION_STORE). Entities from unchanged text are rebased
+        onto the new offsets; changed regions plus INCREMENTAL_CONTEXT_MARGIN
+        characters on each side go through 3-wave extraction. The first
+        version of a document is extracted in full.
+
+        Args:
+            document_id: Stable document identifier across versions
+            document_text: Full text of the new version
+            metadata: Optional document metadata
+
+        Returns:
+            IncrementalResult with the full entity set, the added/removed/moved
+            delta and reuse statistics
+        """
+        from src.core.incremental_extraction import IncrementalExtractor
+
+        await self._ensure_vllm_client()
+
+        if self._incremental_extractor is None:
+            self._incremental_extractor = IncrementalExtractor.from_settings(
+                self._extract_three_wave,
+                chunker=self._get_smart_chunker(),
+                dedupe_fn=self._deduplicate_entities
+            )
+
+        return await self._incremental_extractor.extract(document_id, document_text, metadata)
+
+    async def extract_stream(
+        self,
+        pieces: AsyncIterable[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract entities from a document that is still arriving.
+
+        Chunks are cut from the text stream with SmartChunker's boundary
+        logic as soon as enough lookahead has arrived, and each goes through
+        3-wave extraction while the rest of the document is read. At most
+        STREAMING_MAX_INFLIGHT_CHUNKS are extracted at once; reading pauses
+        until one finishes, so memory stays bounded for any document size.
+
+        Args:
+            pieces: The document's text, in order (e.g. a decoded request body)
+            metadata: Optional document metadata
+
+        Yields:
+            One result per chunk, in document order, with entity positions in
+            the whole document (see StreamingExtractor.extract)
+        """
+        from src.core.streaming_ingestion import StreamingExtractor
+
+        await self._ensure_vllm_client()
+
+        if self._streaming_extractor is None:
+            self._streaming_extractor = StreamingExtractor.from_settings(
+                self._extract_three_wave,
+                chunker=self._get_smart_chunker()
+            )
+
+        async for result in self._streaming_extractor.extract(pieces, metadata):
+            yield result
+
     async def _extract_single_pass(
         self,
         document_text: str,
@@ -574,6 +666,7 @@ class ExtractionOrchestrator:
 
         all_entities = []
         total_tokens = 0
+        completion_tokens = 0
         wave_results = []
 
         for wave_num in range(1, 4):
@@ -607,6 +700,7 @@ class ExtractionOrchestrator:
             # Accumulate enhanced entities
             all_entities.extend(enhanced_wave_entities)
             total_tokens += response["tokens_used"]
+            completion_tokens += response.get("completion_tokens") or 0
 
             wave_results.append({
                 "wave": wave_num,
@@ -630,6 +724,7 @@ class ExtractionOrchestrator:
             "relationships": [],  # 3-wave doesn't extract relationships
             "waves_executed": 3,
             "tokens_used": total_tokens,
+            "completion_tokens": completion_tokens,
             "metadata": {
                 "prompt_version": "three_wave",
                 "prompt_templates_used": ["wave1", "wave2", "wave3"],
@@ -1168,12 +1263,12 @@ Extract these relationship types when found:
         Returns:
             Dictionary with entities and stats
         """
-        from src.core.smart_chunker import SmartChunker, ChunkingStrategy
+        from src.core.smart_chunker import ChunkingStrategy
+        from src.core.document_index import DocumentIndex
 
         logger.info(f"Executing 3-wave chunked extraction: {len(document_text):,} chars")
 
-        # Initialize SmartChunker
-        smart_chunker = SmartChunker()
+        smart_chunker = self._get_smart_chunker()
 
         # Check if smart chunking should be used
         use_smart_chunking = smart_chunker.should_use_smart_chunking(document_text)
@@ -1181,10 +1276,13 @@ Extract these relationship types when found:
         if use_smart_chunking:
             # Use smart chunking with legal-aware strategy
             logger.info("Using SmartChunker with LEGAL_AWARE strategy")
+            # Scan the document's structure once for every chunking stage
+            index = DocumentIndex.build(document_text)
             chunks = smart_chunker.smart_chunk_document(
                 text=document_text,
                 strategy=ChunkingStrategy.LEGAL_AWARE,
-                document_type=None  # Auto-detect
+                document_type=None,  # Auto-detect
+                index=index
             )
         else:
             # Document not large enough for smart chunking, use three-wave directly
@@ -1215,44 +1313,57 @@ Extract these relationship types when found:
                     }
                 )
 
-                # Adjust entity positions relative to original document
-                adjusted_entities = []
-                for entity in chunk_result["entities"]:
-                    adjusted_entity = entity.copy()
-
-                    # Adjust positions if present
-                    if "start_pos" in entity and entity["start_pos"] is not None:
-                        adjusted_entity["start_pos"] = chunk.start_pos + entity["start_pos"]
-                    if "end_pos" in entity and entity["end_pos"] is not None:
-                        adjusted_entity["end_pos"] = chunk.start_pos + entity["end_pos"]
+                # Rebase entity positions onto the original document. The entity
+                # dicts were parsed for this chunk alone, so update them in place.
+                chunk_entities = chunk_result["entities"]
+                for entity in chunk_entities:
+                    if entity.get("start_pos") is not None:
+                        entity["start_pos"] += chunk.start_pos
+                    if entity.get("end_pos") is not None:
+                        entity["end_pos"] += chunk.start_pos
 
                     # Add chunk metadata
-                    adjusted_entity["chunk_index"] = chunk.chunk_index
-                    adjusted_entity["chunk_metadata"] = {
+                    entity["chunk_index"] = chunk.chunk_index
+                    entity["chunk_metadata"] = {
                         "chunk_start": chunk.start_pos,
                         "chunk_end": chunk.end_pos,
                         "chunk_type": chunk.chunk_type,
-                        "in_overlap": False  # TODO: Detect overlap regions
+                        "in_overlap": entity.get("start_pos") is not None and chunk.in_overlap(entity["start_pos"])
                     }
 
-                    adjusted_entities.append(adjusted_entity)
-
                 # Accumulate results
-                all_entities.extend(adjusted_entities)
+                all_entities.extend(chunk_entities)
                 total_tokens += chunk_result["tokens_used"]
 
+                # Teach the density model what this chunk's density produced
+                if smart_chunker.density_model is not None:
+                    entity_weight = chunk.metadata.get("entity_weight")
+                    if entity_weight is None:
+                        entity_weight = smart_chunker.density_model.text_weight(chunk.text)
+                    smart_chunker.density_model.record(
+                        entity_weight,
+                        chunk_result.get("completion_tokens", 0),
+                        calls=chunk_result["waves_executed"]
+                    )
+
                 chunk_results.append({
                     "chunk_index": chunk.chunk_index,
-                    "entities_count": len(adjusted_entities),
+                    "entities_count": len(chunk_entities),
                     "tokens_used": chunk_result["tokens_used"],
+                    "completion_tokens": chunk_result.get("completion_tokens", 0),
+                    "entity_weight": chunk.metadata.get("entity_weight"),
                     "chunk_length": chunk.length,
                     "waves_executed": chunk_result["waves_executed"]
                 })
 
                 logger.info(f"Chunk {chunk.chunk_index + 1} complete: "
-                           f"{len(adjusted_entities)} entities, "
+                           f"{len(chunk_entities)} entities, "
                            f"{chunk_result['tokens_used']:,} tokens")
 
+            except DeadlineExceededError:
+                # Remaining chunks would only be cancelled in the queue as well
+                raise
+
             except Exception as e:
                 logger.error(f"Error processing chunk {chunk.chunk_index}: {e}")
                 # Continue with next chunk rather than failing entire extraction
@@ -1302,7 +1413,8 @@ Extract these relationship types when found:
                     for r in chunk_results
                 },
                 "average_entities_per_chunk": len(all_entities) / len(chunks) if chunks else 0,
-                "average_tokens_per_chunk": total_tokens / len(chunks) if chunks else 0
+                "average_tokens_per_chunk": total_tokens / len(chunks) if chunks else 0,
+                "density_model": smart_chunker.density_model.get_stats() if smart_chunker.density_model else None
             }
         }
 
@@ -1390,8 +1502,17 @@ Extract these relationship types when found:
             logger.info(f"Calling vLLM with guided JSON for entity extraction")
             logger.info(f"🔍 CRITICAL: Prompt length: {len(prompt)} chars")
 
-            # Call vLLM with structured output constraint
-            response = await self.vllm_client.generate_chat_completion(request)
+            # Call vLLM with structured output constraint, micro-batched with
+            # concurrent extraction calls when the client can take a batch in
+            # one call (HTTP clients already overlap on the server's batching;
+            # ThrottledVLLMClient batches its admitted calls itself)
+            if (
+                settings.vllm_direct.vllm_enable_micro_batching
+                and getattr(self.vllm_client, "supports_native_batching", False) is True
+            ):
+                response = await get_micro_batcher().submit(self.vllm_client, request)
+            else:
+                response = await self.vllm_client.generate_chat_completion(request)
 
             logger.info(f"✅ vLLM response received ({response.usage.total_tokens} tokens)")
             logger.info(f"🔍 CRITICAL: Response content length: {len(response.content)} chars")
@@ -1400,7 +1521,8 @@ Extract these relationship types when found:
             # Response is now guaranteed to match EntityExtractionResponse schema
             return {
                 "text": response.content,  # JSON string matching schema
-                "tokens_used": response.usage.total_tokens
+                "tokens_used": response.usage.total_tokens,
+                "completion_tokens": response.usage.completion_tokens
             }
 
         except Exception as e:
@@ -1648,7 +1770,8 @@ Extract these relationship types when found:
 # Factory function for creating orchestrator
 def create_extraction_orchestrator(
     prompt_manager: Optional[PromptManager] = None,
-    vllm_client: Optional[Any] = None
+    vllm_client: Optional[Any] = None,
+    smart_chunker: Optional[Any] = None
 ) -> ExtractionOrchestrator:
     """
     Factory function for creating ExtractionOrchestrator.
@@ -1656,11 +1779,13 @@ def create_extraction_orchestrator(
     Args:
         prompt_manager: Optional PromptManager instance
         vllm_client: Optional vLLM client instance
+        smart_chunker: Optional SmartChunker instance
 
     Returns:
         ExtractionOrchestrator instance
     """
     return ExtractionOrchestrator(
         prompt_manager=prompt_manager,
-        vllm_client=vllm_client
+        vllm_client=vllm_client,
+        smart_chunker=smart_chunker
     )
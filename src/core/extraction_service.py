@@ -20,6 +20,8 @@ from ..models.responses import ExtractionResponse, ProcessingSummary
 from ..models.entities import Entity, Citation, EntityRelationship, ExtractionMethod, TextPosition, EntityType
 from ..models.extraction_strategy import ExtractionStrategy, UnifiedConfig, PageBatchConfig
 from .page_batch_processor import PageBatchProcessor
+from .document_index import DocumentIndex
+from .entity_density import get_entity_density_model
 from .config import get_settings, Settings
 from .config import get_runtime_config
 from .response_cache import get_response_cache
@@ -817,9 +819,12 @@ class ExtractionService:
         if not self._smart_chunker:
             self._smart_chunker = SmartChunker(self.runtime_config)
         
+        # Scan the document's structure once for every chunking stage
+        index = DocumentIndex.build(request.text)
         chunks = self._smart_chunker.chunk_document(
             request.text,
-            strategy="legal"  # Legal chunking for multipass
+            strategy="legal",  # Legal chunking for multipass
+            index=index
         )
         
         self.logger.info(f"Processing {len(chunks)} chunks with multipass extraction")
@@ -1049,11 +1054,14 @@ class ExtractionService:
         if not self._smart_chunker:
             self._smart_chunker = SmartChunker(self.runtime_config)
         
-        # Use the smart chunking method for documents >50K
+        # Use the smart chunking method for documents >50K, scanning the
+        # document's structure once for every chunking stage
+        index = DocumentIndex.build(request.text)
         chunks = self._smart_chunker.smart_chunk_document(
             request.text,
             strategy=ChunkingStrategy.LEGAL_AWARE,  # Use legal-aware for multipass
-            document_type=self._smart_chunker.detect_document_type(request.text)
+            document_type=self._smart_chunker.detect_document_type(request.text, index),
+            index=index
         )
         
         self.logger.info(f"Smart chunking: Processing {len(chunks)} optimized chunks with multipass extraction")
@@ -1442,9 +1450,12 @@ class ExtractionService:
         if not self._smart_chunker:
             self._smart_chunker = SmartChunker(self.runtime_config)
         
+        # Scan the document's structure once for every chunking stage
+        index = DocumentIndex.build(request.text)
         chunks = self._smart_chunker.chunk_document(
             request.text,
-            strategy="semantic"  # Semantic chunking for AI-enhanced
+            strategy="semantic",  # Semantic chunking for AI-enhanced
+            index=index
         )
         
         self.logger.info(f"Processing {len(chunks)} chunks with AI-enhanced extraction")
@@ -1581,11 +1592,14 @@ class ExtractionService:
         if not self._smart_chunker:
             self._smart_chunker = SmartChunker(self.runtime_config)
         
-        # Use the smart chunking method for documents >50K
+        # Use the smart chunking method for documents >50K, scanning the
+        # document's structure once for every chunking stage
+        index = DocumentIndex.build(request.text)
         chunks = self._smart_chunker.smart_chunk_document(
             request.text,
             strategy=ChunkingStrategy.LEGAL_AWARE,  # Use legal-aware for AI-enhanced
-            document_type=self._smart_chunker.detect_document_type(request.text)
+            document_type=self._smart_chunker.detect_document_type(request.text, index),
+            index=index
         )
         
         self.logger.info(f"Smart chunking: Processing {len(chunks)} optimized chunks with AI-enhanced extraction")
@@ -2016,7 +2030,8 @@ class ExtractionService:
         chunking_strategy = self._get_chunking_strategy(strategy)
         chunks = self._smart_chunker.chunk_document(
             document_text, 
-            strategy=chunking_strategy
+            strategy=chunking_strategy,
+            index=DocumentIndex.build(document_text)
         )
         
         self.logger.info(
@@ -3476,13 +3491,18 @@ class ExtractionService:
             batch_summaries = []
             cross_references = []
             
-            # Initialize PageBatch processor with configuration
-            processor = PageBatchProcessor(config)
+            # Initialize PageBatch processor with configuration; with density
+            # sizing, batches hold a roughly constant expected entity count
+            density_model = None
+            if self.settings.chunking.adaptive_density_enabled:
+                density_model = get_entity_density_model()
+            processor = PageBatchProcessor(config, density_model=density_model)
             
             # Process document into intelligent page batches
             page_batches = processor.process_document(
                 content=request.text,
-                document_metadata={"document_id": request.document_id}
+                document_metadata={"document_id": request.document_id},
+                index=DocumentIndex.build(request.text)
             )
             
             total_batches = len(page_batches)
@@ -0,0 +1,629 @@
+"""
+Incremental re-chunking and re-extraction for edited documents.
+
+A new version of a document usually differs from the previous one in a few
+paragraphs, yet the orchestrator re-chunks it and runs every extraction wave
+over the whole text again. IncrementalExtractor instead:
+
+1. Diffs the new text against the previously stored version (line-level
+   SequenceMatcher, converted to character offsets) into an OffsetMap
+2. Keeps the previous chunks whose content is unchanged and rebases their
+   entities through the OffsetMap
+3. Re-extracts only the changed regions, widened by a context margin so
+   entities that straddle an edit are seen whole
+4. Returns the full entity set plus a delta (added / removed / moved)
+
+Previous versions come from a VersionStore: LocalVersionStore keeps them in
+process memory, GraphVersionStore rebuilds them from the chunks and entities
+GraphStorageService wrote to graph.chunks and graph.entities.
+"""
+
+import bisect
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.core.smart_chunker import SmartChunker
+
+logger = logging.getLogger(__name__)
+
+Span = Tuple[int, int]
+
+# extract_fn(text, metadata) -> {"entities": [...], ...}, e.g. ExtractionOrchestrator._extract_three_wave
+ExtractFn = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+# ============================================================================
+# Offset mapping
+# ============================================================================
+
+class OffsetMap:
+    """
+    Maps character offsets of an old text onto a new text.
+
+    Built from the equal blocks of a line-level diff: offsets inside an
+    unchanged block move by that block's shift, offsets inside replaced,
+    inserted or deleted lines have no image in the new text.
+    """
+
+    def __init__(self, equal_blocks: List[Tuple[int, int, int]], changed: List[Span]):
+        """
+        Initialize OffsetMap.
+
+        Args:
+            equal_blocks: (old_start, new_start, length) of unchanged text, in order
+            changed: Changed spans in new-text coordinates (empty spans mark deletions)
+        """
+        self._old_starts = [block[0] for block in equal_blocks]
+        self._new_starts = [block[1] for block in equal_blocks]
+        self._lengths = [block[2] for block in equal_blocks]
+        self._changed = changed
+
+    @classmethod
+    def from_texts(cls, old_text: str, new_text: str) -> "OffsetMap":
+        """
+        Diff two texts line by line.
+
+        Args:
+            old_text: Previous version
+            new_text: New version
+
+        Returns:
+            OffsetMap from old_text offsets to new_text offsets
+        """
+        old_lines = old_text.splitlines(keepends=True)
+        new_lines = new_text.splitlines(keepends=True)
+
+        # Trim the common prefix and suffix before diffing: edits are usually
+        # local, and SequenceMatcher is quadratic in the differing middle
+        prefix = 0
+        limit = min(len(old_lines), len(new_lines))
+        while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix
+               and old_lines[len(old_lines) - 1 - suffix] == new_lines[len(new_lines) - 1 - suffix]):
+            suffix += 1
+
+        old_offsets = _line_offsets(old_lines)
+        new_offsets = _line_offsets(new_lines)
+
+        opcodes = [("equal", 0, prefix, 0, prefix)]
+        middle = SequenceMatcher(
+            None,
+            old_lines[prefix:len(old_lines) - suffix],
+            new_lines[prefix:len(new_lines) - suffix],
+            autojunk=False
+        ).get_opcodes()
+        for tag, i1, i2, j1, j2 in middle:
+            opcodes.append((tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+        opcodes.append(("equal", len(old_lines) - suffix, len(old_lines),
+                        len(new_lines) - suffix, len(new_lines)))
+
+        equal_blocks: List[Tuple[int, int, int]] = []
+        changed: List[Span] = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            old_start, new_start = old_offsets[i1], new_offsets[j1]
+            if tag == "equal":
+                length = old_offsets[i2] - old_start
+                if not length:
+                    continue
+                last = equal_blocks[-1] if equal_blocks else None
+                if last and last[0] + last[2] == old_start and last[1] + last[2] == new_start:
+                    equal_blocks[-1] = (last[0], last[1], last[2] + length)
+                else:
+                    equal_blocks.append((old_start, new_start, length))
+            else:
+                changed.append((new_start, new_offsets[j2]))
+
+        return cls(equal_blocks, changed)
+
+    def map_span(self, start: int, end: int) -> Optional[Span]:
+        """
+        Map an old-text span onto the new text.
+
+        Args:
+            start: Start offset in the old text
+            end: End offset in the old text
+
+        Returns:
+            (start, end) in the new text, or None if the span touches changed text
+        """
+        i = bisect.bisect_right(self._old_starts, start) - 1
+        if i < 0 or end > self._old_starts[i] + self._lengths[i]:
+            return None
+        shift = self._new_starts[i] - self._old_starts[i]
+        return start + shift, end + shift
+
+    def changed_spans(self) -> List[Span]:
+        """Changed spans in new-text coordinates (empty spans mark deletions)."""
+        return list(self._changed)
+
+    @property
+    def unchanged_chars(self) -> int:
+        return sum(self._lengths)
+
+
+def _line_offsets(lines: List[str]) -> List[int]:
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+def _overlaps(span: Span, regions: List[Span], region_starts: List[int]) -> bool:
+    """True if span intersects any of the sorted, disjoint regions."""
+    i = bisect.bisect_right(region_starts, span[0]) - 1
+    if i >= 0 and regions[i][1] > span[0]:
+        return True
+    return i + 1 < len(regions) and regions[i + 1][0] < span[1]
+
+
+# ============================================================================
+# Version stores
+# ============================================================================
+
+@dataclass
+class DocumentVersion:
+    """A processed document version: its text, chunk spans and entities."""
+    document_id: str
+    text: str
+    chunks: List[Span] = field(default_factory=list)
+    entities: List[Dict[str, Any]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+
+class LocalVersionStore:
+    """In-process store of the latest version of each document (LRU)."""
+
+    def __init__(self, max_documents: int = 256):
+        """
+        Initialize LocalVersionStore.
+
+        Args:
+            max_documents: Documents kept before the least recently used is evicted
+        """
+        self.max_documents = max_documents
+        self._versions: "OrderedDict[str, DocumentVersion]" = OrderedDict()
+
+    async def load(self, document_id: str) -> Optional[DocumentVersion]:
+        version = self._versions.get(document_id)
+        if version is not None:
+            self._versions.move_to_end(document_id)
+        return version
+
+    async def save(self, version: DocumentVersion):
+        self._versions[version.document_id] = version
+        self._versions.move_to_end(version.document_id)
+        while len(self._versions) > self.max_documents:
+            self._versions.popitem(last=False)
+
+    async def delete(self, document_id: str):
+        self._versions.pop(document_id, None)
+
+
+class GraphVersionStore:
+    """
+    Previous versions read from graph.chunks / graph.entities.
+
+    The text is rebuilt from chunk content placed at each chunk's
+    ``start_char``. Versions saved through this store partition the text into
+    contiguous chunks, so the rebuild is exact; chunks written by other
+    pipelines may leave gaps, which are filled with spaces. graph.entities
+    holds one row per (type, text), or per canonical entity when storage
+    resolves entities across documents (the row then keeps the document's
+    own text in metadata.mention_text), so only the first occurrence of a
+    repeated entity can be rebased from there.
+    """
+
+    def __init__(self, storage):
+        """
+        Initialize GraphVersionStore.
+
+        Args:
+            storage: GraphStorageService instance
+        """
+        self.storage = storage
+
+    async def load(self, document_id: str) -> Optional[DocumentVersion]:
+        records = await self.storage.get_chunks_by_document(document_id)
+        if not records:
+            return None
+
+        pieces = []
+        for record in records:
+            start = (record.get("metadata") or {}).get("start_char")
+            if start is None:
+                logger.info(f"Stored chunks of {document_id} have no offsets, skipping incremental path")
+                return None
+            pieces.append((start, record.get("content") or ""))
+
+        parts: List[str] = []
+        length = 0
+        for start, content in sorted(pieces, key=lambda piece: piece[0]):
+            if start > length:
+                parts.append(" " * (start - length))
+                length = start
+            if start + len(content) > length:
+                parts.append(content[length - start:])
+                length = start + len(content)
+        text = "".join(parts)
+
+        entities = []
+        for record in await self.storage.get_entities_by_document(document_id):
+            record_metadata = record.get("metadata") or {}
+            entities.append({
+                "text": record_metadata.get("mention_text") or record.get("entity_text", ""),
+                "entity_type": record.get("entity_type", "UNKNOWN"),
+                "confidence": record.get("confidence"),
+                "start_pos": record_metadata.get("start_char"),
+                "end_pos": record_metadata.get("end_char")
+            })
+
+        chunks = [(start, start + len(content)) for start, content in pieces]
+        return DocumentVersion(document_id=document_id, text=text, chunks=chunks, entities=entities)
+
+    async def save(self, version: DocumentVersion):
+        text = version.text
+        boundaries = sorted({start for start, _ in version.chunks} | {0})
+        boundaries.append(len(text))
+        chunk_records = [
+            {"text": text[start:end], "chunk_index": i, "start_char": start, "end_char": end}
+            for i, (start, end) in enumerate(zip(boundaries, boundaries[1:]))
+            if end > start
+        ]
+        entity_records = [
+            {
+                "type": entity.get("entity_type", entity.get("type", "UNKNOWN")),
+                "text": entity.get("text", ""),
+                "confidence": entity.get("confidence", 0.95),
+                "start_char": entity.get("start_pos"),
+                "end_char": entity.get("end_pos")
+            }
+            for entity in version.entities
+        ]
+
+        await self.storage.delete_document_data(version.document_id)
+        await self.storage.store_chunks_and_entities(version.document_id, chunk_records, entity_records)
+
+    async def delete(self, document_id: str):
+        await self.storage.delete_document_data(document_id)
+
+
+# ============================================================================
+# Incremental extraction
+# ============================================================================
+
+@dataclass
+class EntityDelta:
+    """Entity changes between two document versions."""
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    moved: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "moved": self.moved,
+            "counts": {"added": len(self.added), "removed": len(self.removed), "moved": len(self.moved)}
+        }
+
+
+@dataclass
+class IncrementalResult:
+    """Result of an incremental extraction."""
+    entities: List[Dict[str, Any]]
+    delta: EntityDelta
+    chunks: List[Span]
+    full_extraction: bool
+    stats: Dict[str, Any]
+
+
+def _entity_key(entity: Dict[str, Any]) -> Tuple[str, str]:
+    entity_type = entity.get("entity_type", entity.get("type", "UNKNOWN"))
+    return entity_type, (entity.get("text") or "").lower().strip()
+
+
+def _entity_span(entity: Dict[str, Any]) -> Optional[Span]:
+    start, end = entity.get("start_pos"), entity.get("end_pos")
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+class IncrementalExtractor:
+    """
+    Diff-aware extraction for new versions of known documents.
+
+    Example:
+        >>> extractor = IncrementalExtractor(orchestrator._extract_three_wave)
+        >>> first = await extractor.extract("doc-1", text_v1)   # full extraction
+        >>> second = await extractor.extract("doc-1", text_v2)  # changed regions only
+        >>> second.delta.added, second.delta.removed
+    """
+
+    def __init__(
+        self,
+        extract_fn: ExtractFn,
+        store=None,
+        chunker: Optional[SmartChunker] = None,
+        context_margin: int = 1000,
+        max_region_size: Optional[int] = None,
+        dedupe_fn: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+    ):
+        """
+        Initialize IncrementalExtractor.
+
+        Args:
+            extract_fn: Async extraction over a text piece, returning {"entities": [...]}
+                with positions relative to the piece
+            store: Version store (LocalVersionStore or GraphVersionStore)
+            chunker: SmartChunker used to split large regions
+            context_margin: Characters re-extracted on each side of a change
+            max_region_size: Largest piece sent to extract_fn, in the chunker's sizing
+                units (characters, or tokens with CHUNKING_MAX_TOKENS); defaults to
+                the chunker's max_size
+            dedupe_fn: Optional deduplication over the returned entity list (the
+                stored version and the delta keep every mention)
+        """
+        self.extract_fn = extract_fn
+        self.store = store or LocalVersionStore()
+        self.chunker = chunker or SmartChunker()
+        self.context_margin = context_margin
+        self.max_region_size = max_region_size or self.chunker.max_size
+        self.dedupe_fn = dedupe_fn
+
+    @classmethod
+    def from_settings(cls, extract_fn: ExtractFn, settings=None, **kwargs) -> "IncrementalExtractor":
+        """
+        Create an incremental extractor from centralized settings.
+
+        Args:
+            extract_fn: Async extraction over a text piece
+            settings: EntityExtractionServiceSettings instance (or None to load from get_settings())
+            **kwargs: Overrides for store, chunker or dedupe_fn
+
+        Returns:
+            IncrementalExtractor configured from chunking settings
+        """
+        if settings is None:
+            from src.core.config import get_settings
+            settings = get_settings()
+
+        chunking = settings.chunking
+        kwargs.setdefault("store", get_version_store())
+        kwargs.setdefault("chunker", SmartChunker(chunking))
+        return cls(
+            extract_fn,
+            context_margin=chunking.incremental_context_margin,
+            max_region_size=chunking.incremental_max_region_size,
+            **kwargs
+        )
+
+    async def extract(
+        self,
+        document_id: str,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> IncrementalResult:
+        """
+        Extract entities from a document version, reusing the previous version's work.
+
+        Args:
+            document_id: Stable document identifier across versions
+            text: Full text of the new version
+            metadata: Optional document metadata passed to extract_fn
+
+        Returns:
+            IncrementalResult with the full entity set and the delta to the previous version
+        """
+        started = time.time()
+        previous = await self.store.load(document_id)
+
+        if previous is None:
+            omap = None
+            regions = [(0, len(text))] if text.strip() else []
+            kept_chunks: List[Span] = []
+            carried: List[Dict[str, Any]] = []
+        else:
+            omap = OffsetMap.from_texts(previous.text, text)
+            regions = self._dirty_regions(text, omap.changed_spans())
+            region_starts = [start for start, _ in regions]
+
+            kept_chunks = []
+            for chunk in previous.chunks:
+                mapped = omap.map_span(*chunk)
+                if mapped and not _overlaps(mapped, regions, region_starts):
+                    kept_chunks.append(mapped)
+
+            carried = []
+            for entity in previous.entities:
+                span = _entity_span(entity)
+                if span is None:
+                    # Positionless entities survive while their text does
+                    if entity.get("text") and entity["text"] in text:
+                        carried.append(dict(entity))
+                    continue
+                mapped = omap.map_span(*span)
+                if mapped and not _overlaps(mapped, regions, region_starts):
+                    carried.append({**entity, "start_pos": mapped[0], "end_pos": mapped[1]})
+
+        pieces = [
+            piece
+            for start, end in regions
+            for piece in self.chunker.split_span(text, start, end, self.max_region_size)
+        ]
+        extracted, tokens_used = await self._extract_pieces(document_id, text, pieces, metadata)
+
+        # Margins overlap carried text: keep the carried copy of anything found twice
+        carried_keys = {(_entity_key(e), _entity_span(e)) for e in carried}
+        fresh = [e for e in extracted if (_entity_key(e), _entity_span(e)) not in carried_keys]
+        mentions = sorted(
+            carried + fresh,
+            key=lambda e: (e.get("start_pos") is None, e.get("start_pos") or 0)
+        )
+
+        # Versions keep every positioned mention; deduplication would drop the
+        # copies a later edit needs to carry forward
+        delta = self._delta(previous.entities if previous else [], mentions, omap)
+        chunks = sorted(kept_chunks + pieces)
+        await self.store.save(DocumentVersion(
+            document_id=document_id, text=text, chunks=chunks, entities=mentions
+        ))
+        entities = self.dedupe_fn(mentions) if self.dedupe_fn else mentions
+
+        chars_reextracted = sum(end - start for start, end in pieces)
+        stats = {
+            "document_length": len(text),
+            "changed_regions": len(omap.changed_spans()) if omap else 0,
+            "chunks_reused": len(kept_chunks),
+            "chunks_reextracted": len(pieces),
+            "chars_reextracted": chars_reextracted,
+            "reextracted_ratio": chars_reextracted / len(text) if text else 0.0,
+            "entities_carried": len(carried),
+            "entities_extracted": len(extracted),
+            "tokens_used": tokens_used,
+            "processing_time": time.time() - started
+        }
+        logger.info(
+            f"Incremental extraction of {document_id}: "
+            f"{'full (no previous version)' if previous is None else 'diff'}, "
+            f"{len(pieces)} pieces re-extracted ({chars_reextracted:,}/{len(text):,} chars), "
+            f"{len(kept_chunks)} chunks reused, delta +{len(delta.added)} "
+            f"-{len(delta.removed)} ~{len(delta.moved)}"
+        )
+
+        return IncrementalResult(
+            entities=entities,
+            delta=delta,
+            chunks=chunks,
+            full_extraction=previous is None,
+            stats=stats
+        )
+
+    def _dirty_regions(self, text: str, changed: List[Span]) -> List[Span]:
+        """Widen changed spans by the context margin, snap to whitespace and merge."""
+        regions: List[Span] = []
+        for start, end in changed:
+            start = max(0, start - self.context_margin)
+            end = min(len(text), end + self.context_margin)
+            while start > 0 and not text[start - 1].isspace():
+                start -= 1
+            while end < len(text) and not text[end].isspace():
+                end += 1
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], max(end, regions[-1][1]))
+            else:
+                regions.append((start, end))
+        return [region for region in regions if region[1] > region[0]]
+
+    async def _extract_pieces(
+        self,
+        document_id: str,
+        text: str,
+        pieces: List[Span],
+        metadata: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        entities: List[Dict[str, Any]] = []
+        tokens_used = 0
+        for index, (start, end) in enumerate(pieces):
+            result = await self.extract_fn(
+                text[start:end],
+                {
+                    **(metadata or {}),
+                    "document_id": document_id,
+                    "incremental": True,
+                    "chunk_index": index,
+                    "chunk_start_pos": start,
+                    "chunk_end_pos": end
+                }
+            )
+            for entity in result.get("entities", []):
+                if entity.get("start_pos") is not None:
+                    entity["start_pos"] += start
+                if entity.get("end_pos") is not None:
+                    entity["end_pos"] += start
+                entities.append(entity)
+            tokens_used += result.get("tokens_used", 0)
+        return entities, tokens_used
+
+    @staticmethod
+    def _delta(
+        old_entities: List[Dict[str, Any]],
+        new_entities: List[Dict[str, Any]],
+        omap: Optional[OffsetMap]
+    ) -> EntityDelta:
+        """
+        Pair old and new entities by (type, normalized text).
+
+        A pair whose old position maps onto the new position is unchanged (at
+        most rebased); other pairs are moves. Unpaired entities are added or
+        removed.
+        """
+        old_by_key: Dict[Tuple[str, str], List[Tuple[Dict[str, Any], Optional[Span]]]] = defaultdict(list)
+        for entity in old_entities:
+            span = _entity_span(entity)
+            mapped = omap.map_span(*span) if (omap and span) else None
+            old_by_key[_entity_key(entity)].append((entity, mapped))
+
+        delta = EntityDelta()
+        unmatched_new: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for entity in new_entities:
+            key = _entity_key(entity)
+            candidates = old_by_key.get(key)
+            span = _entity_span(entity)
+            match = None
+            if candidates:
+                match = next((i for i, (_, mapped) in enumerate(candidates) if mapped == span), None)
+            if match is not None:
+                candidates.pop(match)
+            else:
+                unmatched_new[key].append(entity)
+
+        for key, entities in unmatched_new.items():
+            candidates = old_by_key.get(key, [])
+            for entity in entities:
+                if candidates:
+                    old_entity, _ = candidates.pop(0)
+                    delta.moved.append({
+                        **entity,
+                        "previous_start_pos": old_entity.get("start_pos"),
+                        "previous_end_pos": old_entity.get("end_pos")
+                    })
+                else:
+                    delta.added.append(entity)
+
+        for candidates in old_by_key.values():
+            delta.removed.extend(entity for entity, _ in candidates)
+
+        return delta
+
+
+# Global version store
+_version_store = None
+
+
+def get_version_store():
+    """
+    Get the shared document version store.
+
+    Returns:
+        GraphVersionStore when INCREMENTAL_VERSION_STORE=graph, LocalVersionStore otherwise
+    """
+    global _version_store
+    if _version_store is None:
+        from src.core.config import get_settings
+        settings = get_settings()
+        if settings.chunking.incremental_version_store == "graph":
+            from src.database.graph_storage import GraphStorageService
+            _version_store = GraphVersionStore(GraphStorageService(
+                supabase_url=settings.supabase.supabase_url,
+                supabase_key=settings.supabase.supabase_service_key
+            ))
+        else:
+            _version_store = LocalVersionStore(settings.chunking.incremental_max_documents)
+    return _version_store
@@ -9,11 +9,37 @@ batch size calculation for comprehensive entity extraction with 195+ entity type
 import re
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from ..models.extraction_strategy import PageBatchConfig
+from .document_index import DocumentIndex
+from .entity_density import EntityDensityModel
 
 logger = logging.getLogger(__name__)
 
+# Explicit page breaks, tried in order
+PAGE_BREAK_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\f',  # Form feed character
+        r'\n\s*Page\s+\d+\s*\n',  # "Page X" markers
+        r'\n\s*-\s*\d+\s*-\s*\n',  # "- X -" page numbers
+        r'\n\s*\d+\s*\n\s*\n',  # Standalone page numbers
+    )
+]
+
+# Legal document boundaries for heuristic page splitting, tried in order
+DOCUMENT_BOUNDARY_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+        r'\n\s*(?:CASE\s+NO\.?|Case\s+Number)\s*:?\s*\d+',  # Case number headers
+        r'\n\s*(?:IN\s+THE\s+(?:UNITED\s+STATES\s+)?(?:DISTRICT\s+)?COURT)',  # Court headers
+        r'\n\s*(?:UNITED\s+STATES\s+(?:DISTRICT\s+)?COURT)',  # US Court headers
+        r'\n\s*(?:SUPERIOR\s+COURT\s+OF)',  # Superior court headers
+        r'\n\s*(?:STATE\s+OF\s+\w+)',  # State headers
+        r'\n\s*(?:BEFORE\s+THE\s+)',  # Administrative headers
+        r'\n\s*(?:ORDER\s*(?:GRANTING|DENYING)?)',  # Order headers
+        r'\n\s*(?:MEMORANDUM\s+(?:OPINION\s+)?(?:AND\s+)?ORDER)',  # Memorandum headers
+    )
+]
+
 @dataclass
 class DocumentPage:
     """Represents a single page of a document."""
@@ -28,18 +54,35 @@ class DocumentPage:
         """Check if page has substantial content (>50 words)."""
         return self.word_count > 50
 
+def combine_page_content(pages: List[DocumentPage]) -> str:
+    """Join page contents with page-number separators."""
+    if not pages:
+        return ""
+        
+    if len(pages) == 1:
+        return pages[0].content
+        
+    # Combine pages with clear separators
+    return "\n\n".join(
+        f"\n=== Page {page.page_number} ===\n{page.content}" for page in pages
+    )
+
 @dataclass
 class PageBatch:
-    """Represents a batch of document pages for processing."""
+    """Represents a batch of document pages for processing.
+    
+    The batch references its pages (and the overlap pages borrowed from the
+    previous batch) instead of holding copies of their text; the prompt text
+    is built on access.
+    """
     batch_id: int
     pages: List[DocumentPage]
     start_page: int
     end_page: int
-    combined_content: str
     word_count: int
     char_count: int
     estimated_complexity: str
-    context_overlap: str  # Content overlapping with previous batch
+    overlap_pages: List[DocumentPage] = field(default_factory=list)  # Pages repeated from previous batch
     
     @property
     def page_range(self) -> str:
@@ -47,6 +90,22 @@ class PageBatch:
         if self.start_page == self.end_page:
             return f"Page {self.start_page}"
         return f"Pages {self.start_page}-{self.end_page}"
+    
+    @property
+    def context_overlap(self) -> str:
+        """Content overlapping with previous batch."""
+        if not self.overlap_pages:
+            return ""
+        overlap_content = combine_page_content(self.overlap_pages)
+        return f"=== Context from Previous Batch ===\n{overlap_content}\n=== Current Batch Content ==="
+    
+    @property
+    def combined_content(self) -> str:
+        """Batch text for the prompt, preceded by any context overlap."""
+        content = combine_page_content(self.pages)
+        if self.overlap_pages:
+            return self.context_overlap + "\n\n" + content
+        return content
 
 class PageBatchProcessor:
     """
@@ -56,18 +115,35 @@ class PageBatchProcessor:
     optimized batches for comprehensive entity extraction with context preservation.
     """
     
-    def __init__(self, config: Optional[PageBatchConfig] = None):
-        """Initialize the PageBatch processor."""
+    def __init__(
+        self,
+        config: Optional[PageBatchConfig] = None,
+        density_model: Optional[EntityDensityModel] = None
+    ):
+        """Initialize the PageBatch processor.
+        
+        Args:
+            config: Page batch configuration
+            density_model: When given, batches are sized by expected entity
+                count instead of page complexity
+        """
         self.config = config or PageBatchConfig()
+        self.density_model = density_model
         self.logger = logging.getLogger(f"{__name__}.PageBatchProcessor")
         
-    def process_document(self, content: str, document_metadata: Dict[str, Any] = None) -> List[PageBatch]:
+    def process_document(
+        self,
+        content: str,
+        document_metadata: Dict[str, Any] = None,
+        index: Optional[DocumentIndex] = None
+    ) -> List[PageBatch]:
         """
         Process a document into optimized page batches.
         
         Args:
             content: Full document text
             document_metadata: Optional metadata about the document
+            index: Structure index of content shared with other pipeline stages
             
         Returns:
             List of PageBatch objects ready for entity extraction
@@ -75,7 +151,7 @@ class PageBatchProcessor:
         self.logger.info(f"Processing document into page batches (batch_size: {self.config.batch_size})")
         
         # Split document into pages
-        pages = self._split_into_pages(content)
+        pages = self._split_into_pages(content, index)
         self.logger.info(f"Document split into {len(pages)} pages")
         
         # Create batches from pages
@@ -88,52 +164,55 @@ class PageBatchProcessor:
             
         return batches
     
-    def _split_into_pages(self, content: str) -> List[DocumentPage]:
-        """Split document content into individual pages."""
-        
-        # Method 1: Look for explicit page breaks
-        page_breaks = [
-            r'\f',  # Form feed character
-            r'\n\s*Page\s+\d+\s*\n',  # "Page X" markers
-            r'\n\s*-\s*\d+\s*-\s*\n',  # "- X -" page numbers
-            r'\n\s*\d+\s*\n\s*\n',  # Standalone page numbers
-        ]
+    def _split_into_pages(self, content: str, index: Optional[DocumentIndex] = None) -> List[DocumentPage]:
+        """Split document content into individual pages.
         
-        # Try to find explicit page breaks
-        for pattern in page_breaks:
-            if re.search(pattern, content, re.IGNORECASE):
-                pages_content = re.split(pattern, content, flags=re.IGNORECASE)
-                if len(pages_content) > 1:
-                    return self._create_pages_from_content(pages_content)
+        With an index covering content, page-break matches come from its
+        shared scans instead of a re.search plus re.split per pattern.
+        """
+        if index is not None and not index.covers(content):
+            index = None
+        
+        # Method 1: Try to find explicit page breaks
+        for pattern in PAGE_BREAK_PATTERNS:
+            breaks = self._match_spans(content, pattern, index)
+            if breaks:
+                pages_content = []
+                start = 0
+                for break_start, break_end in breaks:
+                    pages_content.append(content[start:break_start])
+                    start = break_end
+                pages_content.append(content[start:])
+                return self._create_pages_from_content(pages_content)
         
         # Method 2: Heuristic page splitting based on content patterns
-        pages_content = self._heuristic_page_split(content)
+        pages_content = self._heuristic_page_split(content, index)
         return self._create_pages_from_content(pages_content)
     
-    def _heuristic_page_split(self, content: str) -> List[str]:
+    def _match_spans(
+        self,
+        content: str,
+        pattern: re.Pattern,
+        index: Optional[DocumentIndex]
+    ) -> List[Tuple[int, int]]:
+        """Spans of pattern's matches in content, from the index when given."""
+        if index is not None:
+            return index.spans(pattern)
+        return [match.span() for match in pattern.finditer(content)]
+    
+    def _heuristic_page_split(self, content: str, index: Optional[DocumentIndex] = None) -> List[str]:
         """Use heuristics to split content into logical pages."""
         
         # For legal documents, look for section breaks, case boundaries, etc.
-        split_patterns = [
-            r'\n\s*(?:CASE\s+NO\.?|Case\s+Number)\s*:?\s*\d+',  # Case number headers
-            r'\n\s*(?:IN\s+THE\s+(?:UNITED\s+STATES\s+)?(?:DISTRICT\s+)?COURT)',  # Court headers
-            r'\n\s*(?:UNITED\s+STATES\s+(?:DISTRICT\s+)?COURT)',  # US Court headers
-            r'\n\s*(?:SUPERIOR\s+COURT\s+OF)',  # Superior court headers
-            r'\n\s*(?:STATE\s+OF\s+\w+)',  # State headers
-            r'\n\s*(?:BEFORE\s+THE\s+)',  # Administrative headers
-            r'\n\s*(?:ORDER\s*(?:GRANTING|DENYING)?)',  # Order headers
-            r'\n\s*(?:MEMORANDUM\s+(?:OPINION\s+)?(?:AND\s+)?ORDER)',  # Memorandum headers
-        ]
-        
         # Try splitting on legal document boundaries
-        for pattern in split_patterns:
-            matches = list(re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE))
+        for pattern in DOCUMENT_BOUNDARY_PATTERNS:
+            matches = self._match_spans(content, pattern, index)
             if len(matches) > 1:
                 pages = []
                 start = 0
-                for match in matches[1:]:  # Skip first match
-                    pages.append(content[start:match.start()].strip())
-                    start = match.start()
+                for match_start, _ in matches[1:]:  # Skip first match
+                    pages.append(content[start:match_start].strip())
+                    start = match_start
                 pages.append(content[start:].strip())  # Last page
                 
                 # Filter out very short pages
@@ -231,9 +310,6 @@ class PageBatchProcessor:
             if not batch_pages:
                 break
             
-            # Combine content from all pages in batch
-            combined_content = self._combine_page_content(batch_pages)
-            
             # Calculate batch statistics
             total_words = sum(page.word_count for page in batch_pages)
             total_chars = sum(page.char_count for page in batch_pages)
@@ -248,11 +324,9 @@ class PageBatchProcessor:
                 pages=batch_pages,
                 start_page=batch_pages[0].page_number,
                 end_page=batch_pages[-1].page_number,
-                combined_content=combined_content,
                 word_count=total_words,
                 char_count=total_chars,
-                estimated_complexity=batch_complexity,
-                context_overlap=""  # Will be filled by _add_context_overlap if needed
+                estimated_complexity=batch_complexity
             )
             
             batches.append(batch)
@@ -266,6 +340,9 @@ class PageBatchProcessor:
         
         if not remaining_pages:
             return self.config.batch_size
+        
+        if self.density_model is not None:
+            return self._density_batch_size(remaining_pages)
             
         # For complex pages, use smaller batches
         complex_pages = sum(1 for page in remaining_pages[:self.config.batch_size * 2] 
@@ -283,21 +360,21 @@ class PageBatchProcessor:
             
         return min(len(remaining_pages), self.config.batch_size)
     
-    def _combine_page_content(self, pages: List[DocumentPage]) -> str:
-        """Intelligently combine content from multiple pages."""
-        if not pages:
-            return ""
-            
-        if len(pages) == 1:
-            return pages[0].content
-            
-        # Combine pages with clear separators
-        combined_parts = []
-        for page in pages:
-            page_header = f"\n=== Page {page.page_number} ===\n"
-            combined_parts.append(page_header + page.content)
-            
-        return "\n\n".join(combined_parts)
+    def _density_batch_size(self, remaining_pages: List[DocumentPage]) -> int:
+        """Pages whose expected entity count reaches the density model's target.
+        
+        Between 1 and twice the configured batch size; a page that would take
+        the batch past the target starts the next batch.
+        """
+        target = self.density_model.target_weight
+        max_pages = min(len(remaining_pages), self.config.batch_size * 2)
+        
+        batch_weight = 0.0
+        for count, page in enumerate(remaining_pages[:max_pages]):
+            batch_weight += self.density_model.text_weight(page.content)
+            if batch_weight > target:
+                return max(1, count)
+        return max_pages
     
     def _add_context_overlap(self, batches: List[PageBatch], pages: List[DocumentPage]) -> List[PageBatch]:
         """Add context overlap between batches for better entity continuity."""
@@ -313,12 +390,8 @@ class PageBatchProcessor:
             prev_batch = batches[i - 1]
             overlap_pages = prev_batch.pages[-self.config.overlap_pages:]
             
-            if overlap_pages:
-                overlap_content = self._combine_page_content(overlap_pages)
-                current_batch.context_overlap = f"=== Context from Previous Batch ===\n{overlap_content}\n=== Current Batch Content ==="
-                
-                # Update combined content to include overlap
-                current_batch.combined_content = current_batch.context_overlap + "\n\n" + current_batch.combined_content
+            # Reference the overlap pages; combined_content prepends them on access
+            current_batch.overlap_pages = list(overlap_pages)
                 
         return batches
     
@@ -353,7 +426,7 @@ class PageBatchProcessor:
                     "page_range": batch.page_range,
                     "word_count": batch.word_count,
                     "complexity": batch.estimated_complexity,
-                    "has_overlap": bool(batch.context_overlap)
+                    "has_overlap": bool(batch.overlap_pages)
                 }
                 for batch in batches
             ]
@@ -0,0 +1,519 @@
+"""
+Columnar snapshots of EntityRegistry state.
+
+EntityRegistry used to pickle RegistrySnapshot.dict() and zlib-compress it,
+and loading validated every entity back through pydantic and then rebuilt
+every index. A columnar snapshot instead stores:
+
+- a string table: each distinct string (ids, texts, variants, chunk ids,
+  enum values, JSON of nested attributes) once, as one UTF-8 blob plus
+  character lengths
+- entity and occurrence columns: numpy arrays of string ids, numbers and
+  offsets, with list fields (variants, occurrences, merged_from, ...) as
+  offsets into flat arrays
+- the registry's text, type and chunk indexes and the blocking index
+  buckets (sorted keys as byte-planed differences, bucket sizes), so
+  loading does not rebuild them
+- relationships and registry metadata as JSON
+
+in a deflated .npz read without pickle. A delta snapshot holds only
+the entities, relationships and index keys changed since the snapshot it
+names as its base; a registry loads the chain back to a full snapshot and
+applies the deltas in order.
+
+Snapshots are larger than the pickles they replace: 20,000 entities take
+about 7.5 MB against 1.9 MB. About 5.4 MB of that is the blocking buckets,
+whose keys are random 64-bit hashes and do not compress. Rebuilding the
+buckets on load instead (MinHash over every variant) takes about 7 s,
+against about 2 s for the whole load with them stored, so they are kept.
+"""
+
+import gc
+import json
+import os
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import chain
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+from ..models.entities import EntityAttributes, EntityType, TextPosition
+from ..models.registry import (
+    EntityOccurrence,
+    EntityRelationship,
+    ReferenceType,
+    RegisteredEntity,
+    RegistryMetadata,
+    ResolutionStatus,
+)
+from .entity_blocking import CandidateBlockingIndex
+
+
+# Format 1 stores the blocking buckets (see the module docstring for the size cost)
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = ".npz"
+
+# Registry index name -> type of its keys
+INDEX_KEY_TYPES = {"entity_index": str, "type_index": EntityType, "chunk_index": str}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING = -1  # absent optional ints and strings
+
+Index = Dict[Any, Set[str]]
+
+
+class StringTable:
+    """Interned strings, saved as one UTF-8 blob and character lengths."""
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = strings if strings is not None else []
+        self._ids: Dict[str, int] = {}
+
+    def add(self, text: Optional[str]) -> int:
+        """String id of text (_MISSING for None)"""
+        if text is None:
+            return _MISSING
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        blob = "".join(self.strings).encode("utf-8")
+        return {
+            "strings": np.frombuffer(blob, dtype=np.uint8),
+            "string_lengths": np.fromiter(map(len, self.strings), dtype=np.int64, count=len(self.strings)),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "StringTable":
+        text = arrays["strings"].tobytes().decode("utf-8")
+        ends = np.cumsum(arrays["string_lengths"]).tolist()
+        starts = [0] + ends[:-1]
+        return cls([text[start:end] for start, end in zip(starts, ends)])
+
+
+@dataclass
+class SnapshotData:
+    """Decoded contents of one snapshot file."""
+
+    header: Dict[str, Any]
+    entities: Dict[str, RegisteredEntity]
+    relationships: Dict[str, EntityRelationship]
+    metadata: RegistryMetadata
+    indexes: Dict[str, Index]
+    blocking: Optional[Tuple[List[str], Dict[str, np.ndarray]]]  # CandidateBlockingIndex.to_arrays()
+
+
+class _Ragged:
+    """Lists of ints built up as one flat array plus offsets."""
+
+    def __init__(self):
+        self.flat: List[int] = []
+        self.offsets: List[int] = [0]
+
+    def append(self, values: Iterable[int]) -> None:
+        self.flat.extend(values)
+        self.offsets.append(len(self.flat))
+
+    def to_arrays(self, name: str) -> Dict[str, np.ndarray]:
+        return {name: _compact(self.flat), f"{name}_offsets": _compact(self.offsets)}
+
+
+def _compact(values: Iterable[int]) -> np.ndarray:
+    """Integers in the smallest signed dtype that holds them"""
+    array = values if isinstance(values, np.ndarray) else np.fromiter(values, dtype=np.int64)
+    if not len(array):
+        return array.astype(np.int8)
+    low, high = array.min(), array.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return array.astype(dtype)
+    return array
+
+
+def _ragged_lists(arrays: Dict[str, np.ndarray], name: str) -> List[List[int]]:
+    flat = arrays[name].tolist()
+    offsets = arrays[f"{name}_offsets"].tolist()
+    return [flat[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause garbage collection: building or decoding a large registry creates
+    enough objects to trigger repeated full collections, none of which can
+    free anything.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _construct(model: Type[BaseModel], **values: Any) -> BaseModel:
+    """
+    Model from values that were validated when saved: model_construct
+    without its per-field default and alias handling (every field is given),
+    which dominates decoding large registries.
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _timestamp(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _position_row(position: TextPosition) -> List[int]:
+    return [
+        position.start, position.end,
+        _MISSING if position.line_number is None else position.line_number,
+        _MISSING if position.context_start is None else position.context_start,
+        _MISSING if position.context_end is None else position.context_end,
+    ]
+
+
+def _position(row: List[int]) -> TextPosition:
+    start, end, line_number, context_start, context_end = row
+    return _construct(
+        TextPosition,
+        start=start,
+        end=end,
+        line_number=None if line_number == _MISSING else line_number,
+        context_start=None if context_start == _MISSING else context_start,
+        context_end=None if context_end == _MISSING else context_end,
+    )
+
+
+def encode_snapshot(
+    header: Dict[str, Any],
+    entities: Iterable[RegisteredEntity],
+    relationships: Iterable[EntityRelationship],
+    metadata: RegistryMetadata,
+    indexes: Dict[str, Index],
+    blocking: Optional[CandidateBlockingIndex] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Encode registry state as named arrays.
+
+    Args:
+        header: Snapshot header (id, kind, base, ...), stored as JSON
+        entities: Entities to store (all of them, or the changed ones)
+        relationships: Relationships to store
+        metadata: Registry metadata
+        indexes: Index name (see INDEX_KEY_TYPES) -> key -> entity ids
+        blocking: Blocking index to save with its buckets
+
+    Returns:
+        Arrays for write_snapshot
+    """
+    with _gc_paused():
+        return _encode_snapshot(header, entities, relationships, metadata, indexes, blocking)
+
+
+def _encode_snapshot(
+    header: Dict[str, Any],
+    entities: Iterable[RegisteredEntity],
+    relationships: Iterable[EntityRelationship],
+    metadata: RegistryMetadata,
+    indexes: Dict[str, Index],
+    blocking: Optional[CandidateBlockingIndex]
+) -> Dict[str, np.ndarray]:
+    strings = StringTable()
+    add = strings.add
+
+    entity_columns: Dict[str, List] = defaultdict(list)
+    variants, merged_from, relationship_ids, methods = _Ragged(), _Ragged(), _Ragged(), _Ragged()
+    occurrence_offsets = [0]
+    occurrence_columns: Dict[str, List] = defaultdict(list)
+
+    for entity in entities:
+        entity_columns["id"].append(add(entity.id))
+        entity_columns["canonical_text"].append(add(entity.canonical_text))
+        entity_columns["entity_type"].append(add(entity.entity_type.value))
+        entity_columns["entity_subtype"].append(add(entity.entity_subtype))
+        entity_columns["resolution_status"].append(add(entity.resolution_status.value))
+        entity_columns["first_seen_chunk"].append(add(entity.first_seen_chunk))
+        entity_columns["last_seen_chunk"].append(add(entity.last_seen_chunk))
+        entity_columns["attributes"].append(add(entity.attributes.model_dump_json(exclude_defaults=True)))
+        entity_columns["reference_chains"].append(add(json.dumps(entity.reference_chains)))
+        entity_columns["metadata"].append(add(json.dumps(entity.metadata, default=str)))
+        entity_columns["aggregate_confidence"].append(entity.aggregate_confidence)
+        entity_columns["total_occurrences"].append(entity.total_occurrences)
+        entity_columns["chunk_span"].append(entity.chunk_span)
+        entity_columns["timestamps"].append((_timestamp(entity.created_at), _timestamp(entity.updated_at)))
+        variants.append(map(add, entity.all_variants))
+        merged_from.append(map(add, entity.merged_from))
+        relationship_ids.append(map(add, entity.relationships))
+        methods.append(map(add, entity.extraction_methods_used))
+
+        occurrence_offsets.append(occurrence_offsets[-1] + len(entity.occurrences))
+        for occurrence in entity.occurrences:
+            occurrence_columns["chunk_id"].append(add(occurrence.chunk_id))
+            occurrence_columns["chunk_index"].append(occurrence.chunk_index)
+            occurrence_columns["positions"].append(
+                _position_row(occurrence.position) + _position_row(occurrence.global_position)
+            )
+            occurrence_columns["text_variant"].append(add(occurrence.text_variant))
+            occurrence_columns["reference_type"].append(add(occurrence.reference_type.value))
+            occurrence_columns["confidence"].append(occurrence.confidence)
+            occurrence_columns["context_before"].append(add(occurrence.context_before))
+            occurrence_columns["context_after"].append(add(occurrence.context_after))
+            occurrence_columns["extraction_metadata"].append(
+                add(json.dumps(occurrence.extraction_metadata, default=str))
+            )
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name in (
+        "id", "canonical_text", "entity_type", "entity_subtype", "resolution_status",
+        "first_seen_chunk", "last_seen_chunk", "attributes", "reference_chains", "metadata"
+    ):
+        arrays[f"entity_{name}"] = _compact(entity_columns[name])
+    arrays["entity_aggregate_confidence"] = np.asarray(entity_columns["aggregate_confidence"], dtype=np.float64)
+    arrays["entity_total_occurrences"] = _compact(entity_columns["total_occurrences"])
+    arrays["entity_chunk_span"] = _compact(chain.from_iterable(entity_columns["chunk_span"])).reshape(-1, 2)
+    arrays["entity_timestamps"] = np.asarray(entity_columns["timestamps"], dtype=np.int64).reshape(-1, 2)
+    arrays.update(variants.to_arrays("entity_variants"))
+    arrays.update(merged_from.to_arrays("entity_merged_from"))
+    arrays.update(relationship_ids.to_arrays("entity_relationships"))
+    arrays.update(methods.to_arrays("entity_methods"))
+    arrays["entity_occurrence_offsets"] = _compact(occurrence_offsets)
+
+    for name in (
+        "chunk_id", "text_variant", "reference_type", "context_before", "context_after", "extraction_metadata"
+    ):
+        arrays[f"occurrence_{name}"] = _compact(occurrence_columns[name])
+    arrays["occurrence_chunk_index"] = _compact(occurrence_columns["chunk_index"])
+    arrays["occurrence_positions"] = _compact(chain.from_iterable(occurrence_columns["positions"])).reshape(-1, 10)
+    arrays["occurrence_confidence"] = np.asarray(occurrence_columns["confidence"], dtype=np.float64)
+
+    for name, index in indexes.items():
+        keys, members = [], _Ragged()
+        for key, entity_ids in index.items():
+            keys.append(add(getattr(key, "value", key)))
+            members.append(map(add, entity_ids))
+        arrays[f"index_{name}_keys"] = _compact(keys)
+        arrays.update(members.to_arrays(f"index_{name}_members"))
+
+    header = dict(header, indexes=sorted(indexes), blocking=None)
+    if blocking is not None:
+        blocking_ids, blocking_arrays = blocking.to_arrays()
+        header["blocking"] = blocking.key_parameters
+        arrays["blocking_ids"] = _compact(map(add, blocking_ids))
+        arrays.update(_encode_buckets(blocking_arrays))
+
+    arrays.update(strings.to_arrays())
+    arrays["relationships"] = _json_array([rel.model_dump(mode="json") for rel in relationships])
+    arrays["metadata"] = _json_array(metadata.model_dump(mode="json"))
+    arrays["header"] = _json_array(dict(header, format=SNAPSHOT_FORMAT))
+    return arrays
+
+
+def decode_snapshot(arrays: Dict[str, np.ndarray]) -> SnapshotData:
+    """
+    Decode arrays written by encode_snapshot.
+
+    Raises:
+        ValueError: If the arrays are from an unknown snapshot format
+    """
+    with _gc_paused():
+        return _decode_snapshot(arrays)
+
+
+def _decode_snapshot(arrays: Dict[str, np.ndarray]) -> SnapshotData:
+    header = _read_json(arrays["header"])
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {header.get('format')}")
+
+    strings = StringTable.from_arrays(arrays)
+    table = strings.strings
+
+    def column(name: str) -> List:
+        return arrays[name].tolist()
+
+    # Occurrences
+    occurrence_positions = column("occurrence_positions")
+    reference_types = {value.value: value for value in ReferenceType}
+    occurrences = [
+        _construct(
+            EntityOccurrence,
+            chunk_id=table[chunk_id],
+            chunk_index=chunk_index,
+            position=_position(positions[:5]),
+            global_position=_position(positions[5:]),
+            text_variant=table[text_variant],
+            reference_type=reference_types[table[reference_type]],
+            confidence=confidence,
+            context_before=table[context_before],
+            context_after=table[context_after],
+            extraction_metadata=json.loads(table[extraction_metadata]),
+        )
+        for (chunk_id, chunk_index, positions, text_variant, reference_type, confidence,
+             context_before, context_after, extraction_metadata) in zip(
+            column("occurrence_chunk_id"), column("occurrence_chunk_index"), occurrence_positions,
+            column("occurrence_text_variant"), column("occurrence_reference_type"),
+            column("occurrence_confidence"), column("occurrence_context_before"),
+            column("occurrence_context_after"), column("occurrence_extraction_metadata")
+        )
+    ]
+
+    # Entities
+    entity_types = {value.value: value for value in EntityType}
+    statuses = {value.value: value for value in ResolutionStatus}
+    occurrence_offsets = column("entity_occurrence_offsets")
+    variants = _ragged_lists(arrays, "entity_variants")
+    merged_from = _ragged_lists(arrays, "entity_merged_from")
+    relationship_ids = _ragged_lists(arrays, "entity_relationships")
+    methods = _ragged_lists(arrays, "entity_methods")
+
+    entities: Dict[str, RegisteredEntity] = {}
+    for i, (entity_id, canonical_text, entity_type, entity_subtype, status, first_seen, last_seen,
+            attributes, reference_chains, metadata, confidence, total, chunk_span, timestamps) in enumerate(zip(
+        column("entity_id"), column("entity_canonical_text"), column("entity_entity_type"),
+        column("entity_entity_subtype"), column("entity_resolution_status"),
+        column("entity_first_seen_chunk"), column("entity_last_seen_chunk"), column("entity_attributes"),
+        column("entity_reference_chains"), column("entity_metadata"),
+        column("entity_aggregate_confidence"), column("entity_total_occurrences"),
+        column("entity_chunk_span"), column("entity_timestamps")
+    )):
+        attributes = table[attributes]
+        entities[table[entity_id]] = _construct(
+            RegisteredEntity,
+            id=table[entity_id],
+            canonical_text=table[canonical_text],
+            entity_type=entity_types[table[entity_type]],
+            entity_subtype=table[entity_subtype],
+            all_variants={table[s] for s in variants[i]},
+            occurrences=occurrences[occurrence_offsets[i]:occurrence_offsets[i + 1]],
+            merged_from=[table[s] for s in merged_from[i]],
+            resolution_status=statuses[table[status]],
+            aggregate_confidence=confidence,
+            attributes=(
+                EntityAttributes() if attributes == "{}" else EntityAttributes.model_validate_json(attributes)
+            ),
+            relationships=[table[s] for s in relationship_ids[i]],
+            reference_chains=json.loads(table[reference_chains]),
+            first_seen_chunk=table[first_seen],
+            last_seen_chunk=table[last_seen],
+            chunk_span=tuple(chunk_span),
+            total_occurrences=total,
+            extraction_methods_used={table[s] for s in methods[i]},
+            metadata=json.loads(table[metadata]),
+            created_at=_EPOCH + timestamps[0] * _MICROSECOND,
+            updated_at=_EPOCH + timestamps[1] * _MICROSECOND,
+        )
+
+    relationships = {
+        rel.id: rel for rel in (
+            EntityRelationship.model_validate(data) for data in _read_json(arrays["relationships"])
+        )
+    }
+
+    indexes: Dict[str, Index] = {}
+    for name in header["indexes"]:
+        key_type = INDEX_KEY_TYPES[name]
+        members = _ragged_lists(arrays, f"index_{name}_members")
+        indexes[name] = {
+            key_type(table[key]): {table[s] for s in entity_ids}
+            for key, entity_ids in zip(column(f"index_{name}_keys"), members)
+        }
+
+    blocking = None
+    if header["blocking"] is not None:
+        blocking = ([table[s] for s in column("blocking_ids")], _decode_buckets(arrays))
+
+    return SnapshotData(
+        header=header,
+        entities=entities,
+        relationships=relationships,
+        metadata=RegistryMetadata.model_validate(_read_json(arrays["metadata"])),
+        indexes=indexes,
+        blocking=blocking,
+    )
+
+
+def _encode_buckets(buckets: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Blocking buckets in a form that deflates well.
+
+    Bucket keys are random 64-bit hashes, but sorted: their differences are
+    stored with the bytes of each significance in one row, so the high rows
+    are mostly zeros. Offsets become bucket sizes (mostly 1) and members
+    take the smallest dtype.
+    """
+    keys = buckets["keys"].astype("<u8")
+    gaps = np.diff(keys, prepend=np.uint64(0))
+    return {
+        "blocking_key_gaps": gaps.view(np.uint8).reshape(-1, 8).T.copy(),
+        "blocking_sizes": _compact(np.diff(buckets["offsets"])),
+        "blocking_members": _compact(buckets["members"]),
+    }
+
+
+def _decode_buckets(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """CandidateBlockingIndex.from_arrays input from _encode_buckets output"""
+    gaps = arrays["blocking_key_gaps"].T.copy().view("<u8").ravel()
+    sizes = arrays["blocking_sizes"].astype(np.int64)
+    members = arrays["blocking_members"]
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64 if len(members) >= 1 << 31 else np.int32)
+    np.cumsum(sizes, out=offsets[1:])
+    return {
+        "keys": np.cumsum(gaps, dtype=np.uint64),
+        "offsets": offsets,
+        "members": members.astype(np.int32),
+    }
+
+
+def _json_array(value: Any) -> np.ndarray:
+    return np.frombuffer(json.dumps(value).encode("utf-8"), dtype=np.uint8)
+
+
+def _read_json(array: np.ndarray) -> Any:
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def write_snapshot(path: Path, arrays: Dict[str, np.ndarray]) -> int:
+    """
+    Write snapshot arrays to path atomically, as an .npz np.load can read.
+
+    Columns are deflated at level 1: string ids, offsets, positions and the
+    encoded blocking buckets shrink several times for little CPU.
+
+    Returns:
+        Size of the file in bytes
+    """
+    partial = path.with_name(path.name + ".partial")
+    with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for name, array in arrays.items():
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+    os.replace(partial, path)
+    return path.stat().st_size
+
+
+def read_snapshot(path: Path) -> Dict[str, np.ndarray]:
+    """Read snapshot arrays from path (without unpickling anything)"""
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """Header of the snapshot at path, without reading its columns"""
+    with np.load(path, allow_pickle=False) as data:
+        return _read_json(data["header"])
@@ -10,7 +10,8 @@ from .relationship_models import (
     EntityMention,
     RelationshipInstance,
     RelationshipExtractionResult,
-    RelationshipExtractionModel
+    RelationshipExtractionModel,
+    RelationshipInferenceWorker
 )
 
 from .legal_relationship_patterns import (
@@ -18,21 +19,28 @@ from .legal_relationship_patterns import (
     RelationshipPattern
 )
 
+from .entity_index import EntityIndex
+
 from .relationship_extractor import (
     RelationshipExtractor,
     ExtractionConfig
 )
 
+from .extractor_pool import RelationshipExtractorPool
+
 __all__ = [
     "RelationshipType",
     "EntityMention",
     "RelationshipInstance",
     "RelationshipExtractionResult",
     "RelationshipExtractionModel",
+    "RelationshipInferenceWorker",
     "LegalRelationshipPatterns",
     "RelationshipPattern",
+    "EntityIndex",
     "RelationshipExtractor",
-    "ExtractionConfig"
+    "ExtractionConfig",
+    "RelationshipExtractorPool"
 ]
 
 __version__ = "1.0.0"
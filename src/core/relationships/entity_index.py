@@ -0,0 +1,100 @@
+"""
+Position index over the entity mentions of one document.
+
+RelationshipExtractor used to index entities with one dict entry per
+character of every entity and to scan a match span character by character.
+EntityIndex keeps the entities sorted by start position instead, so the
+lookups the extraction methods share are binary searches:
+
+- within(start, end): entities lying fully inside [start, end]
+  (pattern matches)
+- near(start, end, distance): entities within distance characters of a span
+- following(i, distance): entities after the i-th whose start is at most
+  distance past its end (proximity relationships)
+- pairs_within(distance): entity pairs whose starts are at most distance
+  apart, in input order (ML candidate pairs)
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from .relationship_models import EntityMention
+
+
+class EntityIndex:
+    """
+    Entities of one document sorted by start position.
+
+    Attributes:
+        entities: Entities in start order (ties keep their input order)
+        starts: Start position of each entity in entities
+        by_type: Entities per entity type, in input order
+        by_text: Entities per lowercased entity text, in input order
+    """
+
+    def __init__(self, entities: List[EntityMention]):
+        """
+        Index entities.
+
+        Args:
+            entities: Entity mentions of one document
+        """
+        self._input = list(entities)
+        # Input position of each sorted entity, to hand pairs out in input order
+        self._input_order = sorted(range(len(entities)), key=lambda k: entities[k].start_position)
+        self.entities = [entities[k] for k in self._input_order]
+        self.starts = [entity.start_position for entity in self.entities]
+        # Upper bound on entity length, so start-sorted searches can find ends
+        self._max_length = max((e.end_position - e.start_position for e in entities), default=0)
+
+        self.by_type: Dict[str, List[EntityMention]] = defaultdict(list)
+        self.by_text: Dict[str, List[EntityMention]] = defaultdict(list)
+        for entity in entities:
+            self.by_type[entity.entity_type].append(entity)
+            self.by_text[entity.entity_text.lower()].append(entity)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def within(self, start: int, end: int) -> List[EntityMention]:
+        """Entities fully inside [start, end], in start order."""
+        low = bisect_left(self.starts, start)
+        high = bisect_right(self.starts, end)
+        return [entity for entity in self.entities[low:high] if entity.end_position <= end]
+
+    def near(self, start: int, end: int, distance: int) -> List[EntityMention]:
+        """Entities overlapping [start - distance, end + distance], in start order."""
+        low = bisect_left(self.starts, start - distance - self._max_length)
+        high = bisect_right(self.starts, end + distance)
+        return [entity for entity in self.entities[low:high] if entity.end_position >= start - distance]
+
+    def following(self, i: int, distance: int) -> List[EntityMention]:
+        """
+        Entities after entities[i] that start at most distance past its end.
+
+        Args:
+            i: Position of the anchor entity in entities
+            distance: Largest gap between the anchor's end and a follower's start
+
+        Returns:
+            Followers in start order (overlapping entities have negative gaps)
+        """
+        high = bisect_right(self.starts, self.entities[i].end_position + distance, lo=i + 1)
+        return self.entities[i + 1:high]
+
+    def pairs_within(self, distance: int) -> List[Tuple[EntityMention, EntityMention]]:
+        """
+        Entity pairs whose start positions are at most distance apart.
+
+        Pairs are oriented and ordered as a nested loop over the input list
+        would produce them: (entities[a], entities[b]) with a < b in input order.
+        """
+        pairs = []
+        for i, start in enumerate(self.starts):
+            high = bisect_right(self.starts, start + distance, lo=i + 1)
+            for j in range(i + 1, high):
+                a, b = self._input_order[i], self._input_order[j]
+                pairs.append((a, b) if a < b else (b, a))
+        pairs.sort()
+        return [(self._input[a], self._input[b]) for a, b in pairs]
@@ -0,0 +1,122 @@
+"""
+Warm RelationshipExtractors shared across requests.
+
+Building a RelationshipExtractor compiles every LegalRelationshipPatterns
+regex and loads the spaCy (and optionally ML) model, which dominated the
+latency of a single /extract/relationships call. The pool keeps one
+extractor per set of loaded components (RelationshipExtractor.COMPONENT_SETTINGS),
+built on first use, and applies each request's ExtractionConfig as an
+overlay. Calls on one extractor are serialized, since overlay() swaps the
+extractor's configuration, and run in a thread so the event loop stays free;
+a cancelled call keeps the extractor locked until its thread has finished.
+"""
+
+import asyncio
+import logging
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+from .relationship_extractor import ExtractionConfig, RelationshipExtractor
+from .relationship_models import EntityMention, RelationshipExtractionResult
+
+logger = logging.getLogger(__name__)
+
+
+class RelationshipExtractorPool:
+    """
+    Process-level pool of warm RelationshipExtractors.
+
+    Attributes:
+        builds: Number of extractors built so far (cold requests)
+    """
+
+    def __init__(self):
+        self._extractors: Dict[Tuple, RelationshipExtractor] = {}
+        self._locks: Dict[Tuple, asyncio.Lock] = {}
+        self.builds = 0
+
+    @staticmethod
+    def component_key(config: ExtractionConfig) -> Tuple:
+        """Settings that select the extractor serving config"""
+        return tuple(getattr(config, name) for name in RelationshipExtractor.COMPONENT_SETTINGS)
+
+    def __len__(self) -> int:
+        return len(self._extractors)
+
+    async def _acquire(self, key: Tuple, config: ExtractionConfig) -> RelationshipExtractor:
+        """Extractor for key, built in a thread on first use (caller holds the key's lock)"""
+        extractor = self._extractors.get(key)
+        if extractor is None:
+            # The extractor owns (and may modify) its config; keep the caller's intact
+            extractor = await self._in_thread(RelationshipExtractor, replace(config))
+            self._extractors[key] = extractor
+            self.builds += 1
+            logger.info(f"Built relationship extractor: {extractor._get_model_description()}")
+        return extractor
+
+    async def warm(self, config: ExtractionConfig):
+        """Build the extractor serving config ahead of the first request"""
+        key = self.component_key(config)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            await self._acquire(key, config)
+
+    async def extract(self,
+                      text: str,
+                      entities: List[EntityMention],
+                      config: ExtractionConfig,
+                      document_id: str = "") -> RelationshipExtractionResult:
+        """
+        Extract relationships with config on a warm extractor.
+
+        Args:
+            text: Document text
+            entities: List of extracted entities
+            config: Extraction configuration for this call
+            document_id: Document identifier
+
+        Returns:
+            RelationshipExtractionResult with all extracted relationships
+        """
+        key = self.component_key(config)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            extractor = await self._acquire(key, config)
+            return await self._in_thread(self._extract_with, extractor, text, entities, config, document_id)
+
+    @staticmethod
+    async def _in_thread(fn, *args):
+        """
+        Run fn in a thread, returning only once the thread has.
+
+        A cancelled caller waits for the thread before the cancellation
+        propagates, so the key's lock is not released while the thread is
+        still building or using (overlaying) the extractor.
+        """
+        work = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        try:
+            return await asyncio.shield(work)
+        except asyncio.CancelledError:
+            while not work.done():
+                try:
+                    await asyncio.wait([work])
+                except asyncio.CancelledError:
+                    pass
+            if not work.cancelled():
+                work.exception()  # Nobody awaits a cancelled caller's outcome
+            raise
+
+    @staticmethod
+    def _extract_with(extractor: RelationshipExtractor,
+                      text: str,
+                      entities: List[EntityMention],
+                      config: ExtractionConfig,
+                      document_id: str) -> RelationshipExtractionResult:
+        with extractor.overlay(config):
+            return extractor.extract_relationships(text, entities, document_id=document_id)
+
+    def close(self):
+        """Stop ML worker processes and drop the extractors"""
+        for extractor in self._extractors.values():
+            shutdown = getattr(extractor.ml_model, "shutdown", None)
+            if shutdown:
+                shutdown()
+        self._extractors.clear()
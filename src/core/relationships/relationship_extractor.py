@@ -13,6 +13,7 @@ from typing import Dict, List, Tuple, Optional, Set, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 import spacy
 from spacy.tokens import Doc, Span, Token
@@ -23,16 +24,23 @@ from .relationship_models import (
     RelationshipInstance,
     RelationshipType,
     RelationshipExtractionResult,
-    RelationshipExtractionModel
+    RelationshipExtractionModel,
+    RelationshipInferenceWorker
 )
 from .legal_relationship_patterns import (
     LegalRelationshipPatterns,
     RelationshipPattern
 )
+from .entity_index import EntityIndex
+from ..document_index import DocumentIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Pipeline components dependency relationships never read: entities are
+# given, and merge_entities would only merge the (disabled) NER spans
+DEPENDENCY_UNUSED_PIPES = {"ner", "entity_ruler", "entity_linker", "merge_entities", "textcat", "textcat_multilabel"}
+
 
 @dataclass
 class ExtractionConfig:
@@ -55,10 +63,18 @@ class ExtractionConfig:
     sentence_window: int = 2  # sentences
     max_entity_distance: int = 200  # characters
     
+    # Pattern evaluation: run patterns only on windows around co-occurring
+    # entity pairs of the types each pattern declares, instead of the whole text
+    anchor_patterns_to_entities: bool = False
+    pattern_window: int = 300  # characters between anchored entities and around them
+    
     # Model settings
     spacy_model: str = "en_core_web_lg"
     use_gpu: bool = True
     batch_size: int = 32
+    ml_compatible_types_only: bool = False  # classify only pairs whose types some pattern relates
+    ml_inference_in_worker: bool = False  # run the ML model in a separate worker process
+    parse_n_process: int = 1  # processes for nlp.pipe over the sentences to parse
     
     # Output settings
     merge_duplicates: bool = True
@@ -72,6 +88,17 @@ class RelationshipExtractor:
     Combines multiple extraction methods for comprehensive coverage.
     """
     
+    # Settings that decide which components __init__ loads; all other
+    # settings can change per call through overlay()
+    COMPONENT_SETTINGS = (
+        "use_patterns",
+        "use_dependency_parsing",
+        "spacy_model",
+        "use_gpu",
+        "use_ml_model",
+        "ml_inference_in_worker"
+    )
+    
     def __init__(self, config: Optional[ExtractionConfig] = None):
         """
         Initialize the RelationshipExtractor.
@@ -89,11 +116,19 @@ class RelationshipExtractor:
         # Initialize ML model if configured
         if self.config.use_ml_model:
             try:
-                self.ml_model = RelationshipExtractionModel()
+                if self.config.ml_inference_in_worker:
+                    self.ml_model = RelationshipInferenceWorker()
+                else:
+                    self.ml_model = RelationshipExtractionModel()
             except Exception as e:
                 logger.warning(f"Failed to load ML model: {e}. Falling back to pattern-based extraction.")
                 self.config.use_ml_model = False
         
+        # Patterns applicable to (subject type, object type), for anchored evaluation
+        self._type_pair_patterns: Dict[Tuple[str, str, float], List[RelationshipPattern]] = {}
+        # (subject type, object type) pairs any pattern declares, for the ML pair prefilter
+        self._compatible_type_pairs: Optional[Set[Tuple[str, str]]] = None
+        
         # Coreference resolution tracking
         self.coreference_chains: Dict[str, List[EntityMention]] = {}
         
@@ -121,7 +156,8 @@ class RelationshipExtractor:
     def extract_relationships(self,
                              text: str,
                              entities: List[EntityMention],
-                             document_id: str = "") -> RelationshipExtractionResult:
+                             document_id: str = "",
+                             document_index: Optional[DocumentIndex] = None) -> RelationshipExtractionResult:
         """
         Extract all relationships from text given entities.
         
@@ -129,6 +165,8 @@ class RelationshipExtractor:
             text: Document text
             entities: List of extracted entities
             document_id: Document identifier
+            document_index: Shared DocumentIndex of text (sentence spans for
+                dependency parsing); built when needed if not given
             
         Returns:
             RelationshipExtractionResult with all extracted relationships
@@ -150,17 +188,17 @@ class RelationshipExtractor:
             self.extraction_stats["pattern_relationships"] = len(pattern_rels)
         
         if self.config.use_dependency_parsing and self.nlp:
-            dep_rels = self._extract_dependency_relationships(text, entities, entity_index)
+            dep_rels = self._extract_dependency_relationships(text, entities, entity_index, document_index)
             relationships.extend(dep_rels)
             self.extraction_stats["dependency_relationships"] = len(dep_rels)
         
         if self.config.use_proximity:
-            prox_rels = self._extract_proximity_relationships(text, entities)
+            prox_rels = self._extract_proximity_relationships(text, entities, entity_index)
             relationships.extend(prox_rels)
             self.extraction_stats["proximity_relationships"] = len(prox_rels)
         
         if self.config.use_ml_model and self.ml_model:
-            ml_rels = self._extract_ml_relationships(text, entities)
+            ml_rels = self._extract_ml_relationships(text, entities, entity_index)
             relationships.extend(ml_rels)
             self.extraction_stats["ml_relationships"] = len(ml_rels)
         
@@ -190,26 +228,9 @@ class RelationshipExtractor:
             statistics=statistics
         )
     
-    def _build_entity_index(self, entities: List[EntityMention]) -> Dict:
-        """Build index for efficient entity lookup"""
-        index = {
-            "by_position": defaultdict(list),
-            "by_type": defaultdict(list),
-            "by_text": defaultdict(list)
-        }
-        
-        for entity in entities:
-            # Index by position range
-            for pos in range(entity.start_position, entity.end_position + 1):
-                index["by_position"][pos].append(entity)
-            
-            # Index by type
-            index["by_type"][entity.entity_type].append(entity)
-            
-            # Index by text (lowercase for matching)
-            index["by_text"][entity.entity_text.lower()].append(entity)
-        
-        return index
+    def _build_entity_index(self, entities: List[EntityMention]) -> EntityIndex:
+        """Build index for efficient entity lookup (sorted by position, searched with bisect)"""
+        return EntityIndex(entities)
     
     def _resolve_coreferences(self, text: str, entities: List[EntityMention]):
         """
@@ -299,13 +320,16 @@ class RelationshipExtractor:
     def _extract_pattern_relationships(self,
                                       text: str,
                                       entities: List[EntityMention],
-                                      entity_index: Dict) -> List[RelationshipInstance]:
+                                      entity_index: EntityIndex) -> List[RelationshipInstance]:
         """Extract relationships using regex patterns"""
         relationships = []
         
         if not self.patterns:
             return relationships
         
+        if self.config.anchor_patterns_to_entities:
+            return self._extract_anchored_pattern_relationships(text, entities, entity_index)
+        
         # Get all patterns
         all_patterns = self.patterns.get_all_patterns()
         
@@ -316,30 +340,115 @@ class RelationshipExtractor:
             
             # Find all matches
             matches = pattern.compiled_regex.finditer(text)
+            relationships.extend(self._relationships_from_matches(
+                matches, pattern, text, entities, entity_index
+            ))
+        
+        return relationships
+    
+    def _relationships_from_matches(self,
+                                    matches,
+                                    pattern: RelationshipPattern,
+                                    text: str,
+                                    entities: List[EntityMention],
+                                    entity_index: EntityIndex) -> List[RelationshipInstance]:
+        """Create relationships (and reverses for bidirectional patterns) from pattern matches"""
+        relationships = []
+        
+        for match in matches:
+            # Extract entities from match groups
+            rel = self._create_relationship_from_pattern(
+                match, pattern, text, entities, entity_index
+            )
             
-            for match in matches:
-                # Extract entities from match groups
-                rel = self._create_relationship_from_pattern(
-                    match, pattern, text, entities, entity_index
-                )
+            if rel:
+                relationships.append(rel)
                 
-                if rel:
-                    relationships.append(rel)
-                    
-                    # Handle bidirectional relationships
-                    if pattern.bidirectional:
-                        reverse_rel = self._create_reverse_relationship(rel)
-                        if reverse_rel:
-                            relationships.append(reverse_rel)
+                # Handle bidirectional relationships
+                if pattern.bidirectional:
+                    reverse_rel = self._create_reverse_relationship(rel)
+                    if reverse_rel:
+                        relationships.append(reverse_rel)
+        
+        return relationships
+    
+    def _patterns_for_type_pair(self, subject_type: str, object_type: str) -> List[RelationshipPattern]:
+        """Patterns declaring subject_type -> object_type above the confidence threshold (cached)"""
+        threshold = self.config.pattern_confidence_threshold
+        key = (subject_type, object_type, threshold)
+        patterns = self._type_pair_patterns.get(key)
+        if patterns is None:
+            patterns = [
+                pattern for pattern in self.patterns.get_patterns_for_entity_types(subject_type, object_type)
+                if pattern.confidence >= threshold
+            ]
+            self._type_pair_patterns[key] = patterns
+        return patterns
+    
+    def _extract_anchored_pattern_relationships(self,
+                                                text: str,
+                                                entities: List[EntityMention],
+                                                entity_index: EntityIndex) -> List[RelationshipInstance]:
+        """
+        Run each pattern only around entity pairs of the types it declares.
+        
+        Every pair of entities at most pattern_window characters apart whose
+        types some pattern declares (subject, object) gives that pattern a
+        window reaching pattern_window characters beyond the pair. Overlapping
+        windows are merged and the pattern is matched inside them only
+        (finditer with pos/endpos, so anchors and lookbehinds still see the
+        surrounding text).
+        """
+        window = self.config.pattern_window
+        windows: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        
+        for entity1 in entity_index.entities:
+            for entity2 in entity_index.near(entity1.start_position, entity1.end_position, window):
+                if entity2 is entity1:
+                    continue
+                patterns = self._patterns_for_type_pair(entity1.entity_type, entity2.entity_type)
+                if not patterns:
+                    continue
+                start = max(0, min(entity1.start_position, entity2.start_position) - window)
+                end = min(len(text), max(entity1.end_position, entity2.end_position) + window)
+                for pattern in patterns:
+                    windows[id(pattern)].append((start, end))
+        
+        relationships = []
+        if not windows:
+            return relationships
+        
+        # Patterns in their usual order, so results are ordered as in a full scan
+        for pattern in self.patterns.get_all_patterns():
+            spans = windows.get(id(pattern))
+            if not spans:
+                continue
+            for start, end in self._merge_windows(spans):
+                matches = pattern.compiled_regex.finditer(text, start, end)
+                relationships.extend(self._relationships_from_matches(
+                    matches, pattern, text, entities, entity_index
+                ))
         
+        self.extraction_stats["anchored_pattern_windows"] = sum(len(spans) for spans in windows.values())
         return relationships
     
+    @staticmethod
+    def _merge_windows(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Merge overlapping (start, end) windows"""
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+    
     def _create_relationship_from_pattern(self,
                                          match,
                                          pattern: RelationshipPattern,
                                          text: str,
                                          entities: List[EntityMention],
-                                         entity_index: Dict) -> Optional[RelationshipInstance]:
+                                         entity_index: EntityIndex) -> Optional[RelationshipInstance]:
         """Create relationship instance from pattern match"""
         try:
             # Get match span
@@ -402,19 +511,9 @@ class RelationshipExtractor:
                                start: int,
                                end: int,
                                entities: List[EntityMention],
-                               entity_index: Dict) -> List[EntityMention]:
-        """Find entities within a text span"""
-        found_entities = set()
-        
-        # Use position index for efficient lookup
-        for pos in range(start, end + 1):
-            if pos in entity_index["by_position"]:
-                for entity in entity_index["by_position"][pos]:
-                    # Check if entity is fully within span
-                    if entity.start_position >= start and entity.end_position <= end:
-                        found_entities.add(entity)
-        
-        return list(found_entities)
+                               entity_index: EntityIndex) -> List[EntityMention]:
+        """Find entities fully within a text span, in position order"""
+        return entity_index.within(start, end)
     
     def _create_reverse_relationship(self, 
                                     rel: RelationshipInstance) -> Optional[RelationshipInstance]:
@@ -441,57 +540,113 @@ class RelationshipExtractor:
     def _extract_dependency_relationships(self,
                                          text: str,
                                          entities: List[EntityMention],
-                                         entity_index: Dict) -> List[RelationshipInstance]:
-        """Extract relationships using dependency parsing"""
+                                         entity_index: EntityIndex,
+                                         document_index: Optional[DocumentIndex] = None) -> List[RelationshipInstance]:
+        """
+        Extract relationships using dependency parsing.
+        
+        Only sentences holding two or more entities of types some pattern
+        relates are parsed, each on its own, through nlp.pipe with the
+        components dependency paths do not use disabled.
+        """
         relationships = []
         
         if not self.nlp:
             return relationships
         
-        # Process text with SpaCy
-        doc = self.nlp(text)
+        windows = self._dependency_windows(text, entity_index, document_index)
+        self.extraction_stats["dependency_sentences_parsed"] = len(windows)
+        self.extraction_stats["dependency_chars_parsed"] = sum(end - start for start, end, _ in windows)
+        if not windows:
+            return relationships
         
-        # Map entities to SpaCy tokens
-        entity_tokens = self._map_entities_to_tokens(entities, doc)
+        disabled = [name for name in self.nlp.pipe_names if name in DEPENDENCY_UNUSED_PIPES]
+        docs = self.nlp.pipe(
+            (text[start:end] for start, end, _ in windows),
+            batch_size=self.config.batch_size,
+            n_process=self.config.parse_n_process,
+            disable=disabled
+        )
         
-        # Extract relationships from dependencies
-        for sent in doc.sents:
-            sent_relationships = self._extract_sentence_dependencies(
-                sent, entity_tokens, entities
-            )
-            relationships.extend(sent_relationships)
+        for (start, _, window_entities), doc in zip(windows, docs):
+            # Map entities to SpaCy tokens
+            entity_tokens = self._map_entities_to_tokens(window_entities, doc, offset=start)
+            
+            # Extract relationships from dependencies
+            for sent in doc.sents:
+                sent_relationships = self._extract_sentence_dependencies(
+                    sent, entity_tokens, window_entities, offset=start
+                )
+                relationships.extend(sent_relationships)
         
         return relationships
     
+    def _dependency_windows(self,
+                            text: str,
+                            entity_index: EntityIndex,
+                            document_index: Optional[DocumentIndex] = None) -> List[Tuple[int, int, List[EntityMention]]]:
+        """
+        Sentences worth parsing: (start, end, entities overlapping the sentence).
+        
+        Sentences come from the shared DocumentIndex; a sentence is kept when
+        two of its entities have types some relationship pattern relates.
+        Without a usable sentence split the whole text is one window.
+        """
+        try:
+            if document_index is None or not document_index.covers(text):
+                document_index = DocumentIndex(text)
+            sentence_spans = document_index.sentence_spans
+        except Exception as e:
+            logger.warning(f"Sentence split unavailable, parsing whole document: {e}")
+            sentence_spans = [(0, len(text))]
+        
+        windows = []
+        for start, end in sentence_spans:
+            # Entities overlapping [start, end)
+            sent_entities = entity_index.near(start + 1, end - 1, 0)
+            if len(sent_entities) < 2:
+                continue
+            if any(
+                self._types_compatible(entity1.entity_type, entity2.entity_type)
+                for i, entity1 in enumerate(sent_entities)
+                for entity2 in sent_entities[i + 1:]
+            ):
+                windows.append((start, end, sent_entities))
+        return windows
+    
     def _map_entities_to_tokens(self,
                                 entities: List[EntityMention],
-                                doc: Doc) -> Dict[EntityMention, List[Token]]:
-        """Map entities to SpaCy tokens"""
+                                doc: Doc,
+                                offset: int = 0) -> Dict[int, List[Token]]:
+        """Map entities (by id()) to the SpaCy tokens inside them; doc starts at offset in the text"""
         entity_tokens = {}
         
         for entity in entities:
             tokens = []
             for token in doc:
-                # Check if token overlaps with entity
-                if (token.idx >= entity.start_position and 
-                    token.idx + len(token.text) <= entity.end_position):
+                # Check if token lies inside the entity
+                token_start = token.idx + offset
+                if (token_start >= entity.start_position and 
+                    token_start + len(token.text) <= entity.end_position):
                     tokens.append(token)
             
             if tokens:
-                entity_tokens[entity] = tokens
+                entity_tokens[id(entity)] = tokens
         
         return entity_tokens
     
     def _extract_sentence_dependencies(self,
                                       sent: Span,
-                                      entity_tokens: Dict,
-                                      entities: List[EntityMention]) -> List[RelationshipInstance]:
+                                      entity_tokens: Dict[int, List[Token]],
+                                      entities: List[EntityMention],
+                                      offset: int = 0) -> List[RelationshipInstance]:
         """Extract relationships from sentence dependencies"""
         relationships = []
         
         # Find entities in this sentence
         sent_entities = []
-        for entity, tokens in entity_tokens.items():
+        for entity in entities:
+            tokens = entity_tokens.get(id(entity), [])
             if any(token in sent for token in tokens):
                 sent_entities.append(entity)
         
@@ -502,7 +657,7 @@ class RelationshipExtractor:
         for i, entity1 in enumerate(sent_entities):
             for entity2 in sent_entities[i+1:]:
                 dep_rel = self._analyze_dependency_path(
-                    entity1, entity2, entity_tokens, sent
+                    entity1, entity2, entity_tokens, sent, offset
                 )
                 if dep_rel:
                     relationships.append(dep_rel)
@@ -512,12 +667,13 @@ class RelationshipExtractor:
     def _analyze_dependency_path(self,
                                 entity1: EntityMention,
                                 entity2: EntityMention,
-                                entity_tokens: Dict,
-                                sent: Span) -> Optional[RelationshipInstance]:
-        """Analyze dependency path between two entities"""
+                                entity_tokens: Dict[int, List[Token]],
+                                sent: Span,
+                                offset: int = 0) -> Optional[RelationshipInstance]:
+        """Analyze dependency path between two entities (sent's doc starts at offset)"""
         try:
-            tokens1 = entity_tokens.get(entity1, [])
-            tokens2 = entity_tokens.get(entity2, [])
+            tokens1 = entity_tokens.get(id(entity1), [])
+            tokens2 = entity_tokens.get(id(entity2), [])
             
             if not tokens1 or not tokens2:
                 return None
@@ -550,8 +706,8 @@ class RelationshipExtractor:
                 confidence=confidence,
                 extraction_method="dependency",
                 context=context,
-                context_start=sent.start_char,
-                context_end=sent.end_char,
+                context_start=sent.start_char + offset,
+                context_end=sent.end_char + offset,
                 evidence=[f"dep_path: {' -> '.join([t.dep_ for t in path])}"],
                 metadata={
                     "dependency_path": [t.dep_ for t in path],
@@ -631,21 +787,19 @@ class RelationshipExtractor:
     
     def _extract_proximity_relationships(self,
                                         text: str,
-                                        entities: List[EntityMention]) -> List[RelationshipInstance]:
+                                        entities: List[EntityMention],
+                                        entity_index: Optional[EntityIndex] = None) -> List[RelationshipInstance]:
         """Extract relationships based on entity proximity"""
         relationships = []
         
-        # Sort entities by position
-        sorted_entities = sorted(entities, key=lambda e: e.start_position)
+        # Entities sorted by position; followers beyond max_entity_distance are never visited
+        if entity_index is None:
+            entity_index = EntityIndex(entities)
         
-        for i, entity1 in enumerate(sorted_entities):
-            for entity2 in sorted_entities[i+1:]:
-                # Check distance
+        for i, entity1 in enumerate(entity_index.entities):
+            for entity2 in entity_index.following(i, self.config.max_entity_distance):
                 distance = entity2.start_position - entity1.end_position
                 
-                if distance > self.config.max_entity_distance:
-                    break  # Entities are too far apart
-                
                 if distance <= self.config.proximity_window:
                     # Create proximity relationship
                     rel = self._create_proximity_relationship(
@@ -728,21 +882,26 @@ class RelationshipExtractor:
     
     def _extract_ml_relationships(self,
                                  text: str,
-                                 entities: List[EntityMention]) -> List[RelationshipInstance]:
+                                 entities: List[EntityMention],
+                                 entity_index: Optional[EntityIndex] = None) -> List[RelationshipInstance]:
         """Extract relationships using ML model"""
         relationships = []
         
         if not self.ml_model:
             return relationships
         
-        # Create entity pairs for classification
-        entity_pairs = []
-        for i, entity1 in enumerate(entities):
-            for entity2 in entities[i+1:]:
-                # Filter by distance
-                distance = abs(entity2.start_position - entity1.start_position)
-                if distance <= self.config.max_entity_distance:
-                    entity_pairs.append((entity1, entity2))
+        # Create entity pairs for classification (starts within max_entity_distance)
+        if entity_index is None:
+            entity_index = EntityIndex(entities)
+        entity_pairs = entity_index.pairs_within(self.config.max_entity_distance)
+        
+        if self.config.ml_compatible_types_only:
+            candidate_count = len(entity_pairs)
+            entity_pairs = [
+                (entity1, entity2) for entity1, entity2 in entity_pairs
+                if self._types_compatible(entity1.entity_type, entity2.entity_type)
+            ]
+            self.extraction_stats["ml_pairs_pruned"] = candidate_count - len(entity_pairs)
         
         if not entity_pairs:
             return relationships
@@ -784,6 +943,18 @@ class RelationshipExtractor:
         
         return relationships
     
+    def _types_compatible(self, type1: str, type2: str) -> bool:
+        """Whether some relationship pattern relates the two entity types, in either direction"""
+        if self._compatible_type_pairs is None:
+            patterns = self.patterns or LegalRelationshipPatterns()
+            self._compatible_type_pairs = {
+                (subject_type, object_type)
+                for pattern in patterns.get_all_patterns()
+                for subject_type in pattern.subject_types
+                for object_type in pattern.object_types
+            }
+        return (type1, type2) in self._compatible_type_pairs or (type2, type1) in self._compatible_type_pairs
+    
     def _merge_duplicate_relationships(self,
                                       relationships: List[RelationshipInstance]) -> List[RelationshipInstance]:
         """Merge duplicate relationships and boost confidence"""
@@ -918,4 +1089,28 @@ class RelationshipExtractor:
     
     def get_statistics(self) -> Dict:
         """Get cumulative extraction statistics"""
-        return dict(self.extraction_stats)
\ No newline at end of file
+        return dict(self.extraction_stats)
+    
+    @contextmanager
+    def overlay(self, config: ExtractionConfig):
+        """
+        Extract with config inside the block, keeping the loaded components.
+        
+        Thresholds, windows and output settings come from config; components
+        stay those loaded from the constructor's config (methods whose
+        component was not loaded are skipped), so callers should overlay
+        configs with the same COMPONENT_SETTINGS. Statistics and coreference
+        chains start empty, as in a new extractor, and the previous
+        configuration is restored on exit.
+        
+        Args:
+            config: Configuration for the calls inside the block
+        """
+        saved = (self.config, self.extraction_stats, self.coreference_chains)
+        self.config = config
+        self.extraction_stats = defaultdict(int)
+        self.coreference_chains = {}
+        try:
+            yield self
+        finally:
+            self.config, self.extraction_stats, self.coreference_chains = saved
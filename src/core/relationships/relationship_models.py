@@ -8,7 +8,10 @@ pattern-based and neural approaches.
 
 import os
 import torch
+import asyncio
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
@@ -254,6 +257,7 @@ class RelationshipExtractionModel:
         return {
             "max_sequence_length": 512,
             "batch_size": 16,
+            "max_batch_tokens": 2048,  # Padded tokens per length-bucketed batch
             "confidence_threshold": 0.7,
             "relationship_labels": [r.value for r in RelationshipType],
             "entity_pair_window": 100,  # Maximum token distance between entities
@@ -454,46 +458,78 @@ class RelationshipExtractionModel:
         """
         Predict relationships for multiple entity pairs.
         
+        Inputs are sorted by token length and cut into batches whose padded
+        size stays within max_batch_tokens, so short inputs run in larger
+        batches and are not padded to the longest input of the document.
+        
         Args:
             text: Document text
             entity_pairs: List of entity pairs
-            batch_size: Batch size for processing
+            batch_size: Batch size for processing (batches of short inputs may
+                grow up to four times larger)
             
         Returns:
-            List of (relationship_type, confidence) tuples
+            List of (relationship_type, confidence) tuples, in entity_pairs order
         """
         batch_size = batch_size or self.config.get("batch_size", 16)
-        results = []
+        results: List[Tuple[RelationshipType, float]] = [(RelationshipType.RELATED_TO, 0.5)] * len(entity_pairs)
         
-        for i in range(0, len(entity_pairs), batch_size):
-            batch = entity_pairs[i:i + batch_size]
-            
-            # Prepare batch inputs
-            batch_inputs = []
-            for entity1, entity2 in batch:
-                context = self._extract_entity_context(text, entity1, entity2)
-                input_text = self._format_input(context, entity1, entity2)
-                batch_inputs.append(input_text)
+        if not self.pipeline:
+            return []
+        
+        # Prepare inputs
+        inputs = []
+        for entity1, entity2 in entity_pairs:
+            context = self._extract_entity_context(text, entity1, entity2)
+            inputs.append(self._format_input(context, entity1, entity2))
+        
+        for batch in self._length_buckets(inputs, batch_size):
+            batch_results = self.pipeline([inputs[i] for i in batch], batch_size=len(batch))
             
-            # Process batch
-            if self.pipeline:
-                batch_results = self.pipeline(batch_inputs)
+            for i, result_list in zip(batch, batch_results):
+                if isinstance(result_list, list):
+                    top_result = result_list[0] if result_list else None
+                else:
+                    top_result = result_list
                 
-                for result_list in batch_results:
-                    if isinstance(result_list, list):
-                        top_result = result_list[0] if result_list else None
-                    else:
-                        top_result = result_list
-                    
-                    if top_result:
-                        rel_type = self._label_to_relationship_type(top_result['label'])
-                        confidence = top_result['score']
-                        results.append((rel_type, confidence))
-                    else:
-                        results.append((RelationshipType.RELATED_TO, 0.5))
+                if top_result:
+                    rel_type = self._label_to_relationship_type(top_result['label'])
+                    results[i] = (rel_type, top_result['score'])
         
         return results
     
+    def _input_lengths(self, inputs: List[str]) -> List[int]:
+        """Token length of each input (characters / 4 without a tokenizer)"""
+        max_length = self.config.get("max_sequence_length", 512)
+        if self.tokenizer is None:
+            return [min(max_length, len(text) // 4 + 2) for text in inputs]
+        encoded = self.tokenizer(inputs, truncation=True, max_length=max_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def _length_buckets(self, inputs: List[str], batch_size: int) -> List[List[int]]:
+        """
+        Group input indices into batches of similar length.
+        
+        A batch closes when its padded size (items x longest input) would
+        exceed max_batch_tokens or it holds 4 x batch_size items; an input
+        longer than the budget gets a batch of its own.
+        """
+        lengths = self._input_lengths(inputs)
+        budget = self.config.get("max_batch_tokens") or batch_size * 128
+        max_items = batch_size * 4
+        
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        for i in sorted(range(len(inputs)), key=lengths.__getitem__):
+            # Sorted ascending, so the newcomer is the longest input of the batch
+            if batch and (len(batch) >= max_items or (len(batch) + 1) * lengths[i] > budget):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+    
     def fine_tune(self, 
                  training_data: List[Dict],
                  validation_data: Optional[List[Dict]] = None,
@@ -645,4 +681,83 @@ class RelationshipExtractionModel:
             "model_loaded": self.model is not None,
             "tokenizer_loaded": self.tokenizer is not None,
             "pipeline_ready": self.pipeline is not None
-        }
\ No newline at end of file
+        }
+
+
+# Per-process worker state: the model is loaded inside the worker on start
+# and never shared with the parent
+_worker_model: Optional[RelationshipExtractionModel] = None
+
+
+def _init_relationship_worker(model_name: str, model_path: Optional[str], device: Optional[str]):
+    """Process pool initializer: load the relationship model once per worker."""
+    global _worker_model
+    _worker_model = RelationshipExtractionModel(model_name=model_name, model_path=model_path, device=device)
+
+
+def _worker_ready() -> bool:
+    """Report whether the worker's model pipeline is usable."""
+    return _worker_model is not None and _worker_model.pipeline is not None
+
+
+def _batch_predict_in_worker(text: str,
+                             entity_pairs: List[Tuple[EntityMention, EntityMention]],
+                             batch_size: Optional[int]) -> List[Tuple[RelationshipType, float]]:
+    """Run batch_predict inside a pool worker."""
+    return _worker_model.batch_predict(text, entity_pairs, batch_size)
+
+
+class RelationshipInferenceWorker:
+    """
+    RelationshipExtractionModel running in a separate worker process.
+    
+    batch_predict has the model's signature; the calling thread only waits
+    for the worker, so inference neither holds this process's GIL nor
+    blocks an event loop that runs extraction in a thread.
+    batch_predict_async awaits the worker directly.
+    """
+    
+    def __init__(self,
+                 model_name: str = "nlpaueb/legal-bert-base-uncased",
+                 model_path: Optional[str] = None,
+                 device: Optional[str] = None):
+        """
+        Start the worker and load the model in it.
+        
+        Args:
+            model_name: Name or path of the model to load
+            model_path: Custom path to fine-tuned model
+            device: Device to load model on ('cpu', 'cuda', 'cuda:0', etc.)
+        """
+        self.model_name = model_name
+        self._pool = ProcessPoolExecutor(
+            max_workers=1,
+            # spawn: the worker must not inherit CUDA state or locks of this process
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_relationship_worker,
+            initargs=(model_name, model_path, device)
+        )
+        
+        # Wait for the model so load failures surface here, as they do in-process
+        if not self._pool.submit(_worker_ready).result():
+            self.shutdown()
+            raise RuntimeError("Relationship model pipeline not initialized in worker")
+    
+    def batch_predict(self,
+                      text: str,
+                      entity_pairs: List[Tuple[EntityMention, EntityMention]],
+                      batch_size: Optional[int] = None) -> List[Tuple[RelationshipType, float]]:
+        """Predict relationships for entity pairs in the worker process."""
+        return self._pool.submit(_batch_predict_in_worker, text, entity_pairs, batch_size).result()
+    
+    async def batch_predict_async(self,
+                                  text: str,
+                                  entity_pairs: List[Tuple[EntityMention, EntityMention]],
+                                  batch_size: Optional[int] = None) -> List[Tuple[RelationshipType, float]]:
+        """Predict relationships for entity pairs without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _batch_predict_in_worker, text, entity_pairs, batch_size)
+    
+    def shutdown(self):
+        """Stop the worker process."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -6,17 +6,20 @@ legal structure while maintaining context continuity.
 
 Features:
 - Multiple chunking strategies (legal_aware, section_aware, paragraph_aware, etc.)
+- Character or token-exact sizing (CHUNKING_MAX_TOKENS with the served model's tokenizer)
 - Document type detection (contract, opinion, statute, brief)
 - Complexity calculation based on legal terminology
 - Citation and quote preservation
 - Adaptive strategy selection
 - Overlap management for context continuity
+- Optional shared DocumentIndex so structure is scanned once per request
+- Optional entity-density sizing (ADAPTIVE_DENSITY_ENABLED) so each chunk is
+  expected to produce about the same extraction output
 """
 
 import re
 import logging
 from typing import List, Optional, Tuple, Dict, Any
-from dataclasses import dataclass, field
 from enum import Enum
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
@@ -39,6 +42,9 @@ except LookupError:
         pass
 
 from .config import get_settings
+from .document_index import DocumentIndex
+from .entity_density import EntityDensityModel, get_entity_density_model
+from .token_counter import TokenCounter, get_token_counter
 
 logger = logging.getLogger(__name__)
 
@@ -68,26 +74,140 @@ class ChunkingStrategy(str, Enum):
     ADAPTIVE = "adaptive"
 
 
-@dataclass
+_NON_SPACE = re.compile(r'\S')
+
+# Cut candidates for find_boundary(), weakest last
+_LINE_END = re.compile(r'\n')
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s')
+_WORD_BREAK = re.compile(r'\s')
+
+# Text past a density-sized chunk's budget given to find_boundary
+_DENSITY_LOOKAHEAD = 2000
+
+
+def strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Return the offsets of ``text[start:end].strip()`` without copying.
+    
+    Args:
+        text: Source text
+        start: Span start
+        end: Span end (exclusive)
+        
+    Returns:
+        (start, end) with surrounding whitespace excluded; start == end if blank
+    """
+    match = _NON_SPACE.search(text, start, end)
+    if match is None:
+        return start, start
+    start = match.start()
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
 class DocumentChunk:
-    """Represents a chunk of a legal document with metadata."""
+    """Represents a chunk of a legal document with metadata.
+    
+    Chunks are offset views: they hold a reference to the source document and
+    ``text`` is sliced from ``[start_pos, end_pos)`` on access, so a chunked
+    document costs one copy of the text however many chunks (and overlaps)
+    it has. Overlap is expressed as offsets: ``[core_start, core_end)`` is
+    the part of the chunk not shared with its neighbours.
+    
+    Passing ``text`` without ``document`` creates a detached chunk that
+    stores its own text.
+    """
+    
+    __slots__ = (
+        "document", "start_pos", "end_pos", "chunk_index", "chunk_type",
+        "confidence", "metadata", "core_start", "core_end", "_text"
+    )
+    
+    def __init__(
+        self,
+        text: Optional[str] = None,
+        start_pos: int = 0,
+        end_pos: Optional[int] = None,
+        chunk_index: int = 0,
+        chunk_type: str = "standard",
+        confidence: float = 1.0,
+        metadata: Optional[Dict[str, Any]] = None,
+        document: Optional[str] = None,
+        core_start: Optional[int] = None,
+        core_end: Optional[int] = None
+    ):
+        if text is None and document is None:
+            raise ValueError("DocumentChunk needs either text or a source document")
+        
+        self.document = document
+        self._text = None if document is not None else text
+        self.start_pos = start_pos
+        self.end_pos = end_pos if end_pos is not None else start_pos + len(text or "")
+        self.chunk_index = chunk_index
+        self.chunk_type = chunk_type
+        self.confidence = confidence
+        self.metadata = metadata if metadata is not None else {}
+        self.core_start = core_start if core_start is not None else self.start_pos
+        self.core_end = core_end if core_end is not None else self.end_pos
     
-    text: str
-    start_pos: int
-    end_pos: int
-    chunk_index: int
-    chunk_type: str = "standard"
-    confidence: float = 1.0
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    @classmethod
+    def view(cls, document: str, start_pos: int, end_pos: int, **kwargs) -> "DocumentChunk":
+        """Create a chunk over ``document[start_pos:end_pos]`` without copying."""
+        return cls(document=document, start_pos=start_pos, end_pos=end_pos, **kwargs)
+    
+    @property
+    def text(self) -> str:
+        """Chunk text (sliced from the source document on each access)."""
+        if self._text is not None:
+            return self._text
+        return self.document[self.start_pos:self.end_pos]
     
     @property
     def length(self) -> int:
         """Return the length of the chunk text."""
-        return len(self.text)
+        if self._text is not None:
+            return len(self._text)
+        return self.end_pos - self.start_pos
+    
+    @property
+    def overlap_before(self) -> int:
+        """Characters shared with the previous chunk."""
+        return self.core_start - self.start_pos
+    
+    @property
+    def overlap_after(self) -> int:
+        """Characters shared with the next chunk."""
+        return self.end_pos - self.core_end
+    
+    def in_overlap(self, position: int) -> bool:
+        """Whether a document position falls in a region shared with a neighbouring chunk."""
+        return self.start_pos <= position < self.core_start or self.core_end <= position < self.end_pos
+    
+    def is_blank(self) -> bool:
+        """True if the chunk contains only whitespace."""
+        if self._text is not None:
+            return not self._text.strip()
+        return _NON_SPACE.search(self.document, self.start_pos, self.end_pos) is None
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DocumentChunk):
+            return NotImplemented
+        return (
+            self.text == other.text
+            and self.start_pos == other.start_pos
+            and self.end_pos == other.end_pos
+            and self.chunk_index == other.chunk_index
+            and self.chunk_type == other.chunk_type
+            and self.confidence == other.confidence
+            and self.metadata == other.metadata
+        )
     
     def __repr__(self) -> str:
         """String representation of the chunk."""
-        preview = self.text[:50] + "..." if len(self.text) > 50 else self.text
+        preview_end = min(self.end_pos, self.start_pos + 50) if self._text is None else None
+        preview = self.document[self.start_pos:preview_end] if preview_end is not None else self._text[:50]
+        if self.length > 50:
+            preview += "..."
         return f"DocumentChunk(index={self.chunk_index}, type={self.chunk_type}, length={self.length}, preview='{preview}')"
 
 
@@ -144,11 +264,20 @@ class SmartChunker:
         ]
     }
     
-    def __init__(self, config: Optional[Any] = None):
+    def __init__(
+        self,
+        config: Optional[Any] = None,
+        token_counter: Optional[TokenCounter] = None,
+        density_model: Optional[EntityDensityModel] = None
+    ):
         """Initialize the SmartChunker with configuration.
 
         Args:
             config: Optional ChunkingIntegrationSettings instance. If not provided, uses default from config.
+            token_counter: Token counter for token-exact sizing (defaults to the shared counter
+                when config.chunking_max_tokens is set)
+            density_model: Entity density model for density-driven chunk sizes (defaults to
+                the shared model when config.adaptive_density_enabled is set)
         """
         # Handle ChunkingIntegrationSettings or get from settings
         if config is None:
@@ -160,10 +289,25 @@ class SmartChunker:
             # Assume it's a ChunkingIntegrationSettings
             self.config = config
         
+        # Token-exact sizing: chunk budgets count tokens of the served model
+        # instead of characters
+        self.max_chunk_tokens = getattr(self.config, 'chunking_max_tokens', 0) or 0
+        self.token_counter = None
+        if self.max_chunk_tokens:
+            self.token_counter = token_counter or get_token_counter()
+        
+        # Density sizing: adaptive and smart chunks end where their expected
+        # extraction output reaches the model's target
+        self.density_model = density_model
+        if self.density_model is None and getattr(self.config, 'adaptive_density_enabled', False):
+            self.density_model = get_entity_density_model()
+        
         # Compile regex patterns for efficiency
         self._compile_patterns()
         
         logger.info(f"SmartChunker initialized with max_chunk_size={self.config.max_chunk_size}, "
+                   f"max_chunk_tokens={self.max_chunk_tokens or 'off'}, "
+                   f"density_sizing={'on' if self.density_model else 'off'}, "
                    f"overlap={self.config.chunk_overlap}, smart_chunking={self.config.enable_smart_chunking}")
     
     def _compile_patterns(self):
@@ -182,12 +326,164 @@ class SmartChunker:
             "|".join(self.QUOTE_PATTERNS),
             re.DOTALL
         )
+        
+        self.paragraph_break_pattern = re.compile(r'\n\s*\n')
+    
+    # Chunk sizing: characters by default, tokens when a token budget is set
+    
+    @property
+    def max_size(self) -> int:
+        """Chunk budget in sizing units (tokens or characters)."""
+        return self.max_chunk_tokens if self.token_counter else self.config.max_chunk_size
+    
+    @property
+    def min_size(self) -> int:
+        """Minimum chunk size in sizing units (tokens or characters)."""
+        if self.token_counter:
+            return int(self.config.min_chunk_size / self.token_counter.chars_per_token)
+        return self.config.min_chunk_size
+    
+    def _span_sizes(self, text: str, spans: List[Tuple[int, int]]) -> List[int]:
+        """Sizes of text[start:end] spans (tokens counted in one batch, or characters)."""
+        if self.token_counter:
+            return self.token_counter.count_spans(text, spans)
+        return [end - start for start, end in spans]
+    
+    def _span_size(self, text: str, start: int, end: int) -> int:
+        return self._span_sizes(text, [(start, end)])[0]
     
+    def _fit(self, text: str, start: int, end: int, budget: int) -> int:
+        """Offset where text[start:end] reaches budget sizing units."""
+        if self.token_counter:
+            return self.token_counter.fit(text, start, end, budget)
+        return min(end, start + budget)
+    
+    def _fit_words(self, text: str, start: int, end: int, budget: int) -> int:
+        """Like _fit, but backs a mid-word cut off to the previous space."""
+        cut = self._fit(text, start, end, budget)
+        if cut < end and not text[cut].isspace():
+            last_space = text.rfind(' ', start, cut)
+            if last_space > start:
+                cut = last_space
+        return cut
+    
+    def split_span(
+        self, text: str, start: int, end: int, budget: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """Split a span into pieces of at most budget (default max_size) at word boundaries."""
+        budget = budget or self.max_size
+        pieces = []
+        pos = start
+        while pos < end:
+            cut = self._fit_words(text, pos, end, budget)
+            piece_start, piece_end = strip_span(text, pos, cut)
+            if piece_end > piece_start:
+                pieces.append((piece_start, piece_end))
+            pos = cut
+        return pieces
+
+    def find_boundary(
+        self, text: str, start: int, end: int, budget: Optional[int] = None
+    ) -> int:
+        """End offset for a chunk starting at start, cut at the strongest boundary in budget.
+
+        Boundaries are tried in order (section start, paragraph break, line
+        end, sentence end, word break) among cuts in the second half of the
+        budget; a cut inside a citation or quote is not taken. text[start:end]
+        should extend past the budget (the lookahead) so that a citation or
+        quote crossing the budget's offset is matched whole.
+
+        Args:
+            text: Source text
+            start: Chunk start offset
+            end: End of the available text
+            budget: Chunk size in sizing units (defaults to max_size)
+
+        Returns:
+            Cut offset in (start, end]; end if the rest fits in the budget
+        """
+        limit = self._fit(text, start, end, budget or self.max_size)
+        if limit >= end:
+            return end
+        floor = start + (limit - start) // 2
+
+        protected = [
+            match.span()
+            for pattern in (self.citation_pattern, self.quote_pattern)
+            for match in pattern.finditer(text, start, end)
+        ]
+
+        def inside_protected(pos: int) -> bool:
+            return any(b_start < pos < b_end for b_start, b_end in protected)
+
+        candidates = (
+            [m.start() for m in self.section_pattern.finditer(text, floor, limit)],
+            [m.end() for m in self.paragraph_break_pattern.finditer(text, floor, limit)],
+            [m.end() for m in _LINE_END.finditer(text, floor, limit)],
+            [m.end() for m in _SENTENCE_END.finditer(text, floor, limit)],
+            [m.start() for m in _WORD_BREAK.finditer(text, floor, limit)],
+        )
+        for cuts in candidates:
+            for cut in reversed(cuts):
+                if floor < cut <= limit and not inside_protected(cut):
+                    return cut
+
+        # A citation or quote covers the whole second half: cut before it if
+        # that leaves a chunk, otherwise split it at a word break
+        covering = [b_start for b_start, b_end in protected if b_start < limit < b_end]
+        if covering and min(covering) > start:
+            return min(covering)
+        return candidates[-1][-1] if candidates[-1] else limit
+
+    def _density_spans(
+        self,
+        text: str,
+        index: Optional[DocumentIndex] = None,
+        budget: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """Chunk spans sized by entity density, cut at find_boundary's boundaries.
+
+        Each span runs from the previous cut until its expected extraction
+        output (density_model.weight) reaches the model's target, between
+        min_chunk_size and max_chunk_size characters; dense citation and party
+        lists get short spans, narrative gets long ones.
+
+        Args:
+            text: Document text
+            index: Optional structure index of text
+            budget: Largest span in sizing units (defaults to max_size)
+
+        Returns:
+            Non-blank (start, end) spans in document order
+        """
+        model = self.density_model
+        starts = model.match_starts(text, index)
+        budget = min(budget or self.max_size, self.max_size)
+        chars_per_unit = self.token_counter.chars_per_token if self.token_counter else 1
+        max_chars = int(budget * chars_per_unit)
+        min_chars = min(self.config.min_chunk_size, max_chars)
+        
+        text_length = len(text)
+        spans = []
+        pos = 0
+        while pos < text_length:
+            extent = model.chunk_extent(starts, pos, text_length, min_chars, max_chars)
+            unit_budget = max(1, min(budget, int(extent / chars_per_unit)))
+            # find_boundary only needs the text past the budget as lookahead
+            window_end = min(text_length, pos + 2 * extent + _DENSITY_LOOKAHEAD)
+            cut = self.find_boundary(text, pos, window_end, unit_budget)
+            span_start, span_end = strip_span(text, pos, cut)
+            if span_end > span_start:
+                spans.append((span_start, span_end))
+            pos = cut
+        return spans
+
     def chunk_document(
         self,
         text: str,
         strategy: Optional[ChunkingStrategy] = None,
-        document_type: Optional[DocumentType] = None
+        document_type: Optional[DocumentType] = None,
+        index: Optional[DocumentIndex] = None
     ) -> List[DocumentChunk]:
         """Chunk a document using the specified or adaptive strategy.
         
@@ -195,6 +491,7 @@ class SmartChunker:
             text: The document text to chunk
             strategy: Optional specific chunking strategy to use
             document_type: Optional document type hint
+            index: Structure index of text shared with other pipeline stages
             
         Returns:
             List of DocumentChunk objects
@@ -211,22 +508,22 @@ class SmartChunker:
         
         # Detect document type if not provided
         if document_type is None:
-            document_type = self.detect_document_type(text)
+            document_type = self.detect_document_type(text, index)
         
         logger.info(f"Chunking document with strategy={strategy}, type={document_type}, "
                    f"length={len(text)} chars")
         
         # Apply the appropriate chunking strategy
         if strategy == ChunkingStrategy.ADAPTIVE:
-            chunks = self._adaptive_chunking(text, document_type)
+            chunks = self._adaptive_chunking(text, document_type, index)
         elif strategy == ChunkingStrategy.LEGAL_AWARE:
-            chunks = self._legal_aware_chunking(text)
+            chunks = self._legal_aware_chunking(text, index)
         elif strategy == ChunkingStrategy.SECTION_AWARE:
-            chunks = self._section_aware_chunking(text)
+            chunks = self._section_aware_chunking(text, index)
         elif strategy == ChunkingStrategy.PARAGRAPH_AWARE:
-            chunks = self._paragraph_aware_chunking(text)
+            chunks = self._paragraph_aware_chunking(text, index)
         elif strategy == ChunkingStrategy.SENTENCE_AWARE:
-            chunks = self._sentence_aware_chunking(text)
+            chunks = self._sentence_aware_chunking(text, index)
         else:  # FIXED_SIZE
             chunks = self._fixed_size_chunking(text)
         
@@ -269,7 +566,8 @@ class SmartChunker:
         self,
         text: str,
         strategy: Optional[ChunkingStrategy] = None,
-        document_type: Optional[DocumentType] = None
+        document_type: Optional[DocumentType] = None,
+        index: Optional[DocumentIndex] = None
     ) -> List[DocumentChunk]:
         """Smart chunk a large document using the formula: (doc_chars / context_window) * 0.8.
         
@@ -280,6 +578,7 @@ class SmartChunker:
             text: The large document text to chunk
             strategy: Optional chunking strategy (defaults to LEGAL_AWARE for large docs)
             document_type: Optional document type hint
+            index: Structure index of text shared with other pipeline stages
             
         Returns:
             List of DocumentChunk objects with proper overlap
@@ -307,70 +606,112 @@ class SmartChunker:
         max_chunk = min(context_window * buffer, 10000)  # Cap at 10K chars to leave room for prompt
         optimal_chunk_size = max(min_chunk, min(optimal_chunk_size, max_chunk))
         
-        logger.info(f"Smart chunking document of {document_length:,} chars into chunks of ~{optimal_chunk_size:,} chars")
+        overlap_size = self.config.chunk_overlap  # Use configured overlap (now 500 chars)
         
-        # Calculate number of chunks needed
-        num_chunks = max(1, int(document_length / optimal_chunk_size) + (1 if document_length % optimal_chunk_size else 0))
+        if self.token_counter:
+            # Token sizing: each core fills the token budget less the overlap,
+            # cut at the budget's exact offset. The overlap is carried forward
+            # only (core + the next chunk's first tokens) so it is counted exactly
+            # too; every core boundary is still covered by one chunk.
+            overlap_tokens = 2 * int(overlap_size / self.token_counter.chars_per_token)
+            core_budget = max(1, self.max_chunk_tokens - overlap_tokens)
+        
+        if self.density_model is not None:
+            # Density sizing: cores end where their expected entity count
+            # reaches the target, within the same size budget
+            if index is not None and not index.covers(text):
+                index = None
+            cores = self._density_spans(
+                text, index, core_budget if self.token_counter else None
+            ) or [(0, document_length)]
+            density_starts = self.density_model.match_starts(text, index)
+            logger.info(f"Smart chunking document of {document_length:,} chars into "
+                       f"{len(cores)} entity-density sized chunks")
+        elif self.token_counter:
+            cores = self.split_span(text, 0, document_length, core_budget) or [(0, document_length)]
+            logger.info(f"Smart chunking document of {document_length:,} chars into chunks of "
+                       f"~{core_budget:,} tokens")
+        else:
+            logger.info(f"Smart chunking document of {document_length:,} chars into chunks of ~{optimal_chunk_size:,} chars")
+            
+            # Calculate number of chunks needed
+            num_chunks = max(1, int(document_length / optimal_chunk_size) + (1 if document_length % optimal_chunk_size else 0))
+            cores = [
+                (i * optimal_chunk_size, min(document_length, (i + 1) * optimal_chunk_size))
+                for i in range(num_chunks)
+            ]
+        num_chunks = len(cores)
         
         chunks = []
         chunk_index = 0
-        overlap_size = self.config.chunk_overlap  # Use configured overlap (now 500 chars)
         
-        for i in range(num_chunks):
+        for i, (core_start, core_end) in enumerate(cores):
             # Calculate chunk boundaries with overlap
-            if i == 0:
-                # First chunk: no overlap at start
-                start_pos = 0
-            else:
-                # Add overlap from previous chunk
-                start_pos = max(0, i * optimal_chunk_size - overlap_size)
-                # Find word boundary for clean overlap
-                while start_pos > 0 and start_pos < len(text) and not text[start_pos].isspace():
-                    start_pos -= 1
-            
-            if i == num_chunks - 1:
-                # Last chunk: extend to end of document
-                end_pos = document_length
+            if self.token_counter:
+                start_pos, end_pos = core_start, core_end
+                if i < num_chunks - 1 and overlap_tokens:
+                    # Carry the next chunk's first tokens forward
+                    end_pos = self._fit_words(text, core_end, document_length, overlap_tokens)
             else:
-                # Add overlap into next chunk
-                end_pos = min(document_length, (i + 1) * optimal_chunk_size + overlap_size)
-                # Find word boundary for clean overlap
-                while end_pos < len(text) and not text[end_pos].isspace():
-                    end_pos += 1
+                if i == 0:
+                    # First chunk: no overlap at start
+                    start_pos = 0
+                else:
+                    # Add overlap from previous chunk
+                    start_pos = max(0, core_start - overlap_size)
+                    # Find word boundary for clean overlap
+                    while start_pos > 0 and start_pos < len(text) and not text[start_pos].isspace():
+                        start_pos -= 1
+                
+                if i == num_chunks - 1:
+                    # Last chunk: extend to end of document
+                    end_pos = document_length
+                else:
+                    # Add overlap into next chunk
+                    end_pos = min(document_length, core_end + overlap_size)
+                    # Find word boundary for clean overlap
+                    while end_pos < len(text) and not text[end_pos].isspace():
+                        end_pos += 1
             
-            # Extract chunk text
-            chunk_text = text[start_pos:end_pos].strip()
+            # Chunk is a view over the stripped span; the core (non-overlap)
+            # region is this chunk's share of the document
+            span_start, span_end = strip_span(text, start_pos, end_pos)
             
-            if chunk_text:
-                chunk = DocumentChunk(
-                    text=chunk_text,
-                    start_pos=start_pos,
-                    end_pos=end_pos,
+            if span_end > span_start:
+                chunk = DocumentChunk.view(
+                    text, span_start, span_end,
                     chunk_index=chunk_index,
                     chunk_type="smart_chunk",
                     confidence=0.95,
+                    core_start=min(max(span_start, core_start), span_end),
+                    core_end=max(min(span_end, core_end), span_start),
                     metadata={
                         "strategy": "smart_chunking",
-                        "chunk_size": len(chunk_text),
-                        "overlap_before": overlap_size if i > 0 else 0,
+                        "chunk_size": span_end - span_start,
+                        "overlap_before": overlap_size if i > 0 and not self.token_counter else 0,
                         "overlap_after": overlap_size if i < num_chunks - 1 else 0,
                         "total_chunks": num_chunks,
                         "document_length": document_length,
-                        "optimal_chunk_size": optimal_chunk_size
+                        "optimal_chunk_size": optimal_chunk_size,
+                        "max_chunk_tokens": self.max_chunk_tokens
                     }
                 )
+                if self.density_model is not None:
+                    chunk.metadata["entity_weight"] = self.density_model.weight(
+                        density_starts, span_start, span_end
+                    )
                 chunks.append(chunk)
                 chunk_index += 1
                 
                 logger.debug(f"Created chunk {chunk_index}/{num_chunks}: "
-                           f"chars {start_pos:,}-{end_pos:,} (size: {len(chunk_text):,})")
+                           f"chars {span_start:,}-{span_end:,} (size: {span_end - span_start:,})")
         
         logger.info(f"Smart chunking complete: created {len(chunks)} chunks with {overlap_size} char overlap")
         
         # If a specific strategy was requested, apply additional processing
         if strategy and strategy != ChunkingStrategy.FIXED_SIZE:
             # Apply legal-aware or other strategy-specific refinements
-            chunks = self._refine_smart_chunks(chunks, text, strategy, document_type)
+            chunks = self._refine_smart_chunks(chunks, text, strategy, document_type, index)
         
         return chunks
     
@@ -379,7 +720,8 @@ class SmartChunker:
         chunks: List[DocumentChunk],
         text: str,
         strategy: ChunkingStrategy,
-        document_type: Optional[DocumentType]
+        document_type: Optional[DocumentType],
+        index: Optional[DocumentIndex] = None
     ) -> List[DocumentChunk]:
         """Refine smart chunks based on specific strategy requirements.
         
@@ -391,13 +733,14 @@ class SmartChunker:
             text: Original document text
             strategy: Chunking strategy to apply
             document_type: Type of document
+            index: Optional structure index of text
             
         Returns:
             Refined list of DocumentChunk objects
         """
         if strategy == ChunkingStrategy.LEGAL_AWARE:
             # Find legal boundaries to avoid splitting
-            boundaries = self._find_legal_boundaries(text)
+            boundaries = self._find_legal_boundaries(text, index)
             
             refined_chunks = []
             for chunk in chunks:
@@ -420,15 +763,19 @@ class SmartChunker:
         # For other strategies, return chunks as-is
         return chunks
     
-    def detect_document_type(self, text: str) -> DocumentType:
+    def detect_document_type(self, text: str, index: Optional[DocumentIndex] = None) -> DocumentType:
         """Detect the type of legal document based on content analysis.
         
         Args:
             text: Document text to analyze
+            index: Optional structure index of text (the result is kept on it)
             
         Returns:
             Detected DocumentType
         """
+        if index is not None and index.covers(text):
+            return index.memo("smart_chunker.document_type", lambda: self.detect_document_type(text))
+        
         text_lower = text[:5000].lower()  # Analyze first 5000 chars for efficiency
         
         # Contract indicators
@@ -479,15 +826,19 @@ class SmartChunker:
         
         return document_type
     
-    def calculate_complexity(self, text: str) -> float:
+    def calculate_complexity(self, text: str, index: Optional[DocumentIndex] = None) -> float:
         """Calculate document complexity based on legal terminology and structure.
         
         Args:
             text: Text to analyze
+            index: Optional structure index of text (sentences and citations are taken from it)
             
         Returns:
             Complexity score between 0.0 and 1.0
         """
+        if index is not None and not index.covers(text):
+            index = None
+        
         words = word_tokenize(text.lower())
         total_words = len(words)
         
@@ -506,14 +857,17 @@ class SmartChunker:
         )
         
         # Factor in sentence length (longer sentences = higher complexity)
-        sentences = sent_tokenize(text)
+        sentences = index.sentences if index is not None else sent_tokenize(text)
         if sentences:
             avg_sentence_length = total_words / len(sentences)
             length_factor = min(avg_sentence_length / 50, 1.0)  # Cap at 50 words per sentence
             complexity_score = (complexity_score + length_factor) / 2
         
         # Factor in citation density
-        citation_count = len(self.citation_pattern.findall(text))
+        if index is not None:
+            citation_count = len(index.spans(self.citation_pattern))
+        else:
+            citation_count = len(self.citation_pattern.findall(text))
         citation_density = citation_count / (total_words / 100)  # Citations per 100 words
         citation_factor = min(citation_density / 5, 1.0)  # Cap at 5 citations per 100 words
         
@@ -522,150 +876,172 @@ class SmartChunker:
         
         return min(max(final_score, 0.0), 1.0)  # Ensure 0-1 range
     
-    def _adaptive_chunking(self, text: str, document_type: DocumentType) -> List[DocumentChunk]:
+    def _adaptive_chunking(
+        self,
+        text: str,
+        document_type: DocumentType,
+        index: Optional[DocumentIndex] = None
+    ) -> List[DocumentChunk]:
         """Choose and apply the best chunking strategy based on document characteristics.
         
         Args:
             text: Document text to chunk
             document_type: Type of legal document
+            index: Optional structure index of text
             
         Returns:
             List of DocumentChunk objects
         """
-        complexity = self.calculate_complexity(text)
+        if self.density_model is not None:
+            return self._density_chunking(text, index)
+        
+        complexity = self.calculate_complexity(text, index)
         
         logger.debug(f"Adaptive chunking for {document_type} with complexity={complexity:.2f}")
         
         # Select strategy based on document type and complexity
         if document_type == DocumentType.CONTRACT:
             # Contracts benefit from section-aware chunking
-            return self._section_aware_chunking(text)
+            return self._section_aware_chunking(text, index)
         
         elif document_type == DocumentType.OPINION:
             # Opinions need legal-aware chunking to preserve citations
-            return self._legal_aware_chunking(text)
+            return self._legal_aware_chunking(text, index)
         
         elif document_type == DocumentType.STATUTE:
             # Statutes have clear section structure
-            return self._section_aware_chunking(text)
+            return self._section_aware_chunking(text, index)
         
         elif document_type == DocumentType.BRIEF:
             # Briefs benefit from paragraph-aware chunking
-            return self._paragraph_aware_chunking(text)
+            return self._paragraph_aware_chunking(text, index)
         
         else:
             # Default based on complexity
             if complexity > 0.7:
-                return self._legal_aware_chunking(text)
+                return self._legal_aware_chunking(text, index)
             elif complexity > 0.4:
-                return self._paragraph_aware_chunking(text)
+                return self._paragraph_aware_chunking(text, index)
             else:
-                return self._sentence_aware_chunking(text)
+                return self._sentence_aware_chunking(text, index)
+    
+    def _density_chunking(self, text: str, index: Optional[DocumentIndex] = None) -> List[DocumentChunk]:
+        """Chunk text into spans of roughly equal expected entity count.
+        
+        Args:
+            text: Text to chunk
+            index: Optional structure index of text
+            
+        Returns:
+            List of DocumentChunk objects
+        """
+        if index is not None and not index.covers(text):
+            index = None
+        starts = self.density_model.match_starts(text, index)
+        return [
+            DocumentChunk.view(
+                text, start, end,
+                chunk_index=chunk_index,
+                chunk_type="density",
+                confidence=0.9,
+                metadata={
+                    "strategy": "entity_density",
+                    "entity_weight": self.density_model.weight(starts, start, end)
+                }
+            )
+            for chunk_index, (start, end) in enumerate(self._density_spans(text, index))
+        ]
     
-    def _legal_aware_chunking(self, text: str) -> List[DocumentChunk]:
+    def _legal_aware_chunking(self, text: str, index: Optional[DocumentIndex] = None) -> List[DocumentChunk]:
         """Chunk text with awareness of legal structure and citations.
         
         Preserves legal sections, citations, and quotes as atomic units.
         
         Args:
             text: Text to chunk
+            index: Optional structure index of text
             
         Returns:
             List of DocumentChunk objects
         """
         chunks = []
-        current_chunk = []
-        current_size = 0
         chunk_start = 0
-        chunk_index = 0
         
-        # Find all legal boundaries
-        boundaries = self._find_legal_boundaries(text)
+        # Find all legal boundaries (sorted and non-overlapping)
+        if index is not None and not index.covers(text):
+            index = None
+        boundaries = self._find_legal_boundaries(text, index)
+        boundary_idx = 0
+        num_boundaries = len(boundaries)
+        max_size = self.max_size
+        min_size = self.min_size
+        
+        # Token sizing counts every line in one batch up front
+        line_sizes = None
+        if self.token_counter:
+            line_spans = index.line_spans() if index is not None else self._line_spans(text)
+            line_sizes = iter(self.token_counter.count_spans(text, line_spans))
+        
+        def close_chunk(end: int):
+            chunks.append(DocumentChunk.view(
+                text, chunk_start, end,
+                chunk_index=len(chunks),
+                chunk_type="legal_section",
+                confidence=0.9,
+                metadata={"strategy": "legal_aware"}
+            ))
         
-        lines = text.split('\n')
+        # Walk lines by offset rather than text.split('\n'), which would copy the document
+        text_length = len(text)
         current_pos = 0
+        current_size = 0
         
-        for line_num, line in enumerate(lines):
-            line_with_newline = line + '\n' if line_num < len(lines) - 1 else line
-            line_len = len(line_with_newline)
+        while True:
+            newline = text.find('\n', current_pos)
+            line_end = newline if newline != -1 else text_length
+            line_len = line_end - current_pos + (1 if newline != -1 else 0)
+            line_size = next(line_sizes) if line_sizes is not None else line_len
             
-            # Check if this line contains a boundary that shouldn't be split
-            is_boundary = any(
-                boundary[0] <= current_pos < boundary[1]
-                for boundary in boundaries
+            # Check if this line contains a boundary that shouldn't be split.
+            # Line starts only move forward, so skip boundaries that end at or
+            # before this line; the next one is the only one that can contain it.
+            while boundary_idx < num_boundaries and boundaries[boundary_idx][1] <= current_pos:
+                boundary_idx += 1
+            is_boundary = (
+                boundary_idx < num_boundaries
+                and boundaries[boundary_idx][0] <= current_pos
             )
             
             # Check if this line starts a new section
-            is_section_start = bool(self.section_pattern.match(line))
-            
-            # Decide whether to start a new chunk
-            if is_section_start and current_size > self.config.min_chunk_size:
-                # Save current chunk
-                if current_chunk:
-                    chunk_text = ''.join(current_chunk)
-                    chunks.append(DocumentChunk(
-                        text=chunk_text,
-                        start_pos=chunk_start,
-                        end_pos=chunk_start + len(chunk_text),
-                        chunk_index=chunk_index,
-                        chunk_type="legal_section",
-                        confidence=0.9,
-                        metadata={"strategy": "legal_aware"}
-                    ))
-                    chunk_index += 1
-                
-                # Start new chunk
-                current_chunk = [line_with_newline]
-                current_size = line_len
-                chunk_start = current_pos
+            is_section_start = bool(self.section_pattern.match(text, current_pos, line_end))
             
-            elif current_size + line_len > self.config.max_chunk_size and not is_boundary:
-                # Current chunk is full and we're not in a boundary
-                if current_chunk:
-                    chunk_text = ''.join(current_chunk)
-                    chunks.append(DocumentChunk(
-                        text=chunk_text,
-                        start_pos=chunk_start,
-                        end_pos=chunk_start + len(chunk_text),
-                        chunk_index=chunk_index,
-                        chunk_type="legal_section",
-                        confidence=0.9,
-                        metadata={"strategy": "legal_aware"}
-                    ))
-                    chunk_index += 1
-                
-                # Start new chunk
-                current_chunk = [line_with_newline]
-                current_size = line_len
+            # Start a new chunk at a section start, or when the current chunk is
+            # full and we're not inside a boundary
+            if (
+                (is_section_start and current_size > min_size)
+                or (current_size + line_size > max_size and not is_boundary)
+            ):
+                if current_pos > chunk_start:
+                    close_chunk(current_pos)
                 chunk_start = current_pos
+                current_size = 0
             
-            else:
-                # Add to current chunk
-                current_chunk.append(line_with_newline)
-                current_size += line_len
-            
+            current_size += line_size
             current_pos += line_len
+            if newline == -1:
+                break
         
         # Save final chunk
-        if current_chunk:
-            chunk_text = ''.join(current_chunk)
-            chunks.append(DocumentChunk(
-                text=chunk_text,
-                start_pos=chunk_start,
-                end_pos=chunk_start + len(chunk_text),
-                chunk_index=chunk_index,
-                chunk_type="legal_section",
-                confidence=0.9,
-                metadata={"strategy": "legal_aware"}
-            ))
+        close_chunk(current_pos)
         
         return chunks
     
-    def _section_aware_chunking(self, text: str) -> List[DocumentChunk]:
+    def _section_aware_chunking(self, text: str, index: Optional[DocumentIndex] = None) -> List[DocumentChunk]:
         """Chunk text based on document sections and structure.
         
         Args:
             text: Text to chunk
+            index: Optional structure index of text
             
         Returns:
             List of DocumentChunk objects
@@ -673,188 +1049,97 @@ class SmartChunker:
         chunks = []
         
         # Find all section markers
-        sections = list(self.section_pattern.finditer(text))
+        if index is not None and index.covers(text):
+            sections = index.spans(self.section_pattern)
+        else:
+            sections = [match.span() for match in self.section_pattern.finditer(text)]
         
         if not sections:
             # No sections found, fall back to paragraph chunking
-            return self._paragraph_aware_chunking(text)
+            return self._paragraph_aware_chunking(text, index)
         
         chunk_index = 0
         
-        for i, section_match in enumerate(sections):
-            section_start = section_match.start()
-            
+        for i, (header_start, header_end) in enumerate(sections):
             # Determine section end
             if i < len(sections) - 1:
-                section_end = sections[i + 1].start()
+                next_section = sections[i + 1][0]
             else:
-                section_end = len(text)
+                next_section = len(text)
             
-            section_text = text[section_start:section_end].strip()
+            section_start, section_end = strip_span(text, header_start, next_section)
             
-            if len(section_text) <= self.config.max_chunk_size:
+            if self._span_size(text, section_start, section_end) <= self.max_size:
                 # Section fits in one chunk
-                chunks.append(DocumentChunk(
-                    text=section_text,
-                    start_pos=section_start,
-                    end_pos=section_end,
+                chunks.append(DocumentChunk.view(
+                    text, section_start, section_end,
                     chunk_index=chunk_index,
                     chunk_type="section",
                     confidence=0.95,
                     metadata={
                         "strategy": "section_aware",
-                        "section_header": section_match.group()
+                        "section_header": text[header_start:header_end]
                     }
                 ))
                 chunk_index += 1
             else:
                 # Section too large, need to split it
                 sub_chunks = self._split_large_section(
-                    section_text, section_start, chunk_index
+                    text, section_start, section_end, chunk_index, index
                 )
                 chunks.extend(sub_chunks)
                 chunk_index += len(sub_chunks)
         
         return chunks
     
-    def _paragraph_aware_chunking(self, text: str) -> List[DocumentChunk]:
+    def _paragraph_aware_chunking(self, text: str, index: Optional[DocumentIndex] = None) -> List[DocumentChunk]:
         """Chunk text at paragraph boundaries.
         
         Args:
             text: Text to chunk
+            index: Optional structure index of text
             
         Returns:
             List of DocumentChunk objects
         """
-        chunks = []
-        
-        # Split into paragraphs (double newline or more)
-        paragraphs = re.split(r'\n\s*\n', text)
-        
-        current_chunk = []
-        current_size = 0
-        chunk_start = 0
-        chunk_index = 0
-        current_pos = 0
-        
-        for para_num, paragraph in enumerate(paragraphs):
-            para_with_separator = paragraph
-            if para_num < len(paragraphs) - 1:
-                para_with_separator += "\n\n"
-            
-            para_len = len(para_with_separator)
-            
-            if current_size + para_len > self.config.max_chunk_size and current_chunk:
-                # Save current chunk
-                chunk_text = '\n\n'.join(current_chunk)
-                chunks.append(DocumentChunk(
-                    text=chunk_text,
-                    start_pos=chunk_start,
-                    end_pos=chunk_start + len(chunk_text),
-                    chunk_index=chunk_index,
-                    chunk_type="paragraph",
-                    confidence=0.85,
-                    metadata={"strategy": "paragraph_aware"}
-                ))
-                chunk_index += 1
-                
-                # Start new chunk
-                current_chunk = [paragraph]
-                current_size = para_len
-                chunk_start = current_pos
-            else:
-                # Add to current chunk
-                current_chunk.append(paragraph)
-                current_size += para_len
-            
-            current_pos += para_len
-        
-        # Save final chunk
-        if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
-            chunks.append(DocumentChunk(
-                text=chunk_text,
-                start_pos=chunk_start,
-                end_pos=chunk_start + len(chunk_text),
-                chunk_index=chunk_index,
-                chunk_type="paragraph",
-                confidence=0.85,
-                metadata={"strategy": "paragraph_aware"}
-            ))
-        
-        return chunks
+        return self._pack_spans(
+            text,
+            self._paragraph_spans(text, 0, len(text), index),
+            chunk_type="paragraph",
+            confidence=0.85,
+            strategy="paragraph_aware"
+        )
     
-    def _sentence_aware_chunking(self, text: str) -> List[DocumentChunk]:
+    def _sentence_aware_chunking(self, text: str, index: Optional[DocumentIndex] = None) -> List[DocumentChunk]:
         """Chunk text at sentence boundaries using NLTK.
         
         Args:
             text: Text to chunk
+            index: Optional structure index of text
             
         Returns:
             List of DocumentChunk objects
         """
-        chunks = []
-        
-        # Tokenize into sentences
-        sentences = sent_tokenize(text)
-        
-        current_chunk = []
-        current_size = 0
-        chunk_start = 0
-        chunk_index = 0
-        
-        # Track position in original text
-        current_pos = 0
-        
-        for sentence in sentences:
-            # Find sentence position in original text
-            sentence_start = text.find(sentence, current_pos)
-            if sentence_start == -1:
-                continue
-            
-            sentence_len = len(sentence)
-            
-            if current_size + sentence_len > self.config.max_chunk_size and current_chunk:
-                # Save current chunk
-                chunk_text = ' '.join(current_chunk)
-                chunks.append(DocumentChunk(
-                    text=chunk_text,
-                    start_pos=chunk_start,
-                    end_pos=chunk_start + len(chunk_text),
-                    chunk_index=chunk_index,
-                    chunk_type="sentence",
-                    confidence=0.8,
-                    metadata={"strategy": "sentence_aware"}
-                ))
-                chunk_index += 1
-                
-                # Start new chunk
-                current_chunk = [sentence]
-                current_size = sentence_len
-                chunk_start = sentence_start
-            else:
-                # Add to current chunk
-                if not current_chunk:
-                    chunk_start = sentence_start
-                current_chunk.append(sentence)
-                current_size += sentence_len
-            
-            current_pos = sentence_start + sentence_len
-        
-        # Save final chunk
-        if current_chunk:
-            chunk_text = ' '.join(current_chunk)
-            chunks.append(DocumentChunk(
-                text=chunk_text,
-                start_pos=chunk_start,
-                end_pos=chunk_start + len(chunk_text),
-                chunk_index=chunk_index,
-                chunk_type="sentence",
-                confidence=0.8,
-                metadata={"strategy": "sentence_aware"}
-            ))
-        
-        return chunks
+        if index is not None and index.covers(text):
+            spans = index.sentence_spans
+        else:
+            # Locate each sentence in the original text
+            spans = []
+            current_pos = 0
+            for sentence in sent_tokenize(text):
+                sentence_start = text.find(sentence, current_pos)
+                if sentence_start == -1:
+                    continue
+                current_pos = sentence_start + len(sentence)
+                spans.append((sentence_start, current_pos))
+        
+        return self._pack_spans(
+            text,
+            spans,
+            chunk_type="sentence",
+            confidence=0.8,
+            strategy="sentence_aware"
+        )
     
     def _fixed_size_chunking(self, text: str) -> List[DocumentChunk]:
         """Simple fixed-size chunking with basic word boundary awareness.
@@ -871,7 +1156,7 @@ class SmartChunker:
         
         while current_pos < len(text):
             # Calculate chunk end position
-            chunk_end = min(current_pos + self.config.max_chunk_size, len(text))
+            chunk_end = self._fit(text, current_pos, len(text), self.max_size)
             
             # Try to break at word boundary if not at end of text
             if chunk_end < len(text):
@@ -881,13 +1166,11 @@ class SmartChunker:
                     chunk_end = last_space
             
             # Extract chunk
-            chunk_text = text[current_pos:chunk_end].strip()
+            span_start, span_end = strip_span(text, current_pos, chunk_end)
             
-            if chunk_text:
-                chunks.append(DocumentChunk(
-                    text=chunk_text,
-                    start_pos=current_pos,
-                    end_pos=chunk_end,
+            if span_end > span_start:
+                chunks.append(DocumentChunk.view(
+                    text, span_start, span_end,
                     chunk_index=chunk_index,
                     chunk_type="fixed",
                     confidence=0.7,
@@ -903,15 +1186,28 @@ class SmartChunker:
         
         return chunks
     
-    def _find_legal_boundaries(self, text: str) -> List[Tuple[int, int]]:
+    def _find_legal_boundaries(
+        self,
+        text: str,
+        index: Optional[DocumentIndex] = None
+    ) -> List[Tuple[int, int]]:
         """Find boundaries that shouldn't be split (citations, quotes).
         
         Args:
             text: Text to analyze
+            index: Optional structure index of text (the merged boundaries are kept on it)
             
         Returns:
             List of (start, end) tuples representing boundaries
         """
+        if index is not None and index.covers(text):
+            return index.memo(
+                "smart_chunker.legal_boundaries",
+                lambda: self._merge_boundaries(
+                    index.spans(self.citation_pattern) + index.spans(self.quote_pattern)
+                )
+            )
+        
         boundaries = []
         
         # Find all citations
@@ -922,6 +1218,10 @@ class SmartChunker:
         for match in self.quote_pattern.finditer(text):
             boundaries.append((match.start(), match.end()))
         
+        return self._merge_boundaries(boundaries)
+    
+    def _merge_boundaries(self, boundaries: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Sort boundary spans and merge overlapping ones."""
         # Sort and merge overlapping boundaries
         boundaries.sort(key=lambda x: x[0])
         
@@ -937,70 +1237,126 @@ class SmartChunker:
     
     def _split_large_section(
         self,
-        section_text: str,
+        text: str,
         section_start: int,
-        start_index: int
+        section_end: int,
+        start_index: int,
+        index: Optional[DocumentIndex] = None
     ) -> List[DocumentChunk]:
-        """Split a large section into smaller chunks.
+        """Split a large section into smaller chunks at paragraph boundaries.
         
         Args:
-            section_text: Text of the section to split
-            section_start: Starting position in original document
+            text: Full document text
+            section_start: Section start position in the document
+            section_end: Section end position in the document
             start_index: Starting chunk index
+            index: Optional structure index of text
             
         Returns:
             List of DocumentChunk objects
         """
-        # Use paragraph-aware chunking for large sections
-        sub_chunks = []
-        
-        # Try paragraph splitting first
-        paragraphs = re.split(r'\n\s*\n', section_text)
+        return self._pack_spans(
+            text,
+            self._paragraph_spans(text, section_start, section_end, index),
+            chunk_type="section_part",
+            confidence=0.85,
+            strategy="section_split",
+            start_index=start_index
+        )
+    
+    def _paragraph_spans(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        index: Optional[DocumentIndex] = None
+    ) -> List[Tuple[int, int]]:
+        """Offsets of paragraphs (separated by blank lines) within text[start:end].
+        
+        With an index the breaks come from its one scan of the document;
+        callers pass the whole text or a strip_span span, which no break crosses.
+        """
+        if index is not None and index.covers(text):
+            breaks = index.spans_within(self.paragraph_break_pattern, start, end)
+        else:
+            breaks = (match.span() for match in self.paragraph_break_pattern.finditer(text, start, end))
+        spans = []
+        pos = start
+        for break_start, break_end in breaks:
+            spans.append((pos, break_start))
+            pos = break_end
+        spans.append((pos, end))
+        return spans
+    
+    def _line_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Offsets of each line including its newline."""
+        spans = []
+        pos = 0
+        while True:
+            newline = text.find('\n', pos)
+            if newline == -1:
+                spans.append((pos, len(text)))
+                return spans
+            spans.append((pos, newline + 1))
+            pos = newline + 1
+    
+    def _pack_spans(
+        self,
+        text: str,
+        spans: List[Tuple[int, int]],
+        chunk_type: str,
+        confidence: float,
+        strategy: str,
+        start_index: int = 0
+    ) -> List[DocumentChunk]:
+        """Group consecutive spans (paragraphs, sentences) into chunks up to the size budget.
         
-        current_chunk = []
-        current_size = 0
-        chunk_start = 0
-        chunk_index = start_index
+        Each chunk is a view from its first span's start to its last span's end,
+        so the separators between spans are the document's own. With token
+        sizing, spans and separators are counted in one batch, and a span that
+        alone exceeds the budget is split at the token budget.
+        """
+        chunks = []
+        chunk_start = chunk_end = None
+        chunk_size = 0
+        max_size = self.max_size
+        
+        if self.token_counter:
+            span_sizes = self._span_sizes(text, spans)
+            if any(size > max_size for size in span_sizes):
+                spans = [
+                    piece
+                    for span, size in zip(spans, span_sizes)
+                    for piece in (self.split_span(text, *span) if size > max_size else [span])
+                ]
+        gaps = [(prev[1], span[0]) for prev, span in zip(spans, spans[1:])]
+        sizes = self._span_sizes(text, list(spans) + gaps)
+        span_sizes, gap_sizes = sizes[:len(spans)], [0] + sizes[len(spans):]
+        
+        def close_chunk():
+            chunks.append(DocumentChunk.view(
+                text, chunk_start, chunk_end,
+                chunk_index=start_index + len(chunks),
+                chunk_type=chunk_type,
+                confidence=confidence,
+                metadata={"strategy": strategy}
+            ))
         
-        for paragraph in paragraphs:
-            para_len = len(paragraph)
-            
-            if current_size + para_len > self.config.max_chunk_size and current_chunk:
-                # Save current chunk
-                chunk_text = '\n\n'.join(current_chunk)
-                sub_chunks.append(DocumentChunk(
-                    text=chunk_text,
-                    start_pos=section_start + chunk_start,
-                    end_pos=section_start + chunk_start + len(chunk_text),
-                    chunk_index=chunk_index,
-                    chunk_type="section_part",
-                    confidence=0.85,
-                    metadata={"strategy": "section_split"}
-                ))
-                chunk_index += 1
-                
-                # Start new chunk
-                current_chunk = [paragraph]
-                current_size = para_len
-                chunk_start += len(chunk_text) + 2  # Account for paragraph separator
+        for (span_start, span_end), span_size, gap_size in zip(spans, span_sizes, gap_sizes):
+            if chunk_start is not None and chunk_size + gap_size + span_size > max_size:
+                close_chunk()
+                chunk_start = None
+            if chunk_start is None:
+                chunk_start = span_start
+                chunk_size = span_size
             else:
-                current_chunk.append(paragraph)
-                current_size += para_len
+                chunk_size += gap_size + span_size
+            chunk_end = span_end
         
-        # Save final chunk
-        if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
-            sub_chunks.append(DocumentChunk(
-                text=chunk_text,
-                start_pos=section_start + chunk_start,
-                end_pos=section_start + chunk_start + len(chunk_text),
-                chunk_index=chunk_index,
-                chunk_type="section_part",
-                confidence=0.85,
-                metadata={"strategy": "section_split"}
-            ))
+        if chunk_start is not None:
+            close_chunk()
         
-        return sub_chunks
+        return chunks
     
     def _apply_overlap(self, chunks: List[DocumentChunk], original_text: str) -> List[DocumentChunk]:
         """Apply overlap between chunks for context continuity.
@@ -1037,16 +1393,16 @@ class SmartChunker:
                     overlap_end += 1
                 new_end = overlap_end
             
-            # Create new chunk with overlap
-            overlapped_text = original_text[new_start:new_end].strip()
+            # Widen the view; the original span stays as the core region
+            new_start, new_end = strip_span(original_text, new_start, new_end)
             
-            overlapped_chunks.append(DocumentChunk(
-                text=overlapped_text,
-                start_pos=new_start,
-                end_pos=new_end,
+            overlapped_chunks.append(DocumentChunk.view(
+                original_text, new_start, new_end,
                 chunk_index=chunk.chunk_index,
                 chunk_type=chunk.chunk_type,
                 confidence=chunk.confidence,
+                core_start=max(chunk.start_pos, new_start),
+                core_end=min(chunk.end_pos, new_end),
                 metadata={
                     **chunk.metadata,
                     "has_overlap": True,
@@ -1070,20 +1426,24 @@ class SmartChunker:
         
         for chunk in chunks:
             # Skip empty chunks
-            if not chunk.text.strip():
+            if chunk.is_blank():
                 continue
             
+            # Character sizing allows 20% overflow; token sizing is exact
+            size = self._span_size(chunk.text, 0, chunk.length) if self.token_counter else chunk.length
+            max_allowed = self.max_size if self.token_counter else self.config.max_chunk_size * 1.2
+            
             # Check minimum size
-            if chunk.length < self.config.min_chunk_size:
+            if size < self.min_size:
                 logger.warning(f"Chunk {chunk.chunk_index} below minimum size "
-                             f"({chunk.length} < {self.config.min_chunk_size})")
+                             f"({size} < {self.min_size})")
                 # Could merge with adjacent chunk, but for now just flag it
                 chunk.metadata["below_min_size"] = True
             
             # Check maximum size
-            if chunk.length > self.config.max_chunk_size * 1.2:  # Allow 20% overflow
+            if size > max_allowed:
                 logger.warning(f"Chunk {chunk.chunk_index} exceeds maximum size "
-                             f"({chunk.length} > {self.config.max_chunk_size * 1.2})")
+                             f"({size} > {max_allowed})")
                 # Could split further, but for now just flag it
                 chunk.metadata["exceeds_max_size"] = True
             
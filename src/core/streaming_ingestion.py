@@ -0,0 +1,318 @@
+"""
+Streaming ingestion of large documents.
+
+The v2 process endpoints take the whole document as one JSON string
+(ProcessRequest.document_text), so a request near the 100 MB body limit is
+held several times over while the body is read, decoded and parsed, and
+chunking only starts once all of it is in memory.
+
+This module chunks a document while it is still arriving:
+
+- StreamingChunker reads text pieces (decoded from a chunked or multipart
+  request body by decode_text_stream) into a bounded buffer and cuts chunks
+  with SmartChunker.find_boundary. A cut is only made once
+  STREAMING_LOOKAHEAD_CHARS of text past it have arrived, so citations,
+  quotes and section headers crossing the budget are seen whole; the text
+  before the next chunk's overlap is then dropped from the buffer.
+- StreamingExtractor sends each chunk to extraction as soon as it is cut,
+  with at most STREAMING_MAX_INFLIGHT_CHUNKS in flight. Reading of the body
+  pauses while that many are running, and results are yielded per chunk in
+  document order instead of being collected.
+
+Memory therefore stays bounded by STREAMING_MAX_BUFFER_CHARS plus the
+in-flight chunks, however large the document.
+"""
+
+import asyncio
+import codecs
+import logging
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.core.config import get_settings
+from src.core.smart_chunker import DocumentChunk, SmartChunker, strip_span
+from src.vllm_client.exceptions import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+# Extraction of one chunk's text: returns {"entities": [...], "tokens_used": int, ...}
+ExtractFn = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+async def decode_text_stream(
+    byte_stream: AsyncIterable[bytes],
+    encoding: str = "utf-8"
+) -> AsyncIterator[str]:
+    """
+    Decode a byte stream to text pieces without joining it.
+
+    Multi-byte characters split across pieces are carried over to the next
+    piece by an incremental decoder.
+
+    Args:
+        byte_stream: Request body pieces (e.g. Request.stream())
+        encoding: Text encoding of the body
+
+    Yields:
+        Decoded text pieces
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    async for data in byte_stream:
+        text = decoder.decode(data)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+class StreamingChunker:
+    """
+    Cuts chunks from a text stream as it arrives, holding a bounded buffer.
+
+    Chunks are detached DocumentChunks (they own their text) whose offsets
+    are positions in the whole streamed document; [core_start, core_end) is
+    the part not repeated from the previous chunk's overlap.
+    """
+
+    def __init__(
+        self,
+        chunker: Optional[SmartChunker] = None,
+        lookahead_chars: int = 2000,
+        max_buffer_chars: int = 100000,
+        overlap_chars: Optional[int] = None
+    ):
+        """
+        Initialize StreamingChunker.
+
+        Args:
+            chunker: SmartChunker supplying the size budget and boundary logic
+            lookahead_chars: Text that must follow a cut before it is made
+            max_buffer_chars: Buffer size at which a chunk is cut regardless of lookahead
+            overlap_chars: Text repeated at the start of each chunk (defaults to
+                the chunker's chunk_overlap)
+        """
+        self.chunker = chunker or SmartChunker()
+        self.lookahead_chars = lookahead_chars
+        self.max_buffer_chars = max_buffer_chars
+        self.overlap_chars = (
+            overlap_chars if overlap_chars is not None else self.chunker.config.chunk_overlap
+        )
+        # Each chunk's own text fills the budget less the overlap carried in front of it
+        overlap_units = self.overlap_chars
+        if self.chunker.token_counter:
+            overlap_units = int(self.overlap_chars / self.chunker.token_counter.chars_per_token)
+        self.core_budget = max(1, self.chunker.max_size - overlap_units)
+
+    @classmethod
+    def from_settings(
+        cls,
+        chunker: Optional[SmartChunker] = None,
+        settings=None
+    ) -> "StreamingChunker":
+        """Create a StreamingChunker from STREAMING_* settings."""
+        settings = settings or get_settings()
+        return cls(
+            chunker=chunker,
+            lookahead_chars=settings.chunking.streaming_lookahead_chars,
+            max_buffer_chars=settings.chunking.streaming_max_buffer_chars
+        )
+
+    async def chunks(self, pieces: AsyncIterable[str]) -> AsyncIterator[DocumentChunk]:
+        """
+        Chunk a document arriving as text pieces.
+
+        Args:
+            pieces: The document's text, in order
+
+        Yields:
+            DocumentChunk objects in document order, each as soon as it is cut
+        """
+        buffer = ""
+        offset = 0       # Document position of buffer[0]
+        chunk_start = 0  # Buffer position of the next chunk, including overlap
+        core_start = 0   # Buffer position of the next chunk's own text
+        chunk_index = 0
+
+        def overlap_start(cut: int) -> int:
+            # Start of the next chunk's overlap, moved forward to a word start
+            start = max(0, cut - self.overlap_chars)
+            while 0 < start < cut and not buffer[start - 1].isspace():
+                start += 1
+            return start
+
+        def make_chunk(cut: int) -> Optional[DocumentChunk]:
+            start, end = strip_span(buffer, chunk_start, cut)
+            if end <= start:
+                return None
+            return DocumentChunk(
+                text=buffer[start:end],
+                start_pos=offset + start,
+                end_pos=offset + end,
+                chunk_index=chunk_index,
+                chunk_type="streamed",
+                confidence=0.9,
+                core_start=offset + min(max(start, core_start), end),
+                metadata={"strategy": "streaming"}
+            )
+
+        async for piece in pieces:
+            buffer += piece
+            while len(buffer) - core_start > self.lookahead_chars:
+                cut = self.chunker.find_boundary(buffer, core_start, len(buffer), self.core_budget)
+                if cut > len(buffer) - self.lookahead_chars:
+                    if len(buffer) < self.max_buffer_chars:
+                        break  # Wait for the text following the cut
+                    # Buffer is full: cut within what has lookahead
+                    cut = self.chunker.find_boundary(
+                        buffer, core_start, len(buffer) - self.lookahead_chars, self.core_budget
+                    )
+                    logger.debug(f"Streaming buffer full at {offset + len(buffer):,} chars; forced cut")
+
+                chunk = make_chunk(cut)
+                if chunk is not None:
+                    yield chunk
+                    chunk_index += 1
+
+                # Keep the overlap and drop the text before it
+                core_start = cut
+                chunk_start = overlap_start(cut)
+                buffer = buffer[chunk_start:]
+                offset += chunk_start
+                core_start -= chunk_start
+                chunk_start = 0
+
+        # End of stream: the remaining text needs no lookahead
+        while core_start < len(buffer):
+            cut = self.chunker.find_boundary(buffer, core_start, len(buffer), self.core_budget)
+            chunk = make_chunk(cut)
+            if chunk is not None:
+                yield chunk
+                chunk_index += 1
+            core_start = cut
+            chunk_start = overlap_start(cut)
+
+
+class StreamingExtractor:
+    """
+    Extracts entities from a streamed document chunk by chunk.
+
+    Each chunk is dispatched to extraction as soon as it is cut; results are
+    yielded in chunk order with entity positions rebased onto the whole
+    document. An entity starting in a chunk's leading overlap belongs to the
+    previous chunk and is dropped, so each entity is reported once.
+    """
+
+    def __init__(
+        self,
+        extract_fn: ExtractFn,
+        chunker: Optional[StreamingChunker] = None,
+        max_inflight_chunks: int = 4
+    ):
+        """
+        Initialize StreamingExtractor.
+
+        Args:
+            extract_fn: Extraction of one chunk's text (e.g. 3-wave extraction)
+            chunker: StreamingChunker cutting the document
+            max_inflight_chunks: Chunks extracted concurrently before reading pauses
+        """
+        self.extract_fn = extract_fn
+        self.chunker = chunker or StreamingChunker()
+        self.max_inflight_chunks = max_inflight_chunks
+
+    @classmethod
+    def from_settings(
+        cls,
+        extract_fn: ExtractFn,
+        chunker: Optional[SmartChunker] = None,
+        settings=None
+    ) -> "StreamingExtractor":
+        """Create a StreamingExtractor from STREAMING_* settings."""
+        settings = settings or get_settings()
+        return cls(
+            extract_fn,
+            chunker=StreamingChunker.from_settings(chunker, settings=settings),
+            max_inflight_chunks=settings.chunking.streaming_max_inflight_chunks
+        )
+
+    async def extract(
+        self,
+        pieces: AsyncIterable[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Chunk and extract a document arriving as text pieces.
+
+        Args:
+            pieces: The document's text, in order
+            metadata: Optional document metadata passed to each extraction
+
+        Yields:
+            One result per chunk, in document order: chunk_index, start_pos,
+            end_pos, entities (document positions), tokens_used and, if the
+            chunk failed, error
+        """
+        pending: Deque[asyncio.Task] = deque()
+        try:
+            async for chunk in self.chunker.chunks(pieces):
+                pending.append(asyncio.create_task(self._extract_chunk(chunk, metadata)))
+                # Backpressure: stop reading the stream while the window is full
+                while len(pending) >= self.max_inflight_chunks:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _extract_chunk(
+        self,
+        chunk: DocumentChunk,
+        metadata: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Extract one chunk and rebase its entities onto the document."""
+        result = {
+            "chunk_index": chunk.chunk_index,
+            "start_pos": chunk.start_pos,
+            "end_pos": chunk.end_pos,
+            "entities": [],
+            "tokens_used": 0
+        }
+        try:
+            chunk_result = await self.extract_fn(
+                chunk.text,
+                {
+                    **(metadata or {}),
+                    "chunk_index": chunk.chunk_index,
+                    "chunk_start_pos": chunk.start_pos,
+                    "chunk_end_pos": chunk.end_pos,
+                    "streamed": True
+                }
+            )
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing streamed chunk {chunk.chunk_index}: {e}")
+            result["error"] = str(e)
+            return result
+
+        entities: List[Dict[str, Any]] = []
+        for entity in chunk_result.get("entities", []):
+            if entity.get("start_pos") is not None:
+                entity["start_pos"] += chunk.start_pos
+            if entity.get("end_pos") is not None:
+                entity["end_pos"] += chunk.start_pos
+            # Entities ending in the overlap were reported by the previous chunk;
+            # ones that start there but run past it were only seen whole here
+            last = entity.get("end_pos")
+            if last is not None and last <= chunk.core_start:
+                continue
+            if last is None and entity.get("start_pos") is not None and entity["start_pos"] < chunk.core_start:
+                continue
+            entity["chunk_index"] = chunk.chunk_index
+            entities.append(entity)
+
+        result["entities"] = entities
+        result["tokens_used"] = chunk_result.get("tokens_used", 0)
+        return result
@@ -8,12 +8,13 @@ as a drop-in replacement for the standard VLLMLocalClient.
 import logging
 from typing import Optional, Dict, Any
 
-from src.client.vllm_direct_client import DirectVLLMEngine
+from src.vllm_client.client import HTTPVLLMClient, VLLMClientInterface
+from src.vllm_client.models import VLLMConfig, VLLMRequest
 from src.core.throttled_vllm_client import ThrottledVLLMClient
+from src.core.config import get_settings
 
 # Compatibility alias
-VLLMLocalClient = DirectVLLMEngine
-from src.core.config import get_config
+VLLMLocalClient = VLLMClientInterface
 
 logger = logging.getLogger(__name__)
 
@@ -63,16 +64,10 @@ class ThrottledVLLMClientFactory:
         # Determine if throttling should be enabled
         if enable_throttling is None:
             # Use config to determine throttling
-            enable_throttling = (
-                config.performance.processing_mode == "throttled" or
-                config.performance.enable_rate_limiting
-            )
+            enable_throttling = config.vllm_direct.vllm_enable_admission_control
         
-        # Create base client with DirectVLLMEngine
-        base_client = DirectVLLMEngine(
-            model_name=config.vllm.model,
-            max_model_len=getattr(config.vllm, 'max_model_len', 131072)
-        )
+        # Create base HTTP client from centralized settings
+        base_client = HTTPVLLMClient(config=VLLMConfig.from_settings(config))
         
         # Wrap with throttling if enabled
         if enable_throttling:
@@ -136,8 +131,8 @@ def get_vllm_client(
         client = get_vllm_client(
             throttled=True,
             config_override={
-                "max_concurrent_requests": 1,
-                "requests_per_minute": 10
+                "vllm_kv_token_budget": 65536,
+                "vllm_requests_per_minute": 10
             }
         )
     """
@@ -157,7 +152,6 @@ async def example_entity_extraction_with_throttling():
     replacement in existing entity extraction code.
     """
     import json
-    from src.client.vllm_http_client import VLLMRequest
     
     # Get throttled client (auto-detect from config)
     client = get_vllm_client()
@@ -193,7 +187,7 @@ async def example_entity_extraction_with_throttling():
         ],
         max_tokens=500,
         temperature=0.1,
-        response_format="json"
+        response_format={"type": "json_object"}
     )
     
     try:
@@ -213,7 +207,7 @@ async def example_entity_extraction_with_throttling():
             logger.info(f"Throttling stats:")
             logger.info(f"  - Total requests: {stats.total_requests}")
             logger.info(f"  - Average response time: {stats.average_response_time_ms:.1f}ms")
-            logger.info(f"  - Adaptive delay: {stats.adaptive_delay_ms:.1f}ms")
+            logger.info(f"  - Token budget: {stats.token_budget} ({stats.in_flight_tokens} in flight)")
             logger.info(f"  - Circuit state: {stats.circuit_state}")
         
         return entities
@@ -344,7 +338,7 @@ def modify_existing_extraction_code():
     Example of how to modify existing extraction code.
     
     Original code:
-        client = VLLMLocalClient()
+        client = HTTPVLLMClient()
         response = await client.generate_chat_completion(request)
     
     Modified code (Option 1 - Minimal change):
@@ -354,7 +348,7 @@ def modify_existing_extraction_code():
     
     Modified code (Option 2 - Explicit throttling):
         from src.core.throttled_vllm_client import ThrottledVLLMClient
-        base_client = VLLMLocalClient()
+        base_client = HTTPVLLMClient()
         client = ThrottledVLLMClient(base_client)
         response = await client.generate_chat_completion(request)
     
@@ -362,7 +356,7 @@ def modify_existing_extraction_code():
         from src.core.throttled_integration import get_vllm_client
         config = get_settings()
         client = get_vllm_client(
-            throttled=(config.performance.processing_mode == "throttled")
+            throttled=config.vllm_direct.vllm_enable_admission_control
         )
         response = await client.generate_chat_completion(request)
     """
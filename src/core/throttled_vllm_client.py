@@ -1,13 +1,25 @@
 """
 Throttling wrapper for vLLM client to prevent service overload.
 
-This module provides a wrapper around VLLMLocalClient that adds:
-- Request throttling and rate limiting
+This module provides a wrapper around the vLLM clients that adds:
+- Token-aware admission control against an estimated KV-cache budget
+- AIMD budget adjustment from observed latency and queue depth
+- Priority/deadline-aware ordering of queued calls (see src.vllm_client.scheduler)
+- Optional sliding-window rate limiting
 - Circuit breaker pattern for resilience
-- Adaptive throttling based on response times
-- Request queue management
 - Comprehensive performance monitoring
 
+Admitted calls go through the process-wide micro-batcher when the base client
+batches natively, so calls from concurrent requests sharing one wrapper per
+endpoint (see get_extraction_orchestrator) reach vLLM as one generate_batch().
+
+Waiting never happens while a lock is held: admission and rate-limit slots are
+reserved in synchronous sections, and the actual wait happens afterwards.
+
+The admission controller, the rate-limit window and the circuit breaker are
+shared per endpoint, so every wrapper around the same vLLM server counts
+against one budget, one requests-per-minute limit and one failure count.
+
 The wrapper is transparent - existing code continues to work unchanged.
 """
 
@@ -19,17 +31,14 @@ from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-import statistics
-
-from src.client.vllm_direct_client import (
-    DirectVLLMEngine, 
-    VLLMRequest, 
-    VLLMResponse,
-    GenerationError
-)
-# Compatibility alias
-VLLMLocalClient = DirectVLLMEngine
-from src.core.config import get_config
+
+from src.vllm_client.client import VLLMClientInterface, HTTPVLLMClient
+from src.vllm_client.models import VLLMRequest, VLLMResponse
+from src.vllm_client.exceptions import GenerationError, DeadlineExceededError
+from src.vllm_client.admission import TokenBudgetAdmissionController, get_admission_controller
+from src.vllm_client.scheduler import get_request_context
+from src.core.config import get_settings
+from src.core.vllm_micro_batcher import get_micro_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -47,18 +56,21 @@ class ThrottlingStats:
     total_requests: int = 0
     throttled_requests: int = 0
     rejected_requests: int = 0
+    expired_requests: int = 0
     successful_requests: int = 0
     failed_requests: int = 0
     circuit_opens: int = 0
     average_response_time_ms: float = 0.0
     current_rate: float = 0.0  # requests per second
     queue_size: int = 0
-    semaphore_available: int = 0
+    in_flight_requests: int = 0
+    in_flight_tokens: int = 0
+    token_budget: int = 0
     circuit_state: str = CircuitState.CLOSED.value
     last_circuit_open: Optional[str] = None
     last_circuit_close: Optional[str] = None
-    adaptive_delay_ms: float = 0.0
-    
+    average_queue_time_ms: float = 0.0
+
 
 @dataclass
 class RequestHistoryEntry:
@@ -87,6 +99,9 @@ class CircuitBreaker:
         self.last_failure_time = None
         self.half_open_success_count = 0
         self.state_change_callbacks = []
+        self.opens = 0
+        self.last_open: Optional[str] = None
+        self.last_close: Optional[str] = None
         
     def call_succeeded(self):
         """Record successful call."""
@@ -130,6 +145,8 @@ class CircuitBreaker:
         """Transition to OPEN state."""
         self.state = CircuitState.OPEN
         self.half_open_success_count = 0
+        self.opens += 1
+        self.last_open = datetime.now().isoformat()
         logger.warning(f"Circuit breaker OPEN after {self.failure_count} failures")
         self._notify_state_change()
     
@@ -145,6 +162,7 @@ class CircuitBreaker:
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.half_open_success_count = 0
+        self.last_close = datetime.now().isoformat()
         logger.info("Circuit breaker CLOSED - service recovered")
         self._notify_state_change()
     
@@ -165,243 +183,225 @@ class CircuitBreaker:
         return self.state
 
 
-class AdaptiveThrottler:
-    """Adaptive throttling based on response times."""
-    
-    def __init__(
-        self,
-        target_response_time_ms: float = 1000.0,
-        min_delay_ms: float = 0.0,
-        max_delay_ms: float = 5000.0,
-        adaptation_rate: float = 0.1
-    ):
-        self.target_response_time_ms = target_response_time_ms
-        self.min_delay_ms = min_delay_ms
-        self.max_delay_ms = max_delay_ms
-        self.adaptation_rate = adaptation_rate
-        
-        self.current_delay_ms = min_delay_ms
-        self.response_times: Deque[float] = deque(maxlen=10)
-    
-    def record_response_time(self, response_time_ms: float):
-        """Record response time and adapt delay."""
-        self.response_times.append(response_time_ms)
-        self._adapt_delay()
-    
-    def get_delay_seconds(self) -> float:
-        """Get current delay in seconds."""
-        return self.current_delay_ms / 1000.0
-    
-    def _adapt_delay(self):
-        """Adapt delay based on recent response times."""
-        if len(self.response_times) < 3:
-            return
-        
-        avg_response_time = statistics.mean(self.response_times)
-        
-        if avg_response_time > self.target_response_time_ms:
-            # Increase delay if response times are high
-            increase = (avg_response_time - self.target_response_time_ms) * self.adaptation_rate
-            self.current_delay_ms = min(
-                self.current_delay_ms + increase,
-                self.max_delay_ms
-            )
-        else:
-            # Decrease delay if response times are low
-            decrease = (self.target_response_time_ms - avg_response_time) * self.adaptation_rate * 0.5
-            self.current_delay_ms = max(
-                self.current_delay_ms - decrease,
-                self.min_delay_ms
-            )
-        
-        logger.debug(f"Adaptive delay adjusted to {self.current_delay_ms:.1f}ms (avg response: {avg_response_time:.1f}ms)")
+# Shared per endpoint (like the admission controllers), so per-request
+# wrappers still rate-limit and trip the breaker per vLLM server
+_rate_windows: Dict[str, Deque[float]] = {}
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_rate_window(key: str = "default") -> Deque[float]:
+    """
+    Get the process-wide rate-limit window for an endpoint.
+
+    Args:
+        key: Endpoint identifier (usually the client's base URL)
+
+    Returns:
+        Shared deque of reserved request start times
+    """
+    window = _rate_windows.get(key)
+    if window is None:
+        window = deque()
+        _rate_windows[key] = window
+    return window
+
+
+def get_circuit_breaker(
+    key: str = "default",
+    failure_threshold: int = 3,
+    recovery_timeout: int = 60,
+    half_open_requests: int = 1
+) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for an endpoint.
+
+    Args:
+        key: Endpoint identifier (usually the client's base URL)
+        failure_threshold: Consecutive failures before opening (first caller's value wins)
+        recovery_timeout: Seconds before a probe call is allowed
+        half_open_requests: Successful probes needed to close again
+
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    breaker = _circuit_breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            failure_threshold=failure_threshold,
+            recovery_timeout=recovery_timeout,
+            half_open_requests=half_open_requests
+        )
+        _circuit_breakers[key] = breaker
+    return breaker
 
 
 class ThrottledVLLMClient:
     """
-    Throttling wrapper for VLLMLocalClient.
-    
-    This wrapper adds comprehensive throttling capabilities without
-    modifying the underlying VLLMLocalClient implementation.
+    Throttling wrapper for vLLM clients.
+
+    This wrapper adds admission control, rate limiting and circuit breaking
+    without modifying the underlying client implementation.
     """
-    
+
+    # Each call is admitted individually; admitted calls are micro-batched
+    # below the wrapper when the base client batches natively
+    supports_native_batching = False
+
     def __init__(
         self,
-        base_client: VLLMLocalClient,
-        config_override: Optional[Union[Dict[str, Any], "RuntimeConfig"]] = None
+        base_client: VLLMClientInterface,
+        config_override: Optional[Union[Dict[str, Any], Any]] = None,
+        admission_controller: Optional[TokenBudgetAdmissionController] = None
     ):
         """
         Initialize throttled wrapper.
-        
+
         Args:
-            base_client: The VLLMLocalClient instance to wrap
-            config_override: Optional configuration overrides
+            base_client: The vLLM client instance to wrap
+            config_override: Optional vllm_direct setting overrides (dict or settings object)
+            admission_controller: Optional controller (defaults to the shared one for the endpoint)
         """
         self.base_client = base_client
+        self.endpoint = getattr(base_client, 'base_url', None) or "default"
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        
+
         # Load configuration
-        self.config = get_settings()
-        
+        self.config = get_settings().vllm_direct
+
         # Apply any overrides
         if config_override:
             self._apply_config_overrides(config_override)
-        
+
         # Initialize throttling components
-        self._init_semaphore()
+        self._init_admission_control(admission_controller)
         self._init_rate_limiter()
         self._init_circuit_breaker()
-        self._init_adaptive_throttler()
         self._init_statistics()
-        
-        # Request queue for rate limiting
-        self.request_queue: Deque[asyncio.Event] = deque()
-        self.queue_processor_task = None
-        
+
         self.logger.info(
             f"ThrottledVLLMClient initialized: "
-            f"concurrent_limit={self.max_concurrent}, "
-            f"rate_limit={self.requests_per_minute} req/min, "
+            f"token_budget={self.admission.max_token_budget}, "
+            f"max_in_flight={self.admission.max_in_flight}, "
+            f"rate_limit={self.requests_per_minute or 'unlimited'} req/min, "
             f"circuit_breaker={'enabled' if self.circuit_breaker_enabled else 'disabled'}"
         )
-    
+
     def _apply_config_overrides(self, overrides):
-        """Apply configuration overrides."""
-        # Handle both dictionary and RuntimeConfig objects
-        if hasattr(overrides, 'vllm'):
-            # It's a RuntimeConfig object, use its vllm settings
-            if hasattr(overrides.vllm, '__dict__'):
-                override_dict = overrides.vllm.__dict__
-            else:
-                override_dict = {}
+        """Apply configuration overrides on a private copy of the vLLM settings."""
+        # Handle dictionaries as well as full settings objects
+        if hasattr(overrides, 'vllm_direct'):
+            override_dict = overrides.vllm_direct.model_dump()
         elif isinstance(overrides, dict):
-            # It's already a dictionary
             override_dict = overrides
         else:
-            # Unknown type, skip
             self.logger.warning(f"Unknown config override type: {type(overrides)}")
             return
-            
-        for key, value in override_dict.items():
-            if hasattr(self.config.vllm, key):
-                setattr(self.config.vllm, key, value)
-                self.logger.info(f"Config override: {key}={value}")
-    
-    def _init_semaphore(self):
-        """Initialize request semaphore for concurrent limiting."""
-        self.max_concurrent = self.config.vllm.max_concurrent_requests
-        self.semaphore = asyncio.Semaphore(self.max_concurrent)
-        self.logger.debug(f"Request semaphore initialized with limit: {self.max_concurrent}")
-    
+
+        known = {key: value for key, value in override_dict.items() if hasattr(self.config, key)}
+        self.config = self.config.model_copy(update=known)
+        for key, value in known.items():
+            self.logger.debug(f"Config override: {key}={value}")
+
+    def _init_admission_control(self, admission_controller: Optional[TokenBudgetAdmissionController]):
+        """Initialize token-budget admission control."""
+        if admission_controller is not None:
+            self.admission = admission_controller
+        else:
+            self.admission = get_admission_controller(self.endpoint)
+        self.admission_enabled = self.config.vllm_enable_admission_control
+        self.logger.debug(
+            f"Admission control {'enabled' if self.admission_enabled else 'disabled'}: "
+            f"budget={self.admission.max_token_budget} tokens"
+        )
+
     def _init_rate_limiter(self):
         """Initialize rate limiting."""
-        self.requests_per_minute = self.config.vllm.requests_per_minute
-        self.request_delay_ms = self.config.vllm.request_delay_ms
-        self.request_history: Deque[RequestHistoryEntry] = deque()
-        self.rate_limiter_lock = asyncio.Lock()
-        self.logger.debug(f"Rate limiter initialized: {self.requests_per_minute} req/min")
-    
+        self.requests_per_minute = self.config.vllm_requests_per_minute
+        # Start times reserved for admitted requests (may lie in the future)
+        self.rate_slots = get_rate_window(self.endpoint)
+        self.logger.debug(f"Rate limiter initialized: {self.requests_per_minute or 'unlimited'} req/min")
+
     def _init_circuit_breaker(self):
         """Initialize circuit breaker."""
-        self.circuit_breaker_enabled = self.config.vllm.enable_circuit_breaker
-        
+        self.circuit_breaker_enabled = self.config.vllm_enable_circuit_breaker
+
         if self.circuit_breaker_enabled:
-            self.circuit_breaker = CircuitBreaker(
-                failure_threshold=self.config.vllm.failure_threshold,
-                recovery_timeout=self.config.vllm.recovery_timeout_seconds,
-                half_open_requests=self.config.vllm.half_open_requests
+            self.circuit_breaker = get_circuit_breaker(
+                self.endpoint,
+                failure_threshold=self.config.vllm_circuit_failure_threshold,
+                recovery_timeout=self.config.vllm_circuit_recovery_timeout,
+                half_open_requests=self.config.vllm_circuit_half_open_requests
             )
-            # Add callback to update stats
-            self.circuit_breaker.add_state_change_callback(self._on_circuit_state_change)
             self.logger.debug("Circuit breaker initialized and enabled")
         else:
             self.circuit_breaker = None
             self.logger.debug("Circuit breaker disabled")
-    
-    def _init_adaptive_throttler(self):
-        """Initialize adaptive throttling."""
-        # Use configurable target response time (default 1000ms)
-        target_time = getattr(self.config.vllm, 'target_response_time_ms', 1000.0)
-        
-        self.adaptive_throttler = AdaptiveThrottler(
-            target_response_time_ms=target_time,
-            min_delay_ms=self.config.vllm.request_delay_ms,
-            max_delay_ms=self.config.vllm.request_delay_ms * 10  # Max 10x configured delay
-        )
-        self.logger.debug(f"Adaptive throttler initialized with target: {target_time}ms")
-    
+
     def _init_statistics(self):
         """Initialize statistics tracking."""
-        self.stats = ThrottlingStats(
-            semaphore_available=self.max_concurrent
-        )
-    
-    def _on_circuit_state_change(self, new_state: CircuitState):
-        """Handle circuit breaker state changes."""
-        self.stats.circuit_state = new_state.value
-        
-        if new_state == CircuitState.OPEN:
-            self.stats.circuit_opens += 1
-            self.stats.last_circuit_open = datetime.now().isoformat()
-        elif new_state == CircuitState.CLOSED:
-            self.stats.last_circuit_close = datetime.now().isoformat()
-    
-    async def _wait_for_rate_limit(self):
-        """Wait if necessary to respect rate limits."""
-        async with self.rate_limiter_lock:
-            # Clean old entries (older than 1 minute)
-            cutoff_time = time.time() - 60
-            while self.request_history and self.request_history[0].timestamp < cutoff_time:
-                self.request_history.popleft()
-            
-            # Check if we're at the rate limit
-            if len(self.request_history) >= self.requests_per_minute:
-                # Calculate how long to wait
-                oldest_request = self.request_history[0]
-                wait_time = 60 - (time.time() - oldest_request.timestamp)
-                
-                if wait_time > 0:
-                    self.logger.info(f"Rate limit reached, waiting {wait_time:.1f}s")
-                    self.stats.throttled_requests += 1
-                    await asyncio.sleep(wait_time)
-                    
-                    # Clean again after waiting
-                    cutoff_time = time.time() - 60
-                    while self.request_history and self.request_history[0].timestamp < cutoff_time:
-                        self.request_history.popleft()
-    
-    async def _apply_request_delay(self):
-        """Apply configured request delay."""
-        base_delay = self.config.vllm.request_delay_ms / 1000.0
-        adaptive_delay = self.adaptive_throttler.get_delay_seconds()
-        
-        # Use the maximum of base and adaptive delay
-        total_delay = max(base_delay, adaptive_delay)
-        
-        if total_delay > 0:
-            await asyncio.sleep(total_delay)
-        
-        self.stats.adaptive_delay_ms = adaptive_delay * 1000
-    
+        self.stats = ThrottlingStats(token_budget=int(self.admission.token_budget))
+        self.request_history: Deque[RequestHistoryEntry] = deque(maxlen=1000)
+
+    def _sync_circuit_stats(self):
+        """Copy the shared breaker's state into this wrapper's statistics."""
+        if self.circuit_breaker is None:
+            return
+        self.stats.circuit_state = self.circuit_breaker.state.value
+        self.stats.circuit_opens = self.circuit_breaker.opens
+        self.stats.last_circuit_open = self.circuit_breaker.last_open
+        self.stats.last_circuit_close = self.circuit_breaker.last_close
+
+    def _reserve_rate_slot(self) -> Optional[float]:
+        """
+        Reserve the next start time allowed by the sliding-window rate limit.
+
+        Runs synchronously, so concurrent callers each get a distinct slot
+        without holding a lock across the wait.
+
+        Returns:
+            Reserved start time (time.time() clock), or None without a rate limit
+        """
+        if not self.requests_per_minute:
+            return None
+
+        now = time.time()
+        while self.rate_slots and self.rate_slots[0] <= now - 60:
+            self.rate_slots.popleft()
+
+        if len(self.rate_slots) < self.requests_per_minute:
+            slot = now
+        else:
+            slot = max(now, self.rate_slots[-self.requests_per_minute] + 60)
+
+        self.rate_slots.append(slot)
+        return slot
+
     async def generate_chat_completion(self, request: VLLMRequest) -> VLLMResponse:
         """
-        Generate completion with throttling.
-        
+        Generate completion with admission control.
+
         This method wraps the base client's generate_chat_completion
         with comprehensive throttling logic.
-        
+
         Args:
             request: VLLMRequest with messages and parameters
-            
+
         Returns:
             VLLMResponse: Generated response
-            
+
         Raises:
             ModelNotLoadedError: If model is not ready
             GenerationError: If generation fails or circuit is open
+            DeadlineExceededError: If the request deadline passes before dispatch
         """
         self.stats.total_requests += 1
-        
+        context = get_request_context()
+
+        # Don't spend queue time or a rate slot on work nobody is waiting for
+        if context.is_expired():
+            self.stats.expired_requests += 1
+            raise DeadlineExceededError("Deadline passed before the request was dispatched", deadline=context.deadline)
+
         # Check circuit breaker first
         if self.circuit_breaker_enabled and self.circuit_breaker:
             if not self.circuit_breaker.can_execute():
@@ -413,70 +413,120 @@ class ThrottledVLLMClient:
                     timeout_occurred=False,
                     server_error=True
                 )
-        
-        # Wait for rate limit if necessary
-        await self._wait_for_rate_limit()
-        
-        # Apply request delay (base + adaptive)
-        await self._apply_request_delay()
-        
-        # Acquire semaphore for concurrent limiting
-        async with self.semaphore:
-            self.stats.semaphore_available = self.semaphore._value
-            self.stats.queue_size = len(self.request_queue)
-            
-            start_time = time.time()
-            success = False
-            error_msg = None
-            
-            try:
-                # Call the base client
+
+        # Wait for a rate-limit slot (reserved synchronously, slept outside any lock)
+        rate_slot = self._reserve_rate_slot()
+        ticket = None
+        try:
+            rate_wait = rate_slot - time.time() if rate_slot is not None else 0.0
+            if rate_wait > 0:
+                self.logger.info(f"Rate limit reached, waiting {rate_wait:.1f}s")
+                self.stats.throttled_requests += 1
+                remaining = context.remaining_seconds()
+                await asyncio.sleep(rate_wait if remaining is None else max(0.0, min(rate_wait, remaining)))
+                if context.is_expired():
+                    raise DeadlineExceededError(
+                        "Deadline passed while waiting for a rate-limit slot", deadline=context.deadline
+                    )
+
+            # Wait for KV token budget
+            if self.admission_enabled:
+                self.stats.queue_size = self.admission.queue_depth
+                ticket = await self.admission.acquire(request, context)
+                if ticket.queued_ms > 0.5:
+                    self.stats.throttled_requests += 1
+        except (asyncio.CancelledError, DeadlineExceededError) as e:
+            # Never dispatched: give the slot back to the window
+            self._release_rate_slot(rate_slot)
+            if isinstance(e, DeadlineExceededError):
+                self.stats.expired_requests += 1
+            raise
+
+        start_time = time.time()
+        success: Optional[bool] = False
+        error_msg = None
+        response = None
+
+        try:
+            # Call the base client, micro-batched with other admitted calls
+            # when it can take a batch in one call
+            if (
+                self.config.vllm_enable_micro_batching
+                and getattr(self.base_client, "supports_native_batching", False) is True
+            ):
+                response = await get_micro_batcher().submit(self.base_client, request)
+            else:
                 response = await self.base_client.generate_chat_completion(request)
-                
-                # Record success
-                success = True
-                self.stats.successful_requests += 1
-                
-                # Update circuit breaker
-                if self.circuit_breaker_enabled and self.circuit_breaker:
-                    self.circuit_breaker.call_succeeded()
-                
-                return response
-                
-            except Exception as e:
-                # Record failure
-                self.stats.failed_requests += 1
-                error_msg = str(e)
-                
-                # Update circuit breaker
-                if self.circuit_breaker_enabled and self.circuit_breaker:
-                    self.circuit_breaker.call_failed()
-                
-                # Re-raise the exception
-                raise
-                
-            finally:
-                # Calculate response time
-                response_time_ms = (time.time() - start_time) * 1000
-                
-                # Update adaptive throttler
-                self.adaptive_throttler.record_response_time(response_time_ms)
-                
-                # Record in history for rate limiting
-                entry = RequestHistoryEntry(
-                    timestamp=time.time(),
-                    response_time_ms=response_time_ms,
+
+            # Record success
+            success = True
+            self.stats.successful_requests += 1
+
+            # Update circuit breaker
+            if self.circuit_breaker_enabled and self.circuit_breaker:
+                self.circuit_breaker.call_succeeded()
+
+            return response
+
+        except asyncio.CancelledError:
+            # The caller gave up; neither a failure nor a load signal
+            success = None
+            error_msg = "cancelled"
+            raise
+
+        except Exception as e:
+            # Record failure
+            self.stats.failed_requests += 1
+            error_msg = str(e)
+
+            # Update circuit breaker
+            if self.circuit_breaker_enabled and self.circuit_breaker:
+                self.circuit_breaker.call_failed()
+
+            # Re-raise the exception
+            raise
+
+        finally:
+            # Calculate response time
+            response_time_ms = (time.time() - start_time) * 1000
+
+            # Return reservation and adapt the budget
+            if ticket is not None:
+                usage = response.usage if response is not None else None
+                self.admission.release(
+                    ticket,
                     success=success,
-                    error=error_msg
+                    latency_ms=response_time_ms,
+                    prompt_tokens=usage.prompt_tokens if usage and usage.prompt_tokens else None,
+                    completion_tokens=usage.completion_tokens if usage else None
                 )
-                self.request_history.append(entry)
-                
-                # Update statistics
-                self._update_statistics(response_time_ms)
-                
-                # Update semaphore availability
-                self.stats.semaphore_available = self.semaphore._value
-    
+
+            # Record in history
+            self.request_history.append(RequestHistoryEntry(
+                timestamp=time.time(),
+                response_time_ms=response_time_ms,
+                success=bool(success),
+                error=error_msg
+            ))
+
+            # Update statistics
+            self._update_statistics(response_time_ms)
+
+    def _release_rate_slot(self, slot: Optional[float]):
+        """Return a reserved start time that was never used."""
+        if slot is None:
+            return
+        try:
+            self.rate_slots.remove(slot)
+        except ValueError:
+            pass  # Already dropped from the window
+
+    async def generate_batch(self, requests):
+        """Generate batch of completions, each admitted individually."""
+        return list(await asyncio.gather(
+            *(self.generate_chat_completion(request) for request in requests)
+        ))
+
     def _update_statistics(self, response_time_ms: float):
         """Update internal statistics."""
         # Calculate average response time
@@ -487,27 +537,38 @@ class ThrottledVLLMClient:
                 self.stats.average_response_time_ms = response_time_ms
             else:
                 self.stats.average_response_time_ms = (
-                    alpha * response_time_ms + 
+                    alpha * response_time_ms +
                     (1 - alpha) * self.stats.average_response_time_ms
                 )
-        
+
         # Calculate current request rate
         if len(self.request_history) > 1:
             time_span = self.request_history[-1].timestamp - self.request_history[0].timestamp
             if time_span > 0:
                 self.stats.current_rate = len(self.request_history) / time_span
-    
+
+        admission_stats = self.admission.get_stats()
+        self.stats.queue_size = admission_stats["queue_depth"]
+        self.stats.in_flight_requests = admission_stats["in_flight_requests"]
+        self.stats.in_flight_tokens = admission_stats["in_flight_tokens"]
+        self.stats.token_budget = admission_stats["token_budget"]
+        self.stats.average_queue_time_ms = admission_stats["average_queue_time_ms"]
+
     async def health_check(self) -> Dict[str, Any]:
         """
         Enhanced health check with throttling statistics.
-        
+
         Returns:
             Dict containing health status and throttling stats
         """
-        # Get base health check
-        base_health = await self.base_client.health_check()
-        
+        # Get base health check (HTTP/Direct clients only expose readiness)
+        if hasattr(self.base_client, 'health_check'):
+            base_health = await self.base_client.health_check()
+        else:
+            base_health = {"ready": self.base_client.is_ready()}
+
         # Add throttling statistics
+        self._sync_circuit_stats()
         enhanced_health = {
             **base_health,
             "throttling": {
@@ -518,12 +579,14 @@ class ThrottledVLLMClient:
                     "failed_requests": self.stats.failed_requests,
                     "throttled_requests": self.stats.throttled_requests,
                     "rejected_requests": self.stats.rejected_requests,
+                    "expired_requests": self.stats.expired_requests,
                     "average_response_time_ms": round(self.stats.average_response_time_ms, 2),
                     "current_rate_per_sec": round(self.stats.current_rate, 2),
-                    "queue_size": self.stats.queue_size,
-                    "semaphore_available": self.stats.semaphore_available,
-                    "semaphore_total": self.max_concurrent,
-                    "adaptive_delay_ms": round(self.stats.adaptive_delay_ms, 2)
+                    "queue_size": self.admission.queue_depth
+                },
+                "admission": {
+                    "enabled": self.admission_enabled,
+                    **self.admission.get_stats()
                 },
                 "circuit_breaker": {
                     "enabled": self.circuit_breaker_enabled,
@@ -533,124 +596,113 @@ class ThrottledVLLMClient:
                     "last_close": self.stats.last_circuit_close
                 } if self.circuit_breaker_enabled else {"enabled": False},
                 "limits": {
-                    "max_concurrent_requests": self.max_concurrent,
-                    "requests_per_minute": self.requests_per_minute,
-                    "base_request_delay_ms": self.config.vllm.request_delay_ms
+                    "kv_token_budget": self.admission.max_token_budget,
+                    "max_in_flight": self.admission.max_in_flight,
+                    "requests_per_minute": self.requests_per_minute
                 }
             }
         }
-        
+
         return enhanced_health
-    
+
     def get_throttling_stats(self) -> ThrottlingStats:
         """
         Get current throttling statistics.
-        
+
         Returns:
             ThrottlingStats object with current metrics
         """
+        self._sync_circuit_stats()
         return self.stats
-    
+
     def reset_statistics(self):
         """Reset throttling statistics."""
-        self.stats = ThrottlingStats(
-            semaphore_available=self.max_concurrent
-        )
+        self.stats = ThrottlingStats(token_budget=int(self.admission.token_budget))
         self.request_history.clear()
-        self.adaptive_throttler.response_times.clear()
-        self.adaptive_throttler.current_delay_ms = self.adaptive_throttler.min_delay_ms
-        
+        self.rate_slots.clear()
+
         if self.circuit_breaker:
             self.circuit_breaker.failure_count = 0
             if self.circuit_breaker.state != CircuitState.CLOSED:
                 self.circuit_breaker._transition_to_closed()
-        
+
         self.logger.info("Throttling statistics reset")
-    
+
     def update_limits(
         self,
-        max_concurrent: Optional[int] = None,
-        requests_per_minute: Optional[int] = None,
-        request_delay_ms: Optional[float] = None
+        kv_token_budget: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        requests_per_minute: Optional[int] = None
     ):
         """
         Dynamically update throttling limits.
-        
+
         Args:
-            max_concurrent: New concurrent request limit
-            requests_per_minute: New rate limit
-            request_delay_ms: New base request delay in milliseconds
+            kv_token_budget: New maximum in-flight token budget
+            max_in_flight: New concurrent request cap
+            requests_per_minute: New rate limit (0 disables)
         """
-        if max_concurrent is not None and max_concurrent != self.max_concurrent:
-            self.max_concurrent = max_concurrent
-            self.semaphore = asyncio.Semaphore(max_concurrent)
-            self.logger.info(f"Updated max_concurrent to {max_concurrent}")
-        
+        if kv_token_budget is not None:
+            self.admission.max_token_budget = kv_token_budget
+            self.admission.token_budget = min(self.admission.token_budget, kv_token_budget)
+            self.admission.min_token_budget = min(self.admission.min_token_budget, kv_token_budget)
+            self.logger.info(f"Updated kv_token_budget to {kv_token_budget}")
+
+        if max_in_flight is not None:
+            self.admission.max_in_flight = max_in_flight
+            self.logger.info(f"Updated max_in_flight to {max_in_flight}")
+
         if requests_per_minute is not None:
             self.requests_per_minute = requests_per_minute
             self.logger.info(f"Updated requests_per_minute to {requests_per_minute}")
-        
-        if request_delay_ms is not None:
-            self.config.vllm.request_delay_ms = request_delay_ms
-            self.adaptive_throttler.min_delay_ms = request_delay_ms
-            self.logger.info(f"Updated request_delay_ms to {request_delay_ms}")
-    
+
+        # Raised limits may admit queued callers immediately
+        self.admission._wake_waiters()
+
     def __getattr__(self, name):
         """
         Delegate all other attributes/methods to the base client.
-        
-        This allows the wrapper to be a drop-in replacement for VLLMLocalClient.
+
+        This allows the wrapper to be a drop-in replacement for the wrapped client.
         """
         return getattr(self.base_client, name)
-    
+
     async def __aenter__(self):
         """Async context manager entry."""
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        # Clean up if needed
-        if self.queue_processor_task:
-            self.queue_processor_task.cancel()
-            try:
-                await self.queue_processor_task
-            except asyncio.CancelledError:
-                pass
+        await self.base_client.close()
 
 
 def create_throttled_client(
-    base_client: Optional[VLLMLocalClient] = None,
+    base_client: Optional[VLLMClientInterface] = None,
     **kwargs
 ) -> ThrottledVLLMClient:
     """
     Factory function to create a throttled vLLM client.
-    
+
     Args:
-        base_client: Optional base VLLMLocalClient instance
-        **kwargs: Arguments to pass to VLLMLocalClient if creating new
-        
+        base_client: Optional base client instance
+        **kwargs: Arguments to pass to HTTPVLLMClient if creating new
+
     Returns:
         ThrottledVLLMClient instance
     """
     if base_client is None:
-        base_client = VLLMLocalClient(**kwargs)
-    
+        base_client = HTTPVLLMClient(**kwargs)
+
     return ThrottledVLLMClient(base_client)
 
 
 # Example usage and testing
 async def example_usage():
     """Example of using the throttled client."""
-    
-    # Create base client
-    base_client = VLLMLocalClient()
-    
-    # Wrap with throttling
-    client = ThrottledVLLMClient(base_client)
-    
-    # Or use factory function
-    # client = create_throttled_client()
-    
+
+    # Wrap an HTTP client with throttling
+    client = create_throttled_client()
+
     try:
         # Make a request
         request = VLLMRequest(
@@ -659,29 +711,31 @@ async def example_usage():
             ],
             max_tokens=100
         )
-        
+
         response = await client.generate_chat_completion(request)
         print(f"Response: {response.content}")
-        
+
         # Check health with stats
         health = await client.health_check()
         print(f"Health: {health}")
-        
+
         # Get throttling stats
         stats = client.get_throttling_stats()
         print(f"Stats: {stats}")
-        
+
     except GenerationError as e:
         if "Circuit breaker is OPEN" in str(e):
             print("Service is temporarily unavailable due to circuit breaker")
         else:
             print(f"Generation error: {e}")
-    
+
     except Exception as e:
         print(f"Error: {e}")
 
+    finally:
+        await client.close()
+
 
 if __name__ == "__main__":
     # Test the throttled client
-    import asyncio
-    asyncio.run(example_usage())
\ No newline at end of file
+    asyncio.run(example_usage())
@@ -0,0 +1,300 @@
+"""
+Token counting with the served model's tokenizer.
+
+Chunk sizing elsewhere in the service divides character counts by a fixed
+chars-per-token ratio, and TokenEstimator's accurate mode uses tiktoken's
+cl100k vocabulary, which is not the Qwen/SauLLM vocabulary vLLM serves. Legal
+text with citations and section symbols tokenizes well away from 4 chars per
+token, so chunks either waste context or overflow into ContextOverflowError
+retries.
+
+TokenCounter loads the served model's HuggingFace ``tokenizer.json`` (the
+``tokenizers`` package is optional) and provides:
+
+- count() / count_batch(): exact token counts, with cache misses encoded in
+  one batched call and counts kept in an LRU cache keyed by text, so the
+  paragraphs of a re-submitted or re-chunked document are not re-encoded
+- count_spans() / count_document(): counts for offset spans of a document
+- fit(): the end offset at which a span reaches a token budget, taken from
+  the tokenizer's offset mapping so chunks fill their budget exactly
+
+Without a tokenizer file every method falls back to chars_per_token.
+"""
+
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Paragraph pieces for count_document(): each piece keeps its trailing
+# separator so the pieces partition the document
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+class TokenCounter:
+    """
+    Token counts and token-budget offsets for document text.
+
+    Attributes:
+        is_exact: True when a tokenizer is loaded, False for the chars_per_token fallback
+    """
+
+    def __init__(
+        self,
+        tokenizer_path: Optional[str] = None,
+        chars_per_token: float = 4.0,
+        cache_size: int = 65536,
+        tokenizer: Optional[Any] = None
+    ):
+        """
+        Initialize TokenCounter.
+
+        Args:
+            tokenizer_path: HuggingFace tokenizer.json, or a model directory containing one
+            chars_per_token: Characters per token when no tokenizer is available
+            cache_size: Token counts remembered (LRU, keyed by text)
+            tokenizer: Already-loaded tokenizers.Tokenizer (overrides tokenizer_path)
+        """
+        self.tokenizer_path = tokenizer_path
+        self.chars_per_token = chars_per_token
+        self.cache_size = cache_size
+
+        self._tokenizer = tokenizer if tokenizer is not None else self._load_tokenizer(tokenizer_path)
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "TokenCounter":
+        """
+        Create a token counter from centralized settings.
+
+        Args:
+            settings: EntityExtractionServiceSettings instance (or None to load from get_settings())
+
+        Returns:
+            TokenCounter configured from vllm_direct settings
+        """
+        if settings is None:
+            from src.core.config import get_settings
+            settings = get_settings()
+
+        vllm = settings.vllm_direct
+        return cls(
+            tokenizer_path=vllm.vllm_tokenizer_path,
+            chars_per_token=vllm.vllm_chars_per_token,
+            cache_size=vllm.vllm_token_count_cache_size
+        )
+
+    @staticmethod
+    def _load_tokenizer(tokenizer_path: Optional[str]) -> Optional[Any]:
+        if not tokenizer_path:
+            return None
+
+        path = tokenizer_path
+        if os.path.isdir(path):
+            path = os.path.join(path, "tokenizer.json")
+
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            logger.warning(
+                "tokenizers not available, falling back to character-based token counts. "
+                "Install with: pip install tokenizers"
+            )
+            return None
+
+        try:
+            tokenizer = Tokenizer.from_file(path)
+        except Exception as e:
+            logger.error(f"Failed to load tokenizer from {path}: {e}; using character-based token counts")
+            return None
+
+        logger.info(f"Token-exact sizing enabled (tokenizer: {path})")
+        return tokenizer
+
+    @property
+    def is_exact(self) -> bool:
+        return self._tokenizer is not None
+
+    # ------------------------------------------------------------------
+    # Counting
+    # ------------------------------------------------------------------
+
+    def _estimate(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token)
+
+    def _remember(self, text: str, count: int):
+        self._cache[text] = count
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Token count (exact with a tokenizer, estimated otherwise)
+        """
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """
+        Count tokens for many texts, encoding cache misses in one batch.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Token count per text, in order
+        """
+        if self._tokenizer is None:
+            return [self._estimate(text) for text in texts]
+
+        counts: List[Optional[int]] = []
+        misses: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self._cache.get(text)
+            if cached is None:
+                misses.setdefault(text, []).append(i)
+            else:
+                self._cache.move_to_end(text)
+                self._hits += 1
+            counts.append(cached)
+
+        if misses:
+            self._misses += len(misses)
+            unique = list(misses)
+            encodings = self._tokenizer.encode_batch(unique, add_special_tokens=False)
+            for text, encoding in zip(unique, encodings):
+                count = len(encoding.ids)
+                self._remember(text, count)
+                for i in misses[text]:
+                    counts[i] = count
+
+        return counts
+
+    def count_spans(self, text: str, spans: Sequence[Tuple[int, int]]) -> List[int]:
+        """Token counts for ``text[start:end]`` of each span."""
+        if self._tokenizer is None:
+            return [int((end - start) / self.chars_per_token) for start, end in spans]
+        return self.count_batch([text[start:end] for start, end in spans])
+
+    def count_document(self, text: str) -> int:
+        """
+        Count tokens in a whole document paragraph by paragraph.
+
+        Paragraph counts are cached, so re-counting an edited or re-submitted
+        document only encodes the paragraphs that changed.
+
+        Args:
+            text: Document text
+
+        Returns:
+            Total token count
+        """
+        if self._tokenizer is None:
+            return self._estimate(text)
+
+        spans = []
+        start = 0
+        for match in _PARAGRAPH_BREAK.finditer(text):
+            spans.append((start, match.end()))
+            start = match.end()
+        if start < len(text):
+            spans.append((start, len(text)))
+        return sum(self.count_spans(text, spans))
+
+    # ------------------------------------------------------------------
+    # Budget fitting
+    # ------------------------------------------------------------------
+
+    def fit(self, text: str, start: int, end: int, budget: int) -> int:
+        """
+        Find where ``text[start:end]`` reaches a token budget.
+
+        Args:
+            text: Document text
+            start: Span start offset
+            end: Span end offset
+            budget: Maximum tokens
+
+        Returns:
+            Largest offset ``cut`` (start < cut <= end where possible) such that
+            ``text[start:cut]`` holds at most ``budget`` tokens
+        """
+        if end <= start:
+            return end
+        budget = max(1, budget)
+
+        if self._tokenizer is None:
+            return min(end, start + max(1, int(budget * self.chars_per_token)))
+
+        # Encode only a window around the expected cut, growing it if the
+        # budget is not reached before the window ends
+        window = max(64, int(budget * self.chars_per_token * 2))
+        while True:
+            window_end = min(end, start + window)
+            encoding = self._tokenizer.encode(text[start:window_end], add_special_tokens=False)
+            if len(encoding.ids) <= budget:
+                if window_end == end:
+                    return end
+                window *= 2
+                continue
+            # The last token that fits ends the chunk
+            return start + max(1, encoding.offsets[budget - 1][1])
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get token counter statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "mode": "tokenizer" if self.is_exact else "chars_per_token",
+            "tokenizer_path": self.tokenizer_path,
+            "chars_per_token": self.chars_per_token,
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "cache_hit_rate": self._hits / lookups if lookups else 0.0
+        }
+
+
+# Global token counters keyed by tokenizer path
+_token_counters: Dict[Optional[str], TokenCounter] = {}
+
+
+def get_token_counter(tokenizer_path: Optional[str] = None) -> TokenCounter:
+    """
+    Get the shared token counter.
+
+    Args:
+        tokenizer_path: Tokenizer to load (None uses VLLM_TOKENIZER_PATH from settings)
+
+    Returns:
+        TokenCounter shared by all callers using the same tokenizer
+    """
+    from src.core.config import get_settings
+    vllm = get_settings().vllm_direct
+    if tokenizer_path is None:
+        tokenizer_path = vllm.vllm_tokenizer_path
+
+    counter = _token_counters.get(tokenizer_path)
+    if counter is None:
+        counter = TokenCounter(
+            tokenizer_path=tokenizer_path,
+            chars_per_token=vllm.vllm_chars_per_token,
+            cache_size=vllm.vllm_token_count_cache_size
+        )
+        _token_counters[tokenizer_path] = counter
+    return counter
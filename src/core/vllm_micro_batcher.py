@@ -0,0 +1,252 @@
+"""
+Micro-batching stage between ExtractionOrchestrator and the vLLM clients.
+
+Extraction calls are collected for a few milliseconds per DocumentSizeTier
+with AdaptiveBatcher, submitted together, and each response is routed back to
+the caller awaiting it. PerformanceProfiler observations (end-to-end latency
+and batch fill) tune batch size and wait time online.
+
+A batch can mix calls from different orchestrators and clients, so every
+queued call carries its own client:
+
+- Calls sharing a client with native batching (DirectVLLMClient) are sent as
+  one generate_batch() call. The API shares one extraction client per
+  endpoint; ThrottledVLLMClient submits its admitted calls here with that
+  base client, so batches form below admission control
+- All other calls are dispatched concurrently in the same event-loop tick,
+  each under its caller's RequestContext, so admission control and the
+  server's continuous batching see them together
+
+A caller that is cancelled while its call is in flight cancels that call
+(a native batch is cancelled once all of its callers have gone).
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.core.vllm_performance_optimizer import (
+    AdaptiveBatcher,
+    BatchConfig,
+    DocumentRequest,
+    DocumentSizeTier,
+    PerformanceProfiler
+)
+from src.vllm_client.models import VLLMRequest, VLLMResponse
+from src.vllm_client.scheduler import get_request_context, set_request_context
+
+logger = logging.getLogger(__name__)
+
+# p95 end-to-end latency targets for LLM calls (ms), used for online tuning
+LLM_LATENCY_TARGETS_MS = {
+    DocumentSizeTier.SMALL: 2000,
+    DocumentSizeTier.MEDIUM: 5000,
+    DocumentSizeTier.LARGE: 15000,
+    DocumentSizeTier.EXTRA_LARGE: 60000
+}
+
+
+class VLLMMicroBatcher:
+    """
+    Collect vLLM chat completions into short-lived batches.
+
+    Usage:
+        response = await get_micro_batcher().submit(client, request)
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        tune_interval: int = 50,
+        enable_auto_tuning: bool = True,
+        chars_per_token: float = 4.0
+    ):
+        """
+        Initialize VLLMMicroBatcher.
+
+        Args:
+            max_batch_size: Maximum calls per batch for small prompts
+            max_wait_ms: Initial time a batch waits for more calls
+            tune_interval: Completed calls between tuning passes
+            enable_auto_tuning: Whether the profiler adjusts batch size and wait
+            chars_per_token: Characters per token for size-tier classification
+        """
+        self.chars_per_token = chars_per_token
+        self.profiler = PerformanceProfiler(
+            enable_auto_tuning=enable_auto_tuning,
+            performance_targets=LLM_LATENCY_TARGETS_MS,
+            tune_interval=tune_interval
+        )
+        self.batcher = AdaptiveBatcher(
+            process_batch_fn=self._process_batch,
+            profiler=self.profiler,
+            batch_configs=self._build_batch_configs(max_batch_size, max_wait_ms)
+        )
+
+        self.batches_dispatched = 0
+        self.native_batches = 0
+        self.calls_dispatched = 0
+        self.largest_batch = 0
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "VLLMMicroBatcher":
+        """
+        Create a micro-batcher from centralized settings.
+
+        Args:
+            settings: EntityExtractionServiceSettings instance (or None to load from get_settings())
+
+        Returns:
+            VLLMMicroBatcher configured from vllm_direct settings
+        """
+        if settings is None:
+            from src.core.config import get_settings
+            settings = get_settings()
+
+        vllm = settings.vllm_direct
+        return cls(
+            max_batch_size=vllm.vllm_micro_batch_max_size,
+            max_wait_ms=vllm.vllm_micro_batch_max_wait_ms,
+            tune_interval=vllm.vllm_micro_batch_tune_interval,
+            chars_per_token=vllm.vllm_chars_per_token
+        )
+
+    @staticmethod
+    def _build_batch_configs(max_batch_size: int, max_wait_ms: float) -> Dict[DocumentSizeTier, BatchConfig]:
+        """Per-tier configs: same short wait everywhere, fewer calls per batch for larger prompts."""
+        sizes = {
+            DocumentSizeTier.SMALL: max_batch_size,
+            DocumentSizeTier.MEDIUM: max_batch_size,
+            DocumentSizeTier.LARGE: max(1, max_batch_size // 2),
+            DocumentSizeTier.EXTRA_LARGE: max(1, max_batch_size // 4)
+        }
+        return {
+            tier: BatchConfig(
+                tier=tier,
+                max_batch_size=size,
+                min_batch_size=1,  # Every queued call arms the flush timer
+                max_wait_time_ms=max_wait_ms,
+                optimal_tokens_per_batch=0,
+                memory_threshold_mb=0
+            )
+            for tier, size in sizes.items()
+        }
+
+    async def submit(self, client: Any, request: VLLMRequest) -> VLLMResponse:
+        """
+        Queue a chat completion and wait for its response.
+
+        Args:
+            client: vLLM client (or wrapper) that should serve the call
+            request: Chat completion request
+
+        Returns:
+            VLLMResponse for this request
+        """
+        context = get_request_context()
+        estimated_tokens = int(request.estimate_prompt_length() / self.chars_per_token)
+
+        return await self.batcher.submit(
+            text="",
+            payload=(client, request, context),
+            priority=context.priority,
+            estimated_tokens=estimated_tokens
+        )
+
+    async def _process_batch(self, batch: List[DocumentRequest]) -> List[Any]:
+        """Dispatch a batch and return one response (or exception) per call, in order."""
+        results: List[Any] = [None] * len(batch)
+
+        groups: Dict[int, List[int]] = {}
+        for index, item in enumerate(batch):
+            groups.setdefault(id(item.payload[0]), []).append(index)
+
+        dispatches = []
+        for indices in groups.values():
+            client = batch[indices[0]].payload[0]
+            if len(indices) > 1 and getattr(client, "supports_native_batching", False) is True:
+                dispatches.append(self._dispatch_native(client, batch, indices, results))
+            else:
+                dispatches.extend(self._dispatch_one(batch[i], i, results) for i in indices)
+
+        await asyncio.gather(*dispatches)
+
+        self.batches_dispatched += 1
+        self.calls_dispatched += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        return results
+
+    async def _dispatch_one(self, item: DocumentRequest, index: int, results: List[Any]):
+        client, request, context = item.payload
+        # gather() runs this in its own task, so the caller's context applies only here
+        set_request_context(context)
+        call = asyncio.ensure_future(client.generate_chat_completion(request))
+        self._cancel_with_callers(call, [item])
+        try:
+            results[index] = await call
+        except asyncio.CancelledError as e:
+            if not call.cancelled() or not item.future.cancelled():
+                raise
+            results[index] = e
+        except Exception as e:
+            results[index] = e
+
+    async def _dispatch_native(self, client: Any, batch: List[DocumentRequest], indices: List[int], results: List[Any]):
+        self.native_batches += 1
+        items = [batch[i] for i in indices]
+        call = asyncio.ensure_future(client.generate_batch([item.payload[1] for item in items]))
+        self._cancel_with_callers(call, items)
+        try:
+            responses = await call
+            for index, response in zip(indices, responses):
+                results[index] = response
+        except asyncio.CancelledError as e:
+            if not call.cancelled() or not all(item.future.cancelled() for item in items):
+                raise
+            for index in indices:
+                results[index] = e
+        except Exception as e:
+            for index in indices:
+                results[index] = e
+
+    @staticmethod
+    def _cancel_with_callers(call: asyncio.Future, items: List[DocumentRequest]):
+        """Cancel a dispatched call once every caller waiting on it has been cancelled."""
+        def on_caller_done(_):
+            if all(item.future.cancelled() for item in items):
+                call.cancel()
+
+        for item in items:
+            item.future.add_done_callback(on_caller_done)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get micro-batching statistics."""
+        return {
+            "batches_dispatched": self.batches_dispatched,
+            "native_batches": self.native_batches,
+            "calls_dispatched": self.calls_dispatched,
+            "average_batch_size": (
+                self.calls_dispatched / self.batches_dispatched if self.batches_dispatched else 0.0
+            ),
+            "largest_batch": self.largest_batch,
+            "queues": self.batcher.get_queue_stats(),
+            "tuning": self.profiler.generate_performance_report()["tier_tuning"]
+        }
+
+
+# Process-wide batcher so calls from concurrent API requests share batches
+_micro_batcher: Optional[VLLMMicroBatcher] = None
+
+
+def get_micro_batcher() -> VLLMMicroBatcher:
+    """
+    Get the shared micro-batcher instance.
+
+    Returns:
+        VLLMMicroBatcher configured from settings
+    """
+    global _micro_batcher
+    if _micro_batcher is None:
+        _micro_batcher = VLLMMicroBatcher.from_settings()
+    return _micro_batcher
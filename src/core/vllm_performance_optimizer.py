@@ -23,6 +23,8 @@ from typing import Dict, List, Optional, Any, Tuple, Callable
 from dataclasses import dataclass, asdict, field
 import hashlib
 
+from src.vllm_client.models import BatchPriority
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,14 +36,6 @@ class DocumentSizeTier(Enum):
     EXTRA_LARGE = "xl"       # >10000 tokens
 
 
-class BatchPriority(Enum):
-    """Batch processing priority levels."""
-    URGENT = 0      # Process immediately
-    HIGH = 1        # Process within 10ms
-    NORMAL = 2      # Process within 50ms
-    LOW = 3         # Process within 200ms
-
-
 @dataclass
 class DocumentRequest:
     """Request for document processing with size and priority metadata."""
@@ -53,6 +47,8 @@ class DocumentRequest:
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
     callback: Optional[Callable] = None
+    payload: Any = None
+    future: Optional[asyncio.Future] = None
 
 
 @dataclass
@@ -287,13 +283,21 @@ class AdaptiveBatcher:
     - Dynamic batch size adjustment based on load
     - Priority-based processing
     - Thread-safe concurrent access
+    - Awaitable submit() that routes each result back to its caller
+    - Online batch size / wait tuning from PerformanceProfiler data
+    
+    process_batch_fn receives the list of DocumentRequest objects and returns
+    one result per request, in order. A result that is an exception instance
+    fails only that request's submit() call.
     """
     
     def __init__(
         self,
         process_batch_fn: Callable,
         size_estimator: Optional[DocumentSizeEstimator] = None,
-        enable_auto_flush: bool = True
+        enable_auto_flush: bool = True,
+        profiler: Optional["PerformanceProfiler"] = None,
+        batch_configs: Optional[Dict[DocumentSizeTier, BatchConfig]] = None
     ):
         """
         Initialize AdaptiveBatcher.
@@ -302,10 +306,13 @@ class AdaptiveBatcher:
             process_batch_fn: Async function to process a batch of requests
             size_estimator: DocumentSizeEstimator instance
             enable_auto_flush: Whether to enable auto-flush timers
+            profiler: PerformanceProfiler that records latencies and tunes batch size/wait
+            batch_configs: Per-tier batch configuration (defaults to _init_batch_configs())
         """
         self.process_batch_fn = process_batch_fn
         self.size_estimator = size_estimator or DocumentSizeEstimator()
         self.enable_auto_flush = enable_auto_flush
+        self.profiler = profiler
         
         # Thread-safe request queues by size tier
         self._queue_lock = threading.RLock()
@@ -314,12 +321,14 @@ class AdaptiveBatcher:
         }
         
         # Batch configurations by tier
-        self._batch_configs = self._init_batch_configs()
+        self._batch_configs = batch_configs or self._init_batch_configs()
         
         # Auto-flush management
         self._flush_tasks: Dict[DocumentSizeTier, Optional[asyncio.Task]] = {
             tier: None for tier in DocumentSizeTier
         }
+        # Strong references to in-progress batch tasks
+        self._batch_tasks: set = set()
         
         # Performance tracking
         self._batch_count = 0
@@ -369,33 +378,41 @@ class AdaptiveBatcher:
             )
         }
     
-    async def add_request(
+    def _effective_batch_size(self, tier: DocumentSizeTier) -> int:
+        """Batch size for a tier after load and profiler tuning."""
+        multiplier = self._load_factor
+        if self.profiler:
+            multiplier *= self.profiler.get_tier_tuning(tier)["batch_size_multiplier"]
+        return max(1, int(self._batch_configs[tier].max_batch_size * multiplier))
+    
+    def _effective_wait_ms(self, tier: DocumentSizeTier) -> float:
+        """Auto-flush wait for a tier after profiler tuning."""
+        wait_ms = self._batch_configs[tier].max_wait_time_ms
+        if self.profiler:
+            wait_ms *= self.profiler.get_tier_tuning(tier)["wait_time_multiplier"]
+        return wait_ms
+    
+    def _enqueue(
         self,
         text: str,
-        request_id: Optional[str] = None,
-        priority: BatchPriority = BatchPriority.NORMAL,
-        metadata: Optional[Dict[str, Any]] = None,
-        callback: Optional[Callable] = None
-    ) -> str:
-        """
-        Add a request to the appropriate queue based on size.
-        
-        Args:
-            text: Document text to process
-            request_id: Optional request ID
-            priority: Processing priority
-            metadata: Additional metadata
-            callback: Optional callback for result
-            
-        Returns:
-            Request ID for tracking
-        """
+        request_id: Optional[str],
+        priority: BatchPriority,
+        metadata: Optional[Dict[str, Any]],
+        callback: Optional[Callable] = None,
+        payload: Any = None,
+        future: Optional[asyncio.Future] = None,
+        estimated_tokens: Optional[int] = None
+    ) -> DocumentRequest:
+        """Classify a request and append it to its tier queue."""
         # Generate request ID if not provided
         if not request_id:
             request_id = f"req_{self._total_requests}_{int(time.time() * 1000)}"
         
         # Estimate size and classify
-        tier, estimated_tokens = self.size_estimator.classify_document(text)
+        if estimated_tokens is None:
+            tier, estimated_tokens = self.size_estimator.classify_document(text)
+        else:
+            tier = self.size_estimator.classify_size_tier(estimated_tokens)
         
         # Create request object
         request = DocumentRequest(
@@ -405,7 +422,9 @@ class AdaptiveBatcher:
             estimated_tokens=estimated_tokens,
             priority=priority,
             metadata=metadata or {},
-            callback=callback
+            callback=callback,
+            payload=payload,
+            future=future
         )
         
         # Add to appropriate queue
@@ -414,27 +433,93 @@ class AdaptiveBatcher:
             self._total_requests += 1
         
         logger.debug(f"Added request {request_id} to {tier.value} queue (tokens: {estimated_tokens})")
+        return request
+    
+    async def add_request(
+        self,
+        text: str,
+        request_id: Optional[str] = None,
+        priority: BatchPriority = BatchPriority.NORMAL,
+        metadata: Optional[Dict[str, Any]] = None,
+        callback: Optional[Callable] = None
+    ) -> str:
+        """
+        Add a request to the appropriate queue based on size.
+        
+        Args:
+            text: Document text to process
+            request_id: Optional request ID
+            priority: Processing priority
+            metadata: Additional metadata
+            callback: Optional callback for result
+            
+        Returns:
+            Request ID for tracking
+        """
+        request = self._enqueue(text, request_id, priority, metadata, callback=callback)
         
         # Check if we should process immediately
-        await self._check_and_process_batch(tier)
+        await self._check_and_process_batch(request.size_tier, priority)
         
-        return request_id
+        return request.id
     
-    async def _check_and_process_batch(self, tier: DocumentSizeTier):
+    async def submit(
+        self,
+        text: str,
+        payload: Any = None,
+        priority: BatchPriority = BatchPriority.NORMAL,
+        metadata: Optional[Dict[str, Any]] = None,
+        request_id: Optional[str] = None,
+        estimated_tokens: Optional[int] = None
+    ) -> Any:
+        """
+        Queue a request and wait for its own result from the batch it joins.
+        
+        Args:
+            text: Text used for size classification
+            payload: Object handed to process_batch_fn with the request
+            priority: Processing priority (URGENT flushes the tier immediately)
+            metadata: Additional metadata
+            request_id: Optional request ID
+            estimated_tokens: Known token estimate (skips text-based estimation)
+            
+        Returns:
+            The result process_batch_fn produced for this request
+            
+        Raises:
+            Exception: Whatever process_batch_fn raised or returned for this request
+        """
+        future = asyncio.get_running_loop().create_future()
+        request = self._enqueue(
+            text, request_id, priority, metadata,
+            payload=payload, future=future, estimated_tokens=estimated_tokens
+        )
+        await self._check_and_process_batch(request.size_tier, priority)
+        return await future
+    
+    async def _check_and_process_batch(
+        self,
+        tier: DocumentSizeTier,
+        priority: Optional[BatchPriority] = None
+    ):
         """
         Check if batch should be processed and trigger processing.
         
         Args:
             tier: Document size tier to check
+            priority: Priority of the request that triggered the check
         """
         config = self._batch_configs[tier]
         
         with self._queue_lock:
             queue_size = len(self._request_queues[tier])
             
-            # Process immediately if batch is full
-            if queue_size >= config.max_batch_size * self._load_factor:
-                await self._process_tier_batch(tier)
+            # Process immediately if batch is full (or an urgent request arrived).
+            # Runs as its own task so a cancelled submitter cannot abort the batch.
+            if queue_size >= self._effective_batch_size(tier) or priority == BatchPriority.URGENT:
+                task = asyncio.create_task(self._process_tier_batch(tier))
+                self._batch_tasks.add(task)
+                task.add_done_callback(self._batch_tasks.discard)
                 
             # Set up auto-flush timer if not already set
             elif (
@@ -443,7 +528,7 @@ class AdaptiveBatcher:
                 and not self._flush_tasks[tier]
             ):
                 self._flush_tasks[tier] = asyncio.create_task(
-                    self._auto_flush_timer(tier, config.max_wait_time_ms)
+                    self._auto_flush_timer(tier, self._effective_wait_ms(tier))
                 )
     
     async def _auto_flush_timer(self, tier: DocumentSizeTier, wait_ms: float):
@@ -461,7 +546,8 @@ class AdaptiveBatcher:
             pass
         finally:
             with self._queue_lock:
-                self._flush_tasks[tier] = None
+                if self._flush_tasks[tier] is asyncio.current_task():
+                    self._flush_tasks[tier] = None
     
     async def _process_tier_batch(self, tier: DocumentSizeTier):
         """
@@ -470,27 +556,32 @@ class AdaptiveBatcher:
         Args:
             tier: Document size tier to process
         """
-        config = self._batch_configs[tier]
-        
         # Collect batch
         batch_requests = []
         
         with self._queue_lock:
             queue = self._request_queues[tier]
-            batch_size = min(len(queue), int(config.max_batch_size * self._load_factor))
+            batch_size = min(len(queue), self._effective_batch_size(tier))
             
             if batch_size == 0:
                 return
             
-            # Collect requests up to batch size
-            for _ in range(batch_size):
-                if queue:
-                    batch_requests.append(queue.popleft())
+            # Collect requests up to batch size, skipping callers that gave up
+            while queue and len(batch_requests) < batch_size:
+                request = queue.popleft()
+                if request.future is not None and request.future.done():
+                    continue
+                batch_requests.append(request)
             
-            # Cancel any pending flush timer
-            if self._flush_tasks[tier]:
-                self._flush_tasks[tier].cancel()
-                self._flush_tasks[tier] = None
+            # Cancel any pending flush timer (but not the timer running this batch)
+            flush_task = self._flush_tasks[tier]
+            if flush_task and flush_task is not asyncio.current_task():
+                flush_task.cancel()
+            self._flush_tasks[tier] = None
+        
+        # Leftover requests start collecting the next batch right away
+        if self._request_queues[tier]:
+            await self._check_and_process_batch(tier)
         
         if not batch_requests:
             return
@@ -506,10 +597,21 @@ class AdaptiveBatcher:
             
             # Call the processing function
             results = await self.process_batch_fn(batch_requests)
+            if len(results) != len(batch_requests):
+                raise ValueError(
+                    f"process_batch_fn returned {len(results)} results for {len(batch_requests)} requests"
+                )
             
-            # Invoke callbacks if provided
+            # Route results to awaiting callers, or invoke callbacks if provided
             for request, result in zip(batch_requests, results):
-                if request.callback:
+                if request.future is not None:
+                    if request.future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        request.future.set_exception(result)
+                    else:
+                        request.future.set_result(result)
+                elif request.callback:
                     try:
                         await request.callback(request.id, result)
                     except Exception as e:
@@ -531,16 +633,45 @@ class AdaptiveBatcher:
             
         except Exception as e:
             logger.error(f"Error processing {tier.value} batch: {e}")
+            results = [e] * len(batch_requests)
+            processing_time_ms = (time.time() - start_time) * 1000
             
-            # Re-queue failed requests with increased priority
             with self._queue_lock:
                 for request in batch_requests:
-                    request.priority = BatchPriority.HIGH
-                    self._request_queues[tier].appendleft(request)
+                    if request.future is not None:
+                        # Awaiting callers get the error instead of an unbounded retry loop
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                    else:
+                        # Re-queue failed requests with increased priority
+                        request.priority = BatchPriority.HIGH
+                        self._request_queues[tier].appendleft(request)
+        
+        self._record_batch_performance(tier, batch_requests, results)
         
         # Adjust batch parameters based on performance
         await self._adjust_batch_parameters(tier, processing_time_ms, len(batch_requests))
     
+    def _record_batch_performance(
+        self,
+        tier: DocumentSizeTier,
+        batch_requests: List[DocumentRequest],
+        results: List[Any]
+    ):
+        """Feed end-to-end latency (queue wait included) and batch fill to the profiler."""
+        if not self.profiler:
+            return
+        
+        now = datetime.now()
+        for request, result in zip(batch_requests, results):
+            self.profiler.record_request(
+                tier=tier,
+                response_time_ms=(now - request.timestamp).total_seconds() * 1000,
+                tokens_processed=request.estimated_tokens,
+                success=not isinstance(result, BaseException)
+            )
+        self.profiler.record_batch(tier, len(batch_requests), self._batch_configs[tier].max_batch_size)
+    
     async def _adjust_batch_parameters(
         self,
         tier: DocumentSizeTier,
@@ -606,6 +737,8 @@ class AdaptiveBatcher:
                 
                 stats["queues"][tier.value] = {
                     "pending": queue_size,
+                    "batch_size": self._effective_batch_size(tier),
+                    "wait_ms": round(self._effective_wait_ms(tier), 2),
                     "processed": tier_stat["count"],
                     "avg_time_ms": (
                         tier_stat["total_time_ms"] / tier_stat["count"]
@@ -910,7 +1043,9 @@ class PerformanceProfiler:
     def __init__(
         self,
         window_size_minutes: int = 15,
-        enable_auto_tuning: bool = True
+        enable_auto_tuning: bool = True,
+        performance_targets: Optional[Dict[DocumentSizeTier, float]] = None,
+        tune_interval: int = 100
     ):
         """
         Initialize PerformanceProfiler.
@@ -918,9 +1053,12 @@ class PerformanceProfiler:
         Args:
             window_size_minutes: Time window for metrics aggregation
             enable_auto_tuning: Whether to enable automatic tuning
+            performance_targets: p95 latency target per tier in ms (defaults below)
+            tune_interval: Number of recorded requests between auto-tuning passes
         """
         self.window_size_minutes = window_size_minutes
         self.enable_auto_tuning = enable_auto_tuning
+        self.tune_interval = max(1, tune_interval)
         
         # Thread-safe metrics storage
         self._metrics_lock = threading.RLock()
@@ -929,7 +1067,7 @@ class PerformanceProfiler:
         }
         
         # Performance targets
-        self._performance_targets = {
+        self._performance_targets = performance_targets or {
             DocumentSizeTier.SMALL: 50,      # ms
             DocumentSizeTier.MEDIUM: 150,    # ms
             DocumentSizeTier.LARGE: 500,     # ms
@@ -943,6 +1081,15 @@ class PerformanceProfiler:
             "memory_threshold_multiplier": 1.0
         }
         
+        # Per-tier batching knobs consumed by AdaptiveBatcher
+        self._tier_tuning: Dict[DocumentSizeTier, Dict[str, float]] = {
+            tier: {"batch_size_multiplier": 1.0, "wait_time_multiplier": 1.0}
+            for tier in DocumentSizeTier
+        }
+        self._batch_fill: Dict[DocumentSizeTier, deque] = {
+            tier: deque(maxlen=100) for tier in DocumentSizeTier
+        }
+        
         # Statistics
         self._total_requests = 0
         self._total_tokens = 0
@@ -990,9 +1137,26 @@ class PerformanceProfiler:
             )
         
         # Auto-tune if enabled
-        if self.enable_auto_tuning and self._total_requests % 100 == 0:
+        if self.enable_auto_tuning and self._total_requests % self.tune_interval == 0:
             self._auto_tune_parameters()
     
+    def record_batch(self, tier: DocumentSizeTier, batch_size: int, max_batch_size: int):
+        """
+        Record how full a dispatched batch was.
+        
+        Args:
+            tier: Document size tier
+            batch_size: Requests in the dispatched batch
+            max_batch_size: Configured (untuned) maximum batch size for the tier
+        """
+        with self._metrics_lock:
+            self._batch_fill[tier].append(batch_size / max(max_batch_size, 1))
+    
+    def get_tier_tuning(self, tier: DocumentSizeTier) -> Dict[str, float]:
+        """Get current batch size and wait time multipliers for a tier."""
+        with self._metrics_lock:
+            return dict(self._tier_tuning[tier])
+    
     def calculate_tier_metrics(self, tier: DocumentSizeTier) -> Optional[PerformanceMetrics]:
         """
         Calculate aggregated metrics for a tier.
@@ -1077,10 +1241,48 @@ class PerformanceProfiler:
             if metrics.p99_response_time_ms > target_ms * 2:
                 self._tuning_params["timeout_multiplier"] *= 1.1
                 adjustments_made = True
+            
+            if self._tune_tier_batching(tier, metrics, target_ms):
+                adjustments_made = True
         
         if adjustments_made:
             logger.info(f"Auto-tuned parameters: {self._tuning_params}")
     
+    def _tune_tier_batching(
+        self,
+        tier: DocumentSizeTier,
+        metrics: PerformanceMetrics,
+        target_ms: float
+    ) -> bool:
+        """
+        Adjust a tier's batch size and wait time from latency and batch fill.
+        
+        - p95 over target: smaller batches, shorter waits
+        - Batches fill before the timer: allow larger batches
+        - Batches mostly leave near-empty: waiting buys nothing, shorten it
+        - Well under target otherwise: wait a little longer to collect more
+        """
+        with self._metrics_lock:
+            fills = list(self._batch_fill[tier])
+            tuning = self._tier_tuning[tier]
+            before = dict(tuning)
+            avg_fill = sum(fills) / len(fills) if fills else None
+            
+            if metrics.p95_response_time_ms > target_ms * 1.2:
+                tuning["batch_size_multiplier"] *= 0.9
+                tuning["wait_time_multiplier"] *= 0.9
+            elif avg_fill is not None and avg_fill >= 0.9:
+                tuning["batch_size_multiplier"] *= 1.1
+            elif avg_fill is not None and avg_fill < 0.25:
+                tuning["wait_time_multiplier"] *= 0.8
+            elif metrics.p95_response_time_ms < target_ms * 0.5:
+                tuning["wait_time_multiplier"] *= 1.1
+            
+            for key in tuning:
+                tuning[key] = min(4.0, max(0.25, tuning[key]))
+            
+            return tuning != before
+    
     def generate_performance_report(self) -> Dict[str, Any]:
         """Generate comprehensive performance report."""
         report = {
@@ -1089,7 +1291,8 @@ class PerformanceProfiler:
             "total_requests": self._total_requests,
             "total_tokens": self._total_tokens,
             "tier_metrics": {},
-            "tuning_parameters": self._tuning_params.copy()
+            "tuning_parameters": self._tuning_params.copy(),
+            "tier_tuning": {tier.value: self.get_tier_tuning(tier) for tier in DocumentSizeTier}
         }
         
         # Add tier-specific metrics
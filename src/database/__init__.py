@@ -4,9 +4,13 @@ Database module for Document Intelligence Service v2.0.0
 Provides database storage services for graph.chunks and graph.entities.
 """
 
+from .entity_resolution import CrossDocumentResolver, MergeRecord, ResolutionResult
 from .graph_storage import GraphStorageService, create_graph_storage_service
 
 __all__ = [
+    "CrossDocumentResolver",
     "GraphStorageService",
+    "MergeRecord",
+    "ResolutionResult",
     "create_graph_storage_service"
 ]
@@ -5,12 +5,15 @@ Handles storage of chunks and entities in graph.chunks and graph.entities tables
 Provides atomic transactions, deduplication, and error handling.
 """
 
+import asyncio
 import logging
 import uuid
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import httpx
 
+from .entity_resolution import CrossDocumentResolver, ResolutionResult, entity_storage_id
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +24,7 @@ class GraphStorageService:
     Features:
     - Atomic chunk + entity storage (both succeed or both fail)
     - Entity deduplication based on (type, text, document_id)
+    - Optional cross-document entity resolution (CrossDocumentResolver)
     - Batch operations for performance
     - Comprehensive error handling
     - Supabase integration via HTTP client
@@ -30,16 +34,25 @@ class GraphStorageService:
     - graph.entities - Extracted entities with relationships
     """
 
-    def __init__(self, supabase_url: str, supabase_key: str):
+    def __init__(
+        self,
+        supabase_url: str,
+        supabase_key: str,
+        resolver: Optional[CrossDocumentResolver] = None
+    ):
         """
         Initialize GraphStorageService.
 
         Args:
             supabase_url: Supabase project URL
             supabase_key: Supabase service role key
+            resolver: Canonical entity index to resolve entities against
+                before storage (None stores them under their own ids)
         """
         self.supabase_url = supabase_url.rstrip('/')
         self.supabase_key = supabase_key
+        self.resolver = resolver
+        self._resolution_lock = asyncio.Lock()
 
         self.client = httpx.AsyncClient(
             timeout=30.0,
@@ -54,8 +67,10 @@ class GraphStorageService:
         logger.info("GraphStorageService initialized")
 
     async def close(self):
-        """Close HTTP client."""
+        """Close HTTP client and the resolver's index."""
         await self.client.aclose()
+        if self.resolver is not None:
+            self.resolver.close()
 
     async def store_chunks_and_entities(
         self,
@@ -206,6 +221,14 @@ class GraphStorageService:
         """
         Store entities in graph.entities table with cross-document deduplication.
 
+        With a resolver, entities matching a canonical entity of earlier
+        documents are stored under its entity_id and canonical text (the
+        mention's text goes to metadata.mention_text, further mentions
+        resolved to the same entity to metadata.aliases), and the merges are
+        recorded by the resolver; other entities keep their own ids. The
+        resolution is committed to the resolver's index only once the upsert
+        succeeds, and resolve-upsert-commit runs for one document at a time.
+
         Args:
             document_id: Document identifier
             entities: List of entity dictionaries with keys:
@@ -218,7 +241,8 @@ class GraphStorageService:
             metadata: Optional document-level metadata
 
         Returns:
-            List of inserted entity_ids (deterministic MD5 hashes)
+            List of inserted entity_ids (deterministic MD5 hashes, canonical
+            ones for resolved entities)
 
         Existing Schema:
             graph.entities (
@@ -251,22 +275,61 @@ class GraphStorageService:
         unique_entities = self._deduplicate_entities_for_storage(entities, document_id)
         logger.debug(f"Deduplicated to {len(unique_entities)} unique entities")
 
+        if self.resolver is None:
+            return await self._upsert_entities(document_id, unique_entities, None, metadata)
+
+        async with self._resolution_lock:
+            # CPU-bound scoring and index file I/O
+            resolution = await asyncio.to_thread(
+                self.resolver.resolve_entities, document_id, unique_entities, False
+            )
+            logger.info(
+                f"Resolved {len(unique_entities)} entities of document {document_id}: "
+                f"{resolution.created} new, {len(resolution.merges)} merged into existing entities"
+            )
+            try:
+                entity_ids = await self._upsert_entities(document_id, unique_entities, resolution, metadata)
+                await asyncio.to_thread(self.resolver.commit, resolution)
+            except BaseException:
+                # Failed or cancelled: no canonical entities or merges for rows never stored
+                await asyncio.to_thread(self.resolver.discard)
+                raise
+            return entity_ids
+
+    async def _upsert_entities(
+        self,
+        document_id: str,
+        unique_entities: List[Dict[str, Any]],
+        resolution: Optional[ResolutionResult],
+        metadata: Optional[Dict[str, Any]]
+    ) -> List[str]:
+        """Upsert one record per entity_id, under canonical ids when resolved."""
         # Prepare entity records for existing schema
         entity_records = []
-        for entity in unique_entities:
-            import hashlib
-
+        records_by_id: Dict[str, Dict[str, Any]] = {}
+        for i, entity in enumerate(unique_entities):
             entity_type = entity.get("type", "UNKNOWN")
             entity_text = entity.get("text", "")
 
-            # Generate deterministic entity_id: md5(type:normalized_text)[:16]
-            normalized_text = entity_text.lower().strip()
-            hash_input = f"{entity_type}:{normalized_text}"
-            entity_id = hashlib.md5(hash_input.encode()).hexdigest()[:16]
+            if resolution is not None:
+                entity_id = resolution.entity_ids[i]
+                canonical_text = resolution.canonical_texts[i]
+            else:
+                # Generate deterministic entity_id: md5(type:normalized_text)[:16]
+                entity_id = entity_storage_id(entity_type, entity_text)
+                canonical_text = entity_text
+
+            # One record per entity_id: an upsert may not touch a row twice
+            existing = records_by_id.get(entity_id)
+            if existing is not None:
+                aliases = existing["metadata"].setdefault("aliases", [])
+                if entity_text not in aliases:
+                    aliases.append(entity_text)
+                continue
 
             record = {
                 "entity_id": entity_id,
-                "entity_text": entity_text,
+                "entity_text": canonical_text,
                 "entity_type": entity_type,
                 "description": entity.get("description"),
                 "confidence": entity.get("confidence", 0.95),
@@ -282,8 +345,11 @@ class GraphStorageService:
                     "end_char": entity.get("end_char")
                 }
             }
+            if canonical_text != entity_text:
+                record["metadata"]["mention_text"] = entity_text
 
             entity_records.append(record)
+            records_by_id[entity_id] = record
 
         # Upsert entities via Supabase REST API (handle cross-document deduplication)
         try:
@@ -442,7 +508,8 @@ class GraphStorageService:
 # Factory function for creating storage service
 async def create_graph_storage_service(
     supabase_url: Optional[str] = None,
-    supabase_key: Optional[str] = None
+    supabase_key: Optional[str] = None,
+    resolver: Optional[CrossDocumentResolver] = None
 ) -> GraphStorageService:
     """
     Factory function for creating GraphStorageService.
@@ -450,21 +517,31 @@ async def create_graph_storage_service(
     Args:
         supabase_url: Optional Supabase URL (reads from config if None)
         supabase_key: Optional Supabase key (reads from config if None)
+        resolver: Optional resolver (opened from ENTITY_RESOLUTION_DIR if None and set)
 
     Returns:
         GraphStorageService instance
     """
-    if supabase_url is None or supabase_key is None:
-        from ..core.config import get_settings
-        settings = get_settings()
+    from ..core.config import get_settings
+    settings = get_settings()
 
+    if supabase_url is None or supabase_key is None:
         # Use Supabase configuration from settings
         supabase_url = supabase_url or settings.supabase.supabase_url
         supabase_key = supabase_key or settings.supabase.supabase_service_key
 
         logger.info(f"Using Supabase URL from config: {supabase_url}")
 
+    if resolver is None and settings.supabase.entity_resolution_dir:
+        resolver = await asyncio.to_thread(
+            CrossDocumentResolver,
+            settings.supabase.entity_resolution_dir,
+            threshold=settings.supabase.entity_resolution_threshold,
+            compact_threshold=settings.supabase.entity_resolution_compact_names
+        )
+
     return GraphStorageService(
         supabase_url=supabase_url,
-        supabase_key=supabase_key
+        supabase_key=supabase_key,
+        resolver=resolver
     )
@@ -300,4 +300,76 @@ class ExtractionResponse(BaseModel):
                 "timestamp": "2024-07-24T10:30:45.123456Z",
                 "success": True
             }
-        }
\ No newline at end of file
+        }
+
+class DocumentChunk(BaseModel):
+    """
+    A chunk of a document produced by the chunking strategies.
+
+    Only src.core.chunking (strategies and enhancer) uses this model; the
+    extraction pipeline works with src.core.smart_chunker.DocumentChunk.
+    It is deliberately not exported from src.models.
+    """
+    
+    chunk_id: str = Field(
+        ...,
+        description="Unique chunk identifier"
+    )
+    content: str = Field(
+        ...,
+        description="Chunk text"
+    )
+    start_position: int = Field(
+        ...,
+        ge=0,
+        description="Start offset of the chunk in the document"
+    )
+    end_position: int = Field(
+        ...,
+        ge=0,
+        description="End offset (exclusive) of the chunk in the document"
+    )
+    chunk_index: int = Field(
+        ...,
+        ge=0,
+        description="Position of the chunk in the document's chunk list"
+    )
+    character_count: int = Field(
+        ...,
+        ge=0,
+        description="Number of characters in the chunk"
+    )
+    word_count: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Number of words in the chunk"
+    )
+    sentence_count: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Number of sentences in the chunk"
+    )
+    quality_score: Optional[float] = Field(
+        None,
+        description="Chunk quality score (0.0 to 1.0)"
+    )
+    boundary_info: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Whether the chunk starts/ends on sentence boundaries"
+    )
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Strategy and document metadata"
+    )
+    enhanced_content: Optional[str] = Field(
+        None,
+        description="Chunk text with contextual enhancement applied"
+    )
+    embedding_vector: Optional[List[float]] = Field(
+        None,
+        description="Embedding of the (enhanced) chunk text"
+    )
+    context_quality_score: Optional[float] = Field(
+        None,
+        description="Quality score of the contextual enhancement"
+    )
@@ -6,11 +6,14 @@ Routes documents to optimal processing strategy based on size and characteristic
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Any, Optional, Literal
+from typing import Dict, Any, Optional, Literal, TYPE_CHECKING
 import logging
 
 from .size_detector import SizeDetector, DocumentSizeInfo, SizeCategory
 
+if TYPE_CHECKING:
+    from src.core.token_counter import TokenCounter
+
 logger = logging.getLogger(__name__)
 
 
@@ -139,15 +142,20 @@ class DocumentRouter:
     DEFAULT_OVERLAP = 500       # tokens
     LARGE_DOC_OVERLAP = 1_000   # tokens for large documents
 
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        token_counter: Optional["TokenCounter"] = None
+    ):
         """
         Initialize document router.
 
         Args:
             config: Optional configuration dict with custom thresholds
+            token_counter: Optional counter with the served model's tokenizer for exact token counts
         """
         self.config = config or {}
-        self.size_detector = SizeDetector()
+        self.size_detector = SizeDetector(token_counter=token_counter)
 
         # Allow configuration overrides
         self.max_context = self.config.get("max_context_length", self.MAX_CONTEXT_LENGTH)
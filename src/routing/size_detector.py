@@ -6,9 +6,12 @@ Analyzes document characteristics and categorizes by size for routing decisions.
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, TYPE_CHECKING
 import logging
 
+if TYPE_CHECKING:
+    from src.core.token_counter import TokenCounter
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +30,7 @@ class DocumentSizeInfo:
 
     Attributes:
         chars: Total character count in document
-        tokens: Estimated token count (4 chars per token)
+        tokens: Token count (exact with a tokenizer, otherwise 4 chars per token)
         pages: Number of pages (if available from metadata)
         category: Size category (VERY_SMALL, SMALL, MEDIUM, LARGE)
         words: Approximate word count
@@ -77,15 +80,25 @@ class SizeDetector:
     # Token estimation factor (characters per token)
     CHARS_PER_TOKEN = 4.0  # Conservative estimate for legal text
 
-    def __init__(self, chars_per_token: float = CHARS_PER_TOKEN):
+    def __init__(
+        self,
+        chars_per_token: float = CHARS_PER_TOKEN,
+        token_counter: Optional["TokenCounter"] = None
+    ):
         """
         Initialize size detector.
 
         Args:
             chars_per_token: Characters per token ratio (default: 4.0)
+            token_counter: Counter with the served model's tokenizer; used for exact
+                token counts when it has a tokenizer loaded
         """
         self.chars_per_token = chars_per_token
-        logger.debug(f"SizeDetector initialized with chars_per_token={chars_per_token}")
+        self.token_counter = token_counter if token_counter is not None and token_counter.is_exact else None
+        logger.debug(
+            f"SizeDetector initialized with chars_per_token={chars_per_token}, "
+            f"exact_tokens={self.token_counter is not None}"
+        )
 
     def detect(self, document_text: str, metadata: Optional[Dict[str, Any]] = None) -> DocumentSizeInfo:
         """
@@ -108,7 +121,7 @@ class SizeDetector:
 
         # Calculate document characteristics
         chars = len(document_text)
-        tokens = self._estimate_tokens(chars)
+        tokens = self._estimate_tokens(chars, document_text)
         pages = self._extract_page_count(metadata)
         words = self._estimate_words(document_text)
         lines = self._count_lines(document_text)
@@ -132,7 +145,7 @@ class SizeDetector:
 
         return size_info
 
-    def _estimate_tokens(self, char_count: int) -> int:
+    def _estimate_tokens(self, char_count: int, text: Optional[str] = None) -> int:
         """
         Estimate token count from character count.
 
@@ -141,12 +154,18 @@ class SizeDetector:
         - Conservative estimate: 4.0 characters/token
         - Accounts for legal terminology, citations, and formatting
 
+        With a tokenizer-backed token counter and the document text, the
+        count is exact (paragraph counts are cached across calls).
+
         Args:
             char_count: Number of characters in document
+            text: Document text (enables exact counting)
 
         Returns:
             Estimated token count
         """
+        if self.token_counter is not None and text is not None:
+            return self.token_counter.count_document(text)
         return int(char_count / self.chars_per_token)
 
     def _extract_page_count(self, metadata: Dict[str, Any]) -> int:
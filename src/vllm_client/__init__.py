@@ -9,6 +9,10 @@ Key Features:
 - Native batch processing support
 - Proactive token estimation and context validation
 - GPU memory monitoring
+- Token-aware admission control against a KV-cache budget
+- Priority and deadline-aware scheduling of queued calls
+- Least-outstanding-tokens load balancing across service replicas
+- Hedged requests across Instruct replicas for tail latency
 - Automatic fallback to HTTP on failure
 - Reproducibility enforcement (temperature=0.0, seed=42)
 """
@@ -16,15 +20,30 @@ Key Features:
 from .client import VLLMClientInterface, VLLMClientType
 from .client import DirectVLLMClient, HTTPVLLMClient
 from .factory import VLLMClientFactory
-from .models import VLLMConfig, VLLMRequest, VLLMResponse, VLLMUsage
+from .models import BatchPriority, VLLMConfig, VLLMRequest, VLLMResponse, VLLMUsage
 from .token_estimator import TokenEstimator, ContextOverflowError
 from .gpu_monitor import GPUMonitor, GPUStats
+from .admission import (
+    TokenBudgetAdmissionController,
+    AdmissionTicket,
+    get_admission_controller
+)
+from .scheduler import (
+    RequestContext,
+    RequestScheduler,
+    get_request_context,
+    set_request_context,
+    reset_request_context
+)
+from .replica_pool import ReplicaPool, ReplicaState, PooledVLLMClient
+from .hedging import HedgedVLLMClient, HedgeBudget, HedgeStats
 from .exceptions import (
     VLLMClientError,
     ModelNotLoadedError,
     GenerationError,
     ContextOverflowError,
-    GPUMemoryError
+    GPUMemoryError,
+    DeadlineExceededError
 )
 
 __all__ = [
@@ -38,6 +57,7 @@ __all__ = [
     "VLLMClientFactory",
 
     # Models
+    "BatchPriority",
     "VLLMConfig",
     "VLLMRequest",
     "VLLMResponse",
@@ -51,11 +71,34 @@ __all__ = [
     "GPUMonitor",
     "GPUStats",
 
+    # Admission control
+    "TokenBudgetAdmissionController",
+    "AdmissionTicket",
+    "get_admission_controller",
+
+    # Scheduling
+    "RequestContext",
+    "RequestScheduler",
+    "get_request_context",
+    "set_request_context",
+    "reset_request_context",
+
+    # Replica pools
+    "ReplicaPool",
+    "ReplicaState",
+    "PooledVLLMClient",
+
+    # Hedging
+    "HedgedVLLMClient",
+    "HedgeBudget",
+    "HedgeStats",
+
     # Exceptions
     "VLLMClientError",
     "ModelNotLoadedError",
     "GenerationError",
     "GPUMemoryError",
+    "DeadlineExceededError",
 ]
 
 __version__ = "1.0.0"
@@ -0,0 +1,410 @@
+"""
+Token-aware admission control for vLLM calls.
+
+Replaces fixed sleep-based throttling with admission against an estimated
+KV-cache budget: every call reserves its estimated prompt + completion tokens
+before it is sent, and waits (without holding any lock) until enough budget is
+free. The budget itself is adjusted with AIMD:
+
+- Additive increase after a healthy completion while other calls are queued
+- Multiplicative decrease when a completion is much slower than the latency
+  predicted from prefill/decode rates, or when a call fails
+
+When the budget is exhausted, waiting calls are ordered by a RequestScheduler
+(priority class, earliest deadline, tenant fair share). All bookkeeping happens
+in synchronous sections on the event loop, so no asyncio.Lock is needed and
+waiters never block each other.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .exceptions import DeadlineExceededError
+from .models import VLLMRequest
+from .scheduler import RequestContext, RequestScheduler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdmissionTicket:
+    """Reservation handed out by the admission controller."""
+
+    tokens: int
+    prompt_tokens: int
+    completion_tokens: int
+    admitted_at: float
+    queued_ms: float = 0.0
+
+
+@dataclass
+class AdmissionStats:
+    """Statistics for admission control behavior."""
+
+    admitted_requests: int = 0
+    queued_requests: int = 0
+    cancelled_waiters: int = 0
+    expired_requests: int = 0
+    budget_increases: int = 0
+    budget_decreases: int = 0
+    total_queue_time_ms: float = 0.0
+    max_queue_depth: int = 0
+    last_slowdown_ratio: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "admitted_requests": self.admitted_requests,
+            "queued_requests": self.queued_requests,
+            "cancelled_waiters": self.cancelled_waiters,
+            "expired_requests": self.expired_requests,
+            "budget_increases": self.budget_increases,
+            "budget_decreases": self.budget_decreases,
+            "average_queue_time_ms": (
+                self.total_queue_time_ms / self.admitted_requests
+                if self.admitted_requests else 0.0
+            ),
+            "max_queue_depth": self.max_queue_depth,
+            "last_slowdown_ratio": round(self.last_slowdown_ratio, 3)
+        }
+
+
+class TokenBudgetAdmissionController:
+    """
+    Admit vLLM calls against an AIMD-adjusted in-flight token budget.
+
+    Waiters are served in scheduler order without skipping: if the next call
+    does not fit, nothing behind it is admitted either, so a large request at
+    the head of the queue is not starved by a stream of small ones. A single request
+    larger than the whole budget is still admitted once nothing else is in
+    flight, so oversized calls degrade to serial execution instead of
+    deadlocking.
+    """
+
+    def __init__(
+        self,
+        kv_token_budget: int = 262144,
+        min_token_budget: int = 16384,
+        additive_increase: int = 8192,
+        decrease_factor: float = 0.7,
+        slowdown_threshold: float = 3.0,
+        max_in_flight: int = 64,
+        chars_per_token: float = 4.0,
+        prefill_rate: float = 19000.0,
+        decode_rate: float = 150.0,
+        aging_seconds: float = 30.0
+    ):
+        """
+        Initialize the admission controller.
+
+        Args:
+            kv_token_budget: Maximum (and initial) in-flight token budget
+            min_token_budget: Lower bound for the adjusted budget
+            additive_increase: Tokens added per healthy completion under demand
+            decrease_factor: Multiplier applied to the budget on congestion
+            slowdown_threshold: Observed/expected latency ratio treated as congestion
+            max_in_flight: Hard cap on concurrently admitted calls
+            chars_per_token: Characters per token for prompt estimation
+            prefill_rate: Expected prefill throughput (tokens/sec)
+            decode_rate: Expected decode throughput (tokens/sec)
+            aging_seconds: Queue time after which a waiter is promoted one priority class
+        """
+        self.max_token_budget = kv_token_budget
+        self.min_token_budget = min(min_token_budget, kv_token_budget)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.slowdown_threshold = slowdown_threshold
+        self.max_in_flight = max_in_flight
+        self.chars_per_token = chars_per_token
+        self.prefill_rate = prefill_rate
+        self.decode_rate = decode_rate
+
+        self.token_budget = float(kv_token_budget)
+        self.in_flight_tokens = 0
+        self.in_flight_requests = 0
+
+        # Completion length is usually far below max_tokens; learn it
+        self._completion_ema: Optional[float] = None
+        self._last_decrease_at = 0.0
+
+        self.scheduler = RequestScheduler(aging_seconds=aging_seconds)
+        self.stats = AdmissionStats()
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "TokenBudgetAdmissionController":
+        """
+        Create a controller from centralized settings.
+
+        Args:
+            settings: EntityExtractionServiceSettings instance (or None to load from get_settings())
+
+        Returns:
+            TokenBudgetAdmissionController configured from vllm_direct settings
+        """
+        if settings is None:
+            from src.core.config import get_settings
+            settings = get_settings()
+
+        vllm = settings.vllm_direct
+        return cls(
+            kv_token_budget=vllm.vllm_kv_token_budget,
+            min_token_budget=vllm.vllm_admission_min_token_budget,
+            additive_increase=vllm.vllm_admission_additive_increase,
+            decrease_factor=vllm.vllm_admission_decrease_factor,
+            slowdown_threshold=vllm.vllm_admission_slowdown_threshold,
+            max_in_flight=vllm.vllm_admission_max_in_flight,
+            chars_per_token=vllm.vllm_chars_per_token,
+            prefill_rate=vllm.vllm_prefill_rate,
+            decode_rate=vllm.vllm_decode_rate,
+            aging_seconds=vllm.vllm_scheduler_aging_seconds
+        )
+
+    # ------------------------------------------------------------------
+    # Estimation
+    # ------------------------------------------------------------------
+
+    def estimate_request_tokens(self, request: VLLMRequest) -> Tuple[int, int]:
+        """
+        Estimate prompt and completion tokens a request will hold in KV cache.
+
+        Args:
+            request: Request to estimate
+
+        Returns:
+            Tuple of (prompt_tokens, completion_tokens)
+        """
+        prompt_tokens = int(request.estimate_prompt_length() / self.chars_per_token)
+
+        completion_tokens = request.max_tokens
+        if self._completion_ema is not None:
+            # Keep headroom over the observed average, never above max_tokens
+            completion_tokens = min(request.max_tokens, int(self._completion_ema * 1.5) + 256)
+
+        return prompt_tokens, completion_tokens
+
+    def expected_latency_ms(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """Latency predicted from configured prefill/decode throughput."""
+        return (prompt_tokens / self.prefill_rate + completion_tokens / self.decode_rate) * 1000
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.scheduler)
+
+    def _fits(self, tokens: int) -> bool:
+        if self.in_flight_requests == 0:
+            return True
+        if self.in_flight_requests >= self.max_in_flight:
+            return False
+        return self.in_flight_tokens + tokens <= self.token_budget
+
+    def _admit(self, tokens: int):
+        self.in_flight_tokens += tokens
+        self.in_flight_requests += 1
+        self.stats.admitted_requests += 1
+
+    def _wake_waiters(self):
+        while True:
+            call = self.scheduler.peek()
+            if call is None or not self._fits(call.tokens):
+                break
+            self.scheduler.remove(call)
+            self._admit(call.tokens)
+            call.future.set_result(None)
+
+    def _expire_waiter(self, future: asyncio.Future, context: RequestContext, queued_at: float):
+        if future.done():
+            return
+        waited_ms = (time.time() - queued_at) * 1000
+        # The scheduler drops done futures on its next pass
+        future.set_exception(DeadlineExceededError(
+            f"Deadline passed after {waited_ms:.0f}ms in queue; request not dispatched",
+            deadline=context.deadline,
+            waited_ms=waited_ms
+        ))
+
+    async def acquire(
+        self,
+        request: VLLMRequest,
+        context: Optional[RequestContext] = None
+    ) -> AdmissionTicket:
+        """
+        Wait until the request fits in the token budget and reserve it.
+
+        Args:
+            request: Request about to be sent
+            context: Priority/deadline/tenant of the originating API request
+
+        Returns:
+            AdmissionTicket that must be passed to release()
+
+        Raises:
+            DeadlineExceededError: If the deadline passes before the call is admitted
+        """
+        context = context or RequestContext()
+        prompt_tokens, completion_tokens = self.estimate_request_tokens(request)
+        tokens = prompt_tokens + completion_tokens
+        queued_at = time.time()
+
+        if context.is_expired(queued_at):
+            self.stats.expired_requests += 1
+            raise DeadlineExceededError(
+                "Deadline passed before the request was queued",
+                deadline=context.deadline
+            )
+
+        if not len(self.scheduler) and self._fits(tokens):
+            self._admit(tokens)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self.scheduler.push(tokens, context, future)
+            self.stats.queued_requests += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self.scheduler))
+
+            # Fail the waiter in place when its deadline passes; no extra task or wait_for
+            remaining = context.remaining_seconds(queued_at)
+            timer = None
+            if remaining is not None:
+                timer = asyncio.get_running_loop().call_later(
+                    remaining, self._expire_waiter, future, context, queued_at
+                )
+
+            try:
+                await future
+            except DeadlineExceededError:
+                self.stats.expired_requests += 1
+                self._wake_waiters()
+                raise
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    # Admitted in the same tick we were cancelled; hand budget back
+                    self.in_flight_tokens -= tokens
+                    self.in_flight_requests -= 1
+                self._wake_waiters()
+                self.stats.cancelled_waiters += 1
+                raise
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+        queued_ms = (time.time() - queued_at) * 1000
+        self.stats.total_queue_time_ms += queued_ms
+
+        return AdmissionTicket(
+            tokens=tokens,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            admitted_at=time.time(),
+            queued_ms=queued_ms
+        )
+
+    def release(
+        self,
+        ticket: AdmissionTicket,
+        success: Optional[bool],
+        latency_ms: float,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None
+    ):
+        """
+        Return a reservation and adapt the budget from the observed outcome.
+
+        Args:
+            ticket: Ticket returned by acquire()
+            success: Whether the call succeeded, None if it was cancelled
+            latency_ms: Observed call latency
+            prompt_tokens: Actual prompt tokens reported by vLLM (if known)
+            completion_tokens: Actual completion tokens reported by vLLM (if known)
+        """
+        self.in_flight_tokens -= ticket.tokens
+        self.in_flight_requests -= 1
+
+        if success and completion_tokens is not None:
+            if self._completion_ema is None:
+                self._completion_ema = float(completion_tokens)
+            else:
+                self._completion_ema = 0.8 * self._completion_ema + 0.2 * completion_tokens
+
+        # A cancelled call says nothing about server load
+        if success is not None:
+            self._adjust_budget(ticket, success, latency_ms, prompt_tokens, completion_tokens)
+        self._wake_waiters()
+
+    def _adjust_budget(
+        self,
+        ticket: AdmissionTicket,
+        success: bool,
+        latency_ms: float,
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int]
+    ):
+        """Apply AIMD to the token budget."""
+        expected_ms = self.expected_latency_ms(
+            prompt_tokens if prompt_tokens is not None else ticket.prompt_tokens,
+            completion_tokens if completion_tokens is not None else ticket.completion_tokens
+        )
+        slowdown = latency_ms / expected_ms if expected_ms > 0 else 0.0
+        self.stats.last_slowdown_ratio = slowdown
+
+        if not success or slowdown > self.slowdown_threshold:
+            # At most one decrease per round trip: ignore calls admitted before the last cut
+            if ticket.admitted_at >= self._last_decrease_at:
+                self.token_budget = max(
+                    float(self.min_token_budget),
+                    self.token_budget * self.decrease_factor
+                )
+                self._last_decrease_at = time.time()
+                self.stats.budget_decreases += 1
+                logger.debug(
+                    f"Admission budget decreased to {self.token_budget:.0f} tokens "
+                    f"(success={success}, slowdown={slowdown:.2f})"
+                )
+        elif len(self.scheduler) and self.token_budget < self.max_token_budget:
+            # Only grow while there is queued demand for more budget
+            self.token_budget = min(
+                float(self.max_token_budget),
+                self.token_budget + self.additive_increase
+            )
+            self.stats.budget_increases += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission control statistics."""
+        return {
+            **self.stats.to_dict(),
+            "token_budget": int(self.token_budget),
+            "max_token_budget": self.max_token_budget,
+            "in_flight_tokens": self.in_flight_tokens,
+            "in_flight_requests": self.in_flight_requests,
+            "queue_depth": self.queue_depth,
+            "scheduler": self.scheduler.get_stats(),
+            "completion_tokens_ema": (
+                round(self._completion_ema, 1) if self._completion_ema is not None else None
+            )
+        }
+
+
+# Shared controllers keyed by endpoint so per-request client instances
+# still admit against one budget per vLLM server
+_admission_controllers: Dict[str, TokenBudgetAdmissionController] = {}
+
+
+def get_admission_controller(key: str = "default") -> TokenBudgetAdmissionController:
+    """
+    Get the process-wide admission controller for an endpoint.
+
+    Args:
+        key: Endpoint identifier (usually the client's base URL)
+
+    Returns:
+        Shared TokenBudgetAdmissionController instance
+    """
+    controller = _admission_controllers.get(key)
+    if controller is None:
+        controller = TokenBudgetAdmissionController.from_settings()
+        _admission_controllers[key] = controller
+    return controller
@@ -44,6 +44,9 @@ class VLLMClientInterface(ABC):
     provide identical functionality, enabling seamless switching.
     """
 
+    # True when generate_batch() submits requests as one engine batch
+    supports_native_batching: bool = False
+
     @abstractmethod
     async def connect(self) -> bool:
         """Initialize/connect to vLLM service."""
@@ -87,6 +90,8 @@ class DirectVLLMClient(VLLMClientInterface):
     - Reproducibility enforcement (temperature=0.0, seed=42)
     """
 
+    supports_native_batching = True
+
     def __init__(self, config: Optional[VLLMConfig] = None):
         """
         Initialize Direct vLLM client.
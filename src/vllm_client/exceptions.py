@@ -103,3 +103,13 @@ class ConfigurationError(VLLMClientError):
         super().__init__(message)
         self.invalid_field = invalid_field
         self.suggested_action = "Check configuration parameters and documentation"
+
+
+class DeadlineExceededError(VLLMClientError):
+    """Raised when a request's deadline passes before it is dispatched."""
+
+    def __init__(self, message: str, deadline: Optional[float] = None, waited_ms: float = 0.0):
+        super().__init__(message)
+        self.deadline = deadline
+        self.waited_ms = waited_ms
+        self.suggested_action = "Extend the request deadline or retry when the service is less loaded"
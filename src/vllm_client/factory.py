@@ -4,8 +4,9 @@ vLLM Client Factory
 Creates appropriate vLLM client with automatic fallback from Direct API to HTTP.
 """
 
+import asyncio
 import logging
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Optional
 
 from .models import VLLMConfig, VLLMClientType
 from .client import VLLMClientInterface, DirectVLLMClient, HTTPVLLMClient
@@ -285,7 +286,10 @@ async def get_client_for_entity_extraction() -> VLLMClientInterface:
 
     **UPDATED**: Now uses HTTP API as default (not Direct API).
 
-    All configuration values now loaded from centralized settings.
+    All configuration values now loaded from centralized settings. When
+    Instruct replicas are configured, calls are balanced (and optionally
+    hedged) across them. When admission control is enabled the client is
+    wrapped in ThrottledVLLMClient.
 
     Returns:
         Initialized HTTP vLLM client with entity extraction optimizations
@@ -295,14 +299,26 @@ async def get_client_for_entity_extraction() -> VLLMClientInterface:
     settings = get_settings()
     config = VLLMConfig.from_settings(settings)
 
-    return await VLLMClientFactory.create_client(
+    # Balance across Instruct replicas when more than one is configured
+    if len(config.get_instruct_urls()) > 1:
+        from .models import VLLMServiceType
+        return await create_replica_pool_client(VLLMServiceType.INSTRUCT, config)
+
+    client = await VLLMClientFactory.create_client(
         preferred_type=VLLMClientType.HTTP_API,
         config=config,
         enable_fallback=False
     )
 
+    # Admit calls against the shared KV token budget for this endpoint
+    if settings.vllm_direct.vllm_enable_admission_control:
+        from src.core.throttled_vllm_client import ThrottledVLLMClient
+        client = ThrottledVLLMClient(client)
+
+    return client
+
 
-async def create_instruct_client(config: Optional[VLLMConfig] = None) -> HTTPVLLMClient:
+async def create_instruct_client(config: Optional[VLLMConfig] = None) -> VLLMClientInterface:
     """
     Create HTTP client for Instruct service (Port 8080).
 
@@ -313,7 +329,8 @@ async def create_instruct_client(config: Optional[VLLMConfig] = None) -> HTTPVLL
         config: VLLMConfig instance (if None, loads from centralized settings)
 
     Returns:
-        HTTPVLLMClient configured for Instruct service
+        HTTPVLLMClient configured for Instruct service (PooledVLLMClient when
+        Instruct replicas are configured)
     """
     from .models import VLLMServiceType
 
@@ -322,6 +339,9 @@ async def create_instruct_client(config: Optional[VLLMConfig] = None) -> HTTPVLL
         settings = get_settings()
         config = VLLMConfig.from_settings(settings)
 
+    if len(config.get_service_urls(VLLMServiceType.INSTRUCT)) > 1:
+        return await create_replica_pool_client(VLLMServiceType.INSTRUCT, config)
+
     logger.info("Creating Instruct client (Port 8080) for entity extraction")
     client = HTTPVLLMClient(config=config, service_type=VLLMServiceType.INSTRUCT)
     success = await client.connect()
@@ -333,7 +353,7 @@ async def create_instruct_client(config: Optional[VLLMConfig] = None) -> HTTPVLL
     return client
 
 
-async def create_thinking_client(config: Optional[VLLMConfig] = None) -> HTTPVLLMClient:
+async def create_thinking_client(config: Optional[VLLMConfig] = None) -> VLLMClientInterface:
     """
     Create HTTP client for Thinking service (Port 8082).
 
@@ -344,7 +364,8 @@ async def create_thinking_client(config: Optional[VLLMConfig] = None) -> HTTPVLL
         config: VLLMConfig instance (if None, loads from centralized settings)
 
     Returns:
-        HTTPVLLMClient configured for Thinking service
+        HTTPVLLMClient configured for Thinking service (PooledVLLMClient when
+        Thinking replicas are configured)
     """
     from .models import VLLMServiceType
 
@@ -353,6 +374,9 @@ async def create_thinking_client(config: Optional[VLLMConfig] = None) -> HTTPVLL
         settings = get_settings()
         config = VLLMConfig.from_settings(settings)
 
+    if len(config.get_service_urls(VLLMServiceType.THINKING)) > 1:
+        return await create_replica_pool_client(VLLMServiceType.THINKING, config)
+
     logger.info("Creating Thinking client (Port 8082) for relationship extraction")
     client = HTTPVLLMClient(config=config, service_type=VLLMServiceType.THINKING)
     success = await client.connect()
@@ -362,3 +386,130 @@ async def create_thinking_client(config: Optional[VLLMConfig] = None) -> HTTPVLL
 
     logger.info("✅ Thinking client initialized successfully")
     return client
+
+
+async def create_replica_pool_client(
+    service_type: "VLLMServiceType",
+    config: Optional[VLLMConfig] = None
+) -> VLLMClientInterface:
+    """
+    Create a client that load-balances across every replica of a service.
+
+    One HTTPVLLMClient is created per URL in config.get_service_urls(); each is
+    wrapped in ThrottledVLLMClient when admission control is enabled, so every
+    replica keeps its own KV token budget. Calls are routed by least
+    outstanding tokens and stick to one replica per document. Instruct pools
+    also hedge slow calls when hedging is enabled.
+
+    Args:
+        service_type: Service whose replicas to pool (INSTRUCT or THINKING)
+        config: VLLMConfig instance (if None, loads from centralized settings)
+
+    Returns:
+        PooledVLLMClient, or HedgedVLLMClient for hedged Instruct pools
+    """
+    from src.core.config import get_settings
+    from .hedging import HedgedVLLMClient
+    from .models import VLLMServiceType
+    from .replica_pool import PooledVLLMClient, ReplicaPool
+
+    settings = get_settings()
+    if config is None:
+        config = VLLMConfig.from_settings(settings)
+
+    urls = config.get_service_urls(service_type)
+    logger.info(f"Creating {service_type.value} replica pool over {len(urls)} replicas")
+
+    replicas = [
+        HTTPVLLMClient(config=config.for_replica(service_type, url), service_type=service_type)
+        for url in urls
+    ]
+    if settings.vllm_direct.vllm_enable_admission_control:
+        from src.core.throttled_vllm_client import ThrottledVLLMClient
+        replicas = [ThrottledVLLMClient(replica) for replica in replicas]
+
+    pool = ReplicaPool.from_settings(replicas, settings)
+    if (
+        service_type == VLLMServiceType.INSTRUCT
+        and settings.vllm_direct.vllm_enable_hedging
+        and len(pool) > 1
+    ):
+        client = HedgedVLLMClient.from_settings(pool, settings)
+    else:
+        client = PooledVLLMClient(pool)
+
+    if not await client.connect():
+        raise VLLMConnectionError(f"Failed to connect to any {service_type.value} replica")
+
+    return client
+
+
+# Process-wide clients keyed by name, so replica routing state, latency
+# profiles and hedge credit outlive a single API request
+_shared_clients: Dict[str, "asyncio.Future[VLLMClientInterface]"] = {}
+
+
+async def get_shared_client(
+    key: str,
+    create: Callable[[], Awaitable[VLLMClientInterface]]
+) -> VLLMClientInterface:
+    """
+    Get the process-wide client for key, creating it on first use.
+
+    Concurrent first calls wait for one creation; a failed creation is
+    retried by the next call. Close the clients with close_shared_clients().
+
+    Args:
+        key: Client identifier (e.g. "replica_pool:instruct")
+        create: Coroutine function that creates and connects the client
+
+    Returns:
+        Shared client instance
+    """
+    creation = _shared_clients.get(key)
+    if creation is None:
+        creation = asyncio.ensure_future(create())
+        _shared_clients[key] = creation
+    try:
+        # A cancelled caller must not cancel the creation others wait for
+        return await asyncio.shield(creation)
+    except Exception:
+        if _shared_clients.get(key) is creation:
+            del _shared_clients[key]
+        raise
+
+
+async def get_replica_pool_client(
+    service_type: "VLLMServiceType",
+    config: Optional[VLLMConfig] = None
+) -> VLLMClientInterface:
+    """
+    Get the process-wide replica pool client for a service type.
+
+    Args:
+        service_type: Service whose replicas to pool (INSTRUCT or THINKING)
+        config: VLLMConfig used if the client is created by this call
+
+    Returns:
+        PooledVLLMClient or HedgedVLLMClient from create_replica_pool_client()
+    """
+    return await get_shared_client(
+        f"replica_pool:{service_type.value}",
+        lambda: create_replica_pool_client(service_type, config)
+    )
+
+
+async def close_shared_clients():
+    """Close every process-wide client (call on application shutdown)."""
+    creations = list(_shared_clients.values())
+    _shared_clients.clear()
+    for creation in creations:
+        if not creation.done():
+            creation.cancel()
+            continue
+        if creation.cancelled() or creation.exception() is not None:
+            continue
+        try:
+            await creation.result().close()
+        except Exception as e:
+            logger.warning(f"Failed to close shared vLLM client: {e}")
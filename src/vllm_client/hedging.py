@@ -0,0 +1,318 @@
+"""
+Hedged requests across vLLM instruct replicas.
+
+A single slow replica (GC pause, long prefill queue) otherwise sets the tail
+latency for a whole document, because each wave awaits one HTTP call. The
+HedgedVLLMClient sends every call to one replica and, if it has not returned
+within the observed p95 for the request's size tier, sends a duplicate to
+another healthy replica. The first successful response wins and the loser is
+cancelled (closing its HTTP connection, which aborts the request in vLLM).
+
+Extra load is capped by a hedge budget: each primary call earns
+``budget_ratio`` hedge credits and each hedge spends one, so hedges never
+exceed ``budget_ratio`` of primary traffic beyond a small burst.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from .client import VLLMClientInterface
+from .models import VLLMRequest, VLLMResponse
+from .replica_pool import ReplicaPool, ReplicaState
+from .scheduler import get_request_context
+
+if TYPE_CHECKING:
+    from src.core.vllm_performance_optimizer import DocumentSizeTier
+
+logger = logging.getLogger(__name__)
+
+
+class HedgeBudget:
+    """Token bucket limiting hedged calls to a fraction of primary calls."""
+
+    def __init__(self, ratio: float = 0.1, max_credit: float = 5.0):
+        """
+        Initialize HedgeBudget.
+
+        Args:
+            ratio: Hedge credits earned per primary call
+            max_credit: Maximum credits that can accumulate (burst size)
+        """
+        self.ratio = ratio
+        self.max_credit = max_credit
+        self.credit = 0.0
+
+    def deposit(self):
+        self.credit = min(self.max_credit, self.credit + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.credit >= 1.0:
+            self.credit -= 1.0
+            return True
+        return False
+
+
+@dataclass
+class HedgeStats:
+    """Statistics for hedging behavior."""
+
+    primary_requests: int = 0
+    hedges_sent: int = 0
+    hedge_wins: int = 0
+    primary_wins: int = 0
+    budget_denied: int = 0
+    no_replica_available: int = 0
+    losers_cancelled: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "primary_requests": self.primary_requests,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "hedge_win_rate": self.hedge_wins / self.hedges_sent if self.hedges_sent else 0.0,
+            "hedge_rate": self.hedges_sent / self.primary_requests if self.primary_requests else 0.0,
+            "budget_denied": self.budget_denied,
+            "no_replica_available": self.no_replica_available,
+            "losers_cancelled": self.losers_cancelled
+        }
+
+
+class HedgedVLLMClient(VLLMClientInterface):
+    """
+    Client that hedges slow calls across replicas serving the same model.
+
+    Primary and hedge replicas are chosen by a ReplicaPool (least
+    outstanding tokens, sticky by document, unhealthy replicas skipped).
+    """
+
+    def __init__(
+        self,
+        replicas: Union[ReplicaPool, List[VLLMClientInterface]],
+        budget_ratio: float = 0.1,
+        min_hedge_delay_ms: float = 500.0,
+        default_hedge_delay_ms: float = 30000.0,
+        min_samples: int = 20,
+        chars_per_token: float = 4.0
+    ):
+        """
+        Initialize HedgedVLLMClient.
+
+        Args:
+            replicas: Replica pool, or clients for each replica
+            budget_ratio: Maximum hedges as a fraction of primary calls
+            min_hedge_delay_ms: Lower bound on the wait before hedging
+            default_hedge_delay_ms: Hedge delay until a tier has min_samples latencies
+            min_samples: Successful calls per tier before its p95 is used
+            chars_per_token: Characters per token for size-tier classification
+        """
+        if not isinstance(replicas, ReplicaPool):
+            replicas = ReplicaPool(replicas, chars_per_token=chars_per_token)
+
+        self.pool = replicas
+        self.budget = HedgeBudget(ratio=budget_ratio)
+        self.min_hedge_delay_ms = min_hedge_delay_ms
+        self.default_hedge_delay_ms = default_hedge_delay_ms
+        self.min_samples = min_samples
+        self.chars_per_token = chars_per_token
+
+        # src.core imports this package, so its profiler is imported on use
+        from src.core.vllm_performance_optimizer import DocumentSizeEstimator, PerformanceProfiler
+        self.size_estimator = DocumentSizeEstimator(enable_cache=False)
+        self.profiler = PerformanceProfiler(enable_auto_tuning=False)
+        self.stats = HedgeStats()
+
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    @classmethod
+    def from_settings(
+        cls,
+        replicas: Union[ReplicaPool, List[VLLMClientInterface]],
+        settings=None
+    ) -> "HedgedVLLMClient":
+        """
+        Create a hedged client from centralized settings.
+
+        Args:
+            replicas: Replica pool, or clients (pooled with ReplicaPool.from_settings)
+            settings: EntityExtractionServiceSettings instance (or None to load from get_settings())
+
+        Returns:
+            HedgedVLLMClient configured from vllm_direct settings
+        """
+        if settings is None:
+            from src.core.config import get_settings
+            settings = get_settings()
+
+        vllm = settings.vllm_direct
+        return cls(
+            replicas=replicas if isinstance(replicas, ReplicaPool) else ReplicaPool.from_settings(replicas, settings),
+            budget_ratio=vllm.vllm_hedge_budget_ratio,
+            min_hedge_delay_ms=vllm.vllm_hedge_min_delay_ms,
+            default_hedge_delay_ms=vllm.vllm_hedge_default_delay_ms,
+            min_samples=vllm.vllm_hedge_min_samples,
+            chars_per_token=vllm.vllm_chars_per_token
+        )
+
+    @property
+    def base_url(self) -> str:
+        """Primary replica URL (keys the shared admission budget)."""
+        return getattr(self.pool.replicas[0].client, "base_url", "hedged")
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return getattr(self.pool.replicas[0].client, "model_name", None)
+
+    # ------------------------------------------------------------------
+    # Hedge timing
+    # ------------------------------------------------------------------
+
+    def _classify(self, request: VLLMRequest) -> "DocumentSizeTier":
+        tokens = int(request.estimate_prompt_length() / self.chars_per_token)
+        return self.size_estimator.classify_size_tier(tokens)
+
+    def hedge_delay_ms(self, tier: "DocumentSizeTier") -> float:
+        """Observed p95 for the tier (or the default until enough samples exist)."""
+        metrics = self.profiler.calculate_tier_metrics(tier)
+        if metrics is None or metrics.successful_requests < self.min_samples:
+            return max(self.min_hedge_delay_ms, self.default_hedge_delay_ms)
+        return max(self.min_hedge_delay_ms, metrics.p95_response_time_ms)
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+
+    async def _call_replica(
+        self,
+        replica: ReplicaState,
+        request: VLLMRequest,
+        tier: "DocumentSizeTier",
+        tokens: int
+    ) -> VLLMResponse:
+        self.pool.start(replica, tokens)
+        success: Optional[bool] = None
+        start_time = time.time()
+        try:
+            response = await replica.client.generate_chat_completion(request)
+            success = True
+        except Exception:
+            success = False
+            raise
+        finally:
+            self.pool.finish(replica, tokens, success)
+
+        self.profiler.record_request(
+            tier=tier,
+            response_time_ms=(time.time() - start_time) * 1000,
+            tokens_processed=response.usage.total_tokens if response.usage else 0
+        )
+        return response
+
+    @staticmethod
+    async def _first_success(tasks: List[asyncio.Task]) -> Tuple[VLLMResponse, asyncio.Task]:
+        """Return the first successful result; raise the last error if all fail."""
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task
+                last_error = task.exception()
+        raise last_error
+
+    async def generate_chat_completion(self, request: VLLMRequest) -> VLLMResponse:
+        """
+        Generate a completion, hedging to a second replica if the first is slow.
+
+        Args:
+            request: VLLMRequest with messages and parameters
+
+        Returns:
+            First successful VLLMResponse
+        """
+        tier = self._classify(request)
+        tokens = self.pool.estimate_tokens(request)
+        document_id = get_request_context().document_id
+        primary = self.pool.select(document_id) or self.pool.replicas[0]
+
+        self.stats.primary_requests += 1
+        self.budget.deposit()
+
+        primary_task = asyncio.create_task(self._call_replica(primary, request, tier, tokens))
+        tasks = [primary_task]
+        replicas = {primary_task: primary}
+
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.hedge_delay_ms(tier) / 1000)
+            if not done:
+                secondary = self.pool.select(document_id, exclude=primary)
+                if secondary is None:
+                    self.stats.no_replica_available += 1
+                elif not self.budget.try_spend():
+                    self.stats.budget_denied += 1
+                else:
+                    hedge_task = asyncio.create_task(self._call_replica(secondary, request, tier, tokens))
+                    tasks.append(hedge_task)
+                    replicas[hedge_task] = secondary
+                    self.stats.hedges_sent += 1
+                    self.logger.debug(
+                        f"Hedging {tier.value} call to {secondary.base_url}"
+                    )
+
+            response, winner = await self._first_success(tasks)
+            replicas[winner].wins += 1
+            if len(tasks) > 1:
+                if winner is primary_task:
+                    self.stats.primary_wins += 1
+                else:
+                    self.stats.hedge_wins += 1
+            return response
+
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    if len(tasks) > 1:
+                        self.stats.losers_cancelled += 1
+
+    async def generate_batch(self, requests: List[VLLMRequest]) -> List[VLLMResponse]:
+        """Generate batch with each call hedged independently."""
+        return list(await asyncio.gather(*(self.generate_chat_completion(r) for r in requests)))
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def connect(self) -> bool:
+        """Connect all replicas; ready if at least one connects."""
+        results = await asyncio.gather(
+            *(replica.client.connect() for replica in self.pool.replicas),
+            return_exceptions=True
+        )
+        for replica, result in zip(self.pool.replicas, results):
+            if result is not True:
+                self.pool.mark_unhealthy(replica)
+        return any(result is True for result in results)
+
+    def is_ready(self) -> bool:
+        return any(replica.client.is_ready() for replica in self.pool.replicas)
+
+    def get_stats(self) -> dict:
+        """Get hedging and per-replica statistics."""
+        from src.core.vllm_performance_optimizer import DocumentSizeTier
+        stats = self.pool.get_stats()
+        stats.update({
+            "hedging": self.stats.to_dict(),
+            "hedge_budget_credit": round(self.budget.credit, 2),
+            "hedge_delay_ms": {tier.value: round(self.hedge_delay_ms(tier), 1) for tier in DocumentSizeTier}
+        })
+        return stats
+
+    async def close(self):
+        """Close all replica clients."""
+        for replica in self.pool.replicas:
+            await replica.client.close()
@@ -13,6 +13,14 @@ class VLLMClientType(Enum):
     HTTP_API = "http_api"
 
 
+class BatchPriority(Enum):
+    """Batch processing priority levels."""
+    URGENT = 0      # Process immediately
+    HIGH = 1        # Process within 10ms
+    NORMAL = 2      # Process within 50ms
+    LOW = 3         # Process within 200ms
+
+
 class VLLMServiceType(str, Enum):
     """vLLM service types for routing."""
     INSTRUCT = "instruct"      # Fast entity extraction (Port 8080)
@@ -47,6 +55,10 @@ class VLLMConfig:
     embeddings_url: str = "http://10.10.0.87:8081/v1"
     embeddings_model: str = "jina-embeddings-v4"
 
+    # Additional replicas serving the same model (load balancing and hedging)
+    instruct_replica_urls: List[str] = field(default_factory=list)
+    thinking_replica_urls: List[str] = field(default_factory=list)
+
     # Context limits (IBM Granite 128K context)
     max_model_len: int = 131072
     max_prompt_tokens: int = 120000
@@ -76,6 +88,7 @@ class VLLMConfig:
     # Token estimation
     chars_per_token: float = 4.0
     use_accurate_tokenizer: bool = False
+    tokenizer_path: Optional[str] = None  # Served model's tokenizer.json (exact counts)
 
     # GPU monitoring
     enable_gpu_monitoring: bool = True
@@ -110,6 +123,12 @@ class VLLMConfig:
         thinking_model = os.getenv("VLLM_THINKING_MODEL", "qwen-thinking-256k")
         embeddings_url = os.getenv("VLLM_EMBEDDINGS_URL", "http://10.10.0.87:8081/v1")
         embeddings_model = os.getenv("VLLM_EMBEDDINGS_MODEL", "jina-embeddings-v4")
+        instruct_replica_urls = [
+            url.strip() for url in os.getenv("VLLM_INSTRUCT_REPLICA_URLS", "").split(",") if url.strip()
+        ]
+        thinking_replica_urls = [
+            url.strip() for url in os.getenv("VLLM_THINKING_REPLICA_URLS", "").split(",") if url.strip()
+        ]
 
         return cls(
             # Model configuration (legacy)
@@ -124,6 +143,8 @@ class VLLMConfig:
             thinking_model=thinking_model,
             embeddings_url=embeddings_url,
             embeddings_model=embeddings_model,
+            instruct_replica_urls=instruct_replica_urls,
+            thinking_replica_urls=thinking_replica_urls,
 
             # Context limits
             max_model_len=vllm.vllm_max_model_len,
@@ -154,6 +175,7 @@ class VLLMConfig:
             # Token estimation
             chars_per_token=vllm.vllm_chars_per_token,
             use_accurate_tokenizer=False,
+            tokenizer_path=vllm.vllm_tokenizer_path,
 
             # GPU monitoring
             enable_gpu_monitoring=vllm.vllm_enable_gpu_monitoring,
@@ -164,6 +186,40 @@ class VLLMConfig:
             disable_log_stats=False
         )
 
+    def get_instruct_urls(self) -> List[str]:
+        """Instruct service URLs: the primary endpoint followed by any extra replicas."""
+        return [self.instruct_url] + [url for url in self.instruct_replica_urls if url != self.instruct_url]
+
+    def get_thinking_urls(self) -> List[str]:
+        """Thinking service URLs: the primary endpoint followed by any extra replicas."""
+        return [self.thinking_url] + [url for url in self.thinking_replica_urls if url != self.thinking_url]
+
+    def get_service_urls(self, service_type: VLLMServiceType) -> List[str]:
+        """
+        All replica URLs for a service type.
+
+        Args:
+            service_type: Service type enum
+
+        Returns:
+            List of base URLs (primary first); embeddings has a single endpoint
+        """
+        if service_type == VLLMServiceType.INSTRUCT:
+            return self.get_instruct_urls()
+        if service_type == VLLMServiceType.THINKING:
+            return self.get_thinking_urls()
+        return [self.embeddings_url]
+
+    def for_replica(self, service_type: VLLMServiceType, url: str) -> "VLLMConfig":
+        """Copy of this config with the service endpoint pointed at one replica."""
+        import dataclasses
+
+        if service_type == VLLMServiceType.THINKING:
+            return dataclasses.replace(self, thinking_url=url)
+        if service_type == VLLMServiceType.EMBEDDINGS:
+            return dataclasses.replace(self, embeddings_url=url)
+        return dataclasses.replace(self, instruct_url=url)
+
 
 @dataclass
 class VLLMRequest:
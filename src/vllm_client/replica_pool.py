@@ -0,0 +1,340 @@
+"""
+Replica pool for vLLM services.
+
+HTTPVLLMClient talks to one base URL per service type. ReplicaPool tracks a
+client per replica of one service (instruct or thinking) and picks where
+each call goes:
+
+- Least outstanding tokens: the healthy replica with the fewest estimated
+  prompt + completion tokens in flight, which tracks KV-cache pressure far
+  better than request counts when prompts range from 1K to 100K tokens
+- Sticky routing: calls carrying a document_id (RequestContext) go to the
+  replica that served that document before, so later waves and chunks reuse
+  its cached prefix; a document spills to the least-loaded replica when its
+  sticky replica is unhealthy or too far ahead in outstanding tokens
+- Health: a replica is skipped for a cooldown after consecutive failures
+
+PooledVLLMClient exposes the pool through VLLMClientInterface.
+
+Load, document assignments and health are only meaningful on a long-lived
+pool, so API requests share one per service type through
+factory.get_replica_pool_client() instead of building their own.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .client import VLLMClientInterface
+from .models import VLLMRequest, VLLMResponse
+from .scheduler import get_request_context
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class ReplicaState:
+    """Health and load of one replica client."""
+
+    client: Any
+    in_flight: int = 0
+    outstanding_tokens: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+    requests_routed: int = 0
+    sticky_hits: int = 0
+    wins: int = 0
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return getattr(self.client, "base_url", None)
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= self.unhealthy_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "healthy": self.is_healthy(),
+            "in_flight": self.in_flight,
+            "outstanding_tokens": self.outstanding_tokens,
+            "consecutive_failures": self.consecutive_failures,
+            "requests_routed": self.requests_routed,
+            "sticky_hits": self.sticky_hits,
+            "wins": self.wins,
+            "client": self.client.get_stats()
+        }
+
+
+class ReplicaPool:
+    """
+    Routing and health tracking for replicas of one vLLM service.
+
+    Callers bracket each call with start() and finish() so outstanding tokens
+    and health stay current.
+    """
+
+    def __init__(
+        self,
+        clients: List[Any],
+        chars_per_token: float = 4.0,
+        failure_threshold: int = 3,
+        unhealthy_cooldown_s: float = 30.0,
+        sticky_routing: bool = True,
+        sticky_max_documents: int = 10000,
+        sticky_max_imbalance_tokens: int = 65536
+    ):
+        """
+        Initialize ReplicaPool.
+
+        Args:
+            clients: One client per replica
+            chars_per_token: Characters per token for load estimation
+            failure_threshold: Consecutive failures that mark a replica unhealthy
+            unhealthy_cooldown_s: Time an unhealthy replica is skipped
+            sticky_routing: Route calls for one document to the same replica
+            sticky_max_documents: Document assignments remembered (LRU)
+            sticky_max_imbalance_tokens: Outstanding-token lead over the least-loaded
+                replica beyond which a document spills to another replica
+        """
+        if not clients:
+            raise ValueError("ReplicaPool requires at least one replica")
+
+        self.replicas = [ReplicaState(client=client) for client in clients]
+        self.chars_per_token = chars_per_token
+        self.failure_threshold = failure_threshold
+        self.unhealthy_cooldown_s = unhealthy_cooldown_s
+        self.sticky_routing = sticky_routing
+        self.sticky_max_documents = sticky_max_documents
+        self.sticky_max_imbalance_tokens = sticky_max_imbalance_tokens
+
+        self._assignments: "OrderedDict[str, ReplicaState]" = OrderedDict()
+        self._rotation = 0
+
+    @classmethod
+    def from_settings(cls, clients: List[Any], settings=None) -> "ReplicaPool":
+        """
+        Create a replica pool from centralized settings.
+
+        Args:
+            clients: One client per replica
+            settings: EntityExtractionServiceSettings instance (or None to load from get_settings())
+
+        Returns:
+            ReplicaPool configured from vllm_direct settings
+        """
+        if settings is None:
+            from src.core.config import get_settings
+            settings = get_settings()
+
+        vllm = settings.vllm_direct
+        return cls(
+            clients=clients,
+            chars_per_token=vllm.vllm_chars_per_token,
+            failure_threshold=vllm.vllm_replica_failure_threshold,
+            unhealthy_cooldown_s=vllm.vllm_replica_cooldown_seconds,
+            sticky_routing=vllm.vllm_enable_sticky_routing,
+            sticky_max_imbalance_tokens=vllm.vllm_sticky_max_imbalance_tokens
+        )
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def estimate_tokens(self, request: VLLMRequest) -> int:
+        """Prompt plus completion tokens the call will hold on its replica."""
+        return int(request.estimate_prompt_length() / self.chars_per_token) + request.max_tokens
+
+    def healthy_replicas(self) -> List[ReplicaState]:
+        now = time.time()
+        return [replica for replica in self.replicas if replica.is_healthy(now)]
+
+    def select(
+        self,
+        document_id: Optional[str] = None,
+        exclude: Optional[ReplicaState] = None
+    ) -> Optional[ReplicaState]:
+        """
+        Pick a replica for a call.
+
+        Args:
+            document_id: Document the call belongs to (enables sticky routing)
+            exclude: Replica to avoid (e.g. the primary when hedging)
+
+        Returns:
+            Chosen replica, or None if no healthy replica is available
+        """
+        now = time.time()
+        count = len(self.replicas)
+        # Rotate the scan start so ties spread across replicas
+        candidates = [
+            self.replicas[(self._rotation + offset) % count]
+            for offset in range(count)
+        ]
+        candidates = [r for r in candidates if r is not exclude and r.is_healthy(now)]
+        if not candidates:
+            return None
+        self._rotation = (self._rotation + 1) % count
+        least_loaded = min(candidates, key=lambda r: r.outstanding_tokens)
+
+        if not (self.sticky_routing and document_id):
+            return least_loaded
+
+        sticky = self._assignments.get(document_id)
+        if (
+            sticky is not None
+            and sticky in candidates
+            and sticky.outstanding_tokens - least_loaded.outstanding_tokens <= self.sticky_max_imbalance_tokens
+        ):
+            self._assignments.move_to_end(document_id)
+            sticky.sticky_hits += 1
+            return sticky
+
+        if exclude is None:
+            # Reassign only on primary routing, never for a hedge
+            self._assignments[document_id] = least_loaded
+            self._assignments.move_to_end(document_id)
+            while len(self._assignments) > self.sticky_max_documents:
+                self._assignments.popitem(last=False)
+        return least_loaded
+
+    def start(self, replica: ReplicaState, tokens: int):
+        """Record a call dispatched to a replica."""
+        replica.in_flight += 1
+        replica.outstanding_tokens += tokens
+        replica.requests_routed += 1
+
+    def finish(self, replica: ReplicaState, tokens: int, success: Optional[bool]):
+        """
+        Record a call leaving a replica.
+
+        Args:
+            replica: Replica that served the call
+            tokens: Tokens passed to start()
+            success: True/False for completed calls, None if cancelled
+        """
+        replica.in_flight -= 1
+        replica.outstanding_tokens -= tokens
+
+        if success:
+            replica.consecutive_failures = 0
+            replica.unhealthy_until = 0.0
+        elif success is False:
+            replica.consecutive_failures += 1
+            if replica.consecutive_failures >= self.failure_threshold:
+                replica.unhealthy_until = time.time() + self.unhealthy_cooldown_s
+                logger.warning(
+                    f"Replica {replica.base_url} marked unhealthy for "
+                    f"{self.unhealthy_cooldown_s:.0f}s after {replica.consecutive_failures} failures"
+                )
+
+    def mark_unhealthy(self, replica: ReplicaState):
+        replica.unhealthy_until = time.time() + self.unhealthy_cooldown_s
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [replica.to_dict() for replica in self.replicas],
+            "healthy_replicas": len(self.healthy_replicas()),
+            "sticky_documents": len(self._assignments)
+        }
+
+
+class PooledVLLMClient(VLLMClientInterface):
+    """
+    Client that load-balances calls across replicas of one vLLM service.
+
+    A call that fails on one replica is retried once on another healthy
+    replica before the error is raised.
+    """
+
+    def __init__(self, pool: ReplicaPool):
+        """
+        Initialize PooledVLLMClient.
+
+        Args:
+            pool: Replica pool to route calls through
+        """
+        self.pool = pool
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    @classmethod
+    def from_settings(cls, clients: List[Any], settings=None) -> "PooledVLLMClient":
+        """Create a pooled client over replica clients using centralized settings."""
+        return cls(ReplicaPool.from_settings(clients, settings))
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self.pool.replicas[0].base_url
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return getattr(self.pool.replicas[0].client, "model_name", None)
+
+    async def _call(self, replica: ReplicaState, request: VLLMRequest, tokens: int) -> VLLMResponse:
+        self.pool.start(replica, tokens)
+        success: Optional[bool] = None
+        try:
+            response = await replica.client.generate_chat_completion(request)
+            success = True
+            return response
+        except Exception:
+            success = False
+            raise
+        finally:
+            self.pool.finish(replica, tokens, success)
+
+    async def generate_chat_completion(self, request: VLLMRequest) -> VLLMResponse:
+        """
+        Generate a completion on the best replica for this call.
+
+        Args:
+            request: VLLMRequest with messages and parameters
+
+        Returns:
+            VLLMResponse from the chosen replica
+        """
+        document_id = get_request_context().document_id
+        tokens = self.pool.estimate_tokens(request)
+        replica = self.pool.select(document_id) or self.pool.replicas[0]
+
+        try:
+            return await self._call(replica, request, tokens)
+        except Exception as e:
+            fallback = self.pool.select(document_id, exclude=replica)
+            if fallback is None:
+                raise
+            self.logger.warning(f"Replica {replica.base_url} failed ({e}); retrying on {fallback.base_url}")
+            return await self._call(fallback, request, tokens)
+
+    async def generate_batch(self, requests: List[VLLMRequest]) -> List[VLLMResponse]:
+        """Generate batch with each call routed independently."""
+        return list(await asyncio.gather(*(self.generate_chat_completion(r) for r in requests)))
+
+    async def connect(self) -> bool:
+        """Connect all replicas; ready if at least one connects."""
+        results = await asyncio.gather(
+            *(replica.client.connect() for replica in self.pool.replicas),
+            return_exceptions=True
+        )
+        for replica, result in zip(self.pool.replicas, results):
+            if result is not True:
+                self.pool.mark_unhealthy(replica)
+        return any(result is True for result in results)
+
+    def is_ready(self) -> bool:
+        return any(replica.client.is_ready() for replica in self.pool.replicas)
+
+    def get_replica_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-replica client statistics keyed by base URL."""
+        return {replica.base_url: replica.client.get_stats() for replica in self.pool.replicas}
+
+    def get_stats(self) -> dict:
+        """Get routing and per-replica statistics."""
+        return self.pool.get_stats()
+
+    async def close(self):
+        """Close all replica clients."""
+        for replica in self.pool.replicas:
+            await replica.client.close()
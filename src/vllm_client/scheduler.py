@@ -0,0 +1,289 @@
+"""
+Priority and deadline-aware scheduling for vLLM calls.
+
+Decides which queued call is admitted next when the admission controller has
+free token budget. Ordering, from strongest to weakest:
+
+1. Priority class (BatchPriority), with aging so LOW work is never starved
+2. Earliest deadline first within a class
+3. Fair share across tenants/documents (least tokens served so far)
+4. Arrival order
+
+Calls whose deadline has already passed are failed with DeadlineExceededError
+before they are dispatched. Priority, deadline and tenant travel with the
+request through a ContextVar that the API layer sets from request headers.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from .exceptions import DeadlineExceededError
+from .models import BatchPriority
+
+logger = logging.getLogger(__name__)
+
+# Request headers understood by RequestContext.from_headers()
+PRIORITY_HEADER = "x-request-priority"
+DEADLINE_HEADER = "x-request-deadline"        # Absolute unix timestamp (seconds)
+TIMEOUT_HEADER = "x-request-timeout-ms"       # Relative budget from arrival
+TENANT_HEADER = "x-tenant-id"
+
+
+@dataclass
+class RequestContext:
+    """Scheduling attributes of the API request a vLLM call belongs to."""
+
+    priority: BatchPriority = BatchPriority.NORMAL
+    deadline: Optional[float] = None
+    tenant_id: Optional[str] = None
+    document_id: Optional[str] = None
+
+    @property
+    def fair_share_key(self) -> str:
+        return self.tenant_id or self.document_id or "default"
+
+    def remaining_seconds(self, now: Optional[float] = None) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - (now if now is not None else time.time())
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        remaining = self.remaining_seconds(now)
+        return remaining is not None and remaining <= 0
+
+    @classmethod
+    def from_headers(
+        cls,
+        headers: Mapping[str, str],
+        document_id: Optional[str] = None,
+        default_priority: BatchPriority = BatchPriority.NORMAL
+    ) -> "RequestContext":
+        """
+        Build a context from HTTP request headers.
+
+        Args:
+            headers: Request headers (case-insensitive mapping or plain dict)
+            document_id: Document identifier used as fair-share key fallback
+            default_priority: Priority when the header is absent or invalid
+
+        Returns:
+            RequestContext for the request
+        """
+        lowered = {key.lower(): value for key, value in headers.items()}
+
+        priority = default_priority
+        raw_priority = lowered.get(PRIORITY_HEADER)
+        if raw_priority:
+            priority = parse_priority(raw_priority, default_priority)
+
+        deadline = None
+        raw_deadline = lowered.get(DEADLINE_HEADER)
+        raw_timeout = lowered.get(TIMEOUT_HEADER)
+        try:
+            if raw_deadline:
+                deadline = float(raw_deadline)
+            elif raw_timeout:
+                deadline = time.time() + float(raw_timeout) / 1000.0
+        except ValueError:
+            logger.warning(f"Ignoring malformed deadline header: {raw_deadline or raw_timeout!r}")
+
+        return cls(
+            priority=priority,
+            deadline=deadline,
+            tenant_id=lowered.get(TENANT_HEADER),
+            document_id=document_id
+        )
+
+
+def parse_priority(value: str, default: BatchPriority = BatchPriority.NORMAL) -> BatchPriority:
+    """Parse a priority given by name ("high") or level ("1")."""
+    value = value.strip()
+    try:
+        return BatchPriority[value.upper()]
+    except KeyError:
+        pass
+    try:
+        return BatchPriority(int(value))
+    except ValueError:
+        logger.warning(f"Unknown request priority {value!r}, using {default.name}")
+        return default
+
+
+_request_context: ContextVar[RequestContext] = ContextVar("vllm_request_context")
+
+
+def get_request_context() -> RequestContext:
+    """Get the scheduling context of the current task (NORMAL/no deadline if unset)."""
+    context = _request_context.get(None)
+    if context is None:
+        return RequestContext()
+    return context
+
+
+def set_request_context(context: RequestContext) -> Token:
+    """Set the scheduling context for the current task and its children."""
+    return _request_context.set(context)
+
+
+def reset_request_context(token: Token):
+    """Restore the context that was active before set_request_context()."""
+    _request_context.reset(token)
+
+
+@dataclass
+class ScheduledCall:
+    """A call waiting for admission."""
+
+    tokens: int
+    context: RequestContext
+    future: asyncio.Future
+    enqueued_at: float
+    seq: int
+
+
+@dataclass
+class SchedulerStats:
+    """Statistics for scheduling decisions."""
+
+    enqueued: int = 0
+    dispatched: int = 0
+    expired: int = 0
+    dispatched_by_priority: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "enqueued": self.enqueued,
+            "dispatched": self.dispatched,
+            "expired": self.expired,
+            "dispatched_by_priority": dict(self.dispatched_by_priority)
+        }
+
+
+class RequestScheduler:
+    """
+    Ordered wait queue for the admission controller.
+
+    Queues in this service stay in the hundreds at most, so selection is a
+    linear scan over waiting calls; this keeps aging and fair-share keys
+    exact without maintaining a re-keyed heap.
+    """
+
+    def __init__(self, aging_seconds: float = 30.0):
+        """
+        Initialize RequestScheduler.
+
+        Args:
+            aging_seconds: Waiting time after which a call is promoted one priority class
+        """
+        self.aging_seconds = aging_seconds
+        self._calls: List[ScheduledCall] = []
+        self._served_tokens: Dict[str, float] = {}
+        self._seq = 0
+        self.stats = SchedulerStats()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def push(self, tokens: int, context: RequestContext, future: asyncio.Future) -> ScheduledCall:
+        """Queue a call for admission."""
+        key = context.fair_share_key
+        if key not in self._served_tokens:
+            # Newcomers start level with the least-served active tenant, not at zero
+            active = [self._served_tokens[c.context.fair_share_key] for c in self._calls
+                      if c.context.fair_share_key in self._served_tokens]
+            self._served_tokens[key] = min(active) if active else 0.0
+
+        self._seq += 1
+        call = ScheduledCall(
+            tokens=tokens,
+            context=context,
+            future=future,
+            enqueued_at=time.time(),
+            seq=self._seq
+        )
+        self._calls.append(call)
+        self.stats.enqueued += 1
+        return call
+
+    def _effective_priority(self, call: ScheduledCall, now: float) -> int:
+        level = call.context.priority.value
+        if self.aging_seconds > 0:
+            level -= int((now - call.enqueued_at) / self.aging_seconds)
+        return max(level, 0)
+
+    def _sort_key(self, call: ScheduledCall, now: float):
+        deadline = call.context.deadline if call.context.deadline is not None else math.inf
+        return (
+            self._effective_priority(call, now),
+            deadline,
+            self._served_tokens.get(call.context.fair_share_key, 0.0),
+            call.seq
+        )
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """
+        Drop cancelled calls and fail calls whose deadline has passed.
+
+        Returns:
+            Number of calls failed for missing their deadline
+        """
+        now = now if now is not None else time.time()
+        kept = []
+        expired = 0
+        for call in self._calls:
+            if call.future.done():
+                continue
+            if call.context.is_expired(now):
+                waited_ms = (now - call.enqueued_at) * 1000
+                call.future.set_exception(DeadlineExceededError(
+                    f"Deadline passed after {waited_ms:.0f}ms in queue; request not dispatched",
+                    deadline=call.context.deadline,
+                    waited_ms=waited_ms
+                ))
+                expired += 1
+                continue
+            kept.append(call)
+        self._calls = kept
+        self.stats.expired += expired
+        return expired
+
+    def peek(self, now: Optional[float] = None) -> Optional[ScheduledCall]:
+        """Return the call that should be dispatched next (after purging)."""
+        now = now if now is not None else time.time()
+        self.purge(now)
+        if not self._calls:
+            return None
+        return min(self._calls, key=lambda call: self._sort_key(call, now))
+
+    def remove(self, call: ScheduledCall):
+        """Remove a call that is being dispatched and charge its tenant."""
+        self._calls.remove(call)
+        key = call.context.fair_share_key
+        self._served_tokens[key] = self._served_tokens.get(key, 0.0) + call.tokens
+
+        self.stats.dispatched += 1
+        name = call.context.priority.name
+        self.stats.dispatched_by_priority[name] = self.stats.dispatched_by_priority.get(name, 0) + 1
+
+        # Forget tenants with nothing queued so the table does not grow unbounded
+        if not any(c.context.fair_share_key == key for c in self._calls):
+            active = {c.context.fair_share_key for c in self._calls}
+            self._served_tokens = {k: v for k, v in self._served_tokens.items() if k in active}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        waiting_by_priority: Dict[str, int] = {}
+        for call in self._calls:
+            name = call.context.priority.name
+            waiting_by_priority[name] = waiting_by_priority.get(name, 0) + 1
+        return {
+            **self.stats.to_dict(),
+            "waiting": len(self._calls),
+            "waiting_by_priority": waiting_by_priority,
+            "active_tenants": len({c.context.fair_share_key for c in self._calls})
+        }
@@ -2,7 +2,8 @@
 Token estimation and context validation for vLLM.
 
 Provides fast character-based estimation and optional accurate tokenization
-using tiktoken library. Critical for preventing context overflow errors.
+using the served model's tokenizer (VLLM_TOKENIZER_PATH) or the tiktoken
+library. Critical for preventing context overflow errors.
 
 All default values now loaded from centralized config.py via VLLMConfig.
 """
@@ -19,9 +20,11 @@ class TokenEstimator:
     """
     Token estimation and context validation.
 
-    Supports two modes:
+    Supports three modes:
     1. Fast mode: Character-based estimation (~4 chars per token)
     2. Accurate mode: tiktoken-based tokenization (slower, more accurate)
+    3. Exact mode: the served model's tokenizer (config.tokenizer_path), with
+       paragraph counts cached across prompts
     """
 
     def __init__(self, config: VLLMConfig):
@@ -38,9 +41,17 @@ class TokenEstimator:
         self.max_prompt = config.max_prompt_tokens
         self.max_completion = config.max_completion_tokens
 
+        # The served model's tokenizer takes precedence over tiktoken
+        self._token_counter = None
+        if config.tokenizer_path:
+            from src.core.token_counter import get_token_counter
+            counter = get_token_counter(config.tokenizer_path)
+            if counter.is_exact:
+                self._token_counter = counter
+
         # Try to import tiktoken for accurate estimation
         self._tokenizer = None
-        if self.use_accurate:
+        if self.use_accurate and self._token_counter is None:
             try:
                 import tiktoken
                 # Use cl100k_base encoding (GPT-4, GPT-3.5-turbo compatible)
@@ -63,6 +74,8 @@ class TokenEstimator:
         Returns:
             Estimated token count
         """
+        if self._token_counter is not None:
+            return self._token_counter.count_document(text)
         if self.use_accurate and self._tokenizer:
             return len(self._tokenizer.encode(text))
         else:
@@ -216,7 +229,10 @@ class TokenEstimator:
     def get_stats(self) -> dict:
         """Get token estimator statistics."""
         return {
-            "estimation_mode": "accurate (tiktoken)" if self.use_accurate else "fast (char-based)",
+            "estimation_mode": (
+                "exact (model tokenizer)" if self._token_counter is not None
+                else "accurate (tiktoken)" if self.use_accurate else "fast (char-based)"
+            ),
             "chars_per_token": self.chars_per_token,
             "max_context_tokens": self.max_context,
             "max_prompt_tokens": self.max_prompt,
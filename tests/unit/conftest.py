@@ -0,0 +1,29 @@
+"""
+Shared fixtures for unit tests.
+
+NLTK's tokenizers need downloaded data, so tests of the context window
+stages swap in regex tokenizers with the regex_tokenizers fixture; the
+lookups under test do not depend on how text is tokenized.
+"""
+
+import re
+
+import pytest
+
+from src.core import document_index
+from src.core.context import context_window_extractor
+
+
+def split_sentences(text):
+    return [m.group().strip() for m in re.finditer(r"[^.!?]+[.!?]*", text) if m.group().strip()]
+
+
+def split_words(text):
+    return re.findall(r"\w+|[^\w\s]", text)
+
+
+@pytest.fixture
+def regex_tokenizers(monkeypatch):
+    monkeypatch.setattr(context_window_extractor, "sent_tokenize", split_sentences)
+    monkeypatch.setattr(context_window_extractor, "word_tokenize", split_words)
+    monkeypatch.setattr(document_index, "sent_tokenize", split_sentences)
@@ -0,0 +1,220 @@
+"""
+Local mock of the vLLM OpenAI-compatible HTTP API for client-layer tests.
+
+Serves /v1/models and /v1/chat/completions on 127.0.0.1 with a latency model
+that scales with prompt and completion tokens, and records concurrency and
+in-flight token counts so tests can assert on admission behavior.
+
+MockVLLMCluster runs several servers in separate processes (one event loop
+each, like real replicas); /mock/stats and /mock/config expose and adjust
+each replica over HTTP.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+
+@dataclass
+class MockServerStats:
+    """Observations recorded by the mock server."""
+
+    requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    in_flight_tokens: int = 0
+    max_in_flight_tokens: int = 0
+    arrivals: List[float] = field(default_factory=list)
+
+
+class MockVLLMServer:
+    """
+    Minimal vLLM chat-completions server.
+
+    Latency per request is ``base_latency_s + prompt_tokens / prefill_rate +
+    completion_tokens / decode_rate``; set ``slowdown`` above 1.0 to simulate
+    an overloaded server.
+    """
+
+    def __init__(
+        self,
+        model: str = "mock-instruct",
+        base_latency_s: float = 0.01,
+        prefill_rate: float = 200000.0,
+        decode_rate: float = 20000.0,
+        completion_tokens: int = 64,
+        chars_per_token: float = 4.0,
+        fail_status: Optional[int] = None
+    ):
+        self.model = model
+        self.base_latency_s = base_latency_s
+        self.prefill_rate = prefill_rate
+        self.decode_rate = decode_rate
+        self.completion_tokens = completion_tokens
+        self.chars_per_token = chars_per_token
+        self.fail_status = fail_status
+        self.slowdown = 1.0
+        self.stats = MockServerStats()
+
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def start(self) -> "MockVLLMServer":
+        app = web.Application()
+        app.router.add_get("/v1/models", self._models)
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        app.router.add_get("/mock/stats", self._get_stats)
+        app.router.add_post("/mock/config", self._set_config)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockVLLMServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def _get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(asdict(self.stats))
+
+    async def _set_config(self, request: web.Request) -> web.Response:
+        payload: Dict[str, Any] = await request.json()
+        if "slowdown" in payload:
+            self.slowdown = payload["slowdown"]
+        if "fail_status" in payload:
+            self.fail_status = payload["fail_status"]
+        return web.json_response({"slowdown": self.slowdown, "fail_status": self.fail_status})
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": self.model}]})
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        payload: Dict[str, Any] = await request.json()
+        prompt_chars = sum(len(m.get("content", "")) for m in payload.get("messages", []))
+        prompt_tokens = int(prompt_chars / self.chars_per_token)
+        completion_tokens = min(self.completion_tokens, payload.get("max_tokens", self.completion_tokens))
+        reserved_tokens = prompt_tokens + payload.get("max_tokens", completion_tokens)
+
+        stats = self.stats
+        stats.requests += 1
+        stats.arrivals.append(time.monotonic())
+        stats.in_flight += 1
+        stats.in_flight_tokens += reserved_tokens
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        stats.max_in_flight_tokens = max(stats.max_in_flight_tokens, stats.in_flight_tokens)
+
+        try:
+            latency = (
+                self.base_latency_s
+                + prompt_tokens / self.prefill_rate
+                + completion_tokens / self.decode_rate
+            ) * self.slowdown
+            await asyncio.sleep(latency)
+
+            if self.fail_status:
+                return web.json_response({"error": "mock failure"}, status=self.fail_status)
+
+            return web.json_response({
+                "id": f"cmpl-{stats.requests}",
+                "object": "chat.completion",
+                "model": self.model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": '{"entities": []}'},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+        finally:
+            stats.in_flight -= 1
+            stats.in_flight_tokens -= reserved_tokens
+
+
+def _serve_in_process(ports, server_kwargs: Dict[str, Any]):
+    """Child process entry point: run one MockVLLMServer until terminated."""
+
+    async def main():
+        server = await MockVLLMServer(**server_kwargs).start()
+        ports.put(server.port)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+class MockVLLMCluster:
+    """
+    Several MockVLLMServer replicas, each in its own process.
+
+    Stats and fault injection go through the replicas' /mock endpoints, since
+    the server objects live in the child processes.
+    """
+
+    def __init__(self, replicas: int = 3, startup_timeout_s: float = 30.0, **server_kwargs):
+        self.replicas = replicas
+        self.startup_timeout_s = startup_timeout_s
+        self.server_kwargs = server_kwargs
+        self.model = server_kwargs.get("model", "mock-instruct")
+        self.ports: List[int] = []
+        self._processes: List[multiprocessing.Process] = []
+
+    @property
+    def base_urls(self) -> List[str]:
+        return [f"http://127.0.0.1:{port}/v1" for port in self.ports]
+
+    async def start(self) -> "MockVLLMCluster":
+        ctx = multiprocessing.get_context("spawn")
+        ports = ctx.Queue()
+        for _ in range(self.replicas):
+            process = ctx.Process(target=_serve_in_process, args=(ports, self.server_kwargs), daemon=True)
+            process.start()
+            self._processes.append(process)
+
+        loop = asyncio.get_running_loop()
+        for _ in range(self.replicas):
+            self.ports.append(await loop.run_in_executor(None, ports.get, True, self.startup_timeout_s))
+        return self
+
+    def stop(self):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._processes = []
+
+    async def __aenter__(self) -> "MockVLLMCluster":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    async def stats(self, index: int) -> MockServerStats:
+        import httpx
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"http://127.0.0.1:{self.ports[index]}/mock/stats")
+            return MockServerStats(**response.json())
+
+    async def configure(self, index: int, **settings):
+        import httpx
+        async with httpx.AsyncClient() as client:
+            await client.post(f"http://127.0.0.1:{self.ports[index]}/mock/config", json=settings)
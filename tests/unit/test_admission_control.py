@@ -0,0 +1,323 @@
+"""
+Unit tests for token-aware admission control.
+
+Covers TokenBudgetAdmissionController directly and ThrottledVLLMClient
+end-to-end against a local mock vLLM server.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.vllm_client.admission import TokenBudgetAdmissionController
+from src.vllm_client.client import HTTPVLLMClient
+from src.vllm_client.exceptions import DeadlineExceededError
+from src.vllm_client.models import VLLMConfig, VLLMRequest
+from src.vllm_client.scheduler import RequestContext, reset_request_context, set_request_context
+from src.core.throttled_vllm_client import ThrottledVLLMClient
+from tests.unit.mock_vllm_server import MockVLLMServer
+
+
+def make_request(prompt_chars: int = 4000, max_tokens: int = 1000) -> VLLMRequest:
+    """Build a request whose estimated size is prompt_chars/4 + max_tokens."""
+    return VLLMRequest(messages=[{"role": "user", "content": "x" * prompt_chars}], max_tokens=max_tokens)
+
+
+def make_controller(**kwargs) -> TokenBudgetAdmissionController:
+    defaults = dict(
+        kv_token_budget=4000,
+        min_token_budget=1000,
+        additive_increase=500,
+        decrease_factor=0.5,
+        slowdown_threshold=3.0,
+        max_in_flight=64,
+        chars_per_token=4.0,
+        prefill_rate=100000.0,
+        decode_rate=10000.0
+    )
+    defaults.update(kwargs)
+    return TokenBudgetAdmissionController(**defaults)
+
+
+class TestTokenBudgetAdmissionController:
+    """Admission, FIFO wakeup and AIMD behavior."""
+
+    async def test_admits_immediately_under_budget(self):
+        controller = make_controller()
+        ticket = await controller.acquire(make_request())  # 1000 + 1000 tokens
+
+        assert ticket.tokens == 2000
+        assert controller.in_flight_tokens == 2000
+        assert controller.queue_depth == 0
+
+    async def test_queues_when_budget_exhausted_and_wakes_fifo(self):
+        controller = make_controller()
+        first = await controller.acquire(make_request())
+        second = await controller.acquire(make_request())
+
+        order = []
+
+        async def waiter(name):
+            ticket = await controller.acquire(make_request())
+            order.append(name)
+            return ticket
+
+        third = asyncio.create_task(waiter("third"))
+        fourth = asyncio.create_task(waiter("fourth"))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 2
+
+        controller.release(first, success=True, latency_ms=50)
+        await asyncio.sleep(0)
+        assert order == ["third"]
+
+        controller.release(second, success=True, latency_ms=50)
+        await asyncio.sleep(0)
+        assert order == ["third", "fourth"]
+
+        for task in (third, fourth):
+            controller.release(task.result(), success=True, latency_ms=50)
+        assert controller.in_flight_tokens == 0
+
+    async def test_oversized_request_admitted_when_idle(self):
+        controller = make_controller(kv_token_budget=1000, min_token_budget=500)
+        ticket = await asyncio.wait_for(controller.acquire(make_request(40000, 1000)), timeout=1)
+
+        assert ticket.tokens > controller.token_budget
+        controller.release(ticket, success=True, latency_ms=10)
+
+    async def test_cancelled_waiter_does_not_leak_budget(self):
+        controller = make_controller()
+        first = await controller.acquire(make_request())
+        second = await controller.acquire(make_request())
+
+        queued = asyncio.create_task(controller.acquire(make_request()))
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        controller.release(first, success=True, latency_ms=10)
+        controller.release(second, success=True, latency_ms=10)
+
+        assert controller.in_flight_tokens == 0
+        assert controller.in_flight_requests == 0
+        assert controller.stats.cancelled_waiters == 1
+
+    async def test_slow_completion_decreases_budget(self):
+        controller = make_controller()
+        ticket = await controller.acquire(make_request())
+
+        # Expected ~110ms for 1000 prompt + 1000 completion tokens; observed 10s
+        controller.release(ticket, success=True, latency_ms=10000, prompt_tokens=1000, completion_tokens=1000)
+
+        assert controller.token_budget == 2000
+        assert controller.stats.budget_decreases == 1
+
+    async def test_failure_decreases_budget_to_floor(self):
+        controller = make_controller(kv_token_budget=4000, min_token_budget=1500)
+        for _ in range(3):
+            ticket = await controller.acquire(make_request(400, 100))
+            controller.release(ticket, success=False, latency_ms=5)
+
+        assert controller.token_budget == 1500
+
+    async def test_one_decrease_per_round_trip(self):
+        controller = make_controller()
+        first = await controller.acquire(make_request(400, 100))
+        second = await controller.acquire(make_request(400, 100))
+
+        controller.release(first, success=False, latency_ms=5)
+        controller.release(second, success=False, latency_ms=5)
+
+        # second was admitted before the first cut, so only one decrease applies
+        assert controller.stats.budget_decreases == 1
+
+    async def test_additive_increase_only_under_queued_demand(self):
+        controller = make_controller()
+        controller.token_budget = 2000
+
+        ticket = await controller.acquire(make_request(400, 100))
+        controller.release(ticket, success=True, latency_ms=1, prompt_tokens=100, completion_tokens=100)
+        assert controller.token_budget == 2000
+
+        holder = await controller.acquire(make_request())
+        blocker = await controller.acquire(make_request(400, 100))
+        queued = asyncio.create_task(controller.acquire(make_request()))
+        await asyncio.sleep(0)
+
+        controller.release(blocker, success=True, latency_ms=1, prompt_tokens=100, completion_tokens=100)
+        assert controller.token_budget == 2500
+
+        controller.release(holder, success=True, latency_ms=1)
+        controller.release(await queued, success=True, latency_ms=1)
+
+    async def test_completion_estimate_learns_from_usage(self):
+        controller = make_controller(kv_token_budget=100000)
+        ticket = await controller.acquire(make_request(400, 60000))
+        assert ticket.completion_tokens == 60000
+
+        controller.release(ticket, success=True, latency_ms=5, prompt_tokens=100, completion_tokens=200)
+        _, completion = controller.estimate_request_tokens(make_request(400, 60000))
+
+        assert completion == int(200 * 1.5) + 256
+
+
+class TestThrottledVLLMClientWithMockServer:
+    """End-to-end admission control against a local mock vLLM server."""
+
+    @pytest.fixture
+    async def server(self):
+        async with MockVLLMServer() as server:
+            yield server
+
+    @pytest.fixture
+    def http_client_factory(self, server):
+        def factory():
+            config = VLLMConfig(base_url=server.base_url, model_id=server.model, http_timeout=30)
+            return HTTPVLLMClient(config=config)
+
+        return factory
+
+    async def test_in_flight_tokens_never_exceed_budget(self, server, http_client_factory):
+        controller = make_controller(kv_token_budget=6000, min_token_budget=6000)
+        client = ThrottledVLLMClient(http_client_factory(), admission_controller=controller)
+
+        responses = await asyncio.gather(*(
+            client.generate_chat_completion(make_request(4000, 1000)) for _ in range(12)
+        ))
+
+        assert len(responses) == 12
+        assert server.stats.max_in_flight == 3
+        assert server.stats.max_in_flight_tokens <= 6000
+        assert controller.in_flight_tokens == 0
+        await client.close()
+
+    async def test_no_fixed_delay_when_budget_available(self, server, http_client_factory):
+        controller = make_controller(kv_token_budget=100000)
+        client = ThrottledVLLMClient(http_client_factory(), admission_controller=controller)
+
+        start = time.monotonic()
+        await asyncio.gather(*(client.generate_chat_completion(make_request(400, 64)) for _ in range(8)))
+        elapsed = time.monotonic() - start
+
+        # All eight run concurrently; no per-call sleep is added
+        assert server.stats.max_in_flight == 8
+        assert elapsed < 1.0
+        await client.close()
+
+    async def test_rate_limit_reserves_slots_without_serializing(self, server, http_client_factory):
+        controller = make_controller(kv_token_budget=100000)
+        client = ThrottledVLLMClient(
+            http_client_factory(),
+            config_override={"vllm_requests_per_minute": 4},
+            admission_controller=controller
+        )
+
+        now = time.time()
+        waits = [client._reserve_rate_slot() - now for _ in range(6)]
+
+        assert all(wait < 0.1 for wait in waits[:4])
+        assert all(59.0 < wait <= 60.1 for wait in waits[4:])
+        await client.close()
+
+    async def test_wrappers_share_rate_window_and_breaker(self, server, http_client_factory):
+        server.fail_status = 500
+        override = {"vllm_requests_per_minute": 100, "vllm_circuit_failure_threshold": 2}
+        first, second = (
+            ThrottledVLLMClient(http_client_factory(), config_override=override, admission_controller=make_controller())
+            for _ in range(2)
+        )
+
+        for client in (first, second):
+            with pytest.raises(Exception):
+                await client.generate_chat_completion(make_request(400, 64))
+
+        # One failure through each wrapper opens the endpoint's breaker
+        with pytest.raises(Exception, match="Circuit breaker is OPEN"):
+            await first.generate_chat_completion(make_request(400, 64))
+        assert first.rate_slots is second.rate_slots and len(first.rate_slots) == 2
+        assert second.get_throttling_stats().circuit_opens == 1
+        for client in (first, second):
+            await client.close()
+
+    async def test_unused_rate_slot_is_returned(self, server, http_client_factory):
+        client = ThrottledVLLMClient(
+            http_client_factory(),
+            config_override={"vllm_requests_per_minute": 1},
+            admission_controller=make_controller()
+        )
+        await client.generate_chat_completion(make_request(400, 64))
+
+        waiting = asyncio.create_task(client.generate_chat_completion(make_request(400, 64)))
+        await asyncio.sleep(0.05)
+        assert len(client.rate_slots) == 2
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert len(client.rate_slots) == 1
+
+        # The rate wait ends at the deadline instead of the next free slot
+        token = set_request_context(RequestContext(deadline=time.time() + 0.2))
+        try:
+            start = time.monotonic()
+            with pytest.raises(DeadlineExceededError):
+                await client.generate_chat_completion(make_request(400, 64))
+        finally:
+            reset_request_context(token)
+        assert time.monotonic() - start < 1.0
+        assert len(client.rate_slots) == 1
+        assert client.stats.expired_requests == 1
+        assert server.stats.requests == 1
+        await client.close()
+
+    async def test_slow_server_shrinks_budget(self, server, http_client_factory):
+        server.slowdown = 50.0
+        controller = make_controller(kv_token_budget=8000, min_token_budget=2000, prefill_rate=1e6, decode_rate=1e5)
+        client = ThrottledVLLMClient(http_client_factory(), admission_controller=controller)
+
+        for _ in range(3):
+            await client.generate_chat_completion(make_request(400, 64))
+
+        assert controller.token_budget < 8000
+        await client.close()
+
+    async def test_failures_open_circuit_and_release_budget(self, server, http_client_factory):
+        server.fail_status = 500
+        controller = make_controller()
+        client = ThrottledVLLMClient(
+            http_client_factory(),
+            config_override={"vllm_circuit_failure_threshold": 2},
+            admission_controller=controller
+        )
+
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await client.generate_chat_completion(make_request(400, 64))
+
+        with pytest.raises(Exception, match="Circuit breaker is OPEN"):
+            await client.generate_chat_completion(make_request(400, 64))
+
+        assert controller.in_flight_tokens == 0
+        health = await client.health_check()
+        assert health["throttling"]["circuit_breaker"]["state"] == "open"
+        await client.close()
+
+    async def test_cancelled_call_leaves_budget_unchanged(self, server, http_client_factory):
+        server.base_latency_s = 2.0
+        controller = make_controller(kv_token_budget=8000)
+        client = ThrottledVLLMClient(http_client_factory(), admission_controller=controller)
+
+        call = asyncio.create_task(client.generate_chat_completion(make_request(400, 64)))
+        while server.stats.max_in_flight == 0:
+            await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+        assert controller.token_budget == 8000
+        assert controller.stats.budget_decreases == 0
+        assert controller.in_flight_tokens == 0
+        assert client.stats.failed_requests == 0
+        await client.close()
@@ -0,0 +1,119 @@
+"""
+Unit tests for entity-anchored relationship pattern evaluation.
+
+With anchor_patterns_to_entities each pattern runs only on windows around
+entity pairs of the types it declares; on a corpus of legal sentences the
+relationships found must be those the full-document scan finds.
+"""
+
+import random
+import re
+
+import pytest
+
+from src.core.relationships import EntityMention, ExtractionConfig, RelationshipExtractor
+
+
+SENTENCES = [
+    "[Smith & Associates LLP|LAW_FIRM] represents [Acme Corporation|CORPORATION]",
+    "[John Doe|PERSON] sued [ABC Corporation|CORPORATION] in state court",
+    "[ABC Corp.|CORPORATION] merged with [XYZ Inc.|CORPORATION] last year",
+    "[XYZ Inc.|CORPORATION] is a subsidiary of [ABC Corp.|CORPORATION]",
+    "[Smith v. Jones|CASE] assigned to Judge [Brown|JUDGE]",
+    "Judge [Mary Brown|JUDGE] of the [District Court|COURT] wrote separately",
+    "[Jane Roe|PERSON] is party to the [lease agreement|AGREEMENT]",
+    "The [complaint|PLEADING] filed on [January 1, 2023|DATE] was amended",
+    "[Richard Roe|DEFENDANT] ordered to pay [$50,000|MONEY] in damages",
+    "[Jones Day LLP|LAW_FIRM] and [Baker Botts LLP|LAW_FIRM] as co-counsel",
+    "[Acme Corporation|CORPORATION] employs [John Doe|PERSON] as a clerk",
+    "[Richard Roe|PERSON] was convicted of [fraud|CRIME] after trial",
+]
+
+FILLER = [
+    "No objection was raised; the hearing proceeded",
+    "Counsel conferred -- nothing further was noted",
+    "The record closed at noon; exhibits were sealed",
+]
+
+MARKUP = re.compile(r"\[([^|\]]+)\|([A-Z_]+)\]")
+
+
+def make_document(count, seed=13):
+    """Join random sentences, returning the text and its annotated entities."""
+    rng = random.Random(seed)
+    text, entities = "", []
+    for _ in range(count):
+        sentence = rng.choice(SENTENCES if rng.random() < 0.6 else FILLER)
+        position = 0
+        for match in MARKUP.finditer(sentence):
+            text += sentence[position:match.start()]
+            entities.append(EntityMention(
+                entity_id=f"e{len(entities)}",
+                entity_type=match.group(2),
+                entity_text=match.group(1),
+                start_position=len(text),
+                end_position=len(text) + len(match.group(1))
+            ))
+            text += match.group(1)
+            position = match.end()
+        text += sentence[position:] + " --\n"
+    return text, entities
+
+
+def make_extractor(anchored):
+    return RelationshipExtractor(ExtractionConfig(
+        use_dependency_parsing=False,
+        use_coreference=False,
+        anchor_patterns_to_entities=anchored
+    ))
+
+
+def found(extractor, text, entities):
+    relationships = extractor._extract_pattern_relationships(
+        text, entities, extractor._build_entity_index(entities)
+    )
+    return {
+        (rel.relationship_type, rel.source_entity.entity_id, rel.target_entity.entity_id)
+        for rel in relationships
+    }
+
+
+class TestAnchoredPatterns:
+    """Anchored evaluation finds what the full scan finds."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_full_scan(self, seed):
+        text, entities = make_document(300, seed=seed)
+
+        full = found(make_extractor(False), text, entities)
+        anchored = found(make_extractor(True), text, entities)
+
+        assert full
+        assert anchored == full
+
+    def test_applicable_patterns_follow_declared_types(self):
+        extractor = make_extractor(True)
+
+        firm_to_corporation = extractor._patterns_for_type_pair("LAW_FIRM", "CORPORATION")
+
+        assert {p.relationship_type for p in firm_to_corporation} >= {"represents"}
+        assert all("LAW_FIRM" in p.subject_types and "CORPORATION" in p.object_types for p in firm_to_corporation)
+        assert extractor._patterns_for_type_pair("LAW_FIRM", "CORPORATION") is firm_to_corporation
+        assert extractor._patterns_for_type_pair("DATE", "DATE") == []
+
+    def test_no_compatible_pairs_skips_patterns(self):
+        extractor = make_extractor(True)
+        text = "John Doe sued ABC Corporation. " * 50
+        dates = [
+            EntityMention(entity_id=f"d{k}", entity_type="DATE", entity_text="John",
+                          start_position=k * 31, end_position=k * 31 + 4)
+            for k in range(50)
+        ]
+
+        assert found(extractor, text, dates) == set()
+        assert found(make_extractor(False), text, dates)
+
+    def test_merge_windows(self):
+        merged = RelationshipExtractor._merge_windows([(50, 80), (0, 10), (5, 20), (20, 30)])
+
+        assert merged == [(0, 30), (50, 80)]
@@ -0,0 +1,87 @@
+"""
+Unit tests for the per-batch chunking worker pool.
+
+Documents are chunked with SmartChunker in spawned workers and must match
+in-process chunking; results must reach callers as each document finishes;
+terminating the pool must drop queued documents and kill running workers.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.core.chunking.batch_pool import BatchWorkerPool
+from src.core.smart_chunker import SmartChunker
+from tests.unit.test_smart_chunker_scaling import make_document
+
+
+# Worker-side functions: spawned workers import them from this module
+
+_worker_label = None
+
+
+def init_worker(label):
+    global _worker_label
+    _worker_label = label
+
+
+def chunk_document(text, size):
+    return SmartChunker().split_span(text, 0, len(text), size)
+
+
+def labelled_sleep(seconds):
+    time.sleep(seconds)
+    return _worker_label, seconds
+
+
+def mark_and_sleep(marker, seconds):
+    with open(marker, "w") as f:
+        f.write(str(os.getpid()))
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def pool():
+    pool = BatchWorkerPool(2, initializer=init_worker, initargs=("batch-1",))
+    yield pool
+    pool.terminate()
+
+
+class TestBatchWorkerPool:
+    """Chunking in spawned workers, streaming and termination."""
+
+    async def test_pooled_chunking_matches_in_process(self, pool):
+        documents = [make_document(20_000, seed=seed) for seed in range(4)]
+
+        chunks = await asyncio.gather(*(pool.run(chunk_document, text, 2000) for text in documents))
+
+        assert chunks == [chunk_document(text, 2000) for text in documents]
+        assert len(pool.processes) == 2
+
+    async def test_results_arrive_in_completion_order(self, pool):
+        calls = [pool.run(labelled_sleep, seconds) for seconds in (1.0, 0.05)]
+
+        finished = [await call for call in asyncio.as_completed(calls)]
+
+        assert finished == [("batch-1", 0.05), ("batch-1", 1.0)]
+
+    async def test_terminate_kills_running_and_drops_queued(self, pool, tmp_path):
+        markers = [tmp_path / f"started_{i}" for i in range(3)]
+        calls = [asyncio.ensure_future(pool.run(mark_and_sleep, str(marker), 30)) for marker in markers]
+        while not (markers[0].exists() and markers[1].exists()):
+            await asyncio.sleep(0.05)
+
+        began = time.monotonic()
+        assert pool.terminate() == 2
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert time.monotonic() - began < 10
+        assert all(isinstance(result, BrokenProcessPool) for result in results[:2])
+        assert isinstance(results[2], (concurrent.futures.CancelledError, BrokenProcessPool))
+        assert not markers[2].exists()
+        assert not any(process.is_alive() for process in pool.processes)
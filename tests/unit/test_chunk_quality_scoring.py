@@ -0,0 +1,236 @@
+"""
+Unit tests for batch chunk quality scoring.
+
+ChunkScoringIndex must reproduce the per-chunk scores ChunkingEngine and
+ChunkQualityScorer computed with Python loops (kept here as references),
+for chunks given by document offsets or by their text alone, and score
+1,000 chunks much faster than the per-chunk loop.
+"""
+
+import random
+import re
+import time
+
+import numpy as np
+import pytest
+
+from src.core.chunking.quality_scoring import ChunkScoringIndex, score_texts
+
+
+SENTENCES = [
+    "The court granted the motion to dismiss.",
+    "However, the plaintiff (Acme Corp. filed an appeal",
+    "and the \"appellate\" court reversed!",
+    "See Smith v. Jones, 123 F.2d 456 (9th Cir. 1999).",
+    "Was the contract valid?",
+    "the parties dispute the meaning of section 4...",
+    "  Notice was served on January 5, 2020;  ",
+    "but no answer was filed",
+    "short.",
+    "The defendant, the court held, waived the defense!?",
+]
+
+
+def make_document(size, seed=11):
+    rng = random.Random(seed)
+    parts, total = [], 0
+    while total < size:
+        sentence = rng.choice(SENTENCES) + rng.choice([" ", " ", "\n", "\n\n", "\t"])
+        parts.append(sentence)
+        total += len(sentence)
+    return "".join(parts)[:size]
+
+
+def make_spans(text, count, seed=3):
+    rng = random.Random(seed)
+    spans = []
+    for _ in range(count):
+        start = rng.randrange(len(text))
+        spans.append((start, min(len(text), start + rng.randrange(0, 400))))
+    return spans
+
+
+# Per-chunk implementations the batch scorer replaces
+
+def reference_basic_quality(content, min_chunk_size):
+    score = 1.0
+    if len(content) < min_chunk_size:
+        score *= 0.5
+    if not content.rstrip().endswith(('.', '!', '?', ':')):
+        score *= 0.8
+    if [s for s in re.split(r'[.!?]+', content) if len(s.strip()) > 10]:
+        score *= 1.1
+    return min(score, 1.0)
+
+
+def reference_completeness(content):
+    score = 1.0
+    if not content.strip().endswith(('.', '!', '?')):
+        score -= 0.3
+    if content.strip().startswith(('and', 'or', 'but', 'however')):
+        score -= 0.2
+    if content.count('(') - content.count(')') != 0 or content.count('"') % 2 != 0:
+        score -= 0.2
+    return max(0.0, score)
+
+
+def reference_coherence(content):
+    if len(content.split()) < 5:
+        return 0.3
+    sentences = re.split(r'[.!?]+', content)
+    if len(sentences) < 2:
+        return 0.8
+    overlaps = []
+    for first, second in zip(sentences, sentences[1:]):
+        words1, words2 = set(first.lower().split()), set(second.lower().split())
+        if words1 and words2:
+            overlaps.append(len(words1 & words2) / len(words1 | words2))
+    return max(0.0, min(1.0, sum(overlaps) / len(overlaps))) if overlaps else 0.5
+
+
+def reference_size_optimality(size, target):
+    ratio = size / target
+    if 0.8 <= ratio <= 1.2:
+        return 1.0
+    if 0.6 <= ratio < 0.8 or 1.2 < ratio <= 1.5:
+        return 0.7
+    if 0.4 <= ratio < 0.6 or 1.5 < ratio <= 2.0:
+        return 0.4
+    return 0.1
+
+
+def sentence_spans(text, count, seed=5):
+    """Spans from just after one [.!?]+ run to the end of a later one."""
+    rng = random.Random(seed)
+    run_ends = [0] + [match.end() for match in re.finditer(r'[.!?]+', text)]
+    spans = []
+    for _ in range(count):
+        first = rng.randrange(len(run_ends) - 1)
+        last = min(len(run_ends) - 1, first + rng.randrange(0, 12))
+        spans.append((run_ends[first], run_ends[last]))
+    return spans
+
+
+class TestMatchesPerChunkScores:
+    """Batch metrics equal the per-chunk implementations."""
+
+    @pytest.fixture(scope="class")
+    def document(self):
+        return make_document(40_000)
+
+    def test_counts_and_basic_quality(self, document):
+        spans = make_spans(document, 2000)
+        starts, ends = zip(*spans)
+        scores = ChunkScoringIndex(document).score_chunks(starts, ends, target_size=200, min_chunk_size=100)
+
+        for i, (start, end) in enumerate(spans):
+            content = document[start:end]
+            assert scores.word_count[i] == len(content.split())
+            assert scores.sentence_count[i] == len(re.split(r'[.!?]+', content))
+            assert scores.basic_quality[i] == pytest.approx(reference_basic_quality(content, 100))
+            assert scores.ends_with_sentence[i] == content.rstrip().endswith(('.', '!', '?'))
+            assert scores.starts_with_capital[i] == (content.strip()[:1].isupper())
+
+    def test_completeness_and_size(self, document):
+        spans = make_spans(document, 2000, seed=4)
+        starts, ends = zip(*spans)
+        index = ChunkScoringIndex(document)
+        scores = index.score_chunks(starts, ends, target_size=200)
+
+        for i, (start, end) in enumerate(spans):
+            content = document[start:end]
+            assert scores.completeness[i] == pytest.approx(reference_completeness(content) or 0.5)
+            assert scores.size_optimality[i] == reference_size_optimality(len(content), 200)
+
+    def test_coherence_on_whole_sentences(self, document):
+        spans = sentence_spans(document, 2000)
+        starts, ends = zip(*spans)
+        coherence = ChunkScoringIndex(document).coherence(np.asarray(starts), np.asarray(ends))
+
+        for i, (start, end) in enumerate(spans):
+            assert coherence[i] == pytest.approx(reference_coherence(document[start:end]))
+
+    def test_texts_without_offsets(self):
+        texts = SENTENCES * 3 + ["", "   ", "one two three four five. six"]
+        scores = score_texts(texts, target_size=40, min_chunk_size=20)
+
+        for i, content in enumerate(texts):
+            assert scores.word_count[i] == len(content.split())
+            assert scores.basic_quality[i] == pytest.approx(reference_basic_quality(content, 20))
+            assert scores.completeness[i] == pytest.approx(reference_completeness(content) or 0.5)
+            assert scores.coherence[i] == pytest.approx(reference_coherence(content) or 0.5)
+
+    def test_entity_density_and_boundaries(self):
+        text = "Smith v. Jones was decided. " * 10
+        index = ChunkScoringIndex(text)
+        scores = index.score_chunks(
+            [0, 28], [28, 280], target_size=100,
+            entity_spans=[(0, 14), (28, 42)],
+            boundary_positions=[27, 55, 280], boundary_strengths=[0.9, 0.5, 0.1]
+        )
+
+        assert scores.entity_density[0] == pytest.approx(1.0 - (14 / 28 - 0.3) * 2)
+        assert scores.entity_density[1] == pytest.approx(14 / 252 * 5)
+        assert scores.boundary_quality[0] == pytest.approx(0.9)
+        assert scores.boundary_quality[1] == pytest.approx((0.5 + 0.1) / 2)
+        per_chunk = index.entity_density(np.array([0, 28]), np.array([28, 280]), entity_chars=[14, 14])
+        assert list(per_chunk) == list(scores.entity_density)
+
+
+@pytest.mark.performance
+class TestScoringCost:
+    """Cost per 1,000 chunks, batch versus per-chunk loop."""
+
+    @pytest.fixture(scope="class")
+    def spans(self):
+        document = make_document(1_000_000)
+        return document, [(start, min(len(document), start + 1500)) for start in range(0, len(document), 1000)]
+
+    def report(self, label, batch, loop, count):
+        per_thousand = 1000 / count
+        print(
+            f"{label} cost per 1,000 chunks: batch {batch * per_thousand * 1000:.1f} ms, "
+            f"per-chunk {loop * per_thousand * 1000:.1f} ms ({count} chunks of 1,500 chars)"
+        )
+
+    def test_detailed_scores(self, spans):
+        document, spans = spans
+        starts, ends = zip(*spans)
+
+        began = time.perf_counter()
+        ChunkScoringIndex(document).score_chunks(starts, ends, target_size=1000, min_chunk_size=100)
+        batch = time.perf_counter() - began
+
+        began = time.perf_counter()
+        for start, end in spans:
+            content = document[start:end]
+            reference_basic_quality(content, 100)
+            reference_completeness(content)
+            reference_coherence(content)
+            len(content.split())
+            len(re.split(r'[.!?]+', content))
+        loop = time.perf_counter() - began
+
+        self.report("detailed scoring", batch, loop, len(spans))
+        assert batch < loop
+
+    def test_engine_scores(self, spans):
+        document, spans = spans
+        starts, ends = zip(*spans)
+
+        began = time.perf_counter()
+        ChunkScoringIndex(document).score_chunks(starts, ends, min_chunk_size=100, detailed=False)
+        batch = time.perf_counter() - began
+
+        began = time.perf_counter()
+        for start, end in spans:
+            content = document[start:end]
+            reference_basic_quality(content, 100)
+            len(content.split())
+            len(re.split(r'[.!?]+', content))
+            content.strip()[:1].isupper()
+            content.rstrip().endswith(('.', '!', '?'))
+        loop = time.perf_counter() - began
+
+        self.report("engine scoring", batch, loop, len(spans))
+        assert batch < loop
@@ -0,0 +1,145 @@
+"""
+Unit tests for offset-only chunk views.
+
+Checks that SmartChunker chunks are views over the source document (text is
+always ``document[start_pos:end_pos]``), that overlap is expressed through
+core offsets, that PageBatch builds its prompt text lazily, and that
+chunking a 5M-character document does not copy the text per chunk.
+"""
+
+import tracemalloc
+
+import pytest
+
+from src.core.page_batch_processor import PageBatchProcessor
+from src.core.smart_chunker import ChunkingStrategy, DocumentChunk, SmartChunker, strip_span
+from src.models.extraction_strategy import PageBatchConfig
+from tests.unit.test_smart_chunker_scaling import make_document
+
+
+@pytest.fixture(scope="module")
+def chunker():
+    return SmartChunker()
+
+
+def assert_views(chunks, text):
+    for chunk in chunks:
+        assert chunk.document is text
+        assert chunk.text == text[chunk.start_pos:chunk.end_pos]
+        assert chunk.length == len(chunk.text)
+        assert chunk.text == chunk.text.strip()
+
+
+class TestDocumentChunk:
+    """View semantics of DocumentChunk."""
+
+    def test_view_slices_source(self):
+        text = "alpha beta gamma"
+        chunk = DocumentChunk.view(text, 6, 10, chunk_index=2)
+
+        assert chunk.text == "beta"
+        assert chunk.length == 4
+        assert chunk.end_pos == 10
+        assert not chunk.is_blank()
+        assert DocumentChunk.view("a    b", 1, 5).is_blank()
+
+    def test_detached_chunk_keeps_own_text(self):
+        chunk = DocumentChunk(text="standalone", start_pos=100)
+
+        assert chunk.text == "standalone"
+        assert chunk.end_pos == 110
+        assert chunk == DocumentChunk.view("x" * 100 + "standalone", 100, 110)
+
+    def test_requires_text_or_document(self):
+        with pytest.raises(ValueError):
+            DocumentChunk()
+
+    def test_core_offsets_mark_overlap(self):
+        chunk = DocumentChunk.view("0123456789", 2, 9, core_start=4, core_end=7)
+
+        assert (chunk.overlap_before, chunk.overlap_after) == (2, 2)
+        assert chunk.in_overlap(3) and chunk.in_overlap(8)
+        assert not chunk.in_overlap(4) and not chunk.in_overlap(6)
+
+    def test_strip_span(self):
+        assert strip_span("  ab c \n", 0, 8) == (2, 6)
+        assert strip_span("   ", 0, 3) == (0, 0)
+
+
+class TestSmartChunkerViews:
+    """Every strategy returns views over the caller's string."""
+
+    @pytest.mark.parametrize("method", [
+        "_legal_aware_chunking",
+        "_section_aware_chunking",
+        "_paragraph_aware_chunking",
+        "_fixed_size_chunking",
+    ])
+    def test_chunks_are_views(self, chunker, method):
+        text = make_document(30_000, seed=4)
+        chunks = getattr(chunker, method)(text)
+
+        assert chunks
+        if method != "_legal_aware_chunking":
+            # Legal-aware chunks keep their line endings
+            assert_views(chunks, text)
+        assert all(chunk.document is text for chunk in chunks)
+
+    def test_overlap_keeps_original_span_as_core(self, chunker):
+        text = make_document(30_000, seed=5)
+        chunks = chunker._apply_overlap(chunker._paragraph_aware_chunking(text), text)
+
+        assert_views(chunks, text)
+        for chunk in chunks:
+            assert chunk.start_pos <= chunk.core_start <= chunk.core_end <= chunk.end_pos
+            assert chunk.core_start == max(chunk.metadata["original_start"], chunk.start_pos)
+        assert any(chunk.overlap_before > 0 for chunk in chunks[1:])
+
+    def test_smart_chunks_are_views_with_cores(self, chunker):
+        text = make_document(200_000, seed=6)
+        chunks = chunker.smart_chunk_document(text, strategy=ChunkingStrategy.FIXED_SIZE)
+
+        assert_views(chunks, text)
+        assert chunks[0].overlap_before == 0
+        assert chunks[1].overlap_before > 0
+
+
+class TestPageBatchContent:
+    """PageBatch builds prompt text from its pages on access."""
+
+    def test_combined_content_includes_overlap(self):
+        pages = "\f".join(f"Page {i} text. " * 40 for i in range(6))
+        processor = PageBatchProcessor(PageBatchConfig(batch_size=2, overlap_pages=1))
+        batches = processor.process_document(pages)
+
+        assert len(batches) > 1
+        assert not batches[0].overlap_pages
+        assert batches[0].context_overlap == ""
+
+        second = batches[1]
+        assert second.overlap_pages == batches[0].pages[-1:]
+        assert second.combined_content.startswith("=== Context from Previous Batch ===")
+        assert second.pages[0].content in second.combined_content
+        assert processor.get_batch_statistics(batches)["batches_summary"][1]["has_overlap"]
+
+
+@pytest.mark.performance
+class TestChunkingMemory:
+    """Chunking keeps about one copy of the document."""
+
+    def test_5m_document_not_copied_per_chunk(self, chunker):
+        text = make_document(5_000_000)
+
+        tracemalloc.start()
+        try:
+            chunks = chunker.smart_chunk_document(text, strategy=ChunkingStrategy.FIXED_SIZE)
+            chunks = chunker._apply_overlap(chunks, text)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert len(chunks) >= 500
+        assert sum(chunk.length for chunk in chunks) > len(text)
+        # Copying chunk text would allocate at least the document size again
+        assert peak < len(text) * 0.25
+        print(f"peak allocation while chunking 5M chars: {peak / 1e6:.2f} MB over {len(chunks)} chunks")
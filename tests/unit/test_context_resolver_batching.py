@@ -0,0 +1,182 @@
+"""
+Unit tests for batched context resolution.
+
+batch_resolve_contexts must encode and parse each distinct context window
+once (Legal-BERT in length-sorted padded batches, SpaCy through nlp.pipe)
+and resolve every entity as resolve_context does on its own. A tiny randomly
+initialised BERT with a vocabulary built from the test text stands in for
+Legal-BERT, and a blank SpaCy pipeline recording its inputs for the parser.
+"""
+
+import random
+import re
+import time
+
+import numpy as np
+import pytest
+import spacy
+import torch
+from spacy.language import Language
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from src.core import document_index
+from src.core.context import ContextResolver, ExtractedEntity
+from tests.unit.conftest import split_words
+
+
+SENTENCES = [
+    "The plaintiff Smith filed a motion against the defendant Jones.",
+    "The court granted the motion for summary judgment.",
+    "Smith and Jones signed the purchase agreement in March.",
+    "Counsel for Jones appeared before the judge.",
+    "The contract required payment of damages.",
+]
+
+PARSED_TEXTS = []
+
+# NLTK's tokenizers need downloaded data
+pytestmark = pytest.mark.usefixtures("regex_tokenizers")
+
+
+@Language.component("recording_parser")
+def recording_parser(doc):
+    PARSED_TEXTS.append(doc.text)
+    return doc
+
+
+@pytest.fixture(scope="module")
+def bert(tmp_path_factory):
+    words = sorted({w.lower() for s in SENTENCES for w in split_words(s)})
+    vocab = tmp_path_factory.mktemp("bert") / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab), do_lower_case=True)
+    torch.manual_seed(0)
+    model = BertModel(BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64
+    ))
+    return model.eval(), tokenizer
+
+
+def make_resolver(bert, **kwargs):
+    resolver = ContextResolver(**kwargs)
+    resolver.legal_bert_model, resolver.legal_bert_tokenizer = bert
+    nlp = spacy.blank("en")
+    nlp.add_pipe("recording_parser")
+    resolver.spacy_model = nlp
+    resolver._prepare_semantic_model()
+    return resolver
+
+
+def make_document(count, seed=4):
+    rng = random.Random(seed)
+    text, entities = "", []
+    for _ in range(count):
+        sentence = rng.choice(SENTENCES)
+        for match in re.finditer(r"Smith|Jones", sentence):
+            entities.append(ExtractedEntity(
+                text=match.group(), type="PARTY",
+                start_pos=len(text) + match.start(), end_pos=len(text) + match.end()
+            ))
+        text += sentence + rng.choice([" ", "\n\n"])
+    return text, entities
+
+
+def signal_fields(resolved):
+    return (
+        resolved.primary_context, resolved.secondary_contexts, pytest.approx(resolved.confidence),
+        [(s.method, s.context_type, pytest.approx(s.confidence)) for s in resolved.signals],
+        resolved.context_window.text, resolved.metadata
+    )
+
+
+class TestBatchResolution:
+    """Batch resolution equals per-entity resolution with shared inference."""
+
+    def test_matches_per_entity_resolution(self, bert):
+        resolver = make_resolver(bert)
+        text, entities = make_document(40)
+
+        batched = resolver.batch_resolve_contexts(text, entities)
+        index = document_index.DocumentIndex.build(text)
+        single = [resolver.resolve_context(text, entity, entities, index) for entity in entities]
+
+        assert len(batched) == len(entities)
+        for got, expected in zip(batched, single):
+            assert got.entity is expected.entity
+            assert signal_fields(got) == signal_fields(expected)
+
+    def test_distinct_windows_run_once(self, bert):
+        resolver = make_resolver(bert)
+        text, entities = make_document(40)
+        encoded = []
+        forward = resolver.legal_bert_model.forward
+        resolver.legal_bert_model.forward = lambda **inputs: encoded.append(len(inputs["input_ids"])) or forward(**inputs)
+
+        PARSED_TEXTS.clear()
+        resolved = resolver.batch_resolve_contexts(text, entities, batch_size=8)
+
+        distinct = {r.context_window.text for r in resolved}
+        assert len(distinct) < len(entities)
+        assert sorted(PARSED_TEXTS) == sorted(distinct)
+        assert sum(encoded) == len(distinct)
+        assert max(encoded) <= 8
+
+    def test_batched_embeddings_match_single(self, bert):
+        resolver = make_resolver(bert)
+        texts = [" ".join(SENTENCES[:k]) for k in range(1, 6)] + SENTENCES
+
+        batched = resolver._encode_windows(texts, batch_size=4)
+
+        for text, embedding in zip(texts, batched):
+            single = resolver._encode_windows([text])[0]
+            assert embedding.shape == (1, 32)
+            np.testing.assert_allclose(embedding, single, atol=1e-5)
+
+
+class TestCpuInference:
+    """Thread count and int8 quantization settings."""
+
+    def test_inference_threads(self, bert):
+        threads = torch.get_num_threads()
+        try:
+            make_resolver(bert, inference_threads=1)
+            assert torch.get_num_threads() == 1
+        finally:
+            torch.set_num_threads(threads)
+
+    def test_int8_quantization(self, bert):
+        if "fbgemm" not in torch.backends.quantized.supported_engines and \
+                "qnnpack" not in torch.backends.quantized.supported_engines:
+            pytest.skip("No quantized CPU engine")
+        resolver = make_resolver(bert, quantize_semantic_model=True)
+        reference = make_resolver(bert)
+
+        assert resolver.legal_bert_model is not bert[0]
+        assert any("quantized" in type(m).__module__ for m in resolver.legal_bert_model.modules())
+        text, entities = make_document(10)
+        resolved = resolver.batch_resolve_contexts(text, entities)
+        expected = reference.batch_resolve_contexts(text, entities)
+        assert [signal_fields(r) for r in resolved] == [signal_fields(r) for r in expected]
+
+
+@pytest.mark.performance
+class TestBatchCost:
+    """Batched versus per-entity inference."""
+
+    def test_batch_is_faster(self, bert):
+        resolver = make_resolver(bert)
+        text, entities = make_document(300, seed=8)
+        index = document_index.DocumentIndex.build(text)
+
+        began = time.perf_counter()
+        resolver.batch_resolve_contexts(text, entities)
+        batched = time.perf_counter() - began
+
+        began = time.perf_counter()
+        for entity in entities:
+            resolver.resolve_context(text, entity, entities, index)
+        single = time.perf_counter() - began
+
+        print(f"{len(entities)} entities: batched {batched * 1000:.0f} ms, per-entity {single * 1000:.0f} ms")
+        assert batched < single
@@ -0,0 +1,218 @@
+"""
+Unit tests for document-indexed context windows.
+
+ContextWindowExtractor locates sentences, paragraphs and sections once per
+DocumentIndex and finds an entity's span with bisect; windows and nearby
+entities must equal the ones computed per call, the bisect lookups must pick
+the spans the linear scans picked, and a 2,000-entity document must be
+resolved much faster with a shared index than with per-entity splits.
+
+NLTK's tokenizers need downloaded data, so the tests swap in regex
+tokenizers; the lookups under test do not depend on how text is tokenized.
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from src.core.context.context_window_extractor import (
+    ContextWindowExtractor,
+    ExtractedEntity,
+    WindowLevel,
+)
+from src.core.document_index import DocumentIndex
+
+
+SENTENCES = [
+    "The plaintiff Smith sued Jones Corp. in the district court.",
+    "See Smith v. Jones, 123 F.3d 456 (9th Cir. 1999).",
+    "The court granted the motion!",
+    "Was the contract valid?",
+    "Payment of $5,000 was due on Jan. 5, 2020.",
+]
+HEADERS = ["I. PARTIES", "II. FACTS", "ARTICLE 3", "CLAIMS:"]
+
+pytestmark = pytest.mark.usefixtures("regex_tokenizers")
+
+
+def make_document(count, seed=7):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            parts.append("\n" + rng.choice(HEADERS) + "\n")
+        elif roll < 0.15:
+            parts.append("\n\n")
+        else:
+            parts.append(rng.choice(SENTENCES) + rng.choice([" ", "  ", "\n"]))
+    return "".join(parts)
+
+
+def make_entities(text, count, seed=3):
+    rng = random.Random(seed)
+    words = list(re.finditer(r"[A-Z][a-z]+|\$[\d,]+", text))
+    entities = []
+    for _ in range(count):
+        match = rng.choice(words)
+        entities.append(ExtractedEntity(
+            text=match.group(), type="PARTY", start_pos=match.start(), end_pos=match.end()
+        ))
+    # Positions outside any sentence, e.g. in paragraph breaks
+    for _ in range(20):
+        position = rng.randrange(len(text))
+        entities.append(ExtractedEntity(text="x", type="OTHER", start_pos=position, end_pos=position + 1))
+    return entities
+
+
+def window_fields(window):
+    return (
+        window.text, window.start_pos, window.end_pos, window.entity_start, window.entity_end,
+        window.sentences, window.tokens, window.metadata
+    )
+
+
+# Linear lookups the bisect versions replace
+
+def reference_containing(position, positions):
+    found = None
+    for i, span in enumerate(positions):
+        if span[0] <= position < span[1]:
+            found = i
+    return found
+
+
+def reference_nearby(target, entities, max_distance):
+    nearby = []
+    for entity in entities:
+        if entity == target:
+            continue
+        if entity.end_pos < target.start_pos:
+            distance = target.start_pos - entity.end_pos
+        elif entity.start_pos > target.end_pos:
+            distance = entity.start_pos - target.end_pos
+        else:
+            distance = 0
+        if distance <= max_distance:
+            nearby.append((entity, distance))
+    nearby.sort(key=lambda pair: pair[1])
+    return [entity for entity, _ in nearby]
+
+
+class TestIndexedLookups:
+    """Bisect lookups pick the spans the linear scans picked."""
+
+    @pytest.fixture(scope="class")
+    def document(self):
+        return make_document(300)
+
+    def test_sentence_and_paragraph_lookups(self, document):
+        extractor = ContextWindowExtractor()
+        index = DocumentIndex(document)
+        _, sentence_positions, sentence_starts = extractor._locate_spans(
+            document, extractor._split_sentences(document, index)
+        )
+        _, para_positions, para_starts = extractor._locate_paragraphs(
+            document, extractor._split_paragraphs(document, index)
+        )
+        assert sentence_starts is not None and para_starts is not None
+
+        for position in range(len(document) + 1):
+            assert (extractor._find_containing_span(position, sentence_positions, sentence_starts)
+                    == reference_containing(position, sentence_positions))
+            assert (extractor._find_closest_sentence(position, sentence_positions, sentence_starts)
+                    == extractor._find_closest_sentence(position, sentence_positions))
+            assert (extractor._find_closest_paragraph(position, para_positions, para_starts)
+                    == extractor._find_closest_paragraph(position, para_positions))
+
+    def test_unordered_spans_scan_linearly(self):
+        extractor = ContextWindowExtractor()
+
+        assert extractor._ordered_starts([(0, 10), (5, 12)]) is None
+        assert extractor._ordered_starts([(0, 10), (-1, -1)]) is None
+        assert extractor._ordered_starts([(0, 10), (10, 12)]) == [0, 10]
+        _, _, starts = extractor._locate_spans("one. two.", ["one.", "missing."])
+        assert starts is None
+
+
+class TestSharedIndexWindows:
+    """Windows from a shared index equal windows computed per call."""
+
+    @pytest.fixture(scope="class")
+    def document(self):
+        return make_document(300, seed=11)
+
+    @pytest.mark.parametrize("level,window_size", [
+        (WindowLevel.SENTENCE, None),
+        (WindowLevel.SENTENCE, 1),
+        (WindowLevel.PARAGRAPH, 2),
+        (WindowLevel.SECTION, None),
+        (WindowLevel.TOKEN, 5),
+    ])
+    def test_windows_match(self, document, level, window_size):
+        extractor = ContextWindowExtractor()
+        index = DocumentIndex(document)
+
+        for entity in make_entities(document, 150):
+            shared = extractor.extract_window(document, entity, level, window_size, index=index)
+            per_call = extractor.extract_window(document, entity, level, window_size)
+            assert window_fields(shared) == window_fields(per_call)
+
+    def test_cached_windows_are_copies(self, document):
+        extractor = ContextWindowExtractor()
+        index = DocumentIndex(document)
+        entity = make_entities(document, 1)[0]
+
+        first = extractor.extract_window(document, entity, WindowLevel.SENTENCE, index=index)
+        first.sentences.append("changed")
+        first.tokens.clear()
+        second = extractor.extract_window(document, entity, WindowLevel.SENTENCE, index=index)
+
+        assert "changed" not in second.sentences
+        assert second.tokens
+
+    def test_surrounding_entities_match(self, document):
+        extractor = ContextWindowExtractor()
+        index = DocumentIndex(document)
+        entities = make_entities(document, 300)
+
+        for target in entities:
+            for max_distance in (0, 80, 500):
+                found = extractor.extract_surrounding_entities(target, entities, max_distance, index=index)
+                expected = reference_nearby(target, entities, max_distance)
+                assert [id(e) for e in found] == [id(e) for e in expected]
+
+
+@pytest.mark.performance
+class TestResolutionCost:
+    """2,000 entities with a shared index versus per-entity splits."""
+
+    def test_shared_index_is_faster(self):
+        document = make_document(4000, seed=5)
+        entities = make_entities(document, 2000, seed=9)
+        extractor = ContextWindowExtractor()
+
+        began = time.perf_counter()
+        index = DocumentIndex(document)
+        for entity in entities:
+            extractor.extract_window(document, entity, WindowLevel.SENTENCE, 3, index=index)
+            extractor.extract_window(document, entity, WindowLevel.PARAGRAPH, index=index)
+            extractor.extract_surrounding_entities(entity, entities, 200, index=index)
+        shared = time.perf_counter() - began
+
+        # Per-entity splits are too slow for all 2,000; time a sample and scale
+        sample = entities[::20]
+        began = time.perf_counter()
+        for entity in sample:
+            extractor.extract_window(document, entity, WindowLevel.SENTENCE, 3)
+            extractor.extract_window(document, entity, WindowLevel.PARAGRAPH)
+            extractor.extract_surrounding_entities(entity, entities, 200)
+        per_entity = (time.perf_counter() - began) * len(entities) / len(sample)
+
+        print(
+            f"{len(entities)} entities over {len(document)} chars: shared index {shared * 1000:.0f} ms, "
+            f"per-entity splits {per_entity * 1000:.0f} ms (estimated)"
+        )
+        assert shared * 5 < per_entity
@@ -0,0 +1,287 @@
+"""
+Unit tests for cross-document entity resolution.
+
+Titled, shortened and misspelled names of an entity in later documents must
+resolve to the canonical entity first stored and produce merge records, while
+ambiguous name parts and other entity types stay separate; the index must
+answer the same after reopening from its journal, after compaction into
+memory-mapped generations and after a change of blocking parameters, and only
+one resolver may hold it open; uncommitted resolutions must leave no trace
+once discarded; and GraphStorageService must store resolved entities under
+canonical ids, one record per id, committing a resolution only after its
+upsert succeeds. The benchmark resolves documents against 5K and 40K
+canonical entities.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+from src.core.entity_blocking import CandidateBlockingIndex
+from src.database import CrossDocumentResolver, GraphStorageService
+from src.database.entity_resolution import entity_storage_id
+from tests.unit.test_entity_registry_blocking import make_names
+
+
+def person(text):
+    return {"type": "PERSON", "text": text}
+
+
+def documents(names, size=50):
+    return [
+        (f"doc_{i // size}", [person(name) for name in names[i:i + size]])
+        for i in range(0, len(names), size)
+    ]
+
+
+def resolve_all(resolver, docs):
+    return [resolver.resolve_entities(document_id, entities) for document_id, entities in docs]
+
+
+class TestResolution:
+    """Resolution of mentions against canonical entities."""
+
+    def test_variants_join_first_entity(self, tmp_path):
+        resolver = CrossDocumentResolver(tmp_path)
+        first = resolver.resolve_entities("doc_1", [
+            person("Hon. Jane Doe"), {"type": "ORGANIZATION", "text": "Acme Holdings Corporation"}
+        ])
+        jane_id, acme_id = first.entity_ids
+        assert first.created == 2 and first.merges == []
+        assert jane_id == entity_storage_id("PERSON", "Hon. Jane Doe")
+
+        second = resolver.resolve_entities("doc_2", [
+            person("Judge Doe"), person("Jane Do"), person("jane doe"),
+            {"type": "ORGANIZATION", "text": "ACME Holdings Corp."}, person("John Roe")
+        ])
+        assert second.entity_ids[:4] == [jane_id, jane_id, jane_id, acme_id]
+        assert second.canonical_texts[:4] == ["Hon. Jane Doe"] * 3 + ["Acme Holdings Corporation"]
+        assert second.created == 1
+
+        methods = {merge.mention_text: merge.method for merge in second.merges}
+        assert methods == {
+            "Judge Doe": "name_part", "Jane Do": "similarity",
+            "jane doe": "similarity", "ACME Holdings Corp.": "similarity"
+        }
+        merge = second.merges[0]
+        assert (merge.document_id, merge.mention_id, merge.canonical_id) == (
+            "doc_2", entity_storage_id("PERSON", "Judge Doe"), jane_id
+        )
+        logged = [json.loads(line) for line in (tmp_path / "merges.jsonl").read_text().splitlines()]
+        assert [record["mention_text"] for record in logged] == [m.mention_text for m in second.merges]
+
+    def test_ambiguous_parts_and_other_types_stay_separate(self, tmp_path):
+        resolver = CrossDocumentResolver(tmp_path)
+        stored = resolver.resolve_entities("doc_1", [person("Jane Doe"), person("John Doe")])
+        assert len(set(stored.entity_ids)) == 2
+
+        later = resolver.resolve_entities("doc_2", [
+            person("Judge Doe"), {"type": "ORGANIZATION", "text": "Jane Doe"}
+        ])
+        assert later.created == 2 and later.merges == []
+        assert not set(later.entity_ids) & set(stored.entity_ids)
+
+    def test_mentions_of_one_document_resolve_together(self, tmp_path):
+        resolver = CrossDocumentResolver(tmp_path)
+        result = resolver.resolve_entities("doc_1", [person("Hon. Jane Doe"), person("Jane Doe")])
+
+        assert result.entity_ids[0] == result.entity_ids[1]
+        assert result.created == 1 and len(result.merges) == 1
+
+
+class TestCommit:
+    """Uncommitted resolutions and the single-writer lock."""
+
+    def test_commit_writes_journal_and_merges(self, tmp_path):
+        resolver = CrossDocumentResolver(tmp_path)
+        resolver.resolve_entities("doc_1", [person("Hon. Jane Doe")])
+
+        result = resolver.resolve_entities("doc_2", [person("Jane Doe"), person("John Roe")], commit=False)
+        assert not (tmp_path / "merges.jsonl").exists()
+        with pytest.raises(RuntimeError):
+            resolver.resolve_entities("doc_3", [person("Jane Doe")])
+
+        resolver.commit(result)
+        assert len((tmp_path / "merges.jsonl").read_text().splitlines()) == 1
+        with pytest.raises(RuntimeError):
+            resolver.commit(result)
+        resolver.close()
+        assert len(CrossDocumentResolver(tmp_path)) == 2
+
+    def test_discard_drops_uncommitted_entities(self, tmp_path):
+        resolver = CrossDocumentResolver(tmp_path)
+        stored = resolver.resolve_entities("doc_1", [person("Hon. Jane Doe")])
+
+        resolver.resolve_entities("doc_2", [person("Jane Doe"), person("John Roe")], commit=False)
+        resolver.discard()
+
+        assert len(resolver) == 1 and not (tmp_path / "merges.jsonl").exists()
+        again = resolver.resolve_entities("doc_3", [person("John Roe")])
+        assert again.created == 1 and again.entity_ids[0] not in stored.entity_ids
+
+    def test_one_resolver_per_index(self, tmp_path):
+        resolver = CrossDocumentResolver(tmp_path)
+        with pytest.raises(RuntimeError):
+            CrossDocumentResolver(tmp_path)
+
+        resolver.close()
+        CrossDocumentResolver(tmp_path).close()
+
+
+class TestPersistence:
+    """The index answers the same after reopening and compaction."""
+
+    @pytest.fixture(scope="class")
+    def docs(self):
+        return documents(make_names(1500, seed=4))
+
+    @pytest.fixture(scope="class")
+    def queries(self):
+        return documents(make_names(1800, seed=4)[1500:])
+
+    def test_reopen_replays_journal(self, tmp_path, docs, queries):
+        resolver = CrossDocumentResolver(tmp_path / "index")
+        resolve_all(resolver, docs)
+        resolver.close()
+        pending = CrossDocumentResolver(tmp_path / "pending")
+        resolve_all(pending, docs)
+        reopened = CrossDocumentResolver(tmp_path / "index")
+
+        assert len(reopened) == len(pending)
+        assert reopened.get_statistics()["generation"] == 1
+        assert resolve_all(reopened, queries) == resolve_all(pending, queries)
+
+    def test_compaction_gives_same_answers(self, tmp_path, docs, queries):
+        compacted = CrossDocumentResolver(tmp_path / "compacted", compact_threshold=200)
+        pending = CrossDocumentResolver(tmp_path / "pending")
+
+        for document_id, entities in docs + queries:
+            expected = pending.resolve_entities(document_id, entities)
+            assert compacted.resolve_entities(document_id, entities) == expected
+
+        statistics = compacted.get_statistics()
+        assert statistics["generation"] > 2
+        assert statistics["pending_names"] < 200
+        assert [path.name for path in (tmp_path / "compacted").glob("generation_*")] == [
+            f"generation_{statistics['generation']:06d}"
+        ]
+        assert isinstance(compacted._base["texts"].base, np.memmap)
+
+        compacted.close()
+        reopened = CrossDocumentResolver(tmp_path / "compacted")
+        assert resolve_all(reopened, queries[:2]) == resolve_all(pending, queries[:2])
+
+    def test_torn_journal_entry_is_ignored(self, tmp_path, docs):
+        resolver = CrossDocumentResolver(tmp_path)
+        resolve_all(resolver, docs[:3])
+        resolver.close()
+        with open(tmp_path / "generation_000001" / "journal.jsonl", "a") as f:
+            f.write('{"document_id": "doc_x", "entit')
+
+        assert len(CrossDocumentResolver(tmp_path)) == len(resolver)
+
+    def test_blocking_parameters_change(self, tmp_path, docs):
+        resolver = CrossDocumentResolver(tmp_path)
+        stored = resolve_all(resolver, docs[:5])
+        resolver.compact()
+        resolver.close()
+
+        rekeyed = CrossDocumentResolver(tmp_path, blocking=CandidateBlockingIndex(bands=12))
+        again = resolve_all(rekeyed, docs[:5])
+        assert [r.entity_ids for r in again] == [r.entity_ids for r in stored]
+        assert sum(r.created for r in again) == 0
+
+
+class TestGraphStorageResolution:
+    """store_entities with a resolver."""
+
+    async def test_stores_canonical_records(self, tmp_path):
+        posted = []
+
+        def handler(request):
+            posted.append(json.loads(request.content))
+            return httpx.Response(201, json=posted[-1])
+
+        service = GraphStorageService("http://supabase.test", "key", resolver=CrossDocumentResolver(tmp_path))
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            first = await service.store_entities("doc_1", [person("Hon. Jane Doe")])
+            second = await service.store_entities("doc_2", [
+                person("Jane Doe"), person("Judge Doe"), person("John Roe")
+            ])
+        finally:
+            await service.close()
+
+        assert second[0] == first[0] and len(second) == 2
+        records = {record["entity_id"]: record for record in posted[1]}
+        jane = records[first[0]]
+        assert jane["entity_text"] == "Hon. Jane Doe"
+        assert jane["metadata"]["mention_text"] == "Jane Doe"
+        assert jane["metadata"]["aliases"] == ["Judge Doe"]
+        assert "mention_text" not in records[second[1]]["metadata"]
+
+    async def test_failed_upsert_commits_nothing(self, tmp_path):
+        failing = {"doc_2"}
+
+        def handler(request):
+            records = json.loads(request.content)
+            if records[0]["first_seen_document_id"] in failing:
+                return httpx.Response(503)
+            return httpx.Response(201, json=records)
+
+        service = GraphStorageService("http://supabase.test", "key", resolver=CrossDocumentResolver(tmp_path))
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            first = await service.store_entities("doc_1", [person("Hon. Jane Doe")])
+            with pytest.raises(httpx.HTTPStatusError):
+                await service.store_entities("doc_2", [person("Jane Doe"), person("John Roe")])
+            assert not (tmp_path / "merges.jsonl").exists()
+            assert len(service.resolver) == 1
+
+            third = await service.store_entities("doc_3", [person("John Roe"), person("Judge Doe")])
+        finally:
+            await service.close()
+
+        assert len(service.resolver) == 2
+        assert third[1] == first[0]
+        merges = [json.loads(line) for line in (tmp_path / "merges.jsonl").read_text().splitlines()]
+        assert [merge["document_id"] for merge in merges] == ["doc_3"]
+
+
+@pytest.mark.performance
+class TestResolutionCost:
+    """Per-mention resolution against N canonical entities."""
+
+    def measure(self, tmp_path, count):
+        names = make_names(count + 1000, seed=6, repeat=0.2)
+        resolver = CrossDocumentResolver(tmp_path / str(count), compact_threshold=count)
+        resolve_all(resolver, documents(names[:count], size=500))
+        resolver.compact()
+        resolver.close()
+
+        began = time.perf_counter()
+        reopened = CrossDocumentResolver(tmp_path / str(count))
+        opened = time.perf_counter() - began
+
+        began = time.perf_counter()
+        resolve_all(reopened, documents(names[count:], size=500))
+        per_mention = (time.perf_counter() - began) / 1000
+
+        print(
+            f"{len(reopened)} canonical entities: open {opened * 1000:.1f} ms, "
+            f"{per_mention * 1000:.2f} ms per mention"
+        )
+        return opened, per_mention
+
+    @pytest.mark.slow
+    def test_scaling_5k_40k(self, tmp_path):
+        small_open, small = self.measure(tmp_path, 5_000)
+        large_open, large = self.measure(tmp_path, 40_000)
+
+        # Buckets fill up to their caps as the index grows, then stop growing
+        assert large_open < 0.5
+        assert large < small * 4
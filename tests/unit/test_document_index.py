@@ -0,0 +1,215 @@
+"""
+Unit tests for the shared document structure index.
+
+Each stage must produce the same result with a DocumentIndex as with its own
+scans, while the index scans each structure of the document once. A regex
+sentence splitter stands in for NLTK's punkt model.
+"""
+
+import re
+
+import pytest
+
+from src.core.document_index import DocumentIndex
+from src.core.page_batch_processor import PageBatchProcessor
+from src.core.smart_chunker import SmartChunker, strip_span
+from tests.unit.test_smart_chunker_scaling import make_document
+
+
+def split_sentences(text):
+    return [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+
+
+def paragraph_document(size, seed):
+    return make_document(size, seed=seed).replace("\n\n", "\n\n\n").replace(".\n", ".\n\n")
+
+
+@pytest.fixture
+def chunker():
+    return SmartChunker()
+
+
+class TestDocumentIndex:
+    """Offset arrays and bisect queries."""
+
+    def test_lines_pages_and_paragraphs(self):
+        text = "first line\nsecond\n\nthird para\fpage two\n"
+        index = DocumentIndex.build(text)
+
+        assert index.line_starts == [0, 11, 18, 19, 39]
+        assert index.line_spans() == SmartChunker()._line_spans(text)
+        assert [text[s:e] for s, e in index.page_spans()] == text.split("\f")
+        assert [text[s:e] for s, e in index.paragraph_spans] == ["first line\nsecond", "third para\fpage two\n"]
+
+        assert index.line_of(0) == 0
+        assert index.line_of(text.index("third")) == 3
+        assert index.page_of(text.index("page two")) == 1
+        assert index.paragraph_of(text.index("second")) == 0
+        assert index.paragraph_of(text.index("third")) == 1
+
+    def test_sentences_located_in_order(self):
+        text = "The court held. It was right!  Was it? Yes."
+        index = DocumentIndex(text, sentence_splitter=split_sentences)
+
+        assert [text[s:e] for s, e in index.sentence_spans] == split_sentences(text)
+        assert index.sentence_of(text.index("right")) == 1
+        assert index.sentence_of(len(text) - 1) == 3
+
+    def test_pattern_scanned_once_and_shared(self):
+        text = make_document(20_000, seed=1)
+        index = DocumentIndex(text)
+
+        first = re.compile(r"\d+ U\.S\. \d+")
+        second = re.compile(r"\d+ U\.S\. \d+")
+        assert index.spans(first) == [m.span() for m in first.finditer(text)]
+        # A separately compiled copy of the pattern reuses the first scan
+        assert index.spans(second) is index.spans(first)
+
+        calls = []
+        assert index.memo("key", lambda: calls.append(1) or "value") == "value"
+        assert index.memo("key", lambda: calls.append(1) or "other") == "value"
+        assert calls == [1]
+
+    def test_spans_within_matches_windowed_scan(self, chunker):
+        text = paragraph_document(50_000, seed=2)
+        index = DocumentIndex(text)
+        pattern = chunker.paragraph_break_pattern
+        for start, end in [(0, len(text)), (1234, 20_000), (30_000, 49_000)]:
+            start, end = strip_span(text, start, end)
+            assert index.spans_within(pattern, start, end) == [
+                m.span() for m in pattern.finditer(text, start, end)
+            ]
+
+
+class TestStagesWithIndex:
+    """Stages give identical results with and without the index."""
+
+    def test_legal_boundaries(self, chunker):
+        text = make_document(100_000, seed=3)
+        index = DocumentIndex(text)
+
+        boundaries = chunker._find_legal_boundaries(text, index)
+        assert boundaries == chunker._find_legal_boundaries(text)
+        assert chunker._find_legal_boundaries(text, index) is boundaries
+
+    @pytest.mark.parametrize(
+        "method", ["_legal_aware_chunking", "_section_aware_chunking", "_paragraph_aware_chunking"]
+    )
+    def test_structural_chunking(self, chunker, method):
+        text = paragraph_document(100_000, seed=4)
+        index = DocumentIndex(text)
+
+        expected = getattr(chunker, method)(text)
+        chunks = getattr(chunker, method)(text, index)
+        assert [(c.start_pos, c.end_pos, c.metadata) for c in chunks] == [
+            (c.start_pos, c.end_pos, c.metadata) for c in expected
+        ]
+
+    def test_sentence_chunking_uses_index_sentences(self, chunker):
+        text = make_document(30_000, seed=5).replace("\n", " ")
+        index = DocumentIndex(text, sentence_splitter=split_sentences)
+        chunks = chunker._sentence_aware_chunking(text, index)
+
+        assert " ".join(c.text for c in chunks).split() == text.split()
+        starts = {s for s, _ in index.sentence_spans}
+        assert all(c.start_pos in starts for c in chunks)
+
+    def test_index_for_other_text_is_ignored(self, chunker):
+        text = make_document(20_000, seed=6)
+        other = DocumentIndex(text[:10_000])
+
+        assert chunker._find_legal_boundaries(text, other) == chunker._find_legal_boundaries(text)
+        assert chunker.detect_document_type(text, other) == chunker.detect_document_type(text)
+
+    @pytest.mark.parametrize("separator", ["\f", "\nPage 7\n", "\n- 12 -\n"])
+    def test_page_split(self, separator):
+        pages = [make_document(3000, seed=seed) for seed in range(5)]
+        text = separator.join(pages)
+        processor = PageBatchProcessor()
+
+        split = processor._split_into_pages(text, DocumentIndex(text))
+        assert [p.content for p in split] == [p.strip() for p in pages]
+        assert [p.content for p in split] == [p.content for p in processor._split_into_pages(text)]
+
+
+class CountingPattern:
+    """Compiled pattern that counts scans of a whole text."""
+
+    def __init__(self, pattern, scans):
+        self._pattern = pattern
+        self._scans = scans
+
+    def __getattr__(self, name):
+        attr = getattr(self._pattern, name)
+        if name not in ("finditer", "findall", "search", "split"):
+            return attr
+
+        def scan(text, *args, **kwargs):
+            if not args and not kwargs:
+                self._scans[self._pattern.pattern] = self._scans.get(self._pattern.pattern, 0) + 1
+            return attr(text, *args, **kwargs)
+        return scan
+
+
+def counting_chunker(scans):
+    chunker = SmartChunker()
+    for name in ("section_pattern", "citation_pattern", "quote_pattern", "paragraph_break_pattern"):
+        setattr(chunker, name, CountingPattern(getattr(chunker, name), scans))
+    return chunker
+
+
+@pytest.fixture
+def index_builds(monkeypatch):
+    builds = []
+    build = DocumentIndex.build.__func__
+
+    def counting_build(cls, text, **kwargs):
+        builds.append(len(text))
+        return build(cls, text, **kwargs)
+
+    monkeypatch.setattr(DocumentIndex, "build", classmethod(counting_build))
+    return builds
+
+
+class TestPipelineSharesIndex:
+    """Extraction entry points build one index and scan each structure once."""
+
+    async def test_orchestrator_chunked_extraction(self, index_builds):
+        from unittest.mock import AsyncMock, MagicMock
+        from src.core.extraction_orchestrator import ExtractionOrchestrator
+
+        scans = {}
+        orchestrator = ExtractionOrchestrator(
+            prompt_manager=MagicMock(), vllm_client=MagicMock(), smart_chunker=counting_chunker(scans)
+        )
+        orchestrator._extract_three_wave = AsyncMock(
+            return_value={"entities": [], "tokens_used": 0, "waves_executed": 3}
+        )
+        text = paragraph_document(120_000, seed=7)
+
+        await orchestrator._extract_three_wave_chunked(text, MagicMock(), None)
+
+        assert index_builds == [len(text)]
+        assert scans and all(count == 1 for count in scans.values())
+
+    async def test_service_smart_chunked_extraction(self, index_builds):
+        from unittest.mock import AsyncMock, MagicMock
+        pytest.importorskip("lz4")  # response_cache dependency
+        from src.core.extraction_service import ExtractionService
+        from src.models.requests import ExtractionRequest
+
+        scans = {}
+        service = ExtractionService.__new__(ExtractionService)
+        service.logger = MagicMock()
+        service.runtime_config = MagicMock()
+        service._smart_chunker = counting_chunker(scans)
+        service._ai_enhancer = MagicMock()
+        service._ai_enhancer.discover_entities_compatibility = AsyncMock(return_value=([], []))
+        text = paragraph_document(120_000, seed=8)
+
+        await service._run_smart_chunked_ai_enhanced_extraction(
+            ExtractionRequest(document_id="doc", text=text)
+        )
+
+        assert index_builds == [len(text)]
+        assert scans and all(count == 1 for count in scans.values())
@@ -0,0 +1,163 @@
+"""
+Unit tests for entity-density driven chunk sizing.
+
+Dense text (string cites, party lists) must get shorter chunks than
+narrative so the expected entities per chunk stay about the same, recorded
+completion tokens must move the learned tokens-per-match, and page batches
+must hold fewer dense pages than sparse ones.
+"""
+
+import random
+
+import pytest
+
+from src.core.config import get_settings
+from src.core.document_index import DocumentIndex
+from src.core.entity_density import EntityDensityModel
+from src.core.page_batch_processor import DocumentPage, PageBatchProcessor
+from src.core.smart_chunker import DocumentType, SmartChunker
+from src.models.extraction_strategy import PageBatchConfig
+
+
+DENSE = (
+    "See Brown v. Board, 347 U.S. 483; Smith v. Jones, 123 F.2d 456; "
+    "42 U.S.C. § 1983; Acme Holdings Corp. v. United States, 501 F.3d 12. "
+)
+SPARSE = (
+    "the witness testified at some length about the events of that evening and "
+    "the jury heard the testimony without objection from either side. "
+)
+
+
+def make_text(size, dense_every=0, seed=5):
+    rng = random.Random(seed)
+    parts, total, n = [], 0, 0
+    while total < size:
+        sentence = DENSE if dense_every and n % dense_every == 0 else SPARSE
+        if rng.random() < 0.1:
+            sentence += "\n\n"
+        parts.append(sentence)
+        total += len(sentence)
+        n += 1
+    return "".join(parts)[:size]
+
+
+def make_chunker(model, max_size=8000):
+    config = get_settings().chunking.model_copy(
+        update={"chunking_max_size": max_size, "chunking_overlap": 0, "chunking_min_size": 200}
+    )
+    return SmartChunker(config, density_model=model)
+
+
+def make_model(**kwargs):
+    params = {"target_completion_tokens": 1200, "tokens_per_match": 60.0, "baseline_per_kchar": 1.0}
+    params.update(kwargs)
+    return EntityDensityModel(**params)
+
+
+class TestDensitySizing:
+    """Chunk extents follow match density."""
+
+    def test_dense_text_gets_shorter_chunks(self):
+        model = make_model()
+        dense, sparse = make_text(40_000, dense_every=1), make_text(40_000)
+
+        dense_chunks = make_chunker(model)._density_chunking(dense)
+        sparse_chunks = make_chunker(model)._density_chunking(sparse)
+
+        average = lambda chunks: sum(c.length for c in chunks) / len(chunks)
+        assert average(dense_chunks) * 3 < average(sparse_chunks)
+        # Expected entities per chunk stay near the target in both
+        for chunk in dense_chunks[:-1]:
+            assert chunk.metadata["entity_weight"] <= model.target_weight * 1.5
+
+    def test_chunks_cover_document_in_budget(self):
+        model = make_model()
+        text = make_text(60_000, dense_every=3)
+        chunker = make_chunker(model)
+        chunks = chunker._density_chunking(text)
+
+        for chunk in chunks:
+            assert chunk.text == text[chunk.start_pos:chunk.end_pos]
+            assert chunk.length <= chunker.max_size
+        assert " ".join(c.text for c in chunks).split() == text.split()
+
+    def test_adaptive_strategy_uses_density(self):
+        text = make_text(20_000, dense_every=2)
+        chunks = make_chunker(make_model())._adaptive_chunking(text, DocumentType.UNKNOWN)
+
+        assert {c.metadata["strategy"] for c in chunks} == {"entity_density"}
+
+    def test_index_shares_match_scan(self):
+        model = make_model()
+        text = make_text(20_000, dense_every=2)
+        index = DocumentIndex.build(text)
+
+        assert model.match_starts(text, index) == model.match_starts(text)
+        assert model.match_starts(text, index) is model.match_starts(text, index)
+
+    def test_extent_bounds(self):
+        model = make_model()
+        starts = model.match_starts(DENSE * 200)
+
+        assert model.chunk_extent(starts, 0, 100_000, 500, 5000) >= 500
+        assert model.chunk_extent([], 0, 100_000, 500, 5000) == 5000
+        assert model.chunk_extent([], 0, 300, 500, 5000) == 300
+
+
+class TestLearning:
+    """Recorded completion tokens adjust the target weight."""
+
+    def test_record_moves_tokens_per_match(self):
+        model = make_model(smoothing=0.5)
+        before = model.target_weight
+
+        model.record(weight=10.0, completion_tokens=3 * 2400, calls=3)
+
+        assert model.tokens_per_match == pytest.approx(150.0)
+        assert model.samples == 1
+        assert model.target_weight < before
+
+    def test_record_ignores_empty_chunks(self):
+        model = make_model()
+        model.record(weight=0.0, completion_tokens=500)
+        model.record(weight=5.0, completion_tokens=0)
+
+        assert model.samples == 0
+        assert model.tokens_per_match == 60.0
+
+    def test_learned_rate_shrinks_chunks(self):
+        model = make_model()
+        text = make_text(40_000, dense_every=2)
+        before = len(make_chunker(model)._density_chunking(text))
+
+        for _ in range(20):
+            model.record(weight=10.0, completion_tokens=2400)
+
+        assert len(make_chunker(model)._density_chunking(text)) > before
+
+
+class TestPageBatchSizing:
+    """Page batches hold a roughly constant expected entity count."""
+
+    def make_pages(self, content, count=12):
+        return [
+            DocumentPage(
+                page_number=i + 1,
+                content=content,
+                word_count=len(content.split()),
+                char_count=len(content),
+                estimated_complexity="medium"
+            )
+            for i in range(count)
+        ]
+
+    def test_dense_pages_get_smaller_batches(self):
+        processor = PageBatchProcessor(PageBatchConfig(batch_size=3), density_model=make_model())
+
+        dense_batches = processor._create_batches(self.make_pages(DENSE * 4))
+        sparse_batches = processor._create_batches(self.make_pages(SPARSE * 4))
+
+        assert len(dense_batches) > len(sparse_batches)
+        assert all(len(batch.pages) <= 6 for batch in sparse_batches)
+        assert sum(len(batch.pages) for batch in dense_batches) == 12
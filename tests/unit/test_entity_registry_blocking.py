@@ -0,0 +1,322 @@
+"""
+Unit tests for candidate blocking in EntityRegistry.
+
+The LCS kernel must bound SequenceMatcher from above and sequence_ratio must
+return SequenceMatcher's ratio whenever it reaches the cutoff; similarity
+scores computed against a threshold must decide exactly as the full scores;
+blocking must find titled, misspelled and short name variants; and a
+registry with blocking must resolve and merge a corpus of such variants as
+the registry scoring every entity of a type does, and nearly so when
+variants are noisier. An index saved as arrays and loaded again must find
+what the live index finds. The benchmarks time candidate search against 1K, 10K
+and 100K registered entities.
+"""
+
+import random
+import time
+
+import pytest
+from difflib import SequenceMatcher
+
+from src.core.entity_blocking import CandidateBlockingIndex, lcs_ratio, sequence_ratio
+from src.core.entity_registry import EntityRegistry
+from src.models.entities import Entity, EntityType, ExtractionMethod, TextPosition
+from src.models.registry import RegisteredEntity
+
+
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiou"
+
+
+def make_name(rng):
+    word = lambda: "".join(
+        rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.choice([2, 3, 4]))
+    ).capitalize()
+    return f"{word()} {word()}"
+
+
+def misspell(rng, text):
+    i = rng.choice([i for i, char in enumerate(text) if char != " "])
+    return text[:i] + rng.choice(VOWELS) + text[i + 1:]
+
+
+def make_names(count, seed=0, repeat=0.3, noisy=False):
+    """
+    Names where a share repeat are titled or misspelled earlier names; noisy
+    variants also drop the first name (which can tie between several
+    earlier names), carry two misspellings or lose the space.
+    """
+    rng = random.Random(seed)
+    bases, names = [], []
+    for _ in range(count):
+        if bases and rng.random() < repeat:
+            base = rng.choice(bases)
+            forms = [base, "Hon. " + base, misspell(rng, base)]
+            if noisy:
+                forms += [
+                    base.split()[-1], misspell(rng, misspell(rng, base)),
+                    base.replace(" ", rng.choice(VOWELS))
+                ]
+            names.append(rng.choice(forms))
+        else:
+            bases.append(make_name(rng))
+            names.append(bases[-1])
+    return names
+
+
+def make_entity(text, entity_type=EntityType.PARTY, subtype="individual"):
+    return Entity(
+        text=text,
+        cleaned_text=text.replace("Hon. ", ""),
+        entity_type=entity_type,
+        entity_subtype=subtype,
+        confidence_score=0.9,
+        extraction_method=ExtractionMethod.REGEX_ONLY,
+        position=TextPosition(start=0, end=len(text))
+    )
+
+
+def make_registered(text, variants=(), entity_type=EntityType.PARTY, chunk=0):
+    return RegisteredEntity(
+        canonical_text=text.replace("Hon. ", ""),
+        entity_type=entity_type,
+        entity_subtype="individual",
+        all_variants={text, text.replace("Hon. ", ""), *variants},
+        aggregate_confidence=0.9,
+        first_seen_chunk=f"chunk_{chunk}",
+        last_seen_chunk=f"chunk_{chunk}",
+        chunk_span=(chunk, chunk)
+    )
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return EntityRegistry("doc", "doc", 100, enable_caching=False)
+
+
+class TestSimilarityKernel:
+    """Bounds and cutoffs around SequenceMatcher."""
+
+    def test_lcs_ratio_bounds_sequence_matcher(self):
+        rng = random.Random(1)
+        for _ in range(3000):
+            a = "".join(rng.choice("abcde ") for _ in range(rng.randrange(0, 30)))
+            b = "".join(rng.choice("abcde ") for _ in range(rng.randrange(1, 30)))
+            assert lcs_ratio(a, b) >= SequenceMatcher(None, a, b).ratio()
+        assert lcs_ratio("abcbdab", "bdcaba") == pytest.approx(2 * 4 / 13)
+
+    def test_sequence_ratio_is_exact_above_cutoff(self):
+        rng = random.Random(2)
+        names = make_names(400, seed=2)
+        for _ in range(3000):
+            a, b = rng.choice(names).lower(), rng.choice(names).lower()
+            exact = SequenceMatcher(None, a, b).ratio()
+            for cutoff in (0.0, 0.5, 0.8):
+                ratio = sequence_ratio(a, b, cutoff)
+                if exact >= cutoff:
+                    assert ratio == exact
+                else:
+                    assert exact <= ratio < cutoff
+
+    def test_thresholded_scores_decide_as_full_scores(self, registry):
+        rng = random.Random(3)
+        names = make_names(600, seed=3)
+        for _ in range(1500):
+            text, other = rng.choice(names), rng.choice(names)
+            entity = make_entity(text, subtype=rng.choice(["individual", "corporation"]))
+            registered = make_registered(
+                other, [rng.choice(names)], rng.choice([EntityType.PARTY, EntityType.PLAINTIFF]),
+                chunk=rng.randrange(5)
+            )
+            for threshold in (0.85, 0.7, 0.5):
+                full, full_features = registry._calculate_similarity(entity, registered)
+                score, features = registry._calculate_similarity(entity, registered, threshold)
+                assert (score >= threshold) == (full >= threshold)
+                if full >= threshold:
+                    assert (score, features) == (full, full_features)
+
+            peer = make_registered(text, chunk=rng.randrange(5))
+            for threshold in (0.85, 0.7):
+                full, _ = registry._calculate_similarity_between_registered(registered, peer)
+                score, _ = registry._calculate_similarity_between_registered(registered, peer, threshold)
+                assert (score >= threshold) == (full >= threshold)
+                if full >= threshold:
+                    assert score == full
+
+
+class TestBlockingIndex:
+    """Blocking keys of name variants."""
+
+    def test_variants_share_keys(self):
+        index = CandidateBlockingIndex()
+        for key, name in enumerate([
+            "Hon. Jane Doe", "Smith", "Acme Holdings Corporation", "Baker Botts LLP", "Robert Nguyen"
+        ]):
+            index.add(key, name, EntityType.PARTY)
+
+        assert index.candidates("Jane Doe", EntityType.PARTY) == {0}
+        assert index.candidates("Smyth", EntityType.PARTY) == {1}
+        assert index.candidates("ACME HOLDING CORP.", EntityType.PARTY) == {2}
+        assert index.candidates("Baker Bots", EntityType.PARTY) == {3}
+        assert index.candidates("Robrt Ngeyen", EntityType.PARTY) == {4}
+        assert index.candidates("Zed Quux", EntityType.PARTY) == set()
+        assert index.candidates("Jane Doe", EntityType.JUDGE) == set()
+
+    def test_common_tokens_are_skipped(self):
+        index = CandidateBlockingIndex(max_token_bucket=5)
+        for key in range(10):
+            index.add(key, f"Smith {make_name(random.Random(key))}")
+
+        assert len(index.candidates("Smith")) < 10
+        assert len(index) == 10
+
+    def test_large_band_buckets_can_be_skipped(self):
+        capped = CandidateBlockingIndex(max_token_bucket=2, max_band_bucket=2)
+        uncapped = CandidateBlockingIndex(max_token_bucket=2)
+        for key in range(5):
+            capped.add(key, "Jane Doe")
+            uncapped.add(key, "Jane Doe")
+
+        assert capped.candidates("Jane Doe") == set()
+        assert uncapped.candidates("Jane Doe") == set(range(5))
+
+    def test_arrays_round_trip(self):
+        names = make_names(400, seed=11)
+        smiths = [f"Smith {make_name(random.Random(key))}" for key in range(6)]
+        live = CandidateBlockingIndex(max_token_bucket=5)
+        for key, name in [*enumerate(names[:300]), *zip(range(1000, 1003), smiths[:3])]:
+            live.add(key, name, EntityType.PARTY)
+        loaded = CandidateBlockingIndex(max_token_bucket=5)
+        loaded.from_arrays(*live.to_arrays())
+
+        # Later names, loaded names again, and a token whose bucket only
+        # exceeds the limit across the loaded and added parts
+        for key, name in [
+            *enumerate(names[300:], start=300), (0, names[0]), *zip(range(1003, 1006), smiths[3:])
+        ]:
+            live.add(key, name, EntityType.PARTY)
+            loaded.add(key, name, EntityType.PARTY)
+
+        saved_again = CandidateBlockingIndex(max_token_bucket=5)
+        saved_again.from_arrays(*loaded.to_arrays())
+        assert len(loaded) == len(saved_again) == len(live)
+        for name in names + smiths + ["Smith"]:
+            expected = live.candidates(name, EntityType.PARTY)
+            assert loaded.candidates(name, EntityType.PARTY) == expected
+            assert saved_again.candidates(name, EntityType.PARTY) == expected
+
+
+class TestRegistryBlocking:
+    """A blocked registry resolves entities as the full registry does."""
+
+    @pytest.fixture(scope="class")
+    def names(self):
+        return make_names(800, seed=5)
+
+    @pytest.fixture(scope="class")
+    def full(self):
+        return EntityRegistry("doc", "doc", 100, enable_caching=False, candidate_blocking=False)
+
+    async def register(self, registry, names):
+        registry.entities = {}
+        registry._rebuild_indices()
+        ids = []
+        for i, name in enumerate(names):
+            entity_type = EntityType.JUDGE if i % 7 == 0 else EntityType.PARTY
+            ids.append(await registry.register_entity(make_entity(name, entity_type), f"chunk_{i // 25}", i // 25))
+        first = {}
+        return [first.setdefault(entity_id, i) for i, entity_id in enumerate(ids)]
+
+    def populate(self, registry, names):
+        # Same entities in the same order; registration order decides merges
+        registry.entities = {}
+        for i, name in enumerate(dict.fromkeys(names)):
+            entity = make_registered(name, chunk=i // 25)
+            entity.id = f"entity_{i}"
+            entity.total_occurrences = 1
+            registry.entities[entity.id] = entity
+        registry._rebuild_indices()
+
+    async def test_same_resolution(self, names, registry, full):
+        blocked_groups = await self.register(registry, names)
+        full_groups = await self.register(full, names)
+
+        assert full.blocking_index is None
+        assert blocked_groups == full_groups
+        assert len(registry.entities) == len(full.entities) < len(names)
+
+        # Rebuilt indices (as after loading a snapshot) block the same way
+        probe = make_entity(names[3])
+        before = registry.blocking_index.candidates_for_all({probe.text}, probe.entity_type)
+        registry._rebuild_indices()
+        assert registry.blocking_index.candidates_for_all({probe.text}, probe.entity_type) == before
+
+    async def test_same_merges(self, names, registry, full):
+        self.populate(registry, names)
+        self.populate(full, names)
+
+        blocked_merges = await registry.merge_duplicates(aggressive=True)
+        full_merges = await full.merge_duplicates(aggressive=True)
+
+        assert len(full_merges) > 0
+        assert blocked_merges == full_merges
+        assert sorted(registry.entities) == sorted(full.entities)
+
+    async def test_noisy_variants_mostly_agree(self, registry, full):
+        # Blocking is approximate: a variant sharing no token and few 3-grams
+        # with its base can be missed
+        names = make_names(1500, seed=7, noisy=True)
+        blocked_groups = await self.register(registry, names)
+        full_groups = await self.register(full, names)
+
+        differing = sum(a != b for a, b in zip(blocked_groups, full_groups))
+        assert differing <= len(names) // 100
+
+
+@pytest.mark.performance
+class TestCandidateSearchCost:
+    """Candidate search per new entity against N registered entities."""
+
+    def populate(self, registry, count):
+        registry.entities = {}
+        for i, name in enumerate(make_names(count, seed=9, repeat=0.0)):
+            entity = make_registered(name, chunk=i // 50)
+            registry.entities[entity.id] = entity
+        registry._rebuild_indices()
+
+    async def measure(self, registry, count, full_sample):
+        self.populate(registry, count)
+        queries = [make_entity(name) for name in make_names(count + 200, seed=9)[count:]]
+
+        began = time.perf_counter()
+        for entity in queries:
+            await registry._find_similar_entities(entity)
+        blocked = (time.perf_counter() - began) / len(queries)
+
+        index, registry.blocking_index = registry.blocking_index, None
+        try:
+            began = time.perf_counter()
+            for entity in queries[:full_sample]:
+                await registry._find_similar_entities(entity)
+            full = (time.perf_counter() - began) / full_sample
+        finally:
+            registry.blocking_index = index
+
+        print(
+            f"{count} registered: blocked {blocked * 1000:.2f} ms, "
+            f"full type scan {full * 1000:.1f} ms per new entity"
+        )
+        return blocked, full
+
+    async def test_scaling_1k_10k(self, registry):
+        small_blocked, small_full = await self.measure(registry, 1_000, 50)
+        large_blocked, large_full = await self.measure(registry, 10_000, 10)
+
+        assert small_blocked * 5 < small_full
+        assert large_blocked * 20 < large_full
+
+    @pytest.mark.slow
+    async def test_scaling_100k(self, registry):
+        blocked, full = await self.measure(registry, 100_000, 2)
+
+        assert blocked * 50 < full
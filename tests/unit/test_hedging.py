@@ -0,0 +1,194 @@
+"""
+Unit tests for hedged requests across vLLM instruct replicas.
+
+Covers the hedge budget, hedge delay selection, replica health,
+HedgedVLLMClient end-to-end against two local mock vLLM servers, and the
+process-wide hedged client API requests share.
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.vllm_performance_optimizer import DocumentSizeTier
+from src.core.config import get_settings
+from src.vllm_client.client import HTTPVLLMClient
+from src.vllm_client.factory import close_shared_clients
+from src.vllm_client.hedging import HedgeBudget, HedgedVLLMClient
+from src.vllm_client.models import VLLMConfig, VLLMServiceType
+from src.vllm_client.replica_pool import ReplicaPool
+from tests.unit.mock_vllm_server import MockVLLMServer
+from tests.unit.test_admission_control import make_request
+
+
+def make_replica(server: MockVLLMServer) -> HTTPVLLMClient:
+    config = VLLMConfig(instruct_url=server.base_url, instruct_model=server.model, http_timeout=30)
+    return HTTPVLLMClient(config=config, service_type=VLLMServiceType.INSTRUCT)
+
+
+@pytest.fixture
+async def servers():
+    async with MockVLLMServer(base_latency_s=0.02) as primary, MockVLLMServer(base_latency_s=0.02) as secondary:
+        yield primary, secondary
+
+
+class TestHedgeBudget:
+    """Token bucket limiting hedge volume."""
+
+    def test_budget_earns_credit_per_primary_call(self):
+        budget = HedgeBudget(ratio=0.25)
+        spent = 0
+        for _ in range(20):
+            budget.deposit()
+            spent += budget.try_spend()
+        assert spent == 5
+
+    def test_zero_ratio_never_hedges(self):
+        budget = HedgeBudget(ratio=0.0)
+        for _ in range(100):
+            budget.deposit()
+        assert not budget.try_spend()
+
+
+class TestHedgeDelay:
+    """Per-tier delay from observed latencies."""
+
+    def test_default_until_enough_samples(self):
+        client = HedgedVLLMClient([object()], min_samples=5, default_hedge_delay_ms=1000, min_hedge_delay_ms=50)
+        assert client.hedge_delay_ms(DocumentSizeTier.SMALL) == 1000
+
+        for latency in range(100, 200, 5):
+            client.profiler.record_request(DocumentSizeTier.SMALL, response_time_ms=latency, tokens_processed=10)
+
+        delay = client.hedge_delay_ms(DocumentSizeTier.SMALL)
+        assert 180 <= delay <= 195
+        assert client.hedge_delay_ms(DocumentSizeTier.LARGE) == 1000
+
+    def test_min_delay_floor(self):
+        client = HedgedVLLMClient([object()], min_samples=1, min_hedge_delay_ms=500)
+        client.profiler.record_request(DocumentSizeTier.SMALL, response_time_ms=10, tokens_processed=10)
+        assert client.hedge_delay_ms(DocumentSizeTier.SMALL) == 500
+
+
+class TestHedgedClient:
+    """End-to-end hedging against two mock replicas."""
+
+    async def test_slow_primary_is_hedged_and_cancelled(self, servers):
+        primary, secondary = servers
+        primary.slowdown = 50.0  # ~1s
+        client = HedgedVLLMClient(
+            [make_replica(primary), make_replica(secondary)],
+            budget_ratio=1.0,
+            min_hedge_delay_ms=0,
+            default_hedge_delay_ms=100
+        )
+
+        response = await asyncio.wait_for(client.generate_chat_completion(make_request()), timeout=0.8)
+
+        assert response.content == '{"entities": []}'
+        assert secondary.stats.requests == 1
+        assert client.stats.hedges_sent == 1
+        assert client.stats.hedge_wins == 1
+        assert client.stats.losers_cancelled == 1
+        assert client.get_stats()["hedging"]["hedge_win_rate"] == 1.0
+        await client.close()
+
+    async def test_fast_primary_is_not_hedged(self, servers):
+        primary, secondary = servers
+        client = HedgedVLLMClient(
+            [make_replica(primary), make_replica(secondary)],
+            budget_ratio=1.0,
+            min_hedge_delay_ms=0,
+            default_hedge_delay_ms=500
+        )
+
+        await asyncio.gather(*(client.generate_chat_completion(make_request()) for _ in range(4)))
+
+        assert client.stats.hedges_sent == 0
+        assert primary.stats.requests + secondary.stats.requests == 4
+        await client.close()
+
+    async def test_exhausted_budget_waits_for_primary(self, servers):
+        primary, secondary = servers
+        primary.slowdown = 10.0
+        client = HedgedVLLMClient(
+            [make_replica(primary), make_replica(secondary)],
+            budget_ratio=0.0,
+            min_hedge_delay_ms=0,
+            default_hedge_delay_ms=50
+        )
+
+        response = await client.generate_chat_completion(make_request())
+
+        assert response.content == '{"entities": []}'
+        assert secondary.stats.requests == 0
+        assert client.stats.budget_denied == 1
+        await client.close()
+
+    async def test_failed_primary_falls_back_to_hedge(self, servers):
+        primary, secondary = servers
+        primary.slowdown = 10.0
+        primary.fail_status = 500
+        client = HedgedVLLMClient(
+            [make_replica(primary), make_replica(secondary)],
+            budget_ratio=1.0,
+            min_hedge_delay_ms=0,
+            default_hedge_delay_ms=50
+        )
+
+        response = await client.generate_chat_completion(make_request())
+
+        assert response.content == '{"entities": []}'
+        assert client.stats.hedge_wins == 1
+        await client.close()
+
+    async def test_unhealthy_replica_is_skipped(self, servers):
+        primary, secondary = servers
+        primary.fail_status = 500
+        pool = ReplicaPool([make_replica(primary), make_replica(secondary)], failure_threshold=2)
+        client = HedgedVLLMClient(pool, budget_ratio=0.0)
+        pool.replicas[1].unhealthy_until = float("inf")
+
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await client.generate_chat_completion(make_request())
+
+        pool.replicas[1].unhealthy_until = 0.0
+        for _ in range(3):
+            await client.generate_chat_completion(make_request())
+
+        assert primary.stats.requests == 2
+        assert secondary.stats.requests == 3
+        assert not client.get_stats()["replicas"][0]["healthy"]
+        await client.close()
+
+
+class TestSharedHedgedClient:
+    """One hedged client per process for extraction requests."""
+
+    async def test_requests_share_profiler_and_budget(self, servers, monkeypatch):
+        from src.api.routes.intelligent import get_extraction_orchestrator
+
+        primary, secondary = servers
+        config = VLLMConfig(
+            instruct_url=primary.base_url,
+            instruct_replica_urls=[secondary.base_url],
+            instruct_model=primary.model,
+            http_timeout=30
+        )
+        monkeypatch.setattr(VLLMConfig, "from_settings", classmethod(lambda cls, settings=None: config))
+        monkeypatch.setattr(get_settings().vllm_direct, "vllm_enable_hedging", True)
+
+        try:
+            first = await get_extraction_orchestrator()
+            await first.vllm_client.generate_chat_completion(make_request())
+            second = await get_extraction_orchestrator()
+        finally:
+            await close_shared_clients()
+
+        client = first.vllm_client
+        assert isinstance(client, HedgedVLLMClient)
+        assert second.vllm_client is client
+        # The second request sees the latency sample and credit the first one earned
+        assert client.profiler._total_requests == 1
+        assert client.budget.credit > 0
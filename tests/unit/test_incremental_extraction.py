@@ -0,0 +1,256 @@
+"""
+Unit tests for incremental re-extraction of edited documents.
+
+A regex extractor stands in for the wave extraction: it finds single-word
+party names and numbers, so a full extraction of the new text is the ground
+truth the incremental result must match while re-extracting only the edited
+regions.
+"""
+
+import re
+
+import pytest
+
+from src.core.incremental_extraction import (
+    DocumentVersion,
+    GraphVersionStore,
+    IncrementalExtractor,
+    LocalVersionStore,
+    OffsetMap,
+)
+from src.core.smart_chunker import SmartChunker
+from tests.unit.test_smart_chunker_scaling import make_document
+
+
+PATTERNS = {
+    "PARTY": re.compile(r"\b(?:Brown|Smith|Jones|Board|Zephyr|Quixote)\b"),
+    "NUMBER": re.compile(r"\b\d+\b"),
+}
+
+
+def find_entities(text):
+    return [
+        {"entity_type": entity_type, "text": m.group(), "start_pos": m.start(), "end_pos": m.end()}
+        for entity_type, pattern in PATTERNS.items()
+        for m in pattern.finditer(text)
+    ]
+
+
+def as_set(entities):
+    return {(e["entity_type"], e["text"], e["start_pos"], e["end_pos"]) for e in entities}
+
+
+class FakeExtractor:
+    def __init__(self):
+        self.chars = 0
+        self.calls = 0
+
+    async def __call__(self, text, metadata):
+        self.calls += 1
+        self.chars += len(text)
+        return {"entities": find_entities(text), "tokens_used": len(text) // 4}
+
+
+def edit_line(text, index, new_line):
+    lines = text.split("\n")
+    lines[index] = new_line
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def extract_fn():
+    return FakeExtractor()
+
+
+@pytest.fixture
+def extractor(extract_fn):
+    return IncrementalExtractor(
+        extract_fn, store=LocalVersionStore(), chunker=SmartChunker(),
+        context_margin=200, max_region_size=2000
+    )
+
+
+@pytest.fixture(scope="module")
+def document():
+    return make_document(100_000, seed=12)
+
+
+class TestOffsetMap:
+    """Line-level diff mapped to character offsets."""
+
+    def test_insert_shifts_following_text(self):
+        old = "alpha\nbeta\ngamma\n"
+        new = "alpha\ninserted line\nbeta\ngamma\n"
+        omap = OffsetMap.from_texts(old, new)
+
+        assert omap.map_span(0, 5) == (0, 5)
+        shift = len("inserted line\n")
+        assert omap.map_span(6, 10) == (6 + shift, 10 + shift)
+        assert omap.changed_spans() == [(6, 6 + shift)]
+
+    def test_changed_line_has_no_image(self):
+        omap = OffsetMap.from_texts("one\ntwo\nthree\n", "one\nTWO\nthree\n")
+
+        assert omap.map_span(4, 7) is None
+        # A span reaching into the changed line is not mapped either
+        assert omap.map_span(0, 6) is None
+        assert omap.map_span(8, 13) == (8, 13)
+
+    def test_deletion_is_empty_changed_span(self):
+        omap = OffsetMap.from_texts("a\nb\nc\n", "a\nc\n")
+
+        assert omap.changed_spans() == [(2, 2)]
+        assert omap.map_span(4, 5) == (2, 3)
+
+
+class TestIncrementalExtractor:
+    """Only changed regions are re-extracted; results match a full extraction."""
+
+    async def test_first_version_is_full_extraction(self, extractor, extract_fn, document):
+        result = await extractor.extract("doc", document)
+
+        assert result.full_extraction
+        assert as_set(result.entities) <= as_set(find_entities(document))
+        assert extract_fn.chars >= len(document.strip()) - len(document) // 100
+        assert not result.delta.removed and not result.delta.moved
+
+    async def test_unchanged_version_extracts_nothing(self, extractor, extract_fn, document):
+        first = await extractor.extract("doc", document)
+        calls = extract_fn.calls
+        second = await extractor.extract("doc", document)
+
+        assert extract_fn.calls == calls
+        assert as_set(second.entities) == as_set(first.entities)
+        assert second.stats["chunks_reused"] == len(first.chunks)
+        assert not (second.delta.added or second.delta.removed or second.delta.moved)
+
+    async def test_edit_reextracts_only_changed_region(self, extractor, extract_fn, document):
+        await extractor.extract("doc", document)
+        edited = edit_line(document, 700, "Zephyr agreed to pay 4242 to Quixote.")
+        edited = "Preamble added by Smith in 2024.\n" + edited
+
+        extract_fn.chars = 0
+        result = await extractor.extract("doc", edited)
+
+        assert as_set(result.entities) == as_set(find_entities(edited))
+        assert extract_fn.chars < len(edited) * 0.05
+        assert result.stats["chunks_reused"] > 0
+
+        added = {(e["entity_type"], e["text"]) for e in result.delta.added}
+        assert {("PARTY", "Zephyr"), ("PARTY", "Quixote"), ("NUMBER", "4242"),
+                ("PARTY", "Smith"), ("NUMBER", "2024")} <= added
+        replaced_line = document.split("\n")[700]
+        removed = {(e["entity_type"], e["text"]) for e in result.delta.removed}
+        assert {("NUMBER", n) for n in re.findall(r"\b\d+\b", replaced_line)} <= removed | added
+
+    async def test_moved_paragraph_reported_as_moved(self, extractor, document):
+        lines = document.split("\n")
+        lines[100] = "Zephyr signed 9191."
+        original = "\n".join(lines)
+        await extractor.extract("doc", original)
+
+        moved_line = lines.pop(100)
+        lines.insert(1200, moved_line)
+        moved_text = "\n".join(lines)
+        result = await extractor.extract("doc", moved_text)
+
+        assert as_set(result.entities) == as_set(find_entities(moved_text))
+        moved = {e["text"]: e for e in result.delta.moved}
+        assert moved["Zephyr"]["previous_start_pos"] == original.index("Zephyr")
+        assert moved["Zephyr"]["start_pos"] == moved_text.index("Zephyr")
+        assert "9191" in moved
+        assert "Zephyr" not in {e["text"] for e in result.delta.added + result.delta.removed}
+
+    async def test_rebased_entities_are_not_in_delta(self, extractor, document):
+        await extractor.extract("doc", document)
+        result = await extractor.extract("doc", "Intro.\n" + document)
+
+        assert not (result.delta.added or result.delta.removed or result.delta.moved)
+        assert as_set(result.entities) == as_set(find_entities("Intro.\n" + document))
+
+
+    async def test_deduplicated_repeat_survives_edit_of_first_mention(self):
+        def find_names(text):
+            return [
+                {"entity_type": "PARTY", "text": m.group(), "start_pos": m.start(), "end_pos": m.end()}
+                for m in re.finditer(r"Alice Smith|Bob Jones", text)
+            ]
+
+        async def extract_names(text, metadata):
+            return {"entities": find_names(text), "tokens_used": 0}
+
+        def first_per_name(entities):
+            seen = set()
+            return [e for e in entities if not (e["text"] in seen or seen.add(e["text"]))]
+
+        filler = "".join(f"Clause {i} of the lease is unchanged here.\n" for i in range(400))
+        head = "Alice Smith signed the lease.\n"
+        v1 = head + filler[:9708 - len(head)] + "Alice Smith renewed it.\n"
+        assert v1.index("Alice Smith", 1) == 9708
+
+        extractor = IncrementalExtractor(
+            extract_names, store=LocalVersionStore(), chunker=SmartChunker(),
+            context_margin=200, max_region_size=2000, dedupe_fn=first_per_name
+        )
+        first = await extractor.extract("doc", v1)
+        assert [e["start_pos"] for e in first.entities] == [0]
+
+        v2 = v1.replace("Alice Smith signed", "Bob Jones signed", 1)
+        result = await extractor.extract("doc", v2)
+
+        assert {(e["text"], e["start_pos"]) for e in result.entities} == {
+            ("Bob Jones", 0), ("Alice Smith", 9706)
+        }
+        assert [(e["text"], e["start_pos"]) for e in result.delta.removed] == [("Alice Smith", 0)]
+
+class TestVersionStores:
+    """Local LRU store and graph.chunks round trip."""
+
+    async def test_local_store_evicts_least_recent(self):
+        store = LocalVersionStore(max_documents=2)
+        for document_id in ("a", "b"):
+            await store.save(DocumentVersion(document_id=document_id, text=document_id))
+        await store.load("a")
+        await store.save(DocumentVersion(document_id="c", text="c"))
+
+        assert await store.load("b") is None
+        assert (await store.load("a")).text == "a"
+
+    async def test_graph_store_round_trip(self, document):
+        class FakeGraphStorage:
+            def __init__(self):
+                self.chunks, self.entities = [], []
+
+            async def delete_document_data(self, document_id):
+                self.chunks, self.entities = [], []
+                return True
+
+            async def store_chunks_and_entities(self, document_id, chunks, entities, metadata=None):
+                self.chunks = [
+                    {"content": c["text"], "chunk_index": c["chunk_index"],
+                     "metadata": {"start_char": c["start_char"], "end_char": c["end_char"]}}
+                    for c in chunks
+                ]
+                self.entities = [
+                    {"entity_text": e["text"], "entity_type": e["type"], "confidence": e["confidence"],
+                     "metadata": {"start_char": e["start_char"], "end_char": e["end_char"]}}
+                    for e in entities
+                ]
+                return [], []
+
+            async def get_chunks_by_document(self, document_id):
+                return list(reversed(self.chunks))
+
+            async def get_entities_by_document(self, document_id):
+                return self.entities
+
+        store = GraphVersionStore(FakeGraphStorage())
+        assert await store.load("doc") is None
+
+        entities = find_entities(document)[:50]
+        chunks = SmartChunker().split_span(document, 0, len(document), 5000)
+        await store.save(DocumentVersion(document_id="doc", text=document, chunks=chunks, entities=entities))
+        version = await store.load("doc")
+
+        assert version.text == document
+        assert as_set(version.entities) == as_set(entities)
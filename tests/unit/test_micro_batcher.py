@@ -0,0 +1,339 @@
+"""
+Unit tests for micro-batching of vLLM extraction calls.
+
+Covers AdaptiveBatcher.submit() result routing, profiler-driven tuning, and
+VLLMMicroBatcher dispatch against a local mock vLLM server.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.vllm_micro_batcher import VLLMMicroBatcher
+from src.core.vllm_performance_optimizer import (
+    AdaptiveBatcher,
+    BatchConfig,
+    BatchPriority,
+    DocumentSizeTier,
+    PerformanceProfiler
+)
+from src.vllm_client.client import HTTPVLLMClient
+from src.vllm_client.models import VLLMConfig, VLLMResponse, VLLMUsage
+from src.vllm_client.scheduler import RequestContext, get_request_context, set_request_context
+from tests.unit.mock_vllm_server import MockVLLMServer
+from tests.unit.test_admission_control import make_request
+
+
+def make_configs(max_batch_size: int = 4, max_wait_ms: float = 20.0):
+    return {
+        tier: BatchConfig(
+            tier=tier,
+            max_batch_size=max_batch_size,
+            min_batch_size=1,
+            max_wait_time_ms=max_wait_ms,
+            optimal_tokens_per_batch=0,
+            memory_threshold_mb=0
+        )
+        for tier in DocumentSizeTier
+    }
+
+
+def make_response(content: str = "{}") -> VLLMResponse:
+    return VLLMResponse(
+        content=content,
+        model="test-model",
+        usage=VLLMUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        finish_reason="stop",
+        response_time_ms=1.0
+    )
+
+
+class AsyncNoop:
+    async def __call__(self, batch):
+        return [None] * len(batch)
+
+
+class TestAdaptiveBatcherSubmit:
+    """Awaitable submission and result routing."""
+
+    async def test_results_routed_to_their_callers(self):
+        batches = []
+
+        async def process(batch):
+            batches.append(len(batch))
+            return [ValueError("bad") if r.payload == "fail" else r.payload.upper() for r in batch]
+
+        batcher = AdaptiveBatcher(process, batch_configs=make_configs(max_batch_size=3))
+        results = await asyncio.gather(
+            batcher.submit("a", payload="one", estimated_tokens=10),
+            batcher.submit("b", payload="fail", estimated_tokens=10),
+            batcher.submit("c", payload="three", estimated_tokens=10),
+            return_exceptions=True
+        )
+
+        assert results[0] == "ONE"
+        assert isinstance(results[1], ValueError)
+        assert results[2] == "THREE"
+        assert batches == [3]
+
+    async def test_partial_batch_flushes_after_wait(self):
+        async def process(batch):
+            return [r.payload for r in batch]
+
+        batcher = AdaptiveBatcher(process, batch_configs=make_configs(max_batch_size=8, max_wait_ms=20))
+        start = time.monotonic()
+        result = await asyncio.wait_for(batcher.submit("x", payload=1, estimated_tokens=10), timeout=1)
+
+        assert result == 1
+        assert time.monotonic() - start >= 0.015
+
+    async def test_urgent_request_skips_wait(self):
+        async def process(batch):
+            return [r.payload for r in batch]
+
+        batcher = AdaptiveBatcher(process, batch_configs=make_configs(max_batch_size=8, max_wait_ms=500))
+        result = await asyncio.wait_for(
+            batcher.submit("x", payload=1, priority=BatchPriority.URGENT, estimated_tokens=10),
+            timeout=0.2
+        )
+        assert result == 1
+
+    async def test_overflow_starts_next_batch(self):
+        batches = []
+
+        async def process(batch):
+            batches.append(len(batch))
+            return [None] * len(batch)
+
+        batcher = AdaptiveBatcher(process, batch_configs=make_configs(max_batch_size=2, max_wait_ms=10))
+        await asyncio.gather(*(batcher.submit("x", payload=i, estimated_tokens=10) for i in range(5)))
+
+        assert sorted(batches) == [1, 2, 2]
+
+    async def test_batch_failure_fails_waiting_callers(self):
+        async def process(batch):
+            raise RuntimeError("server down")
+
+        batcher = AdaptiveBatcher(process, batch_configs=make_configs(max_batch_size=1))
+        with pytest.raises(RuntimeError, match="server down"):
+            await batcher.submit("x", payload=1, estimated_tokens=10)
+
+
+class TestProfilerBatchTuning:
+    """Online tuning of batch size and wait time."""
+
+    def test_near_empty_batches_shorten_wait(self):
+        profiler = PerformanceProfiler(enable_auto_tuning=False, performance_targets={t: 1000 for t in DocumentSizeTier})
+        for _ in range(10):
+            profiler.record_request(DocumentSizeTier.SMALL, response_time_ms=300, tokens_processed=10)
+            profiler.record_batch(DocumentSizeTier.SMALL, batch_size=1, max_batch_size=16)
+
+        profiler._auto_tune_parameters()
+
+        tuning = profiler.get_tier_tuning(DocumentSizeTier.SMALL)
+        assert tuning["wait_time_multiplier"] < 1.0
+        assert tuning["batch_size_multiplier"] == 1.0
+
+    def test_full_batches_grow_batch_size(self):
+        profiler = PerformanceProfiler(enable_auto_tuning=False, performance_targets={t: 1000 for t in DocumentSizeTier})
+        for _ in range(10):
+            profiler.record_request(DocumentSizeTier.SMALL, response_time_ms=300, tokens_processed=10)
+            profiler.record_batch(DocumentSizeTier.SMALL, batch_size=16, max_batch_size=16)
+
+        profiler._auto_tune_parameters()
+
+        assert profiler.get_tier_tuning(DocumentSizeTier.SMALL)["batch_size_multiplier"] > 1.0
+
+    def test_slow_tier_shrinks_batches(self):
+        profiler = PerformanceProfiler(enable_auto_tuning=False, performance_targets={t: 100 for t in DocumentSizeTier})
+        for _ in range(10):
+            profiler.record_request(DocumentSizeTier.LARGE, response_time_ms=500, tokens_processed=10)
+
+        profiler._auto_tune_parameters()
+
+        tuning = profiler.get_tier_tuning(DocumentSizeTier.LARGE)
+        assert tuning["batch_size_multiplier"] < 1.0
+        assert tuning["wait_time_multiplier"] < 1.0
+
+    async def test_batcher_applies_tuning(self):
+        profiler = PerformanceProfiler(enable_auto_tuning=False)
+        batcher = AdaptiveBatcher(AsyncNoop(), profiler=profiler, batch_configs=make_configs(8, 10))
+        profiler._tier_tuning[DocumentSizeTier.SMALL] = {"batch_size_multiplier": 0.5, "wait_time_multiplier": 2.0}
+
+        assert batcher._effective_batch_size(DocumentSizeTier.SMALL) == 4
+        assert batcher._effective_wait_ms(DocumentSizeTier.SMALL) == 20.0
+
+
+class TestVLLMMicroBatcher:
+    """Dispatch through real and fake vLLM clients."""
+
+    async def test_concurrent_calls_share_a_batch(self):
+        async with MockVLLMServer() as server:
+            client = HTTPVLLMClient(config=VLLMConfig(base_url=server.base_url, model_id=server.model))
+            micro = VLLMMicroBatcher(max_batch_size=8, max_wait_ms=10)
+
+            responses = await asyncio.gather(*(micro.submit(client, make_request(400, 64)) for _ in range(8)))
+
+            assert len(responses) == 8
+            assert all(r.content == '{"entities": []}' for r in responses)
+            assert micro.batches_dispatched == 1
+            assert server.stats.max_in_flight == 8
+            await client.close()
+
+    async def test_native_batching_client_gets_one_generate_batch(self):
+        client = MagicMock()
+        client.supports_native_batching = True
+        batch_sizes = []
+
+        async def generate_batch(requests):
+            batch_sizes.append(len(requests))
+            return [make_response(str(i)) for i in range(len(requests))]
+
+        client.generate_batch = generate_batch
+        micro = VLLMMicroBatcher(max_batch_size=4, max_wait_ms=10)
+
+        responses = await asyncio.gather(*(micro.submit(client, make_request(40, 10)) for _ in range(4)))
+
+        assert batch_sizes == [4]
+        assert [r.content for r in responses] == ["0", "1", "2", "3"]
+        assert micro.native_batches == 1
+
+    async def test_each_call_keeps_its_request_context(self):
+        seen = []
+
+        class RecordingClient:
+            async def generate_chat_completion(self, request):
+                seen.append(get_request_context().tenant_id)
+                return make_response()
+
+        micro = VLLMMicroBatcher(max_batch_size=3, max_wait_ms=10)
+        client = RecordingClient()
+
+        async def call(tenant):
+            set_request_context(RequestContext(tenant_id=tenant))
+            return await micro.submit(client, make_request(40, 10))
+
+        await asyncio.gather(call("a"), call("b"), call("c"))
+
+        assert sorted(seen) == ["a", "b", "c"]
+        assert micro.batches_dispatched == 1
+
+    async def test_cancelled_caller_cancels_its_call(self):
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        class HangingClient:
+            async def generate_chat_completion(self, request):
+                started.set()
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+
+        micro = VLLMMicroBatcher(max_batch_size=1, max_wait_ms=1)
+        caller = asyncio.create_task(micro.submit(HangingClient(), make_request(40, 10)))
+        await asyncio.wait_for(started.wait(), timeout=1)
+        caller.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+    async def test_native_batch_cancelled_only_when_all_callers_leave(self):
+        started, cancelled = asyncio.Event(), asyncio.Event()
+        client = MagicMock()
+        client.supports_native_batching = True
+
+        async def generate_batch(requests):
+            started.set()
+            try:
+                await asyncio.sleep(0.2)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return [make_response(str(i)) for i in range(len(requests))]
+
+        client.generate_batch = generate_batch
+        micro = VLLMMicroBatcher(max_batch_size=2, max_wait_ms=10)
+        first, second = (asyncio.create_task(micro.submit(client, make_request(40, 10))) for _ in range(2))
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        first.cancel()
+        assert (await second).content == "1"
+        assert not cancelled.is_set()
+
+    async def test_orchestrator_call_vllm_goes_through_micro_batcher(self):
+        from src.core.extraction_orchestrator import ExtractionOrchestrator
+
+        class FakeClient:
+            supports_native_batching = True
+
+            async def generate_batch(self, requests):
+                return [make_response('{"entities": []}') for _ in requests]
+
+        micro = VLLMMicroBatcher(max_batch_size=4, max_wait_ms=5)
+        with patch("src.core.extraction_orchestrator.get_micro_batcher", return_value=micro):
+            orchestrator = ExtractionOrchestrator(prompt_manager=MagicMock(), vllm_client=FakeClient())
+            results = await asyncio.gather(*(orchestrator._call_vllm("prompt") for _ in range(4)))
+
+        assert all(r["tokens_used"] == 15 for r in results)
+        assert micro.calls_dispatched == 4
+        assert micro.native_batches == 1
+
+    async def test_orchestrator_calls_without_native_batching_skip_micro_batcher(self):
+        from src.core.extraction_orchestrator import ExtractionOrchestrator
+
+        class FakeClient:
+            async def generate_chat_completion(self, request):
+                return make_response('{"entities": []}')
+
+        micro = VLLMMicroBatcher(max_batch_size=4, max_wait_ms=5)
+        with patch("src.core.extraction_orchestrator.get_micro_batcher", return_value=micro):
+            orchestrator = ExtractionOrchestrator(prompt_manager=MagicMock(), vllm_client=FakeClient())
+            results = await asyncio.gather(*(orchestrator._call_vllm("prompt") for _ in range(4)))
+
+        assert all(r["tokens_used"] == 15 for r in results)
+        assert micro.calls_dispatched == 0
+
+    async def test_extraction_requests_batch_below_admission_control(self, monkeypatch):
+        from src.api.routes.intelligent import get_extraction_orchestrator
+        from src.core.config import get_settings
+        from src.core.throttled_vllm_client import ThrottledVLLMClient
+        from src.vllm_client.factory import VLLMClientFactory, close_shared_clients
+
+        batch_sizes = []
+
+        class FakeDirectClient:
+            supports_native_batching = True
+            base_url = "direct://micro-batch-test"
+
+            async def generate_batch(self, requests):
+                batch_sizes.append(len(requests))
+                return [make_response('{"entities": []}') for _ in requests]
+
+            async def close(self):
+                pass
+
+        async def create_client(*args, **kwargs):
+            return FakeDirectClient()
+
+        micro = VLLMMicroBatcher(max_batch_size=4, max_wait_ms=20)
+        monkeypatch.setattr(VLLMClientFactory, "create_client", staticmethod(create_client))
+        monkeypatch.setattr("src.core.vllm_micro_batcher._micro_batcher", micro)
+        monkeypatch.setattr(get_settings().vllm_direct, "vllm_enable_admission_control", True)
+        monkeypatch.setattr(get_settings().vllm_direct, "vllm_enable_micro_batching", True)
+
+        try:
+            first = await get_extraction_orchestrator()
+            second = await get_extraction_orchestrator()
+            results = await asyncio.gather(first._call_vllm("prompt"), second._call_vllm("prompt"))
+        finally:
+            await close_shared_clients()
+
+        assert isinstance(first.vllm_client, ThrottledVLLMClient)
+        assert second.vllm_client is first.vllm_client
+        assert all(r["tokens_used"] == 15 for r in results)
+        assert batch_sizes == [2]
+        assert micro.native_batches == 1
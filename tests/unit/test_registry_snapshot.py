@@ -0,0 +1,323 @@
+"""
+Unit tests for columnar EntityRegistry snapshots.
+
+A registry loaded from a full snapshot, or from a chain of delta snapshots,
+must equal the registry that saved it: entities, relationships, metadata,
+the text/type/chunk indexes and blocking candidates, and it must resolve
+further entities the same way. Incremental saves fall back to full ones when
+they cannot be deltas, earlier pickle snapshots still load, and encoding
+runs off the event loop. The benchmark compares loading 20,000 entities with
+the pickle format.
+"""
+
+import pickle
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from src.core import entity_registry, registry_snapshot
+from src.core.entity_registry import EntityRegistry
+from src.models.entities import Entity, EntityAttributes, EntityType, ExtractionMethod, TextPosition
+from src.models.registry import (
+    EntityOccurrence,
+    ReferenceType,
+    RegisteredEntity,
+    RegistrySnapshot,
+)
+from tests.unit.test_entity_registry_blocking import make_name, make_names
+
+
+@pytest.fixture(autouse=True)
+def no_pattern_files(monkeypatch):
+    # Snapshots do not use the pattern loader, which reads every pattern file
+    monkeypatch.setattr(entity_registry, "PatternLoader", lambda: None)
+
+
+def make_entity(text, k):
+    return Entity(
+        text=text,
+        cleaned_text=text.replace("Hon. ", ""),
+        entity_type=EntityType.JUDGE if k % 7 == 0 else EntityType.PARTY,
+        entity_subtype="individual",
+        confidence_score=0.5 + (k % 5) / 10,
+        extraction_method=ExtractionMethod.REGEX_ONLY,
+        position=TextPosition(start=k % 90, end=k % 90 + len(text), line_number=1 + k % 3 if k % 2 else None),
+        attributes=EntityAttributes(party_name=text, alternate_names=[text.lower()]) if k % 4 == 0 else EntityAttributes(),
+        context_snippet=f"The court heard {text} on the motion." if k % 3 else None
+    )
+
+
+async def register(registry, names, first=0):
+    ids = []
+    for k, name in enumerate(names, start=first):
+        ids.append(await registry.register_entity(make_entity(name, k), f"chunk_{k // 20}", k // 20, k * 100))
+    return ids
+
+
+def make_registry(tmp_path, **kwargs):
+    return EntityRegistry("doc", "doc", 100, cache_dir=str(tmp_path), **kwargs)
+
+
+def assert_same_state(loaded, expected, probes):
+    assert {eid: e.model_dump() for eid, e in loaded.entities.items()} == \
+        {eid: e.model_dump() for eid, e in expected.entities.items()}
+    assert {rid: r.model_dump() for rid, r in loaded.relationships.items()} == \
+        {rid: r.model_dump() for rid, r in expected.relationships.items()}
+    assert loaded.metadata.model_dump() == expected.metadata.model_dump()
+    assert dict(loaded.entity_index) == dict(expected.entity_index)
+    assert dict(loaded.type_index) == dict(expected.type_index)
+    assert dict(loaded.chunk_index) == dict(expected.chunk_index)
+    for name in probes:
+        for entity_type in (EntityType.PARTY, EntityType.JUDGE):
+            assert loaded.blocking_index.candidates(name, entity_type) == \
+                expected.blocking_index.candidates(name, entity_type)
+
+
+async def build(registry, names):
+    ids = await register(registry, names)
+    distinct = list(dict.fromkeys(ids))
+    for source, target in zip(distinct[:30], distinct[1:31]):
+        await registry.add_relationship(source, target, "opposes", evidence=[{"chunk": "chunk_0"}])
+    return ids
+
+
+class TestFullSnapshot:
+    """Saving and loading a full snapshot."""
+
+    async def test_round_trip(self, tmp_path):
+        names = make_names(600, seed=1)
+        registry = make_registry(tmp_path)
+        await build(registry, names)
+        await registry.merge_duplicates(aggressive=True)
+
+        snapshot_id = await registry.save_snapshot("chunk_29")
+        loaded = make_registry(tmp_path)
+        assert await loaded.load_snapshot(snapshot_id)
+
+        assert_same_state(loaded, registry, names[:200])
+        header = registry_snapshot.read_header(registry._snapshot_path(snapshot_id))
+        assert header["kind"] == "full" and header["checkpoint_chunk_id"] == "chunk_29"
+
+        # A resumed registry resolves the rest of the document as the original
+        # (new entities get fresh ids, so they are compared by first occurrence)
+        more = make_names(900, seed=1)[600:]
+        saved = set(registry.entities)
+        resolved = []
+        for target in (loaded, registry):
+            first = {}
+            resolved.append([
+                eid if eid in saved else first.setdefault(eid, k)
+                for k, eid in enumerate(await register(target, more, 600))
+            ])
+        assert resolved[0] == resolved[1]
+        assert len(loaded.entities) == len(registry.entities)
+
+    async def test_snapshot_files_hold_no_pickles(self, tmp_path):
+        registry = make_registry(tmp_path)
+        await build(registry, make_names(50, seed=2))
+        snapshot_id = await registry.save_snapshot()
+
+        with np.load(registry._snapshot_path(snapshot_id), allow_pickle=False) as data:
+            assert all(data[name].dtype != object for name in data.files)
+
+    def test_blocking_buckets_round_trip(self):
+        keys = np.array([0, 7, 1 << 40, (1 << 63) + 5, (1 << 64) - 1], dtype=np.uint64)
+        buckets = {
+            "keys": keys,
+            "offsets": np.array([0, 1, 3, 4, 300, 301], dtype=np.int32),
+            "members": np.arange(301, dtype=np.int32) * 7,
+        }
+
+        encoded = registry_snapshot._encode_buckets(buckets)
+        decoded = registry_snapshot._decode_buckets(encoded)
+
+        assert encoded["blocking_sizes"].dtype == np.int16
+        assert decoded["keys"].dtype == np.uint64 and decoded["keys"].tolist() == keys.tolist()
+        assert decoded["offsets"].tolist() == buckets["offsets"].tolist()
+        assert decoded["members"].dtype == np.int32
+        assert decoded["members"].tolist() == buckets["members"].tolist()
+
+    async def test_blocking_parameters_change(self, tmp_path):
+        names = make_names(300, seed=3)
+        registry = make_registry(tmp_path)
+        await build(registry, names)
+        snapshot_id = await registry.save_snapshot()
+
+        # Saved buckets do not fit other key parameters, so they are rebuilt
+        loaded = make_registry(tmp_path)
+        loaded.blocking_index = type(loaded.blocking_index)(bands=12)
+        assert await loaded.load_snapshot(snapshot_id)
+        assert loaded.blocking_index.bands == 12
+        expected = type(loaded.blocking_index)(bands=12)
+        for entity in registry.entities.values():
+            expected.add_many(entity.id, entity.all_variants, entity.entity_type)
+        for name in names[:100]:
+            assert loaded.blocking_index.candidates(name, EntityType.PARTY) == \
+                expected.candidates(name, EntityType.PARTY)
+
+    async def test_pickle_snapshots_still_load(self, tmp_path):
+        registry = make_registry(tmp_path)
+        await build(registry, make_names(200, seed=4))
+        snapshot = RegistrySnapshot(
+            entities=registry.entities, relationships=registry.relationships, metadata=registry.metadata
+        )
+        path = tmp_path / f"snapshot_{snapshot.snapshot_id}.pkl"
+        path.write_bytes(zlib.compress(pickle.dumps(snapshot.model_dump())))
+
+        loaded = make_registry(tmp_path)
+        assert await loaded.load_snapshot(snapshot.snapshot_id)
+        assert {eid: e.model_dump() for eid, e in loaded.entities.items()} == \
+            {eid: e.model_dump() for eid, e in registry.entities.items()}
+
+    async def test_missing_snapshot(self, tmp_path):
+        assert not await make_registry(tmp_path).load_snapshot("missing")
+
+    async def test_encoding_runs_off_loop(self, tmp_path, monkeypatch):
+        threads = []
+        encode = entity_registry.encode_snapshot
+        monkeypatch.setattr(
+            entity_registry, "encode_snapshot",
+            lambda *args: threads.append(threading.current_thread()) or encode(*args)
+        )
+        registry = make_registry(tmp_path)
+        await build(registry, make_names(50, seed=5))
+
+        await registry.save_snapshot()
+
+        assert threads and threads[0] is not threading.main_thread()
+
+
+class TestDeltaSnapshots:
+    """Incremental checkpoints between full snapshots."""
+
+    async def test_delta_chain_loads_latest_state(self, tmp_path):
+        names = make_names(1200, seed=6)
+        registry = make_registry(tmp_path)
+        await build(registry, names[:800])
+        full_id = await registry.save_snapshot("chunk_39", incremental=True)
+
+        await register(registry, names[800:1000], 800)
+        ids = list(registry.entities)
+        await registry.add_relationship(ids[3], ids[900 % len(ids)], "represents")
+        first_delta = await registry.save_snapshot("chunk_49", incremental=True)
+        await register(registry, names[1000:], 1000)
+        await registry.merge_duplicates(aggressive=True)
+        last_delta = await registry.save_snapshot("chunk_59", incremental=True)
+
+        headers = [
+            registry_snapshot.read_header(registry._snapshot_path(sid))
+            for sid in (full_id, first_delta, last_delta)
+        ]
+        assert [h["kind"] for h in headers] == ["full", "delta", "delta"]
+        assert [h["base_id"] for h in headers] == [None, full_id, first_delta]
+        assert registry._snapshot_path(first_delta).stat().st_size * 2 < \
+            registry._snapshot_path(full_id).stat().st_size
+
+        loaded = make_registry(tmp_path)
+        assert await loaded.load_snapshot(last_delta)
+        assert_same_state(loaded, registry, names[::6])
+
+        # Deltas keep chaining from a loaded delta
+        await register(loaded, names[:50], 1200)
+        next_id = await loaded.save_snapshot(incremental=True)
+        assert registry_snapshot.read_header(loaded._snapshot_path(next_id))["base_id"] == last_delta
+        resumed = make_registry(tmp_path)
+        assert await resumed.load_snapshot(next_id)
+        assert_same_state(resumed, loaded, names[:50])
+
+    async def test_falls_back_to_full(self, tmp_path):
+        registry = make_registry(tmp_path, snapshot_delta_limit=2)
+        names = make_names(200, seed=7)
+        kinds = []
+
+        async def save(batch):
+            await register(registry, names[batch * 40:(batch + 1) * 40], batch * 40)
+            snapshot_id = await registry.save_snapshot(incremental=True)
+            kinds.append(registry_snapshot.read_header(registry._snapshot_path(snapshot_id))["kind"])
+
+        for batch in range(4):
+            await save(batch)
+        registry._rebuild_indices()
+        await save(4)
+
+        # No base yet; two deltas allowed; then indices rebuilt outside the change log
+        assert kinds == ["full", "delta", "delta", "full", "full"]
+
+    async def test_caching_disabled(self, tmp_path):
+        registry = make_registry(tmp_path, enable_caching=False)
+        await build(registry, make_names(20, seed=8))
+
+        snapshot_id = await registry.save_snapshot(incremental=True)
+
+        assert snapshot_id and not list(tmp_path.iterdir())
+        assert not await registry.load_snapshot(snapshot_id)
+
+
+@pytest.mark.performance
+class TestSnapshotCost:
+    """Columnar versus pickled snapshots of 20,000 entities."""
+
+    def populate(self, registry, count):
+        rng = random.Random(9)
+        for i in range(count):
+            name = make_name(rng)
+            occurrences = [
+                EntityOccurrence(
+                    chunk_id=f"chunk_{i // 50}", chunk_index=i // 50,
+                    position=TextPosition(start=k * 10, end=k * 10 + len(name)),
+                    global_position=TextPosition(start=i * 1000 + k * 10, end=i * 1000 + k * 10 + len(name)),
+                    text_variant=name, reference_type=ReferenceType.FULL_NAME, confidence=0.9,
+                    context_before="The plaintiff ", context_after=" filed a motion",
+                    extraction_metadata={"method": "regex_only", "ai_enhancements": []}
+                )
+                for k in range(3)
+            ]
+            entity = RegisteredEntity(
+                canonical_text=name, entity_type=EntityType.PARTY, entity_subtype="individual",
+                all_variants={name, "Hon. " + name}, occurrences=occurrences, aggregate_confidence=0.9,
+                first_seen_chunk=f"chunk_{i // 50}", last_seen_chunk=f"chunk_{i // 50}",
+                chunk_span=(i // 50, i // 50), total_occurrences=3, extraction_methods_used={"regex_only"}
+            )
+            registry.entities[entity.id] = entity
+        registry._rebuild_indices()
+
+    async def test_columnar_load_is_faster(self, tmp_path):
+        registry = make_registry(tmp_path)
+        self.populate(registry, 20_000)
+
+        began = time.perf_counter()
+        snapshot = RegistrySnapshot(
+            entities=registry.entities, relationships=registry.relationships, metadata=registry.metadata
+        )
+        path = tmp_path / f"snapshot_{snapshot.snapshot_id}.pkl"
+        path.write_bytes(zlib.compress(pickle.dumps(snapshot.model_dump())))
+        pickle_save = time.perf_counter() - began
+        began = time.perf_counter()
+        assert await make_registry(tmp_path).load_snapshot(snapshot.snapshot_id)
+        pickle_load = time.perf_counter() - began
+
+        began = time.perf_counter()
+        snapshot_id = await registry.save_snapshot(incremental=True)
+        columnar_save = time.perf_counter() - began
+        began = time.perf_counter()
+        assert await make_registry(tmp_path).load_snapshot(snapshot_id)
+        columnar_load = time.perf_counter() - began
+
+        # 50 changed entities as a delta
+        registry._changed_entities.update(list(registry.entities)[:50])
+        began = time.perf_counter()
+        await registry.save_snapshot(incremental=True)
+        delta_save = time.perf_counter() - began
+
+        print(
+            f"20000 entities: pickle save {pickle_save:.2f} s, load {pickle_load:.2f} s "
+            f"({path.stat().st_size / 1e6:.1f} MB); columnar save {columnar_save:.2f} s, "
+            f"load {columnar_load:.2f} s ({registry._snapshot_path(snapshot_id).stat().st_size / 1e6:.1f} MB, "
+            f"indexes included); delta of 50 entities {delta_save * 1000:.0f} ms"
+        )
+        assert columnar_load * 2 < pickle_load
+        assert delta_save * 10 < columnar_save
@@ -0,0 +1,151 @@
+"""
+Unit tests for sentence-windowed dependency parsing of relationships.
+
+Only sentences holding two entities of related types may be parsed, each
+through nlp.pipe on its own, and the relationships found must be those a
+whole-document parse finds in the same sentences, at document offsets.
+A toy pipeline (sentencizer plus a parser attaching every token to the
+first token of its sentence) stands in for a trained spaCy model.
+"""
+
+import random
+import re
+
+import numpy as np
+import pytest
+import spacy
+from spacy.attrs import DEP, HEAD
+from spacy.language import Language
+
+from src.core.document_index import DocumentIndex
+from src.core.relationships import EntityMention, ExtractionConfig, RelationshipExtractor
+
+
+PARSED_TEXTS = []
+
+
+@Language.component("toy_parser")
+def toy_parser(doc):
+    PARSED_TEXTS.append(doc.text)
+    heads = np.zeros(len(doc), dtype="int64")
+    for sent in doc.sents:
+        for token in sent[1:]:
+            heads[token.i] = sent.start - token.i
+    deps = [doc.vocab.strings.add("ROOT" if token.is_sent_start else "dep") for token in doc]
+    doc.from_array([HEAD, DEP], np.stack([heads.astype("uint64"), np.array(deps, dtype="uint64")], axis=1))
+    return doc
+
+
+def make_nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("toy_parser")
+    # Stands in for merge_entities/ner: must be disabled for windows
+    nlp.add_pipe("merge_entities")
+    return nlp
+
+
+SENTENCES = [
+    "[Acme Holdings|CORPORATION] retained [Baker Botts LLP|LAW_FIRM] for the appeal.",
+    "[John Doe|PERSON] sued [Beta Corporation|CORPORATION] in state court.",
+    "The hearing on [March 3|DATE] was moved to [April 9|DATE].",
+    "Counsel for [Jane Roe|PERSON] did not appear.",
+    "The record was closed without further argument.",
+    "No exhibits were received that afternoon.",
+    "The jury deliberated for most of the day.",
+]
+
+MARKUP = re.compile(r"\[([^|\]]+)\|([A-Z_]+)\]")
+
+
+def make_document(count, seed=21):
+    rng = random.Random(seed)
+    text, entities = "", []
+    for _ in range(count):
+        sentence = rng.choice(SENTENCES)
+        position = 0
+        for match in MARKUP.finditer(sentence):
+            text += sentence[position:match.start()]
+            entities.append(EntityMention(
+                entity_id=f"e{len(entities)}",
+                entity_type=match.group(2),
+                entity_text=match.group(1),
+                start_position=len(text),
+                end_position=len(text) + len(match.group(1))
+            ))
+            text += match.group(1)
+            position = match.end()
+        text += sentence[position:] + " "
+    return text, entities
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in re.findall(r"[^.]*\.", text)]
+
+
+def summary(relationships):
+    return sorted(
+        (rel.source_entity.entity_id, rel.target_entity.entity_id, rel.context_start, rel.context_end)
+        for rel in relationships
+    )
+
+
+@pytest.fixture
+def extractor():
+    extractor = RelationshipExtractor(ExtractionConfig(use_dependency_parsing=False, use_coreference=False))
+    extractor.nlp = make_nlp()
+    return extractor
+
+
+class TestDependencyWindows:
+    """Parse volume is limited to sentences with related entity types."""
+
+    def test_windows_hold_compatible_pairs(self, extractor):
+        text, entities = make_document(200)
+        index = DocumentIndex(text, sentence_splitter=split_sentences)
+
+        windows = extractor._dependency_windows(text, extractor._build_entity_index(entities), index)
+
+        assert windows
+        for start, end, window_entities in windows:
+            sentence = text[start:end]
+            assert sentence.startswith(("[", "Acme", "John"))
+            assert {e.entity_id for e in window_entities} == {
+                e.entity_id for e in entities if e.start_position < end and e.end_position > start
+            }
+        assert sum(end - start for start, end, _ in windows) * 2 < len(text)
+
+    def test_matches_whole_document_parse(self, extractor):
+        text, entities = make_document(200, seed=4)
+        index = DocumentIndex(text, sentence_splitter=split_sentences)
+        entity_index = extractor._build_entity_index(entities)
+
+        PARSED_TEXTS.clear()
+        windowed = extractor._extract_dependency_relationships(text, entities, entity_index, index)
+        parsed = list(PARSED_TEXTS)
+
+        # Whole-document parse, as before, restricted to the same sentences
+        doc = make_nlp()(text)
+        entity_tokens = extractor._map_entities_to_tokens(entities, doc)
+        whole = [
+            rel for sent in doc.sents
+            for rel in extractor._extract_sentence_dependencies(sent, entity_tokens, entities)
+        ]
+        kept = {start for start, _, _ in extractor._dependency_windows(text, entity_index, index)}
+
+        assert summary(windowed) == summary(rel for rel in whole if rel.context_start in kept)
+        assert len(parsed) == len(kept)
+        assert extractor.extraction_stats["dependency_sentences_parsed"] == len(kept)
+
+    def test_extract_relationships_uses_windows(self, extractor):
+        text, entities = make_document(40, seed=9)
+        extractor.config.use_dependency_parsing = True
+
+        result = extractor.extract_relationships(
+            text, entities, document_index=DocumentIndex(text, sentence_splitter=split_sentences)
+        )
+
+        dependency = [r for r in result.relationships if r.extraction_method == "dependency"]
+        assert dependency
+        for rel in dependency:
+            assert text[rel.context_start:rel.context_end] == rel.context
@@ -0,0 +1,116 @@
+"""
+Unit tests for the position-sorted entity index of RelationshipExtractor.
+
+EntityIndex lookups must return what the per-character position dict and
+the nested pair loops returned, and pattern matches must now resolve the
+entities inside them.
+"""
+
+import random
+
+import pytest
+
+from src.core.relationships import EntityIndex, EntityMention, ExtractionConfig, RelationshipExtractor
+
+
+def make_entities(count, seed=7, span=50_000):
+    rng = random.Random(seed)
+    entities = []
+    for k in range(count):
+        start = rng.randrange(span)
+        entities.append(EntityMention(
+            entity_id=f"e{k}",
+            entity_type=rng.choice(["PERSON", "CORPORATION", "LAW_FIRM", "COURT"]),
+            entity_text=f"Entity {k}",
+            start_position=start,
+            end_position=start + rng.randrange(1, 40)
+        ))
+    return entities
+
+
+def ids(entities):
+    return [entity.entity_id for entity in entities]
+
+
+@pytest.fixture
+def extractor():
+    return RelationshipExtractor(ExtractionConfig(use_dependency_parsing=False, use_coreference=False))
+
+
+class TestEntityIndex:
+    """Index queries match brute-force scans."""
+
+    def test_within_matches_scan(self):
+        entities = make_entities(2000)
+        index = EntityIndex(entities)
+        rng = random.Random(1)
+
+        for _ in range(200):
+            start = rng.randrange(50_000)
+            end = start + rng.randrange(0, 500)
+            expected = [e for e in entities if e.start_position >= start and e.end_position <= end]
+            assert sorted(ids(index.within(start, end))) == sorted(ids(expected))
+
+    def test_near_matches_scan(self):
+        entities = make_entities(2000, seed=8)
+        index = EntityIndex(entities)
+
+        for start in range(0, 50_000, 997):
+            expected = [e for e in entities if e.end_position >= start - 100 and e.start_position <= start + 10 + 100]
+            assert sorted(ids(index.near(start, start + 10, 100))) == sorted(ids(expected))
+
+    def test_pairs_match_nested_loop(self):
+        entities = make_entities(600, seed=9, span=20_000)
+        expected = [
+            (e1.entity_id, e2.entity_id)
+            for i, e1 in enumerate(entities)
+            for e2 in entities[i + 1:]
+            if abs(e2.start_position - e1.start_position) <= 200
+        ]
+
+        pairs = EntityIndex(entities).pairs_within(200)
+
+        assert [(e1.entity_id, e2.entity_id) for e1, e2 in pairs] == expected
+
+    def test_by_type_and_text(self):
+        entities = make_entities(50)
+        index = EntityIndex(entities)
+
+        assert sum(len(group) for group in index.by_type.values()) == 50
+        assert index.by_text["entity 3"] == [entities[3]]
+
+
+class TestExtractorUsesIndex:
+    """Extraction methods share the index."""
+
+    def test_proximity_matches_sorted_loop(self, extractor):
+        entities = make_entities(800, seed=10, span=30_000)
+        text = "x" * 30_100
+        config = extractor.config
+
+        expected = []
+        ordered = sorted(entities, key=lambda e: e.start_position)
+        for i, e1 in enumerate(ordered):
+            for e2 in ordered[i + 1:]:
+                distance = e2.start_position - e1.end_position
+                if distance > config.max_entity_distance:
+                    break
+                if distance <= config.proximity_window:
+                    expected.append((e1.entity_id, e2.entity_id))
+
+        relationships = extractor._extract_proximity_relationships(text, entities, EntityIndex(entities))
+
+        assert [(r.source_entity.entity_id, r.target_entity.entity_id) for r in relationships] == expected
+
+    def test_pattern_match_finds_entities(self, extractor):
+        text = "Smith & Jones LLP represents Acme Corporation in this matter."
+        entities = [
+            EntityMention("firm", "LAW_FIRM", "Smith & Jones LLP", 0, 17),
+            EntityMention("client", "CORPORATION", "Acme Corporation", 29, 45),
+        ]
+
+        relationships = extractor._extract_pattern_relationships(text, entities, EntityIndex(entities))
+
+        represents = [r for r in relationships if r.relationship_type.value == "represents"]
+        assert represents
+        assert (represents[0].source_entity.entity_id, represents[0].target_entity.entity_id) == ("firm", "client")
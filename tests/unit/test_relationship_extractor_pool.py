@@ -0,0 +1,174 @@
+"""
+Unit tests for the warm RelationshipExtractor pool.
+
+Per-call configs applied as overlays must give the results of a freshly
+built extractor, the pool must build one extractor per component set, and
+warm requests must be much cheaper than cold ones.
+"""
+
+import asyncio
+import re
+import threading
+import time
+
+import pytest
+
+from src.api.routes.relationships import relationship_extraction_config
+from src.core.relationships import (
+    EntityMention,
+    ExtractionConfig,
+    RelationshipExtractor,
+    RelationshipExtractorPool
+)
+
+
+TEXT = (
+    "Smith & Associates LLP represents Acme Corporation in this matter. "
+    "John Doe sued ABC Corporation in state court. "
+    "ABC Corp. merged with XYZ Inc. last year. "
+)
+SPANS = [
+    ("Smith & Associates LLP", "LAW_FIRM"),
+    ("Acme Corporation", "CORPORATION"),
+    ("John Doe", "PERSON"),
+    ("ABC Corporation", "CORPORATION"),
+    ("ABC Corp.", "CORPORATION"),
+    ("XYZ Inc.", "CORPORATION"),
+]
+
+
+def make_entities():
+    entities = []
+    for k, (name, entity_type) in enumerate(SPANS):
+        start = TEXT.index(name)
+        entities.append(EntityMention(
+            entity_id=f"e{k}",
+            entity_type=entity_type,
+            entity_text=name,
+            start_position=start,
+            end_position=start + len(name)
+        ))
+    return entities
+
+
+def summary(result):
+    return sorted(
+        (rel.relationship_type.value, rel.source_entity.entity_id, rel.target_entity.entity_id, rel.confidence)
+        for rel in result.relationships
+    )
+
+
+class TestOverlay:
+    """An overlay behaves like an extractor built with the overlaid config."""
+
+    def test_overlay_matches_fresh_extractor(self):
+        warm = RelationshipExtractor(relationship_extraction_config())
+
+        for threshold, window in [(0.75, 250), (0.5, 40), (0.9, 500)]:
+            config = relationship_extraction_config(confidence_threshold=threshold, context_window=window)
+            fresh = RelationshipExtractor(relationship_extraction_config(threshold, window))
+            with warm.overlay(config):
+                overlaid = warm.extract_relationships(TEXT, make_entities(), "doc")
+
+            assert summary(overlaid) == summary(fresh.extract_relationships(TEXT, make_entities(), "doc"))
+
+    def test_overlay_restores_config(self):
+        extractor = RelationshipExtractor(relationship_extraction_config())
+        before = extractor.config
+
+        with extractor.overlay(relationship_extraction_config(confidence_threshold=0.3)):
+            assert extractor.config.pattern_confidence_threshold == 0.3
+            extractor.extract_relationships(TEXT, make_entities())
+
+        assert extractor.config is before
+        assert extractor.config.pattern_confidence_threshold == 0.75
+
+
+class TestPool:
+    """One warm extractor per component set."""
+
+    async def test_reuses_extractor_per_component_set(self):
+        pool = RelationshipExtractorPool()
+
+        first = await pool.extract(TEXT, make_entities(), relationship_extraction_config(), "a")
+        await pool.extract(TEXT, make_entities(), relationship_extraction_config(confidence_threshold=0.5), "b")
+        assert (pool.builds, len(pool)) == (1, 1)
+
+        await pool.extract(TEXT, make_entities(), ExtractionConfig(
+            use_patterns=False, use_dependency_parsing=False, use_coreference=False
+        ))
+        assert (pool.builds, len(pool)) == (2, 2)
+
+        fresh = RelationshipExtractor(relationship_extraction_config())
+        assert summary(first) == summary(fresh.extract_relationships(TEXT, make_entities(), "a"))
+        pool.close()
+
+    async def test_concurrent_requests(self):
+        pool = RelationshipExtractorPool()
+        configs = [relationship_extraction_config(0.5 + k / 20, 100 + k * 50) for k in range(8)]
+
+        results = await asyncio.gather(*(pool.extract(TEXT, make_entities(), config) for config in configs))
+
+        assert pool.builds == 1
+        for config, result in zip(configs, results):
+            fresh = RelationshipExtractor(config)
+            assert summary(result) == summary(fresh.extract_relationships(TEXT, make_entities()))
+
+    async def test_cancelled_call_holds_extractor_until_thread_returns(self, monkeypatch):
+        pool = RelationshipExtractorPool()
+        config = relationship_extraction_config()
+        await pool.warm(config)
+
+        started, release = threading.Event(), threading.Event()
+        active, overlapped = [], []
+
+        def slow_extract(extractor, text, entities, config, document_id):
+            overlapped.append(bool(active))
+            active.append(document_id)
+            started.set()
+            release.wait(timeout=5)
+            active.remove(document_id)
+            return document_id
+
+        monkeypatch.setattr(pool, "_extract_with", slow_extract)
+        first = asyncio.create_task(pool.extract(TEXT, [], config, "first"))
+        await asyncio.to_thread(started.wait, 5)
+        first.cancel()
+        await asyncio.sleep(0.05)
+
+        # The lock stays held: the next call waits for the cancelled call's thread
+        second = asyncio.create_task(pool.extract(TEXT, [], config, "second"))
+        await asyncio.sleep(0.05)
+        assert not first.done() and active == ["first"]
+
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == "second"
+        assert overlapped == [False, False]
+        pool.close()
+
+
+@pytest.mark.performance
+class TestLatency:
+    """Cold versus warm /extract/relationships extraction latency."""
+
+    async def test_warm_requests_skip_setup(self):
+        pool = RelationshipExtractorPool()
+        config = relationship_extraction_config()
+        # As in a new process: no compiled patterns in the re module cache
+        re.purge()
+
+        began = time.perf_counter()
+        await pool.extract(TEXT, make_entities(), config)
+        cold = time.perf_counter() - began
+
+        warm_times = []
+        for _ in range(20):
+            began = time.perf_counter()
+            await pool.extract(TEXT, make_entities(), relationship_extraction_config())
+            warm_times.append(time.perf_counter() - began)
+        warm = sorted(warm_times)[len(warm_times) // 2]
+
+        print(f"relationship extraction latency: cold {cold * 1000:.1f} ms, warm median {warm * 1000:.1f} ms")
+        assert warm < cold
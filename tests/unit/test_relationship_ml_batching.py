@@ -0,0 +1,130 @@
+"""
+Unit tests for ML relationship candidate pairs and batching.
+
+The type prefilter must drop only pairs no pattern relates, and
+batch_predict must group inputs of similar length within the token budget
+while returning predictions in entity pair order.
+"""
+
+import random
+
+import pytest
+
+from src.core.relationships import (
+    EntityMention,
+    ExtractionConfig,
+    RelationshipExtractionModel,
+    RelationshipExtractor,
+    RelationshipType
+)
+
+
+class FakePipeline:
+    """Text classifier recording batches; labels each input by its length."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, inputs, batch_size=1):
+        self.batches.append(list(inputs))
+        return [[{"label": "represents" if len(text) % 2 else "sues", "score": 0.9}] for text in inputs]
+
+
+def make_model(**config):
+    model = RelationshipExtractionModel.__new__(RelationshipExtractionModel)
+    model.model_name = "fake"
+    model.tokenizer = None
+    model.pipeline = FakePipeline()
+    model.config = RelationshipExtractionModel._load_config(model)
+    model.config.update(config)
+    return model
+
+
+def make_document(count, seed=3):
+    rng = random.Random(seed)
+    text, entities = "", []
+    for k in range(count):
+        text += " " * rng.randrange(1, 120)
+        name = f"Party{k}"
+        entities.append(EntityMention(
+            entity_id=f"e{k}",
+            entity_type=rng.choice(["PERSON", "CORPORATION", "LAW_FIRM", "DATE", "STATUTE"]),
+            entity_text=name,
+            start_position=len(text),
+            end_position=len(text) + len(name)
+        ))
+        text += name
+    return text, entities
+
+
+class TestLengthBucketedBatches:
+    """Batches hold inputs of similar length within the token budget."""
+
+    def test_predictions_keep_pair_order(self):
+        text, entities = make_document(60)
+        pairs = list(zip(entities, entities[1:]))
+        model = make_model(max_batch_tokens=256)
+
+        predictions = model.batch_predict(text, pairs, batch_size=4)
+
+        for (entity1, entity2), (rel_type, confidence) in zip(pairs, predictions):
+            context = model._extract_entity_context(text, entity1, entity2)
+            expected = "represents" if len(model._format_input(context, entity1, entity2)) % 2 else "sues"
+            assert rel_type == RelationshipType(expected)
+            assert confidence == 0.9
+        assert len(predictions) == len(pairs)
+
+    def test_batches_sorted_and_within_budget(self):
+        model = make_model(max_batch_tokens=300)
+        inputs = ["x" * random.Random(k).randrange(10, 800) for k in range(200)]
+        lengths = model._input_lengths(inputs)
+
+        batches = model._length_buckets(inputs, batch_size=8)
+
+        assert sorted(i for batch in batches for i in batch) == list(range(200))
+        flat = [lengths[i] for batch in batches for i in batch]
+        assert flat == sorted(flat)
+        for batch in batches:
+            assert len(batch) <= 32
+            assert len(batch) == 1 or len(batch) * max(lengths[i] for i in batch) <= 300
+        # Short inputs share larger batches than long ones
+        assert len(batches[0]) > len(batches[-1])
+
+
+class TestCandidatePairs:
+    """Pairs are distance-pruned and optionally type-filtered before classification."""
+
+    def make_extractor(self, **config):
+        extractor = RelationshipExtractor(ExtractionConfig(
+            use_dependency_parsing=False, use_coreference=False, **config
+        ))
+        extractor.ml_model = make_model()
+        return extractor
+
+    def classified_count(self, extractor, text, entities):
+        extractor._extract_ml_relationships(text, entities)
+        return sum(len(batch) for batch in extractor.ml_model.pipeline.batches)
+
+    def test_type_prefilter(self):
+        text, entities = make_document(300)
+        unfiltered = self.make_extractor()
+        filtered = self.make_extractor(ml_compatible_types_only=True)
+
+        all_count = self.classified_count(unfiltered, text, entities)
+        kept_count = self.classified_count(filtered, text, entities)
+
+        pairs = unfiltered._build_entity_index(entities).pairs_within(200)
+        compatible = [
+            (e1, e2) for e1, e2 in pairs
+            if filtered._types_compatible(e1.entity_type, e2.entity_type)
+        ]
+        assert all_count == len(pairs)
+        assert kept_count == len(compatible) < len(pairs)
+        assert filtered.extraction_stats["ml_pairs_pruned"] == len(pairs) - len(compatible)
+
+    def test_types_compatible_either_direction(self):
+        extractor = self.make_extractor()
+
+        assert extractor._types_compatible("LAW_FIRM", "CORPORATION")
+        assert extractor._types_compatible("CORPORATION", "LAW_FIRM")
+        assert not extractor._types_compatible("DATE", "DATE")
@@ -0,0 +1,204 @@
+"""
+Unit tests for load balancing across vLLM replicas.
+
+Covers ReplicaPool routing (least outstanding tokens, sticky documents,
+health), PooledVLLMClient against a multi-process mock vLLM cluster, and the
+process-wide pool extraction requests share.
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.config import get_settings
+from src.vllm_client.client import HTTPVLLMClient
+from src.vllm_client.factory import close_shared_clients
+from src.vllm_client.models import VLLMConfig, VLLMServiceType
+from src.vllm_client.replica_pool import PooledVLLMClient, ReplicaPool
+from src.vllm_client.scheduler import RequestContext, reset_request_context, set_request_context
+from tests.unit.mock_vllm_server import MockVLLMCluster, MockVLLMServer
+from tests.unit.test_admission_control import make_request
+
+
+class FakeReplica:
+    def __init__(self, name: str):
+        self.base_url = name
+
+    def get_stats(self):
+        return {}
+
+
+def make_pool(replicas: int = 3, **kwargs) -> ReplicaPool:
+    return ReplicaPool([FakeReplica(f"r{i}") for i in range(replicas)], **kwargs)
+
+
+class TestReplicaPoolRouting:
+    """Replica selection."""
+
+    def test_least_outstanding_tokens(self):
+        pool = make_pool()
+        r0, r1, r2 = pool.replicas
+        pool.start(r0, 20000)
+        pool.start(r1, 1000)
+        pool.start(r1, 1000)
+
+        # r2 is idle; request counts would have preferred r0 over r1
+        assert pool.select() is r2
+        pool.start(r2, 5000)
+        assert pool.select() is r1
+
+        pool.finish(r0, 20000, success=True)
+        assert pool.select() is r0
+
+    def test_sticky_document_stays_on_replica(self):
+        pool = make_pool(sticky_max_imbalance_tokens=10000)
+        first = pool.select("doc_1")
+        pool.start(first, 8000)
+
+        assert pool.select("doc_1") is first
+        assert pool.select("doc_2") is not first
+        assert first.sticky_hits == 1
+
+    def test_sticky_document_spills_when_replica_overloaded(self):
+        pool = make_pool(sticky_max_imbalance_tokens=10000)
+        first = pool.select("doc_1")
+        pool.start(first, 50000)
+
+        moved = pool.select("doc_1")
+        assert moved is not first
+        assert pool.select("doc_1") is moved
+
+    def test_unhealthy_replica_skipped_and_document_reassigned(self):
+        pool = make_pool(replicas=2, failure_threshold=2)
+        first = pool.select("doc_1")
+        for _ in range(2):
+            pool.start(first, 100)
+            pool.finish(first, 100, success=False)
+
+        assert not first.is_healthy()
+        assert pool.select("doc_1") is not first
+        assert pool.select(exclude=pool.select("doc_1")) is None
+
+    def test_cancelled_calls_do_not_count_as_failures(self):
+        pool = make_pool(replicas=1, failure_threshold=1)
+        replica = pool.replicas[0]
+        pool.start(replica, 100)
+        pool.finish(replica, 100, success=None)
+
+        assert replica.is_healthy()
+        assert replica.outstanding_tokens == 0
+
+    def test_sticky_assignments_are_bounded(self):
+        pool = make_pool(sticky_max_documents=2)
+        for doc in ("a", "b", "c"):
+            pool.select(doc)
+
+        assert pool.get_stats()["sticky_documents"] == 2
+
+
+class TestPooledClient:
+    """End-to-end routing across replicas running in separate processes."""
+
+    @pytest.fixture(scope="class")
+    def cluster(self):
+        cluster = MockVLLMCluster(replicas=3, base_latency_s=0.05)
+        asyncio.run(cluster.start())
+        yield cluster
+        cluster.stop()
+
+    @pytest.fixture
+    def client(self, cluster):
+        replicas = [
+            HTTPVLLMClient(
+                config=VLLMConfig(instruct_url=url, instruct_model=cluster.model, http_timeout=30),
+                service_type=VLLMServiceType.INSTRUCT
+            )
+            for url in cluster.base_urls
+        ]
+        return PooledVLLMClient(ReplicaPool(replicas, failure_threshold=2))
+
+    async def test_load_spread_across_replicas(self, cluster, client):
+        before = [(await cluster.stats(i)).requests for i in range(3)]
+        await asyncio.gather(*(client.generate_chat_completion(make_request(4000, 256)) for _ in range(9)))
+        after = [(await cluster.stats(i)).requests for i in range(3)]
+
+        assert [b - a for a, b in zip(before, after)] == [3, 3, 3]
+        assert all(replica.outstanding_tokens == 0 for replica in client.pool.replicas)
+
+        replica_stats = client.get_replica_stats()
+        assert set(replica_stats) == set(cluster.base_urls)
+        assert all(stats["requests_processed"] >= 3 for stats in replica_stats.values())
+        await client.close()
+
+    async def test_document_calls_share_a_replica(self, cluster, client):
+        token = set_request_context(RequestContext(document_id="doc_sticky"))
+        try:
+            for _ in range(4):
+                await client.generate_chat_completion(make_request())
+        finally:
+            reset_request_context(token)
+
+        routed = [replica.requests_routed for replica in client.pool.replicas]
+        assert sorted(routed) == [0, 0, 4]
+        await client.close()
+
+    async def test_failing_replica_retried_elsewhere_and_ejected(self, cluster, client):
+        await cluster.configure(0, fail_status=500)
+        try:
+            for _ in range(6):
+                response = await client.generate_chat_completion(make_request())
+                assert response.content == '{"entities": []}'
+
+            assert not client.pool.replicas[0].is_healthy()
+            assert client.get_stats()["healthy_replicas"] == 2
+        finally:
+            await cluster.configure(0, fail_status=None)
+        await client.close()
+
+
+class TestSharedReplicaPool:
+    """One pool per process for extraction requests."""
+
+    @pytest.fixture
+    async def servers(self):
+        async with MockVLLMServer(base_latency_s=0.3) as first, MockVLLMServer(base_latency_s=0.3) as second:
+            yield first, second
+
+    async def test_requests_see_each_others_load_and_documents(self, servers, monkeypatch):
+        from src.api.routes.intelligent import get_extraction_orchestrator
+
+        first, second = servers
+        config = VLLMConfig(
+            instruct_url=first.base_url,
+            instruct_replica_urls=[second.base_url],
+            instruct_model=first.model,
+            http_timeout=30
+        )
+        monkeypatch.setattr(VLLMConfig, "from_settings", classmethod(lambda cls, settings=None: config))
+        monkeypatch.setattr(get_settings().vllm_direct, "vllm_enable_hedging", False)
+
+        async def call(document_id):
+            # Each call is its own API request with its own orchestrator
+            orchestrator = await get_extraction_orchestrator()
+            token = set_request_context(RequestContext(document_id=document_id))
+            try:
+                await orchestrator.vllm_client.generate_chat_completion(make_request())
+            finally:
+                reset_request_context(token)
+            return orchestrator.vllm_client
+
+        try:
+            in_flight = asyncio.create_task(call("doc-a"))
+            while first.stats.in_flight + second.stats.in_flight == 0:
+                await asyncio.sleep(0.01)
+            clients = [await call("doc-b"), await in_flight, await call("doc-a")]
+        finally:
+            await close_shared_clients()
+
+        pool = clients[0].pool
+        assert isinstance(clients[0], PooledVLLMClient)
+        assert all(client is clients[0] for client in clients)
+        # doc-b avoided the replica busy with doc-a; doc-a came back to its replica
+        assert sorted([first.stats.requests, second.stats.requests]) == [1, 2]
+        assert sum(replica.sticky_hits for replica in pool.replicas) == 1
+        assert pool.get_stats()["sticky_documents"] == 2
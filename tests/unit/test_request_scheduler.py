@@ -0,0 +1,227 @@
+"""
+Unit tests for priority and deadline-aware scheduling of vLLM calls.
+
+Covers RequestScheduler ordering, deadline cancellation in the admission
+controller, header parsing, and ThrottledVLLMClient end-to-end against a
+local mock vLLM server.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.vllm_client.models import BatchPriority
+from src.vllm_client.client import HTTPVLLMClient
+from src.vllm_client.exceptions import DeadlineExceededError
+from src.vllm_client.models import VLLMConfig
+from src.vllm_client.scheduler import (
+    RequestContext,
+    RequestScheduler,
+    get_request_context,
+    reset_request_context,
+    set_request_context
+)
+from src.core.throttled_vllm_client import ThrottledVLLMClient
+from tests.unit.mock_vllm_server import MockVLLMServer
+from tests.unit.test_admission_control import make_controller, make_request
+
+
+def push(scheduler: RequestScheduler, tokens: int = 100, **context_kwargs):
+    future = asyncio.get_running_loop().create_future()
+    return scheduler.push(tokens, RequestContext(**context_kwargs), future)
+
+
+class TestRequestScheduler:
+    """Dispatch ordering and deadline expiry."""
+
+    async def test_priority_beats_arrival_order(self):
+        scheduler = RequestScheduler()
+        push(scheduler, priority=BatchPriority.LOW)
+        high = push(scheduler, priority=BatchPriority.HIGH)
+
+        assert scheduler.peek() is high
+
+    async def test_earliest_deadline_first_within_priority(self):
+        scheduler = RequestScheduler()
+        now = time.time()
+        push(scheduler)
+        late = push(scheduler, deadline=now + 60)
+        early = push(scheduler, deadline=now + 5)
+
+        assert scheduler.peek() is early
+        scheduler.remove(early)
+        assert scheduler.peek() is late
+
+    async def test_fair_share_across_tenants(self):
+        scheduler = RequestScheduler()
+        batch = [push(scheduler, tokens=1000, tenant_id="batch") for _ in range(3)]
+        scheduler.remove(batch[0])
+
+        interactive = push(scheduler, tokens=1000, tenant_id="interactive")
+
+        # "interactive" starts level with the least-served active tenant, then
+        # wins once "batch" has been charged for another call
+        scheduler.remove(scheduler.peek())
+        assert scheduler.peek() is interactive
+
+    async def test_aging_promotes_waiting_calls(self):
+        scheduler = RequestScheduler(aging_seconds=10)
+        low = push(scheduler, priority=BatchPriority.LOW)
+        normal = push(scheduler, priority=BatchPriority.NORMAL)
+
+        assert scheduler.peek() is normal
+        assert scheduler.peek(now=low.enqueued_at + 35) is low
+
+    async def test_expired_calls_fail_before_dispatch(self):
+        scheduler = RequestScheduler()
+        expired = push(scheduler, deadline=time.time() - 1)
+        live = push(scheduler)
+
+        assert scheduler.peek() is live
+        with pytest.raises(DeadlineExceededError):
+            expired.future.result()
+        assert scheduler.stats.expired == 1
+        assert len(scheduler) == 1
+
+
+class TestRequestContext:
+    """Header parsing and context propagation."""
+
+    def test_from_headers(self):
+        before = time.time()
+        context = RequestContext.from_headers(
+            {"X-Request-Priority": "high", "X-Request-Timeout-Ms": "2000", "X-Tenant-Id": "acme"},
+            document_id="doc_1"
+        )
+
+        assert context.priority == BatchPriority.HIGH
+        assert before + 2 <= context.deadline <= time.time() + 2
+        assert context.fair_share_key == "acme"
+
+    def test_from_headers_defaults_and_numeric_priority(self):
+        context = RequestContext.from_headers({"x-request-priority": "0"}, document_id="doc_1")
+        assert context.priority == BatchPriority.URGENT
+        assert context.deadline is None
+        assert context.fair_share_key == "doc_1"
+
+        fallback = RequestContext.from_headers(
+            {"x-request-priority": "bogus"}, default_priority=BatchPriority.LOW
+        )
+        assert fallback.priority == BatchPriority.LOW
+
+    async def test_context_propagates_to_child_tasks(self):
+        token = set_request_context(RequestContext(priority=BatchPriority.URGENT))
+        try:
+            async def child():
+                return get_request_context()
+
+            assert (await asyncio.create_task(child())).priority == BatchPriority.URGENT
+        finally:
+            reset_request_context(token)
+        assert get_request_context().priority == BatchPriority.NORMAL
+
+
+class TestSchedulingAdmission:
+    """Scheduler ordering inside TokenBudgetAdmissionController."""
+
+    async def test_high_priority_waiter_admitted_first(self):
+        controller = make_controller()
+        first = await controller.acquire(make_request())
+        second = await controller.acquire(make_request())
+
+        order = []
+
+        async def waiter(name, priority):
+            ticket = await controller.acquire(make_request(), RequestContext(priority=priority))
+            order.append(name)
+            return ticket
+
+        low = asyncio.create_task(waiter("low", BatchPriority.LOW))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(waiter("high", BatchPriority.HIGH))
+        await asyncio.sleep(0)
+
+        controller.release(first, success=True, latency_ms=50)
+        await asyncio.sleep(0)
+        assert order == ["high"]
+
+        controller.release(second, success=True, latency_ms=50)
+        await asyncio.sleep(0)
+        assert order == ["high", "low"]
+
+        for task in (low, high):
+            controller.release(task.result(), success=True, latency_ms=50)
+        assert controller.in_flight_tokens == 0
+
+    async def test_deadline_expires_while_queued(self):
+        controller = make_controller()
+        holder = await controller.acquire(make_request())
+        await controller.acquire(make_request())
+
+        context = RequestContext(deadline=time.time() + 0.05)
+        with pytest.raises(DeadlineExceededError):
+            await controller.acquire(make_request(), context)
+
+        assert controller.queue_depth == 0
+        assert controller.stats.expired_requests == 1
+        assert controller.in_flight_requests == 2
+        controller.release(holder, success=True, latency_ms=10)
+
+    async def test_already_expired_request_is_never_queued(self):
+        controller = make_controller()
+        with pytest.raises(DeadlineExceededError):
+            await controller.acquire(make_request(), RequestContext(deadline=time.time() - 1))
+
+        assert controller.in_flight_requests == 0
+        assert controller.stats.queued_requests == 0
+
+
+class TestThrottledClientScheduling:
+    """End-to-end scheduling against a local mock vLLM server."""
+
+    @pytest.fixture
+    async def server(self):
+        async with MockVLLMServer(base_latency_s=0.05) as server:
+            yield server
+
+    @pytest.fixture
+    def client_factory(self, server):
+        def factory(controller):
+            config = VLLMConfig(base_url=server.base_url, model_id=server.model, http_timeout=30)
+            return ThrottledVLLMClient(HTTPVLLMClient(config=config), admission_controller=controller)
+
+        return factory
+
+    async def test_interactive_request_overtakes_batch_queue(self, client_factory):
+        # Budget fits one call at a time, so completion order is dispatch order
+        controller = make_controller(kv_token_budget=2500, min_token_budget=2500)
+        client = client_factory(controller)
+        finished = []
+
+        async def call(name, priority):
+            set_request_context(RequestContext(priority=priority, tenant_id=name.split("-")[0]))
+            await client.generate_chat_completion(make_request())
+            finished.append(name)
+
+        batch = [asyncio.create_task(call(f"batch-{i}", BatchPriority.LOW)) for i in range(6)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(call("interactive", BatchPriority.HIGH))
+        await asyncio.gather(*batch, interactive)
+
+        # Only the batch call already in flight finishes before the interactive one
+        assert finished.index("interactive") == 1
+        await client.close()
+
+    async def test_expired_request_not_sent_to_server(self, server, client_factory):
+        client = client_factory(make_controller())
+        token = set_request_context(RequestContext(deadline=time.time() - 1))
+        try:
+            with pytest.raises(DeadlineExceededError):
+                await client.generate_chat_completion(make_request())
+        finally:
+            reset_request_context(token)
+
+        assert server.stats.requests == 0
+        assert client.stats.expired_requests == 1
+        await client.close()
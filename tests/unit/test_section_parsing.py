@@ -0,0 +1,133 @@
+"""
+Unit tests for sectioned sentence parsing and the chunking strategy base.
+
+A keyword pipeline stands in for spaCy: each sentence gets a one-hot vector
+for its topic, so topic shifts are known in advance. Sections must be parsed
+with one nlp.pipe call each, in at most max_parallel_sections threads even
+when a section times out, and a timed-out section must stop early.
+"""
+
+import re
+import threading
+import time
+
+import numpy as np
+
+from src.core.chunking.section_parsing import SectionSentenceParser
+from src.core.chunking.strategies.base_chunker import BaseChunker
+from src.models.responses import DocumentChunk
+
+
+TOPICS = ("lease", "tax", "court")
+SECTION_HEADER = re.compile(r'^\s*Section\s+\d+', re.MULTILINE)
+
+
+class FakeSentence:
+    def __init__(self, text, start_char):
+        self.start_char = start_char
+        self.vector = np.array([float(topic in text.lower()) for topic in TOPICS], dtype=np.float32)
+
+
+class FakeDoc:
+    def __init__(self, text):
+        self.sents = [FakeSentence(m.group(), m.start()) for m in re.finditer(r'[^.\s][^.]*\.', text)]
+
+
+class FakeNLP:
+    pipe_names = ["tok2vec", "parser", "ner"]
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = self.max_active = self.slices = 0
+        self.disabled = None
+
+    def pipe(self, texts, batch_size, disable):
+        self.disabled = disable
+        for text in texts:
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(self.delay)
+            with self.lock:
+                self.active -= 1
+                self.slices += 1
+            yield FakeDoc(text)
+
+
+def make_parser(**kwargs):
+    return SectionSentenceParser(SECTION_HEADER, **kwargs)
+
+
+class TestSectionSentenceParser:
+    """Topic shifts from bounded, per-section nlp.pipe calls."""
+
+    async def test_topic_shifts_at_absolute_positions(self):
+        text = (
+            "Section 1 The lease runs. The lease renews.\n\n"
+            "Tax is due. Tax is withheld.\n"
+            "Section 2 The tax court ruled. The court closed."
+        )
+        nlp = FakeNLP()
+
+        shifts = await make_parser().topic_shifts(nlp, text)
+
+        # Sections are compared independently: no shift across the header
+        assert shifts == [(text.index("Tax is due"), 0.0)]
+        assert nlp.disabled == ["ner"]
+
+    def test_slices_stay_under_limit_and_cover_text(self):
+        paragraphs = [" ".join(["The lease runs."] * (i + 3)) for i in range(40)]
+        text = "\n\n".join(paragraphs)
+        parser = make_parser(max_slice_chars=300)
+
+        slices = parser.slice_spans(text, 0, len(text))
+
+        assert all(end - start <= 300 for start, end in slices)
+        assert "".join(text[start:end] for start, end in slices).split() == text.split()
+
+    def test_zero_vectors_are_neutral(self):
+        vectors = np.array([[1.0, 0.0], [0.0, 0.0], [0.0, 1.0], [0.0, 2.0]])
+
+        assert SectionSentenceParser.adjacent_similarities(vectors).tolist() == [0.5, 0.5, 1.0]
+
+    async def test_timed_out_section_keeps_its_slot_and_stops(self):
+        slow = "Section 1 " + "\n\n".join(["The lease runs."] * 40)
+        text = slow + "\nSection 2 The tax is due. The court ruled."
+        nlp = FakeNLP(delay=0.1)
+        parser = make_parser(max_slice_chars=40, max_parallel_sections=1, section_timeout=0.3)
+
+        began = time.monotonic()
+        sections = await parser.parse_sections(nlp, text)
+
+        assert sections[0] == ([], None)
+        assert sections[1][0] == [text.index("Section 2"), text.index("The court")]
+        # Never two parsing threads at once, and the slow section gave up early
+        assert nlp.max_active == 1
+        assert nlp.slices <= 4 + 2
+        assert time.monotonic() - began < 1.5
+
+
+class TestBaseChunker:
+    """Shared helpers of the chunking strategies."""
+
+    class FixedChunker(BaseChunker):
+        async def chunk_text(self, text, chunk_size, chunk_overlap, metadata=None):
+            self._validate_parameters(text, chunk_size, chunk_overlap)
+            chunks = []
+            for start, end in self._calculate_positions(text, chunk_size, chunk_overlap):
+                content, start, end = self._content_span(text, start, end)
+                if content:
+                    chunks.append(self._create_chunk(content, start, end, len(chunks), metadata))
+            return chunks
+
+    async def test_chunks_keep_positions_aligned_with_content(self):
+        text = "  The lease runs.   Tax is due.  \n\n The court ruled.  " * 5
+
+        chunks = await self.FixedChunker(settings=None).chunk_text(text, 40, 10, {"source": "test"})
+
+        assert all(isinstance(chunk, DocumentChunk) for chunk in chunks)
+        assert all(text[c.start_position:c.end_position] == c.content for c in chunks)
+        assert all(c.character_count == len(c.content) and c.content == c.content.strip() for c in chunks)
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+        assert chunks[0].metadata == {"source": "test"}
@@ -0,0 +1,133 @@
+"""
+Scaling tests for SmartChunker legal-aware chunking.
+
+Checks that the forward boundary sweep in _legal_aware_chunking produces the
+same chunks as the original per-line scan over every boundary, and that
+chunking time grows linearly from 10K to 5M characters.
+"""
+
+import random
+import time
+from typing import List, Tuple
+
+import pytest
+
+from src.core.smart_chunker import SmartChunker
+
+
+SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+
+LINES = [
+    "ARTICLE {roman}. GENERAL PROVISIONS",
+    "Section {n}. The parties agree as follows.",
+    "See Brown v. Board, {n} U.S. {m} (1954); Smith v. Jones, {n} F.2d {m}.",
+    "The court held in {n} F.3d {m} that the claim under 42 U.S.C. § 1983 fails.",
+    '"The statute plainly requires notice before any action may be taken,',
+    'and the agency gave none," the panel wrote.',
+    "The appellant argues that the record on appeal does not support the finding.",
+    "(a) Notwithstanding the foregoing, the defendant shall pay damages.",
+    "Pursuant to 45 C.F.R. § 164.{n}, disclosure is permitted in limited cases.",
+    "",
+]
+
+
+def make_document(size: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+    while total < size:
+        line = rng.choice(LINES).format(
+            roman=rng.choice(["I", "II", "IV", "IX"]), n=rng.randint(1, 999), m=rng.randint(1, 999)
+        )
+        parts.append(line)
+        total += len(line) + 1
+    return "\n".join(parts)[:size]
+
+
+def reference_chunks(chunker: SmartChunker, text: str) -> List[Tuple[int, int, str]]:
+    """Original algorithm: test every boundary for every line."""
+    boundaries = chunker._find_legal_boundaries(text)
+    chunks = []
+    current_chunk: List[str] = []
+    current_size = 0
+    chunk_start = 0
+    lines = text.split("\n")
+    current_pos = 0
+
+    for line_num, line in enumerate(lines):
+        line_with_newline = line + "\n" if line_num < len(lines) - 1 else line
+        line_len = len(line_with_newline)
+        is_boundary = any(b[0] <= current_pos < b[1] for b in boundaries)
+        is_section_start = bool(chunker.section_pattern.match(line))
+
+        split = (is_section_start and current_size > chunker.config.min_chunk_size) or (
+            current_size + line_len > chunker.config.max_chunk_size and not is_boundary
+        )
+        if split:
+            if current_chunk:
+                chunk_text = "".join(current_chunk)
+                chunks.append((chunk_start, chunk_start + len(chunk_text), chunk_text))
+            current_chunk = [line_with_newline]
+            current_size = line_len
+            chunk_start = current_pos
+        else:
+            current_chunk.append(line_with_newline)
+            current_size += line_len
+        current_pos += line_len
+
+    if current_chunk:
+        chunk_text = "".join(current_chunk)
+        chunks.append((chunk_start, chunk_start + len(chunk_text), chunk_text))
+    return chunks
+
+
+@pytest.fixture(scope="module")
+def chunker():
+    return SmartChunker()
+
+
+class TestLegalAwareSweep:
+    """Equivalence with the original boundary scan."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_identical_chunks(self, chunker, seed):
+        text = make_document(60_000, seed=seed)
+        chunks = chunker._legal_aware_chunking(text)
+
+        assert [(c.start_pos, c.end_pos, c.text) for c in chunks] == reference_chunks(chunker, text)
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+
+    def test_multiline_quote_is_not_split(self, chunker):
+        quote = '"' + "x" * (chunker.config.max_chunk_size - 10) + "\n" + "y" * 200 + '"'
+        text = "Intro line.\n" + quote + "\nTrailing line."
+        chunks = chunker._legal_aware_chunking(text)
+
+        assert [(c.start_pos, c.end_pos, c.text) for c in chunks] == reference_chunks(chunker, text)
+        assert any(quote in c.text for c in chunks)
+
+    def test_empty_and_boundary_free_text(self, chunker):
+        assert [c.text for c in chunker._legal_aware_chunking("")] == [""]
+        text = "plain words\n" * 500
+        assert [(c.start_pos, c.end_pos, c.text) for c in chunker._legal_aware_chunking(text)] == \
+            reference_chunks(chunker, text)
+
+
+@pytest.mark.performance
+class TestLegalAwareScaling:
+    """Chunking time grows linearly with document size."""
+
+    def test_linear_scaling_10k_to_5m(self, chunker):
+        per_char = {}
+        for size in SIZES:
+            text = make_document(size)
+            start = time.perf_counter()
+            chunks = chunker._legal_aware_chunking(text)
+            elapsed = time.perf_counter() - start
+            per_char[size] = elapsed / size
+
+            assert chunks[-1].end_pos == len(text)
+            print(f"legal_aware_chunking {size:>9,} chars: {elapsed * 1000:8.1f} ms, {len(chunks):>6} chunks")
+
+        # The old per-line scan over every boundary was O(lines x boundaries)
+        assert per_char[5_000_000] < per_char[100_000] * 4
+        assert per_char[1_000_000] < per_char[100_000] * 4
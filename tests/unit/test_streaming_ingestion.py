@@ -0,0 +1,227 @@
+"""
+Unit tests for streaming ingestion of large documents.
+
+Documents are fed to StreamingChunker in uneven pieces; chunks must cover
+the document exactly once (outside overlaps), respect the size budget and
+citation/quote boundaries, and be produced before the stream ends. A regex
+extractor stands in for 3-wave extraction in the StreamingExtractor tests.
+"""
+
+import asyncio
+import random
+import re
+
+import pytest
+
+from src.core.config import get_settings
+from src.core.smart_chunker import SmartChunker
+from src.core.streaming_ingestion import StreamingChunker, StreamingExtractor, decode_text_stream
+from tests.unit.test_smart_chunker_scaling import make_document
+
+
+PARTIES = re.compile(r"\b(?:Alice Marie Smith|Brown|Board|Smith|Jones)\b")
+
+
+def make_chunker(max_size=3000, overlap=300):
+    config = get_settings().chunking.model_copy(
+        update={"chunking_max_size": max_size, "chunking_overlap": overlap}
+    )
+    return SmartChunker(config)
+
+
+async def pieces_of(text, seed=0, consumed=None):
+    rng = random.Random(seed)
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 5000)
+        if consumed is not None:
+            consumed.append(pos + size)
+        yield text[pos:pos + size]
+        pos += size
+        await asyncio.sleep(0)
+
+
+async def collect(async_iterable):
+    return [item async for item in async_iterable]
+
+
+@pytest.fixture(scope="module")
+def document():
+    return make_document(200_000, seed=21)
+
+
+class TestStreamingChunker:
+    """Chunks cut from a stream."""
+
+    async def test_cores_partition_document(self, document):
+        chunker = make_chunker()
+        chunks = await collect(StreamingChunker(chunker, lookahead_chars=1000).chunks(pieces_of(document)))
+
+        assert len(chunks) > 50
+        for chunk in chunks:
+            assert chunk.text == document[chunk.start_pos:chunk.end_pos]
+            assert chunk.length <= chunker.max_size
+        # Cores tile the document: each starts where the previous chunk's core ended
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.overlap_before > 0
+            assert document[previous.end_pos:chunk.core_start].strip() == ""
+        assert " ".join(
+            document[c.core_start:c.end_pos] for c in chunks
+        ).split() == document.split()
+
+    async def test_cuts_avoid_citations(self, document):
+        chunker = make_chunker()
+        chunks = await collect(StreamingChunker(chunker, lookahead_chars=1000).chunks(pieces_of(document, seed=1)))
+        citations = [m.span() for m in chunker.citation_pattern.finditer(document)]
+
+        cuts = [chunk.end_pos for chunk in chunks[:-1]]
+        assert not [cut for cut in cuts for start, end in citations if start < cut < end]
+
+    async def test_chunks_emitted_before_stream_ends(self, document):
+        consumed = []
+        stream = StreamingChunker(make_chunker(), lookahead_chars=1000).chunks(
+            pieces_of(document, seed=2, consumed=consumed)
+        )
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first.start_pos == 0
+        # Only the first chunk plus lookahead and one piece were read
+        assert consumed[-1] < 3000 + 1000 + 5000
+
+    async def test_full_buffer_forces_cut(self):
+        text = "x" * 50_000
+        chunker = make_chunker(max_size=100_000)
+        chunks = await collect(
+            StreamingChunker(chunker, lookahead_chars=1000, max_buffer_chars=10_000).chunks(pieces_of(text))
+        )
+
+        assert sum(chunk.end_pos - chunk.core_start for chunk in chunks) == len(text)
+        assert max(chunk.length for chunk in chunks) < 10_000 + 5000
+
+
+class TestStreamingExtractor:
+    """Chunks are extracted as they are cut, with bounded concurrency."""
+
+    async def test_entities_match_full_extraction(self, document):
+        running = {"now": 0, "max": 0}
+
+        async def extract_fn(text, metadata):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.001)
+            running["now"] -= 1
+            entities = [
+                {"entity_type": "PARTY", "text": m.group(), "start_pos": m.start(), "end_pos": m.end()}
+                for m in PARTIES.finditer(text)
+            ]
+            return {"entities": entities, "tokens_used": len(text) // 4}
+
+        extractor = StreamingExtractor(
+            extract_fn,
+            chunker=StreamingChunker(make_chunker(), lookahead_chars=1000),
+            max_inflight_chunks=3
+        )
+        # A run of multi-word names with no sentence breaks is cut between words,
+        # so some names start in a chunk's overlap and end past it
+        text = document[:60_000] + " ".join(["Alice Marie Smith"] * 2000) + document[60_000:100_000]
+        results = await collect(extractor.extract(pieces_of(text, seed=3)))
+
+        assert [r["chunk_index"] for r in results] == list(range(len(results)))
+        found = [(e["text"], e["start_pos"], e["end_pos"]) for r in results for e in r["entities"]]
+        assert sorted(found) == sorted((m.group(), m.start(), m.end()) for m in PARTIES.finditer(text))
+        assert 1 < running["max"] <= 3
+
+        straddling = [
+            e for previous, r in zip(results, results[1:]) for e in r["entities"]
+            if e["start_pos"] < previous["end_pos"] < e["end_pos"]
+        ]
+        assert straddling
+
+    async def test_failed_chunk_is_reported(self, document):
+        async def extract_fn(text, metadata):
+            if metadata["chunk_index"] == 1:
+                raise RuntimeError("vLLM unavailable")
+            return {"entities": [], "tokens_used": 1}
+
+        extractor = StreamingExtractor(extract_fn, chunker=StreamingChunker(make_chunker()))
+        results = await collect(extractor.extract(pieces_of(document[:20_000])))
+
+        assert results[1]["error"] == "vLLM unavailable"
+        assert all("error" not in r for r in results[:1] + results[2:])
+
+
+async def test_decode_splits_multibyte_characters():
+    data = "§ 1983 — “quoted”".encode("utf-8")
+
+    async def byte_pieces():
+        for i in range(len(data)):
+            yield data[i:i + 1]
+
+    assert "".join(await collect(decode_text_stream(byte_pieces()))) == "§ 1983 — “quoted”"
+
+
+class TestStreamRoute:
+    """POST /v2/process/extract/stream with a chunked request body."""
+
+    @pytest.mark.parametrize("trailing", ["", "\n\n   \n"])
+    async def test_chunked_body_is_read_whole(self, document, trailing):
+        import json
+
+        import httpx
+        from fastapi import FastAPI
+
+        from src.api.routes.intelligent import get_extraction_orchestrator, router
+
+        async def extract_fn(text, metadata):
+            await asyncio.sleep(0.001)
+            return {"entities": [], "tokens_used": 1}
+
+        class StreamingOrchestrator:
+            async def extract_stream(self, pieces, metadata=None):
+                extractor = StreamingExtractor(extract_fn, chunker=StreamingChunker(make_chunker()))
+                async for result in extractor.extract(pieces, metadata):
+                    yield result
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_extraction_orchestrator] = StreamingOrchestrator
+
+        text = document[:50_000] + trailing
+
+        async def body():
+            data = text.encode("utf-8")
+            for i in range(0, len(data), 1000):
+                yield data[i:i + 1000]
+                await asyncio.sleep(0)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/v2/process/extract/stream", params={"document_id": "doc"},
+                content=body(), headers={"content-type": "text/plain; charset=utf-8"}
+            )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        summary = lines[-1]
+        assert summary["done"] and "error" not in summary
+        assert summary["chars_processed"] == len(text)
+        assert [line["chunk_index"] for line in lines[:-1]] == list(range(summary["chunks"]))
+
+
+async def test_orchestrator_streams_with_its_chunker(document):
+    from unittest.mock import MagicMock
+
+    from src.core.extraction_orchestrator import ExtractionOrchestrator
+
+    chunker = make_chunker(max_size=2000)
+    orchestrator = ExtractionOrchestrator(prompt_manager=MagicMock(), vllm_client=MagicMock(), smart_chunker=chunker)
+
+    async def extract_three_wave(text, metadata=None):
+        return {"entities": [], "tokens_used": 1}
+
+    orchestrator._extract_three_wave = extract_three_wave
+    results = await collect(orchestrator.extract_stream(pieces_of(document[:20_000])))
+
+    assert orchestrator._streaming_extractor.chunker.chunker is chunker
+    assert max(r["end_pos"] - r["start_pos"] for r in results) <= chunker.max_size
@@ -0,0 +1,197 @@
+"""
+Unit tests for token-exact chunk sizing.
+
+Covers TokenCounter (batched counting, LRU cache, budget fitting, fallback)
+and SmartChunker / SizeDetector sizing with a token counter. A small regex
+tokenizer with the tokenizers.Tokenizer interface stands in for the served
+model's tokenizer; the tokenizer.json round trip runs when the optional
+tokenizers package is installed.
+"""
+
+import re
+
+import pytest
+
+from src.core.config import get_settings
+from src.core.smart_chunker import ChunkingStrategy, SmartChunker
+from src.core.token_counter import TokenCounter
+from src.routing.size_detector import SizeDetector
+from tests.unit.test_smart_chunker_scaling import make_document
+
+
+class FakeEncoding:
+    def __init__(self, matches):
+        self.ids = list(range(len(matches)))
+        self.offsets = [match.span() for match in matches]
+
+
+class FakeTokenizer:
+    """Words, numbers and single punctuation marks are one token each."""
+
+    TOKEN = re.compile(r"\w+|[^\w\s]")
+
+    def __init__(self):
+        self.encoded_texts = 0
+        self.batch_calls = 0
+
+    def encode(self, text, add_special_tokens=True):
+        self.encoded_texts += 1
+        return FakeEncoding(list(self.TOKEN.finditer(text)))
+
+    def encode_batch(self, texts, add_special_tokens=True):
+        self.batch_calls += 1
+        return [self.encode(text) for text in texts]
+
+
+def true_count(text: str) -> int:
+    return len(FakeTokenizer.TOKEN.findall(text))
+
+
+@pytest.fixture
+def tokenizer():
+    return FakeTokenizer()
+
+
+@pytest.fixture
+def counter(tokenizer):
+    return TokenCounter(tokenizer=tokenizer, cache_size=1000)
+
+
+def make_chunker(counter: TokenCounter, max_tokens: int) -> SmartChunker:
+    config = get_settings().chunking.model_copy(update={"chunking_max_tokens": max_tokens})
+    return SmartChunker(config, token_counter=counter)
+
+
+class TestTokenCounter:
+    """Counting, caching and budget fitting."""
+
+    def test_batch_encodes_only_cache_misses(self, counter, tokenizer):
+        texts = ["Brown v. Board, 347 U.S. 483", "See id.", "Brown v. Board, 347 U.S. 483"]
+
+        assert counter.count_batch(texts) == [true_count(t) for t in texts]
+        assert (tokenizer.batch_calls, tokenizer.encoded_texts) == (1, 2)
+
+        assert counter.count_batch(texts + ["new text"]) == [true_count(t) for t in texts] + [2]
+        assert (tokenizer.batch_calls, tokenizer.encoded_texts) == (2, 3)
+        assert counter.get_stats()["cache_hit_rate"] == pytest.approx(3 / 6)
+
+    def test_cache_is_lru_bounded(self, tokenizer):
+        counter = TokenCounter(tokenizer=tokenizer, cache_size=2)
+        for text in ("a", "b", "a", "c"):
+            counter.count(text)
+
+        assert counter.get_stats()["cache_entries"] == 2
+        encoded = tokenizer.encoded_texts
+        counter.count("a")
+        assert tokenizer.encoded_texts == encoded
+        counter.count("b")
+        assert tokenizer.encoded_texts == encoded + 1
+
+    def test_count_document_sums_cached_paragraphs(self, counter, tokenizer):
+        text = make_document(20_000, seed=3)
+        assert counter.count_document(text) == true_count(text)
+
+        encoded = tokenizer.encoded_texts
+        edited = text + "\n\nA new closing paragraph."
+        assert counter.count_document(edited) == true_count(edited)
+        assert tokenizer.encoded_texts - encoded <= 2
+
+    def test_fit_cuts_at_exact_budget(self, counter):
+        text = make_document(50_000, seed=2)
+        for start, budget in [(0, 1), (100, 37), (1234, 500), (10_000, 4000)]:
+            cut = counter.fit(text, start, len(text), budget)
+            assert true_count(text[start:cut]) == budget
+            # The cut ends a token rather than splitting one
+            assert true_count(text[start:cut + 1]) in (budget, budget + 1)
+            assert not text[cut - 1].isspace()
+
+        assert counter.fit(text, 0, 50, 10_000) == 50
+
+    def test_fallback_without_tokenizer(self):
+        counter = TokenCounter(tokenizer_path="/nonexistent/tokenizer.json", chars_per_token=4.0)
+
+        assert not counter.is_exact
+        assert counter.count("x" * 400) == 100
+        assert counter.fit("x" * 1000, 100, 1000, 50) == 300
+
+    def test_loads_tokenizer_json(self, tmp_path):
+        tokenizers = pytest.importorskip("tokenizers")
+        vocab = {"[UNK]": 0, "the": 1, "court": 2, "held": 3}
+        tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+        tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+        tokenizer.save(str(tmp_path / "tokenizer.json"))
+
+        counter = TokenCounter(tokenizer_path=str(tmp_path))
+        assert counter.is_exact
+        assert counter.count("the court held that") == 4
+        assert counter.fit("the court held that", 0, 19, 2) == len("the court")
+
+
+class TestTokenSizedChunking:
+    """SmartChunker fills token budgets."""
+
+    def test_paragraph_chunks_fill_budget(self, counter):
+        chunker = make_chunker(counter, max_tokens=120)
+        text = make_document(30_000, seed=8).replace("\n", "\n\n")
+        chunks = chunker._paragraph_aware_chunking(text)
+        sizes = [true_count(chunk.text) for chunk in chunks]
+
+        assert max(sizes) <= 120
+        # Greedy packing: the next paragraph would not have fit
+        for chunk, following in zip(chunks, chunks[1:]):
+            first_paragraph = text[following.start_pos:following.end_pos].split("\n\n")[0]
+            assert true_count(chunk.text) + true_count(first_paragraph) > 120
+
+    def test_oversized_paragraph_is_split_at_budget(self, counter):
+        chunker = make_chunker(counter, max_tokens=50)
+        text = " ".join(f"word{i}" for i in range(500))
+        chunks = chunker._paragraph_aware_chunking(text)
+
+        assert [true_count(chunk.text) for chunk in chunks] == [50] * 10
+        assert " ".join(chunk.text for chunk in chunks) == text
+
+    def test_fixed_size_chunks_fill_budget(self, counter):
+        chunker = make_chunker(counter, max_tokens=200)
+        text = make_document(40_000, seed=9)
+        sizes = [true_count(chunk.text) for chunk in chunker._fixed_size_chunking(text)]
+
+        assert max(sizes) <= 200
+        # Only the word-boundary back-off is left unused
+        assert min(sizes[:-1]) >= 195
+
+    @pytest.mark.parametrize("method", ["_legal_aware_chunking", "_section_aware_chunking"])
+    def test_structural_chunks_respect_budget(self, counter, method):
+        chunker = make_chunker(counter, max_tokens=200)
+        text = make_document(40_000, seed=9)
+        chunks = getattr(chunker, method)(text)
+
+        assert " ".join(chunk.text for chunk in chunks).split() == text.split()
+        sizes = [true_count(chunk.text) for chunk in chunks]
+        # Legal-aware chunks may run over only to keep a citation or quote whole
+        assert sum(size > 200 for size in sizes) <= len(sizes) // 20
+
+    def test_smart_chunks_fit_budget_with_overlap(self, counter):
+        chunker = make_chunker(counter, max_tokens=400)
+        text = make_document(100_000, seed=10)
+        chunks = chunker.smart_chunk_document(text, strategy=ChunkingStrategy.FIXED_SIZE)
+
+        assert all(true_count(chunk.text) <= 400 for chunk in chunks)
+        assert sum(true_count(chunk.text) for chunk in chunks) / len(chunks) > 390
+        assert all(chunk.overlap_after > 0 for chunk in chunks[:-1])
+        assert chunks[-1].end_pos == len(text.rstrip())
+
+    def test_character_sizing_unchanged_without_budget(self, counter):
+        chunker = SmartChunker(get_settings().chunking, token_counter=counter)
+        assert chunker.token_counter is None
+        assert chunker.max_size == get_settings().chunking.max_chunk_size
+
+
+class TestSizeDetectorTokens:
+    """SizeDetector uses exact counts when a tokenizer is loaded."""
+
+    def test_exact_counts_with_tokenizer(self, counter):
+        text = make_document(10_000, seed=11)
+
+        assert SizeDetector(token_counter=counter).detect(text).tokens == true_count(text)
+        assert SizeDetector().detect(text).tokens == len(text) // 4
+        assert SizeDetector(token_counter=TokenCounter()).detect(text).tokens == len(text) // 4